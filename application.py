@@ -8,11 +8,10 @@ Application class to store properties of the application being created
 """
 
 
-import os, sys, random, re, logging, time
-import wx
+import os, sys, re, logging, time
+from compat import wx  # None without wxPython; then projects can be loaded and code generated
 
-import common, config, misc, compat, clipboard
-import bugdialog
+import common, config, misc, compat, clipboard, codegen
 import new_properties as np
 
 
@@ -67,10 +66,63 @@ class FileDirDialog(object):
         return self.value
 
 
+def _index_add(index, key, widget):
+    if key: index.setdefault(key, set()).add(widget)
+
+
+def _index_remove(index, key, widget):
+    widgets = index.get(key)
+    if widgets is None: return
+    widgets.discard(widget)
+    if not widgets: del index[key]
+
+
 class EditRoot(np.PropertyOwner):
     IS_ROOT = True
     parent = None
 
+    # project wide indexes of names and classes ########################################################################
+    # these are updated from NameProperty and ClassProperty and when widgets are removed;
+    # the indexes may contain stale entries (e.g. deactivated class properties), so lookups verify each candidate
+    def _init_indexes(self):
+        self._names = {}        # widget -> name
+        self._names_index = {}  # name -> set of widgets
+        self._classes = {}      # widget -> class name
+        self._classes_index = {}  # class name -> set of widgets
+        self._leaves_index = {}   # last part of a dotted class name like "module.Class" -> set of widgets
+
+    def track_name(self, widget, name=None):
+        "add, update or (name=None) remove widget in the name index"
+        _index_remove( self._names_index, self._names.pop(widget, None), widget )
+        if not name: return
+        self._names[widget] = name
+        _index_add(self._names_index, name, widget)
+
+    def track_class(self, widget, klass=None):
+        "add, update or (klass=None) remove widget in the class indexes"
+        old = self._classes.pop(widget, None)
+        if old:
+            _index_remove(self._classes_index, old, widget)
+            if "." in old: _index_remove(self._leaves_index, old.rsplit(".",1)[-1], widget)
+        if not klass: return
+        self._classes[widget] = klass
+        _index_add(self._classes_index, klass, widget)
+        if "." in klass: _index_add(self._leaves_index, klass.rsplit(".",1)[-1], widget)
+
+    def untrack(self, widget):
+        "remove widget from all indexes; called from recursive_remove"
+        self.track_name(widget)
+        self.track_class(widget)
+
+    def find_widgets_by_class(self, klass):
+        "returns the widgets with an active class property of the given value"
+        return [w for w in self._classes_index.get(klass, ()) if w.check_prop("class") and w.klass==klass]
+
+    def find_widgets_by_leaf_class(self, leaf):
+        "returns the widgets with an active class property like 'module.leaf'"
+        return [w for w in self._leaves_index.get(leaf, ())
+                if w.check_prop("class") and "." in w.klass and w.klass.rsplit(".",1)[-1]==leaf]
+
     # XXX move this to EditBase
     def get_all_children(self):
         return self.children
@@ -124,31 +176,37 @@ class EditRoot(np.PropertyOwner):
         # add a . to the file extensions
         attrs["source_extension"] = '.' + self.properties["source_extension"].get_string_value()
         attrs["header_extension"] = '.' + self.properties["header_extension"].get_string_value()
+        if self.embed_bitmaps: attrs["embed_bitmaps"] = 1
 
-        inner_xml = []
+        # the children are written directly to output, which may be a common.XMLWriter instead of a list
+        output.append( u'<application %s>\n' % common.format_xml_attrs(**attrs) )
 
         if self.is_template and getattr(self, 'template_data', None):
-            self.template_data.write(inner_xml, tabs+1)
+            self.template_data.write(output, tabs+1)
 
         for c in self.children:
-            c.write(inner_xml, tabs+1)
+            c.write(output, tabs+1)
 
-        output.extend( common.format_xml_tag( u'application', inner_xml, is_xml=True, **attrs ) )
+        output.append( u'</application>\n' )
 
     def find_widget_from_path(self, path):
-        path = path.split("/")
-        index = 1  # skip 'app'
-        w = self
-        for index in range(1, len(path)):
-            if path[index].startswith("SLOT "):
-                pos = int(path[index].split(" ")[1])
-                if pos<len(w.children) and w.children[pos].IS_SLOT:
-                    w = w.children[pos]
-                    continue
-            children = [c for c in w.get_all_children() if c.name==path[index]]
-            if not children: return None
-            w = children[0]
-        return w
+        # the first element is the application and will be ignored
+        names = path.split("/")
+        if len(names)==1: return self
+        name = names[-1]
+        if name.startswith("SLOT "):
+            parent = self.find_widget_from_path( "/".join(names[:-1]) )
+            if parent is None or not parent.children: return None
+            pos = int(name.split(" ")[1])
+            if pos<len(parent.children) and parent.children[pos] is not None and parent.children[pos].IS_SLOT:
+                return parent.children[pos]
+            return None
+        # candidates from the name index; compare the paths without the application name
+        path = "/".join(names[1:])
+        for widget in self._names_index.get(name, ()):
+            if widget.get_path().split("/",1)[-1]==path:
+                return widget
+        return None
 
     def clear(self):
         # delete all children; call common.root.new() or .init() afterwards
@@ -188,6 +246,8 @@ class _DirDialog:
         return self.value
 
 
+_FD_SAVE_STYLE = (wx.FD_SAVE | wx.FD_OVERWRITE_PROMPT) if wx is not None else 0  # file dialog of OutputPathProperty
+
 class OutputPathProperty(np.FileNameProperty):
     dir_message = _("Choose a directory")
     def _create_dialog(self):
@@ -211,7 +271,7 @@ class Application(EditRoot):
                          "Generate source files for wxWidgets version 3.0\nOld style import are not supported anymore.")
 
     PROPERTIES = ["Application", "name", "class", "encoding", "use_gettext", "top_window", "multiple_files",
-                                 "language", "for_version", "overwrite", "mark_blocks",
+                                 "language", "for_version", "overwrite", "mark_blocks", "embed_bitmaps",
                                  "output_path", "generate_code",
                   "Settings",    "indent_mode", "indent_amount", "source_extension", "header_extension"]
     _PROPERTY_LABELS = {"source_extension":     'C++ source file ext',
@@ -221,6 +281,7 @@ class Application(EditRoot):
                         "multiple_files":       "Code Generation",
                         "overwrite":            "Keep user code",
                         "mark_blocks":          "Mark code blocks",
+                        "embed_bitmaps":        "Embed bitmaps",
                         "generate_code":        "Generate Source"}
     _PROPERTY_HELP = {"name":            'Name of the instance created from "Class";\n'
                                          ' also used as (main) file name in case of "Separate file for each class"',
@@ -237,7 +298,10 @@ class Application(EditRoot):
                       "output_path": "Output file or directory: absolute or relative path",
                       "mark_blocks":"Mark auto-generated code blocks with BEGIN/END wxGlade comments.\n"
                                     "This allows to identify user code in source files.\n"
-                                    "Therefore it can not be disabled if 'Keep user code' is selected."
+                                    "Therefore it can not be disabled if 'Keep user code' is selected.",
+                      "embed_bitmaps":"for Python and C++ only: store the content of bitmap files in the generated code\n"
+                                      "instead of loading the files at runtime.\n"
+                                      "Widgets using the same file share the data."
                       }
     if sys.platform=="win32":
         _PROPERTY_HELP["output_path"] = "Output file or directory; double click label to show in Explorer"
@@ -250,8 +314,11 @@ class Application(EditRoot):
 
     def __init__(self):
         np.PropertyOwner.__init__(self)
+        self._init_indexes()
+        self._preview_cache = {}  # toplevel name -> (checksum, code object, have_extracode); see preview()
 
         self.__saved    = True  # raw value for self.saved property; if True, there are no changes to save
+        self.changes    = 0     # incremented with each change, i.e. each time saved is set to False; see autosave
         self.__filename = None  # raw value for the self.filename property; Name of the output XML file
 
         # initialise instance properties
@@ -276,12 +343,13 @@ class Application(EditRoot):
         self.header_extension = np.TextProperty('h')
         # output path: file or directory, depening on 'multiple_files'
         output_path = config.default_output_path  if self.multiple_files else  config.default_output_file
-        self.output_path = OutputPathProperty(output_path, style=wx.FD_SAVE|wx.FD_OVERWRITE_PROMPT)
+        self.output_path = OutputPathProperty(output_path, style=_FD_SAVE_STYLE)
         self._update_output_path('python')
 
         self.overwrite = np.InvCheckBoxProperty(config.default_overwrite)
         # YYY 
         self.mark_blocks = np.CheckBoxProperty(True)
+        self.embed_bitmaps = np.CheckBoxProperty(False)
 
         # output language
         languages = sorted( common.code_writers.keys() )
@@ -332,6 +400,7 @@ class Application(EditRoot):
         try:
             unicode('a', value)
         except LookupError as inst:
+            import bugdialog
             bugdialog.Show(_('Set Encoding'), inst)
             self.encoding_prop.set_value(self.encoding)
         else:
@@ -357,6 +426,9 @@ class Application(EditRoot):
         else:
             self.properties["for_version"].set_blocked(False)
 
+        # only some code writers support embedded bitmaps
+        self.properties["embed_bitmaps"].set_blocked( common.code_writers[language].tmpl_embedded_bitmap is None )
+
         # don't change the extension in multiple files mode
         if self.multiple_files == 1:
             return
@@ -381,6 +453,7 @@ class Application(EditRoot):
     def _get_saved(self):
         return self.__saved
     def _set_saved(self, value):
+        if not value: self.changes += 1
         if self.__saved != value:
             self.__saved = value
             if not config.use_gui: return
@@ -466,6 +539,7 @@ class Application(EditRoot):
 
     def _init(self):
         # common part for init and new
+        self._preview_cache.clear()
         p = self.properties
         p["multiple_files"].set( config.default_multiple_files )
         p["indent_mode"].set(1)
@@ -536,6 +610,10 @@ class Application(EditRoot):
             writer.generate_code(self, widget)
             writer.finalize()
         except EnvironmentError as inst:
+            if not config.use_gui:
+                logging.error( _('An IO related error has occurred: %s'), inst )
+                return
+            import bugdialog
             bugdialog.ShowEnvironmentError(_('An IO related error has occurred:'), inst)
             return
         except UnicodeEncodeError as inst:
@@ -548,10 +626,15 @@ class Application(EditRoot):
         except Exception as inst:
             # unexpected / internal error
             if config.testing or config.debugging: raise
+            if not config.use_gui:
+                logging.exception( _('Internal Error') )
+                return
+            import bugdialog
             bugdialog.Show(_('Generate Code'), inst)
             return
         finally:
             writer.clean_up(widget or self)
+            common.save_files_manifests()
 
         if preview or not config.use_gui: return writer
         if config.preferences.show_completion:
@@ -566,78 +649,45 @@ class Application(EditRoot):
     def is_visible(self):
         return True
 
-    def _get_preview_filename(self):
-        import warnings
-        warnings.filterwarnings("ignore", "tempnam", RuntimeWarning, "application")
-        if compat.PYTHON2:
-            out_name = os.tempnam(None, 'wxg') + '.py'
-        else:
-            # create a temporary file at either the output path or the project path
-            error = None
-            if not self.filename:
-                error = "Save project first; a temporary file will be created in the same directory."
-            else:
-                dirname, basename = os.path.split(self.filename)
-                basename, extension = os.path.splitext(basename)
-                basename = basename.replace(".", "_")
-                if not os.path.exists(dirname):
-                    error = "Directory '%s' not found"%dirname
-                elif not os.path.isdir(dirname):
-                    error = "'%s' is not a directory"%dirname
-            if error:
-                misc.error_message(error)
-                return None
-            while True:
-                out_name = os.path.join(dirname, "_%s_%d.py"%(basename,random.randrange(10**8, 10**9)))
-                if not os.path.exists(out_name): break
-        return out_name
-
     def preview(self, widget, position=None):
         """Generate and instantiate preview widget.
         None will be returned in case of errors. The error details are written to the application log file."""
 
-        preview_filename = self._get_preview_filename()
-        if preview_filename is None: return
-
-        if wx.Platform == "__WXMAC__" and not compat.PYTHON2:
-            # workaround for Mac OS testing: sometimes the caches need to be invalidated
-            import importlib
-            importlib.invalidate_caches()
-
         # make a valid name for the class (this can be invalid for some sensible reasons...)
         preview_classname = widget.WX_CLASS.split('.')[-1].split(':')[-1]
-        # randomize the class name to make preview work when there are multiple classes with the same name (e.g. XRC)
-        preview_classname = '_%d_%s' % (random.randrange(10 ** 8, 10 ** 9), preview_classname)
-        widget.properties["class"].set_temp(preview_classname)
+        preview_classname = '_preview_%s' % preview_classname
+
+        # the compiled code is cached for each toplevel and re-generated if the toplevel or its children were modified
+        settings = repr( (preview_classname, self.encoding, self.properties["indent_mode"].get_string_value(),
+                          self.indent_amount, compat.version, config.version) )
+        checksum = codegen.get_checksum(widget, settings)
+        cached = self._preview_cache.get(widget.name)
 
         frame = None
+        have_extracode = False
         try:
-            # create preview module
-            writer = self.generate_code(True, preview_filename, widget)
-            # import generated preview module dynamically
-            preview_path = os.path.dirname(preview_filename)
-            preview_module_name = os.path.basename(preview_filename)
-            preview_module_name = os.path.splitext(preview_module_name)[0]
-            if preview_path not in sys.path: sys.path.append(preview_path)
-            preview_module = __import__(preview_module_name, {}, {}, ['just_not_empty'])
-
-            if not preview_module:
-                misc.error_message( _('Can not import the preview module from file \n"%s".\n'
-                                      'The details are written to the log file.\n'
-                                      'If you think this is a wxGlade bug, please report it.') % self.output_path )
-                return None
-
-            try:
-                preview_class = getattr(preview_module, preview_classname) # .klass)
-            except AttributeError:
-                # module loaded previously -> do a re-load XXX this is required for Python 3; check alternatives
-                if sys.version_info.major<3:
-                    preview_module = reload(preview_module)
-                else:
-                    import importlib
-                    preview_module = importlib.reload(preview_module)
-                preview_class = getattr(preview_module, preview_classname)
-
+            if cached and cached[0]==checksum:
+                checksum, code, have_extracode = cached
+            else:
+                # create preview code in memory
+                widget.properties["class"].set_temp(preview_classname)
+                writer = self.generate_code(True, "<preview>", widget)
+                if writer is None:
+                    # error message has been displayed already
+                    widget.restore_properties()
+                    return None
+                have_extracode = writer.have_extracode
+                code = compile(writer.preview_code, "<preview of %s>"%widget.name, "exec")
+                self._preview_cache[widget.name] = (checksum, code, have_extracode)
+            # modules next to the project may be imported by custom widgets or extra code
+            if self.filename:
+                preview_path = os.path.dirname(os.path.abspath(self.filename))
+                if preview_path not in sys.path: sys.path.append(preview_path)
+            # execute in a fresh namespace; this is not registered as module, so nothing is left in sys.modules
+            namespace = {"__name__":"_wxglade_preview"}
+            exec(code, namespace)
+
+            preview_class = namespace.get(preview_classname)
             if not preview_class:
                 misc.error_message( _('No preview class "%s" found.\nThe details are written to the log file.\n'
                                       'If you think this is a wxGlade bug, please report it.') % widget.klass )
@@ -692,22 +742,18 @@ class Application(EditRoot):
             frame.Bind(wx.EVT_CHAR_HOOK, self.on_char_hook)
             # keep a reference to the Close method in case it's overwritten by some widget
             frame._close_method = preview_class.Close
-
-            # remove the temporary file
-            if not config.debugging:
-                name = os.path.join(preview_path, preview_module_name+".py")
-                if os.path.isfile(name): os.unlink(name)
         except Exception as inst:
             if config.debugging or config.testing: raise
             widget.preview_widget = None
             widget.properties["preview"].set_label(_('Show Preview'))
-            if writer.have_extracode:
+            if have_extracode:
                 # could be caused by user code: just report
                 msg = ["Exception during preview, potentially due to invalid code in custom widget:","",
                        inst.__class__.__name__, inst.msg]
                 wx.MessageBox("\n".join(msg), "Preview Error", wx.CANCEL|wx.CENTRE|wx.ICON_EXCLAMATION, parent=common.main)
             else:
                 # internal error to be reported
+                import bugdialog
                 bugdialog.Show(_("Generate Preview"), inst)
 
         return frame
@@ -6,39 +6,95 @@
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import copy, logging, os, os.path, random, re, sys, time
+import bisect, copy, hashlib, json, logging, os, os.path, random, re, sys, time
 
-import common, config, compat, misc
+import common, config, compat
 import wcodegen
 import functools
 from collections import OrderedDict
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:
+    ThreadPoolExecutor = None  # Python 2: the files are handled one after the other
 
 
-def _replace_tag(lst, tag, content):
+def _is_tag(line):
+    return line.startswith("<") and line.endswith((">", ">\n"))
+
+
+class _TagIndex(object):
+    """Positions of the placeholder tags in a list of lines, to avoid searching the whole list for each replacement.
+    The positions are updated by _replace_tag(); the index is re-built if the list was modified otherwise."""
+    def __init__(self):
+        self.lines = None
+        self.length = 0
+        self.positions = {}  # tag -> sorted list of positions
+
+    def _build(self, lines):
+        self.lines = lines
+        self.length = len(lines)
+        self.positions = {}
+        for i, line in enumerate(lines):
+            if _is_tag(line):
+                self.positions.setdefault(line, []).append(i)
+
+    def find(self, lines, tag):
+        "returns the position of the first occurrence of tag in lines or None"
+        if lines is not self.lines or len(lines) != self.length:
+            self._build(lines)
+        positions = self.positions.get(tag)
+        if not positions: return None
+        if lines[positions[0]] != tag:
+            # an item was replaced without going through _replace_tag()
+            self._build(lines)
+            positions = self.positions.get(tag)
+            if not positions: return None
+        return positions[0]
+
+    def replaced(self, tag, idx, content):
+        "update the positions after lines[idx:idx+1] = content"
+        positions = self.positions[tag]
+        del positions[0]
+        if not positions: del self.positions[tag]
+        delta = len(content) - 1
+        if delta:
+            for positions in self.positions.values():
+                if positions[-1] > idx:
+                    positions[:] = [pos+delta if pos>idx else pos for pos in positions]
+            self.length += delta
+        for i, line in enumerate(content):
+            if _is_tag(line):
+                bisect.insort( self.positions.setdefault(line, []), idx+i )
+
+
+def _replace_tag(lst, tag, content, index=None):
     # used before writing generated code to file: replace placeholder tag with content
     # an example tag: '<15535320686269365730972wxGlade extra_modules>\n'
+    # index: _TagIndex instance that belongs to lst; otherwise a temporary one will be created
+    if index is None: index = _TagIndex()
     ret = False
     add_line = False
-    if not tag in lst and not tag.endswith("\n"):
+    if index.find(lst, tag) is None and not tag.endswith("\n"):
         tag = tag + "\n"
         add_line = True
     while True:
-        try:
-            idx = lst.index(tag)
-        except ValueError:
+        idx = index.find(lst, tag)
+        if idx is None:
             return ret
         if isinstance(content, list):
             if add_line:
-                lst[idx:idx+1] = content + ["\n"]
+                new = content + ["\n"]
             else:
-                lst[idx:idx+1] = content
+                new = content
         elif isinstance(content, compat.basestring):
             if add_line:
-                lst[idx] = content + "\n"
+                new = [content + "\n"]
             else:
-                lst[idx] = content
+                new = [content]
         else:
             raise ValueError("Internal error")
+        lst[idx:idx+1] = new
+        index.replaced(tag, idx, new)
         ret = True
 
 
@@ -65,6 +121,7 @@ class BaseSourceFileContent(object):
         self.new_classes_inserted = False  # Flag if the placeholder for new classes has been inserted in file already
         self.code_writer = code_writer     # Reference to the parent code writer object (BaseLangCodeWriter instance)
         self.spaces = {}                   # Indentation level for each class
+        self._tag_index = _TagIndex()      # Positions of the tags in content; see replace()
 
         self.nonce = code_writer.nonce
         self.out_dir = code_writer.out_dir
@@ -79,7 +136,7 @@ class BaseSourceFileContent(object):
             pass
 
     def replace(self, tag, content):
-        return _replace_tag(self.content, tag, content)
+        return _replace_tag(self.content, tag, content, self._tag_index)
 
     def build_untouched_content(self):
         """Builds a string with the contents of the file that must be left as is, and replaces the wxGlade blocks
@@ -122,13 +179,53 @@ class ClassLines(object):
         self.dependencies = set() # Names of the modules this class depends on
         self.deps = []
         self.event_handlers = []  # Lines to bind events (see wcodegen.BaseWidgetWriter.get_event_handlers())
-        self.extra_code = []      # Extra code to output before this class
+        self.extra_code = []      # Extra code to output before this class; including embedded bitmaps
         self.done = False         # If True, the code for this class has already been generated
         # XXX refactor init and final into init_code, final_code?
         self.init = []            # Lines of code to insert in the __init__ method (for children widgets)
         self.final = []  # to be inserted after children, e.g. Add or AddPage for sizers / notebooks
 
 
+_encoded_bitmaps = {}  # (language, content hash) -> lines of encoded data; see BaseLangCodeWriter._get_encoded_bitmap()
+_BITMAPS_MAX_FILES = 2000  # limits for the caches in the application data directory; see common.prune_cache_dir()
+_BITMAPS_MAX_BYTES = 100*1024*1024
+_MANIFESTS_MAX_FILES = 500
+_MANIFESTS_MAX_BYTES = 20*1024*1024
+
+
+def get_checksum(obj, settings):
+    """checksum over the given settings string and the properties of obj and all its descendants;
+    used for incremental code generation and for caching the preview code"""
+    checksum = hashlib.md5( settings.encode("utf-8") )
+    def update(obj):
+        checksum.update( repr( (obj.__class__.__name__, obj.WX_CLASS) ).encode("utf-8") )
+        for name in obj.property_names:
+            prop = obj.properties[name]
+            if prop.HAS_DATA:
+                # for flags, value may be None, to be calculated on demand from value_set
+                value = sorted(prop.value_set)  if hasattr(prop, "value_set") else  prop.value
+                checksum.update( repr( (name, prop.deactivated, value) ).encode("utf-8") )
+        for child in obj.get_all_children():
+            if child is not None: update(child)
+    update(obj)
+    return checksum.hexdigest()
+
+
+def get_manifest_filename(directory):
+    "returns the name of the manifest file for incremental code generation into the given output directory"
+    digest = hashlib.md5( os.path.abspath(directory).encode("utf-8") ).hexdigest()
+    return os.path.join(config.appdata_path, "codegen_manifests", "%s.json" % digest)
+
+
+class CodegenManifest(object):
+    "Checksums of the toplevel windows and stamps of the generated files; for incremental code generation"
+    def __init__(self, filename, settings, previous):
+        self.filename = filename  # manifest file in the application data directory; see get_manifest_filename()
+        self.settings = settings  # settings that affect the code of all classes, as string
+        self.previous = previous  # toplevel name -> {"checksum":..., "files":[[filename, size, mtime], ...]}
+        self.current = {}         # the same for this run
+
+
 class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
     """Dictionary of objects used to generate the code in a given language.
 
@@ -236,6 +333,13 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
     # code generation templates
 
     tmpl_encoding = None  # Template of the encoding notices; file encoding will be added to the output in save_file()
+
+    # embedded bitmaps; see add_embedded_bitmap()
+    tmpl_embedded_bitmap = None  # definition, to be added to the extra code; None if embedding is not supported
+    tmpl_embedded_bitmap_stmt = None  # statement that returns the wxBitmap
+    embedded_bitmap_dependency = None  # module to import / header to include for embedded bitmaps
+    embedded_bitmap_chunk_size = 16  # number of bytes per line of data; see _encode_bitmap()
+    embedded_bitmap_indent = 1  # indentation level of the lines of data
     tmpl_block_begin = '%(tab)s%(comment_sign)s begin wxGlade: %(klass)s%(class_separator)s%(function)s\n'
 
     tmpl_cfunc_end = ''        # Statement to add at the end of a class function. e.g. 'return $self;' for Perl.
@@ -272,6 +376,7 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
     tmpl_gettext_simple = None    # simplified application start code with gettext support
 
     _show_warnings = True  # Enable or disable printing of warning messages; see self.warning()
+    _incremental = True    # with multiple files, skip unchanged toplevel windows; see _load_manifest()
 
     def __init__(self):
         "Initialise only instance variables using there defaults"
@@ -306,9 +411,19 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         self.out_dir = None
         self.output_file_name = None
         self.output_file = None
+        self._output_file_tags = _TagIndex()  # positions of the tags in output_file; see output_file_replace()
         self.previous_source = None
+        self.saved_files = []  # (filename, written) for each file stored by save_file(); see common.save_file()
+        self.preview_code = None  # for preview, the code is kept in memory instead of being written; see save_file()
+        self._executor = None       # thread pool for file handling with multiple files; see _start_file_jobs()
+        self._prefetched = {}       # filename -> future of SourceFileContent or None; see _prefetch_source()
+        self._pending_files = []    # (filename, future) of files being written, in order; see _wait_for_files()
+        self._submitted_files = []  # names of all files passed to save_file(), in order
         self._app_added = False
         self._current_extra_code = []
+        self._current_class = None    # ClassLines instance that code is being generated for; see add_embedded_bitmap()
+        self._embed_bitmaps = False
+        self._embedded_bitmaps = {}   # absolute path -> (name, definition) or None if the file can't be read
         self._overwrite = config.default_overwrite
         self._mark_blocks = True # YYY config.mark_blocks
         self._textdomain = 'app'
@@ -382,6 +497,7 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         self.out_dir = os.path.normpath( os.path.expanduser(self.out_dir.strip()) )
         self.preview = preview
         self.have_extracode = False  # set to True if (extra) code for custom widget is added
+        self._embed_bitmaps = app.embed_bitmaps and not preview and self.tmpl_embedded_bitmap is not None
 
         # any of the following could return an error as string
         return self.init_lang(app) or self.check_values() or self.init_files(self.out_dir)
@@ -420,11 +536,13 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         return None
 
     def output_file_replace(self, tag, content):
-        _replace_tag(self.output_file, tag, content)
+        _replace_tag(self.output_file, tag, content, self._output_file_tags)
 
     def check_values(self):
         "Check the validity of output directory/file name"
         out_dir = self.out_dir
+        if self.preview:
+            return None  # nothing will be written
         if not self.multiple_files:
             if os.path.isdir(out_dir):
                 return "Output path is directory, not file"
@@ -456,6 +574,7 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         # first the item
         klass = IS_CLASS and self.add_class(obj) or None
         if not obj.IS_TOPLEVEL:
+            self._current_class = parent_klass
             builder = self.add_object(parent_klass, parent, parent_builder, obj)
         else:
             builder = None
@@ -470,13 +589,235 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
     def generate_code(self, root, widget=None):
         "entry point for recursive code generation via _generate_code()"
         # root must be application.Application instance for now
-        for c in root.children or []:
-            if widget is not None and c is not widget: continue # for preview
-            self._generate_code(None, None, None, c)
-        if not root.IS_ROOT or self.preview: return
-        topwin = [c for c in root.children if c.name==root.top_window]
-        topwin = topwin and topwin[0] or root.children and root.children[0] or None
-        self.add_app(root, topwin)
+        manifest = self._load_manifest(root, widget)
+        generated = []  # for the manifest: (name, checksum, names of the files)
+        self._start_file_jobs()
+        try:
+            for c in root.children or []:
+                if widget is not None and c is not widget: continue # for preview
+                if manifest is None:
+                    self._generate_code(None, None, None, c)
+                    continue
+                # incremental code generation: skip toplevel windows if neither they nor their files were modified
+                checksum = get_checksum(c, manifest.settings)
+                entry = manifest.previous.get(c.name)
+                if entry and entry["checksum"]==checksum and all(self._check_file_stamp(f) for f in entry["files"]):
+                    manifest.current[c.name] = entry
+                    continue
+                submitted = len(self._submitted_files)
+                self._generate_code(None, None, None, c)
+                generated.append( (c.name, checksum, self._submitted_files[submitted:]) )
+            self._wait_for_files()
+            if manifest is not None:
+                saved = set(filename for filename, written in self.saved_files)
+                for name, checksum, filenames in generated:
+                    files = [self._get_file_stamp(filename) for filename in filenames if filename in saved]
+                    manifest.current[name] = {"checksum":checksum, "files":files}
+                self._save_manifest(manifest)
+            if not root.IS_ROOT or self.preview: return
+            topwin = [c for c in root.children if c.name==root.top_window]
+            topwin = topwin and topwin[0] or root.children and root.children[0] or None
+            self.add_app(root, topwin)
+            self._wait_for_files()
+        finally:
+            self._stop_file_jobs()
+
+    # parallel file handling with multiple files #######################################################################
+    # Existing source files are parsed in a thread pool, starting when the class is added, i.e. while the code of the
+    # class and its children is collected. The files are written in the pool as well.
+    # Results, warnings and log messages are processed in the order of the classes, so the output is deterministic.
+    def _start_file_jobs(self):
+        jobs = config.preferences.codegen_jobs
+        if jobs > 1 and self.multiple_files and not self.preview and ThreadPoolExecutor is not None:
+            self._executor = ThreadPoolExecutor(jobs)
+
+    def _stop_file_jobs(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._prefetched.clear()
+        del self._pending_files[:]
+
+    def _get_class_source_names(self, klass):
+        "returns the name of the file for the class and the name to be passed to SourceFileContent"
+        filename = self._get_class_filename(klass)
+        return filename, filename
+
+    def _prefetch_source(self, klass):
+        "start parsing the existing file of the class in the thread pool; called from add_class()"
+        if self._executor is None or self._overwrite: return
+        filename, source_name = self._get_class_source_names(klass)
+        # with a second class of the same name, the file must be parsed after the first one has been written
+        if filename in self._prefetched or not self._file_exists(filename): return
+        self._prefetched[filename] = self._executor.submit(self.SourceFileContent, source_name, self)
+
+    def _get_previous_source(self, klass):
+        "returns a SourceFileContent instance for the existing file of the class or None; for multiple files"
+        filename, source_name = self._get_class_source_names(klass)
+        future = self._prefetched.get(filename)
+        if future is not None:
+            self._prefetched[filename] = None
+            return future.result()
+        self._wait_for_files(filename)
+        if self._overwrite or not self._file_exists(filename):
+            return None
+        return self.SourceFileContent(source_name, self)
+
+    def _wait_for_files(self, filename=None):
+        "wait until the files are written; process results in the order of save_file() calls"
+        if filename is not None:
+            # just wait for the given file, without processing the results yet
+            for name, future in self._pending_files:
+                if name==filename: future.exception()
+            return
+        pending = self._pending_files[:]
+        del self._pending_files[:]
+        for filename, future in pending:
+            self._process_saved_file(filename, future.result)
+
+    # incremental code generation ######################################################################################
+    # With multiple files, a manifest per output directory stores a checksum for each toplevel window and the
+    # size and modification time of the generated files; a window is skipped if nothing has changed.
+    # The manifests are kept in the application data directory, so nothing is added to the user's source tree.
+    def _load_manifest(self, root, widget=None):
+        "returns a CodegenManifest instance or None if incremental code generation is not applicable"
+        if not self._incremental or not self.multiple_files or self.preview or widget is not None: return None
+        if self._embed_bitmaps: return None  # the manifest does not cover the bitmap files
+        if not root.IS_ROOT: return None
+        filename = get_manifest_filename(self.out_dir)
+        previous = self._read_manifest(filename).get(self.language, {})
+
+        # the header of the files depends on the preferences; see create_generated_by()
+        generated_from = config.preferences.write_generated_from and common.app_tree and root.filename
+        settings = [self.language, config.version, self.for_version, self.app_encoding, self.indent_symbol,
+                    self.indent_amount, self._overwrite, self._mark_blocks, self._use_gettext, self.out_dir,
+                    config.preferences.write_timestamp, config.preferences.write_generated_from, generated_from]
+        settings += [( name, root.properties[name].deactivated, root.properties[name].value )
+                     for name in root.property_names if not name in ("name", "class", "top_window")]
+        return CodegenManifest(filename, repr(settings), previous)
+
+    def _read_manifest(self, filename):
+        if not self._file_exists(filename): return {}
+        try:
+            with open(filename) as infile:
+                data = json.load(infile)
+            if isinstance(data, dict):
+                # the directory is stored as well, in case of a hash collision
+                if data.get("directory")!=os.path.abspath(self.out_dir): return {}
+                return data
+        except (EnvironmentError, ValueError):
+            pass
+        logging.warning( _('Ignoring invalid code generation manifest "%s"'), filename )
+        return {}
+
+    def _save_manifest(self, manifest):
+        data = self._read_manifest(manifest.filename)  # keep the entries of the other languages
+        data["directory"] = os.path.abspath(self.out_dir)
+        data[self.language] = manifest.current
+        # written to a temporary file first, as batch mode processes may share the output directory
+        tmp_filename = "%s.%d.tmp" % (manifest.filename, os.getpid())
+        try:
+            if not os.path.isdir( os.path.dirname(manifest.filename) ):
+                os.makedirs( os.path.dirname(manifest.filename) )
+            with open(tmp_filename, "w") as outfile:
+                json.dump(data, outfile, indent=1, sort_keys=True)
+            common.replace_file(tmp_filename, manifest.filename)
+            common.prune_cache_dir(os.path.dirname(manifest.filename), _MANIFESTS_MAX_FILES, _MANIFESTS_MAX_BYTES)
+        except EnvironmentError as inst:
+            self.warning( _('Could not write code generation manifest "%s": %s') % (manifest.filename, inst) )
+            if os.path.isfile(tmp_filename): os.remove(tmp_filename)
+
+    def _get_file_stamp(self, filename):
+        stat = os.stat(filename)
+        return [os.path.relpath(filename, self.out_dir), stat.st_size, stat.st_mtime]
+
+    def _check_file_stamp(self, stamp):
+        "check whether a file still has the size and modification time as stored in the manifest"
+        filename, size, mtime = stamp
+        filename = os.path.join(self.out_dir, filename)
+        if not self._file_exists(filename): return False
+        stat = os.stat(filename)
+        return stat.st_size==size and stat.st_mtime==mtime
+
+    # Embedded bitmaps: with the option "embed_bitmaps" of the application, the content of bitmap files is stored
+    # in the generated code. The definitions are added to the extra code of the classes; files with the same content
+    # share one definition. The encoded data is cached by content hash, also across runs.
+    def add_embedded_bitmap(self, filename):
+        """Add the definition of an embedded bitmap to the current class;
+        returns the statement to create the bitmap or None if the file can't be read"""
+        # relative paths are relative to the output directory, as for loading the files at runtime
+        path = filename
+        if os.path.sep != "\\": path = path.replace("\\", os.path.sep)
+        output_dir = self.out_dir  if self.multiple_files else  os.path.dirname(self.out_dir)
+        path = os.path.abspath( os.path.join(output_dir, path) )
+        if path in self._embedded_bitmaps:
+            entry = self._embedded_bitmaps[path]
+        else:
+            entry = self._embedded_bitmaps[path] = self._create_embedded_bitmap(filename, path)
+        if entry is None: return None
+        name, definition = entry
+        klass = self._current_class
+        if klass is not None:
+            self._add_extra_code(klass, definition)
+            if self.embedded_bitmap_dependency:
+                klass.dependencies.add(self.embedded_bitmap_dependency)
+        return self.tmpl_embedded_bitmap_stmt % {"name": name}
+
+    def _add_extra_code(self, klass, code):
+        if code not in klass.extra_code:
+            klass.extra_code.append(code)
+
+    def _create_embedded_bitmap(self, filename, path):
+        # returns (name, definition) or None
+        try:
+            with open(path, "rb") as infile:
+                content = infile.read()
+        except EnvironmentError as inst:
+            self.warning( _('Bitmap file "%s" could not be embedded: %s') % (filename, inst) )
+            return None
+        if not content:
+            self.warning( _('Bitmap file "%s" could not be embedded: file is empty') % filename )
+            return None
+        digest = hashlib.sha1(content).hexdigest()
+        basename = re.sub( r'\W', '_', os.path.splitext(os.path.basename(path))[0] ).lower()
+        name = "embedded_bitmap_%s_%s" % (basename, digest[:8])
+        tab = self.tabs(self.embedded_bitmap_indent)
+        data = "\n".join( tab + line for line in self._get_encoded_bitmap(content, digest) )
+        return name, self.tmpl_embedded_bitmap % {"name": name, "data": data, "tab": self.tabs(1)}
+
+    def _get_encoded_bitmap(self, content, digest):
+        "returns the lines of the encoded data; see _encode_bitmap(); cached in memory and in the application data dir"
+        key = (self.language, digest)
+        if key in _encoded_bitmaps:
+            return _encoded_bitmaps[key]
+        cache_filename = os.path.join(config.appdata_path, "embedded_bitmaps", "%s.%s" % (digest, self.lang_prefix))
+        lines = None
+        if os.path.isfile(cache_filename):
+            try:
+                with open(cache_filename, "r") as infile:
+                    lines = infile.read().split("\n")
+                common.touch_cache_file(cache_filename)
+            except EnvironmentError as inst:
+                logging.debug( _("Can't read cached bitmap %s: %s"), cache_filename, inst )
+        if lines is None:
+            lines = self._encode_bitmap(content)
+            tmp_filename = "%s.%d.tmp" % (cache_filename, os.getpid())
+            try:
+                if not os.path.isdir( os.path.dirname(cache_filename) ):
+                    os.makedirs( os.path.dirname(cache_filename) )
+                with open(tmp_filename, "w") as outfile:
+                    outfile.write( "\n".join(lines) )
+                common.replace_file(tmp_filename, cache_filename)
+                common.prune_cache_dir(os.path.dirname(cache_filename), _BITMAPS_MAX_FILES, _BITMAPS_MAX_BYTES)
+            except EnvironmentError as inst:
+                logging.debug( _("Can't write cached bitmap %s: %s"), cache_filename, inst )
+                if os.path.isfile(tmp_filename): os.remove(tmp_filename)
+        _encoded_bitmaps[key] = lines
+        return lines
+
+    def _encode_bitmap(self, content):
+        "returns the content of a bitmap file as list of strings, i.e. the lines of data without indentation"
+        raise NotImplementedError
 
     def finalize(self):
         "Code generator finalization function"
@@ -601,6 +942,7 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
             raise
 
         ret = self.classes[code_obj] = self.ClassLines()
+        if self.multiple_files: self._prefetch_source(klass)
         return ret
 
     def finalize_class(self, code_obj):
@@ -610,16 +952,14 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         if self.multiple_files:
             # let's see if the file to generate exists, and in this case create a SourceFileContent instance
             filename = self._get_class_filename(klass)
-            if self._overwrite or not self._file_exists(filename):
-                prev_src = None
-            else:
-                prev_src = self.SourceFileContent(filename, self)
+            prev_src = self._get_previous_source(klass)
         else:
             # previous_source is the SourceFileContent instance that keeps info about the single file to generate
             prev_src = self.previous_source
 
         builder = self.obj_builders[code_obj.WX_CLASS]
         mycn = getattr(builder, 'cn', self.cn)
+        self._current_class = self.classes[code_obj]
 
         # collect all event handlers
         event_handlers = self.classes[code_obj].event_handlers
@@ -841,12 +1181,12 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         else:
             is_supported = True
         if not is_supported:
-            supported_versions = [misc.format_supported_by(version) for version in builder.config['supported_by']]
+            supported_versions = [common.format_supported_by(version) for version in builder.config['supported_by']]
             msg = _('Code for instance "%(name)s" of "%(klass)s" was\n'
                     'not created, because the widget is not available for wx version %(requested_version)s.\n'
                     'It is available for wx versions %(supported_versions)s only.') % {
                         'name':  self._format_name(obj.name), 'klass': obj.klass,
-                        'requested_version':  str(misc.format_for_version(self.for_version)),
+                        'requested_version':  str(common.format_for_version(self.for_version)),
                         'supported_versions': ', '.join(supported_versions) }
             self._source_warning(parent_klass, msg, obj)
             self.warning(msg)
@@ -1071,7 +1411,30 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
         content:      File content as list of strings
         mainfile:     Mainfiles gets a shebang and 0755 permissions.
         content_only: Write only content to the file"""
+        tmp = self._get_file_content(content, mainfile, content_only)
 
+        if self.preview:
+            # the preview code will be compiled and executed from memory; see application.Application.preview()
+            self.preview_code = b"".join(tmp)
+            return
+
+        # check for necessary sub directories e.g. for Perl or Python modules
+        dirname = os.path.dirname(filename)
+        if dirname and not os.path.isdir(dirname):
+            try:
+                os.makedirs(dirname)
+            except:
+                logging.exception( _('Can not create output directory "%s"'), dirname )
+
+        # save the file now or in the thread pool; see _wait_for_files()
+        self._submitted_files.append(filename)
+        if self._executor is not None:
+            self._pending_files.append( (filename, self._executor.submit(self._write_file, filename, tmp, mainfile)) )
+            return
+        self._process_saved_file( filename, lambda: self._write_file(filename, tmp, mainfile) )
+
+    def _get_file_content(self, content, mainfile=False, content_only=False):
+        "returns the content with the file header as list of bytes; see save_file()"
         tmp = []
 
         # write additional information to file header
@@ -1106,32 +1469,33 @@ class BaseLangCodeWriter(wcodegen.BaseCodeWriter):
             return line
 
         # UnicodeEncodeError will be handled in application.generate_code
-        tmp = [encode(line) for line in tmp if line]
+        return [encode(line) for line in tmp if line]
 
-        # check for necessary sub directories e.g. for Perl or Python modules
-        dirname = os.path.dirname(filename)
-        if dirname and not os.path.isdir(dirname):
+    def _write_file(self, filename, content, mainfile):
+        "store content via common.save_file(); may be executed in the thread pool; returns (written, warnings)"
+        warnings = []
+        written = common.save_file(filename, content, 'codegen')
+        if mainfile and sys.platform in ['linux2', 'darwin']:
             try:
-                os.makedirs(dirname)
-            except:
-                logging.exception( _('Can not create output directory "%s"'), dirname )
+                # make the file executable
+                os.chmod(filename, 0o755)
+            except OSError as e:
+                # this isn't necessarily a bad error
+                warnings.append( _('Changing permission of file "%s" failed: %s') % (filename, str(e)) )
+        return written, warnings
 
-        # save the file now
+    def _process_saved_file(self, filename, get_result):
         try:
-            common.save_file(filename, tmp, 'codegen')
+            written, warnings = get_result()
+            self.saved_files.append( (filename, written) )
+            for warning in warnings:
+                self.warning(warning)
         except (UnicodeEncodeError, EnvironmentError):
             # these will be handled inside application.generate_code
             raise
         except:
             if config.debugging: raise
             logging.exception(_('Internal Error'))
-        if mainfile and sys.platform in ['linux2', 'darwin']:
-            try:
-                # make the file executable
-                os.chmod(filename, 0o755)
-            except OSError as e:
-                # this isn't necessarily a bad error
-                self.warning(_('Changing permission of file "%s" failed: %s') % (filename, str(e)))
 
         logging.info('Generated %s', filename)
 
@@ -8,9 +8,9 @@ C++ code generator
 """
 
 
-import os.path, re, logging
+import binascii, os.path, re, logging
 
-from codegen import BaseLangCodeWriter, BaseSourceFileContent, _replace_tag
+from codegen import BaseLangCodeWriter, BaseSourceFileContent, _replace_tag, _TagIndex
 from codegen import ClassLines as BaseClassLines
 import config, wcodegen
 
@@ -95,6 +95,7 @@ class SourceFileContent(BaseSourceFileContent):
 
         # initialise new variables first
         self.header_content = None
+        self._header_tag_index = _TagIndex()
         #self.source_content = None
         self.content = None
         self.event_table_decl = {}
@@ -106,7 +107,7 @@ class SourceFileContent(BaseSourceFileContent):
         BaseSourceFileContent.__init__(self, name, code_writer)
 
     def replace_header(self, tag, content):
-        return _replace_tag(self.header_content, tag, content)
+        return _replace_tag(self.header_content, tag, content, self._header_tag_index)
 
     def build_untouched_content(self):
         BaseSourceFileContent.build_untouched_content(self)
@@ -249,6 +250,7 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
 
     see: BaseLangCodeWriter"""
     ClassLines = ClassLines
+    SourceFileContent = SourceFileContent
     _code_statements = {
         'backgroundcolour': "%(objname)sSetBackgroundColour(%(value)s);\n",
         'disabled':         "%(objname)sEnable(0);\n",
@@ -266,6 +268,18 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
 
     class_separator = '::'
 
+    tmpl_embedded_bitmap = ( 'static wxBitmap %(name)s()\n'
+                             '{\n'
+                             '%(tab)sstatic const unsigned char data[] = {\n'
+                             '%(data)s\n'
+                             '%(tab)s};\n'
+                             '%(tab)swxMemoryInputStream stream(data, sizeof(data));\n'
+                             '%(tab)sreturn wxBitmap(wxImage(stream, wxBITMAP_TYPE_ANY));\n'
+                             '}\n' )
+    tmpl_embedded_bitmap_stmt = '%(name)s()'
+    embedded_bitmap_dependency = '<wx/mstream.h>'
+    embedded_bitmap_indent = 2
+
     language_note = \
         '// Example for compiling a single file project under Linux using g++:\n' \
         '//  g++ MyApp.cpp $(wx-config --libs) $(wx-config --cxxflags) -o MyApp\n' \
@@ -372,6 +386,7 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
         # extra lines to generate (see the 'extracode' property of top-level widgets)
         self._current_extra_code_h = []
         self._current_extra_code_cpp = []
+        self._embedded_bitmaps_added = set()  # definitions added already; for single file output
 
     def init_files(self, out_path):
         if self.multiple_files:
@@ -397,6 +412,7 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
                 self.previous_source = None
                 self.output_header = []
                 self.output_file   = []
+                self._output_header_tags = _TagIndex()  # positions of the tags in output_header
 
                 # isolation directives
                 oh = os.path.basename(name + "." + self.header_extension).upper().replace( '.', '_' )
@@ -419,7 +435,7 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
                 self.output_file.append('\n')
 
     def output_header_replace(self, tag, content):
-        _replace_tag(self.output_header, tag, content)
+        _replace_tag(self.output_header, tag, content, self._output_header_tags)
 
     def finalize(self):
         if self.previous_source:
@@ -512,8 +528,14 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
             # this is an error, let the exception be raised; the details are logged by the global exception handler
             raise
         ret = self.classes[code_obj] = self.ClassLines()  # ClassLines will collect the code lines incl. children
+        if self.multiple_files: self._prefetch_source(code_obj.klass)
         return ret
 
+    def _get_class_source_names(self, klass):
+        # the header file is checked for existence; SourceFileContent will read header and source
+        filename = os.path.join(self.out_dir, klass.replace('::', '_') + "." + self.header_extension)
+        return filename, os.path.join(self.out_dir, klass)
+
     def finalize_class(self, code_obj):
         # write the collected code for the class and its children
         base = code_obj.WX_CLASS
@@ -523,11 +545,7 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
 
         if self.multiple_files:
             # let's see if the file to generate exists, and in this case create a SourceFileContent instance
-            filename = os.path.join(self.out_dir, classname.replace('::', '_') + "." + self.header_extension)
-            if self._overwrite or not self._file_exists(filename):
-                prev_src = None
-            else:
-                prev_src = SourceFileContent( os.path.join(self.out_dir, classname), self )
+            prev_src = self._get_previous_source(classname)
         else:
             # in this case, previous_source is the SourceFileContent instance
             # that keeps info about the single file to generate
@@ -542,6 +560,7 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
         builder = self.obj_builders[base]
         mycn = getattr(builder, 'cn', self.cn)
         mycn_f = getattr(builder, 'cn_f', self.cn_f)
+        self._current_class = klass
 
         # collect all event handlers
         event_handlers = klass.event_handlers
@@ -560,12 +579,6 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
                 self.warning( '%s has extra code, but you are not overwriting existing sources:'
                               ' please check that the resulting code is correct!' % code_obj.name )
 
-        if not self.multiple_files:
-            if klass.extra_code_h:
-                self._current_extra_code_h.append( "\n".join( klass.extra_code_h[::-1] ) )
-            if klass.extra_code_cpp:
-                self._current_extra_code_cpp.append( "\n".join( klass.extra_code_cpp[::-1] ) )
-
         default_sign = [('wxWindow*', 'parent'), ('wxWindowID', 'id')]
         sign = getattr(builder, 'constructor', default_sign)
 
@@ -805,6 +818,13 @@ class CPPCodeWriter(BaseLangCodeWriter, wcodegen.CppMixin):
         else:
             source_buffer.extend(code_lines)
 
+        if not self.multiple_files:
+            # after the code generation, as definitions of embedded bitmaps are added during it; see _add_extra_code()
+            if klass.extra_code_h:
+                self._current_extra_code_h.append( "\n".join( klass.extra_code_h[::-1] ) )
+            if klass.extra_code_cpp:
+                self._current_extra_code_cpp.append( "\n".join( klass.extra_code_cpp[::-1] ) )
+
         if not self.multiple_files and prev_src:
             # if this is a new class, add its code to the new_classes list of the SourceFileContent instance
             if is_new:
@@ -1094,6 +1114,20 @@ void %(klass)s::%(handler)s(%(evt_type)s &event)  // wxGlade: %(klass)s.<event_h
     def quote_path(self, s):
         return 'wxT(%s)' % super(CPPCodeWriter, self).quote_path(s)
 
+    def _encode_bitmap(self, content):
+        size = self.embedded_bitmap_chunk_size
+        data = binascii.hexlify(content).decode("ascii")
+        return [" ".join("0x%s," % data[j:j+2] for j in range(i, min(i+2*size, len(data)), 2))
+                for i in range(0, len(data), 2*size)]
+
+    def _add_extra_code(self, klass, code):
+        # the definitions of embedded bitmaps go into the source file; with a single file, each one only once
+        if code in klass.extra_code_cpp: return
+        if not self.multiple_files:
+            if code in self._embedded_bitmaps_added: return
+            self._embedded_bitmaps_added.add(code)
+        klass.extra_code_cpp.append(code)
+
     def _quote_str(self, s):
         if self._use_gettext:
             return '_("%s")' % s
@@ -168,6 +168,8 @@ class LispCodeWriter(BaseLangCodeWriter, wcodegen.LispMixin):
 
     SourceFileContent = SourceFileContent
 
+    _incremental = False  # class_lines and dependencies are collected over all classes
+
     tmpl_sizeritem = '(wxSizer_AddWindow (%s obj) (%s obj) %s %s %s nil)\n'  # will be overwritten and restored
 
     tmpl_cfunc_end = '%(tab)s)\n'
@@ -8,7 +8,7 @@ Python code generator
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import os, os.path, random, re
+import base64, os, os.path, random, re
 from codegen import BaseLangCodeWriter, BaseSourceFileContent
 import wcodegen
 import compat
@@ -204,6 +204,11 @@ class PythonCodeWriter(BaseLangCodeWriter, wcodegen.PythonMixin):
     tmpl_toplevel_style = '%(tab)skwds["style"] = kwds.get("style", 0) | %(style)s\n'
     tmpl_style0 = '%(tab)skwds["style"] = 0\n'
     tmpl_toplevel_style0 = '%(tab)skwds["style"] = kwds.get("style", 0)\n'
+    tmpl_embedded_bitmap = '%(name)s = PyEmbeddedImage(\n%(data)s)\n'
+    tmpl_embedded_bitmap_stmt = '%(name)s.GetBitmap()'
+    embedded_bitmap_dependency = 'from wx.lib.embeddedimage import PyEmbeddedImage\n'
+    embedded_bitmap_chunk_size = 54  # 72 characters of base64
+
     tmpl_appfile = """\
 %(overwrite)s\
 %(header_lines)s\
@@ -491,6 +496,10 @@ from %(top_win_module)s import %(top_win_class)s\n\n"""
         else:
             return '%s.%s((%s))\n' % (objname, method, size)
 
+    def _encode_bitmap(self, content):
+        size = self.embedded_bitmap_chunk_size
+        return ['"%s"' % base64.b64encode(content[i:i+size]).decode("ascii") for i in range(0, len(content), size)]
+
     def _quote_str(self, s):
         """Escape all unicode characters to there unicode code points in form of \\uxxxx.
         The returned string is a pure ascii string.
@@ -14,9 +14,8 @@ To be done: write XRC directly instead of using BaseLangCodeWriter as base.
 from xml.sax.saxutils import escape, quoteattr
 from codegen import BaseLangCodeWriter
 from collections import OrderedDict
-import common, wcodegen
-import new_properties as np
-import logging
+import common, config, wcodegen
+import hashlib, io, logging, os, zipfile
 
 
 class XrcObject(wcodegen.XrcWidgetCodeWriter):
@@ -96,8 +95,8 @@ class SpacerXrcObject(XrcObject):
             output.append( tabs1 + '<size>%s, %s</size>\n' % (obj.width, obj.height) )
             if obj.proportion:
                 output.append(tabs1 + '<option>%s</option>\n' % obj.proportion)
-            if obj.flag:
-                flag = obj.properties["flag"].get_string_value()
+            flag = obj.properties["flag"].get_string_value()
+            if flag:
                 output.append(tabs1 + '<flag>%s</flag>\n' % self.cn_f(flag))
             if obj.border:
                 output.append(tabs1 + '<border>%s</border>\n' % obj.border)
@@ -127,7 +126,7 @@ class DefaultXrcObject(XrcObject):
         if not val:
             return
 
-        if isinstance(val, np.BitmapProperty):
+        if getattr(val, "IS_BITMAP", False):
             # rename: no '..._bitmap' and some renames
             if name.endswith('_bitmap'):
                 name = name[:-7]
@@ -158,6 +157,10 @@ class DefaultXrcObject(XrcObject):
             logging.warn( _('XRC: Unsupported bitmap statement "%s" for %s "%s"'), val, self.klass, self.name )
             return None
 
+        if self.codegen.archive_bitmaps is not None:
+            # .xrs output: refer to the copy inside the archive
+            val = self.codegen.add_archive_bitmap(val) or val
+
         return common.format_xml_prop(name, val, ntabs)
 
     def write(self, output, ntabs, properties=None):
@@ -177,8 +180,7 @@ class DefaultXrcObject(XrcObject):
                 output.append(self.tabs(ntabs) + '<object class=%s name=%s>\n' % (quoteattr(self.klass), quoteattr(name)))
         tab_str = self.tabs(ntabs + 1)
         # write the properties
-        import edit_sizers
-        active_properties = self.widget.get_properties(without=set(edit_sizers.SizerBase.MANAGED_PROPERTIES))
+        active_properties = self.widget.get_properties(without=set(common.MANAGED_PROPERTIES))
 
         font = None
         for prop in active_properties:
@@ -228,7 +230,7 @@ class DefaultXrcObject(XrcObject):
                 if value:
                     properties.update(value)
                 continue
-            if isinstance(prop, np.BitmapProperty):
+            if prop.IS_BITMAP:
                 value = prop
             else:
                 if value is None: value = prop.get_string_value()
@@ -292,6 +294,11 @@ class XRCCodeWriter(BaseLangCodeWriter, wcodegen.XRCMixin):
 
     use_names_for_binding_events = False
 
+    # for .xrs output: bitmap files are stored in the archive under a name derived from their content
+    tmpl_archive_bitmap = 'bitmaps/%s%s'  # SHA-1 of the content, extension
+    archive_stored_extensions = ('.gif', '.jpeg', '.jpg', '.png')  # compressed already; stored without compression
+    archive_bitmaps = None  # for .xrs output: OrderedDict content hash -> (name in archive, content)
+
     # inject different XRC objects
     XrcObject = XrcObject
     SizerItemXrcObject = SizerItemXrcObject
@@ -320,15 +327,95 @@ class XRCCodeWriter(BaseLangCodeWriter, wcodegen.XRCMixin):
         self.out_file.append('\n<resource version="2.3.0.1">\n')
         self.curr_tab = 1
         self.xrc_objects = OrderedDict()
+        self.archive_bitmaps = None
+        self._archive_paths = {}  # bitmap path -> name in archive or None if the file could not be read
 
     def finalize(self):
+        # with the extension .xrs, the code and the bitmap files are stored in a zip archive, which can be
+        # loaded directly by wxXmlResource
+        if os.path.splitext(self.output_file_name)[1].lower() == '.xrs':
+            self.archive_bitmaps = OrderedDict()
         # write the code for every toplevel object
         for obj in self.xrc_objects.values():
             obj.write(self.out_file, 1)
         self.out_file.append('</resource>\n')
         # store the contents to file
-        self.save_file( self.output_file_name, self.out_file )
+        if self.archive_bitmaps is not None:
+            self.save_archive( self.output_file_name, self.out_file )
+        else:
+            self.save_file( self.output_file_name, self.out_file )
         self.out_file = None
+        self.archive_bitmaps = None
+
+    def add_archive_bitmap(self, filename):
+        """Add a bitmap file to the .xrs archive; files with the same content are stored only once.
+        Relative paths are relative to the output file, like for .xrc files loaded by wxXmlResource.
+        Returns the name inside the archive or None if the file could not be read."""
+        path = filename
+        if os.path.sep != "\\": path = path.replace("\\", os.path.sep)
+        path = os.path.normpath( os.path.join(os.path.dirname(os.path.abspath(self.output_file_name)), path) )
+        if path in self._archive_paths:
+            return self._archive_paths[path]
+        try:
+            with open(path, "rb") as infile:
+                content = infile.read()
+        except EnvironmentError as inst:
+            self.warning( _('XRC: Bitmap file "%s" could not be added to the archive: %s') % (filename, inst) )
+            name = None
+        else:
+            digest = hashlib.sha1(content).hexdigest()
+            if digest not in self.archive_bitmaps:
+                name = self.tmpl_archive_bitmap % (digest, os.path.splitext(path)[1].lower())
+                self.archive_bitmaps[digest] = (name, content)
+            name = self.archive_bitmaps[digest][0]
+        self._archive_paths[path] = name
+        return name
+
+    def save_archive(self, filename, content):
+        "Store the XRC code and the bitmaps as .xrs file, i.e. as zip archive; see save_file()"
+        xrc_name = os.path.splitext( os.path.basename(filename) )[0] + '.xrc'
+        xrc_content = b"".join( self._get_file_content(content) )
+        bitmaps = list( self.archive_bitmaps.values() )
+        self._submitted_files.append(filename)
+        self._process_saved_file( filename, lambda: (self._write_archive(filename, xrc_name, xrc_content, bitmaps),[]) )
+
+    def _get_archive_checksum(self, xrc_content, bitmap_names):
+        # the names of the bitmaps contain the hash of their content; the timestamp of the XRC code is ignored
+        return common._smart_checksum( [xrc_content] + [name.encode("ascii") + b"\n" for name in bitmap_names] )
+
+    def _write_archive(self, filename, xrc_name, xrc_content, bitmaps):
+        "write the archive, if the content has changed; returns True if written"
+        checksum = self._get_archive_checksum( xrc_content, [name for name, data in bitmaps] )
+        if os.path.isfile(filename):
+            # as for other generated files, the archive is only read if modified since it was written
+            old_checksum = common._get_recorded_checksum(filename)
+            if old_checksum is None:
+                try:
+                    with zipfile.ZipFile(filename) as archive:
+                        names = archive.namelist()
+                        old_checksum = self._get_archive_checksum( archive.read(xrc_name),
+                                                                   [name for name in names if name != xrc_name] )
+                except (zipfile.BadZipfile, KeyError, EnvironmentError):
+                    pass
+            if checksum == old_checksum:
+                common._record_checksum(filename, checksum)
+                return False
+
+        # write to memory first; fixed timestamps to get the same archive for the same content
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, "w") as archive:
+            for name, content in [(xrc_name, xrc_content)] + bitmaps:
+                info = zipfile.ZipInfo(name, (1980, 1, 1, 0, 0, 0))
+                info.external_attr = 0o644 << 16
+                if os.path.splitext(name)[1] in self.archive_stored_extensions:
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, content)
+
+        common.write_file( filename, lambda outfile: outfile.write(data.getvalue()), config.preferences.codegen_backup )
+        common._record_checksum(filename, checksum)
+        return True
 
     def generate_code(self, root, widget=None):
         "entry point for recursive code generation via _generate_code()"
@@ -18,10 +18,10 @@ except:
     from hashlib import md5
 from collections import OrderedDict
 
-import logging, os, os.path, sys, tempfile
+import io, json, logging, os, os.path, shutil, sys, tempfile, threading, time
 from xml.sax.saxutils import escape, quoteattr
 
-import config, compat, plugins, misc
+import config, compat, plugins, profiling
 
 
 widget_classes = {}   # EditWidget class name -> EditWidget class
@@ -30,6 +30,8 @@ widgets_from_xml = {} # Factory functions to build objects from a XML file
 
 class_names = {} # maps the name of the classes used by wxGlade to the correspondent classes of wxWindows
 
+MANAGED_PROPERTIES = ["span", "proportion", "border", "flag"]  # the layout properties of a sizer item
+
 # references to windows:
 main = None            # main window
 palette = None         # the panel which contains the various buttons to add the different widgets
@@ -50,6 +52,9 @@ pin_design_window = False
 # used to call the appropriate builder function when a dropping of a widget occurs, knowing only the id of the event
 refs = {}
 
+# for key handler in palette window:
+palette_hotkeys = {"S":"Sizers"}  # key to section name
+
 history = None
 
 ########################################################################################################################
@@ -64,14 +69,29 @@ def init_codegen():
 
     Returns OrderedDict with module sections as key and assigned list of wxBitmapButtons in GUI mode.
     The dict is empty in batch mode.
+    If the widget registry is up to date, the widget modules are imported on demand; in GUI mode, the palette
+    buttons are then created from the registry.
 
     see: load_config() load_code_writers(), load_widgets(), load_sizers()"""
     # process generic related style attributes
     style_attrs_to_sets(config.widget_config['generic_styles'])
-    load_config()
-    load_code_writers()
-    all_widgets = load_widgets()
-    sizer_buttons = load_sizers()
+    if plugins.load_registry():
+        # the widget modules will be imported on first use
+        with profiling.phase("load_code_writers"):
+            load_code_writers()
+        plugins.init_lazy_loading()
+        all_widgets = plugins.create_palette_buttons()
+    else:
+        plugins.record_registry()
+        with profiling.phase("load_config"):
+            load_config()
+        with profiling.phase("load_code_writers"):
+            load_code_writers()
+        with profiling.phase("load_widgets"):
+            all_widgets = load_widgets()
+        plugins.save_registry(all_widgets)
+    with profiling.phase("load_sizers"):
+        sizer_buttons = load_sizers()
 
     # initialize preview code generator
     preview_codegen = code_writers["preview"] = code_writers["python"].copy()
@@ -219,6 +239,7 @@ def add_toplevel_object(event):
     if editor is None: return
     history.widget_adding(root)
     history.widget_added(editor)
+    import misc
     misc.rebuild_tree(widget=editor, recursive=editor.children, focus=True)
 
 
@@ -239,10 +260,12 @@ def make_object_button(widget, icon_path, toplevel=False, tip=None):
 
     return: The newly created wxBitmapButton instance"""
     if not config.use_gui: return None
+    if plugins.palette_from_registry: return None  # module imported on demand; the button exists already
     import wx
     import misc
     from tree import WidgetTree
 
+    args = (widget, icon_path, toplevel, tip)  # for the widget registry
     if not os.path.isabs(icon_path):
         icon_path = os.path.join(config.icons_path, icon_path)
     bmp = misc.get_xpm_bitmap(icon_path)
@@ -277,6 +300,7 @@ def make_object_button(widget, icon_path, toplevel=False, tip=None):
     tmp.SetToolTip(wx.ToolTip(tip))
 
     WidgetTree.images[widget] = icon_path
+    plugins.record_button(tmp, *args)
 
     return tmp
 
@@ -308,36 +332,253 @@ def register(lang, klass_name, code_writer):
         codegen.register_widget_code_generator(klass_name, code_writer)
 
 
+def format_for_version(version):
+    "Return the version information in a string; e.g. format_for_version((2, 8)) -> '2.8'"
+    # see: wxglade.codegen.BaseLangCodeWriter.for_version
+    return '%s.%s' % version
+
+def format_supported_by(version):
+    "Return formatted version string; e.g. 'wx3' -> '3' or 'wx28' -> '2.8'"
+    # see config.widget_config, wcodegen.BaseWidgetWriter.is_widget_supported(), config.widget_config
+    assert version.startswith("wx")
+    if len(version) == 3: return '%s' % version[2]
+    if len(version) == 4: return '%s.%s' % (version[2], version[3])
+    raise ValueError(_('Unknown version format for "%s"') % repr(version))
+
+
 ########################################################################################################################
 # file utilities
 
+class _SmartChecksum(object):
+    # incremental calculation of the "smart" checksum: data may be passed in chunks, which are split into lines
+    def __init__(self):
+        self._md5 = md5()  # use md5 to be compatible with Python 2.4
+        self._lines = 0
+        self._pending = b""  # incomplete last line
+
+    def update(self, data):
+        if isinstance(data, compat.unicode):
+            data = data.encode('utf-8')
+        if not b"\n" in data:
+            self._pending += data
+            return
+        lines = data.split(b"\n")
+        lines[0] = self._pending + lines[0]
+        self._pending = lines.pop()
+        for line in lines:
+            self._add_line(line)
+
+    def _add_line(self, line):
+        if not (self._lines<10 and b'generated by wxGlade' in line):
+            self._md5.update(line.rstrip())
+        self._lines += 1
+
+    def hexdigest(self):
+        if self._pending:
+            self._add_line(self._pending)
+            self._pending = b""
+        return self._md5.hexdigest()
+
+
 def _smart_checksum(content):
     """Generate a "smart" checksum of the given content. The version line "generated by wxGlade" as well as tailing
     whitespaces will ignored during generation of the checksum. Returns a strings.
 
     The version line will be ignored within the first ten lines only.
+    The checksum is calculated over lines, independent of how the content is split into items.
 
     content: Content to generate a checksum for; list of bytes"""
-    chksum = md5()  # use md5 to be compatible with Python 2.4
-
-    for i,line in enumerate(content):
-        if isinstance(line, compat.unicode):
-            line = line.encode('utf-8')
-        if b'generated by wxGlade' in line and i<10: continue
-        chksum.update(line.rstrip())
-
+    chksum = _SmartChecksum()
+    for chunk in content:
+        chksum.update(chunk)
     return chksum.hexdigest()
 
 
 def _read_file(filename):
-    "read file into a list of lines (bytes); line ending is normalized to \n"
-    ret = []
+    "read file line by line (bytes); line ending is normalized to \n"
     with open(filename, "rb") as f:
-        for line in f.readlines():
+        for line in f:
             if line.endswith(b"\r\n"): line = line[:-2]+b"\n"
             yield line
 
 
+# For generated files, a manifest per output directory stores the smart checksum, size and modification time of
+# the files written; if the file on disk still has this size and modification time, it doesn't need to be read again.
+# The manifests are kept in the application data directory, so nothing is added to the user's source tree.
+# As with coarse mtime resolution a modification right after writing could go unnoticed, such entries are not trusted.
+_files_manifests = {}  # directory -> {basename: [checksum, size, mtime, time of recording]}
+_modified_manifests = set()
+_manifests_lock = threading.Lock()  # save_file() may be called from the thread pool of the code writer
+_RACY_SECONDS = 2.0
+_MANIFESTS_MAX_FILES = 500  # see prune_cache_dir()
+_MANIFESTS_MAX_BYTES = 20*1024*1024
+
+
+def get_files_manifest_filename(directory):
+    "returns the name of the manifest file for the given output directory"
+    digest = md5( directory.encode("utf-8") ).hexdigest()
+    return os.path.join(config.appdata_path, "manifests", "%s.json" % digest)
+
+
+def _get_files_manifest(directory):
+    with _manifests_lock:
+        manifest = _files_manifests.get(directory)
+        if manifest is None:
+            manifest = {}
+            filename = get_files_manifest_filename(directory)
+            if os.path.isfile(filename):
+                try:
+                    with open(filename) as infile:
+                        data = json.load(infile)
+                    # the directory is stored as well, in case of a hash collision
+                    if isinstance(data, dict) and data.get("directory")==directory:
+                        manifest = data.get("files", {})
+                        touch_cache_file(filename)
+                except (EnvironmentError, ValueError):
+                    logging.debug( _('Ignoring invalid manifest "%s"'), filename )
+            _files_manifests[directory] = manifest
+    return manifest
+
+
+def _get_recorded_checksum(filename):
+    "returns the checksum from the manifest, if the file has not been modified since it was written; None otherwise"
+    entry = _get_files_manifest( os.path.dirname(os.path.abspath(filename)) ).get( os.path.basename(filename) )
+    if not entry or len(entry)!=4: return None
+    checksum, size, mtime, recorded = entry
+    if recorded - mtime < _RACY_SECONDS: return None
+    stat = os.stat(filename)
+    if stat.st_size!=size or stat.st_mtime!=mtime: return None
+    return checksum
+
+
+def _record_checksum(filename, checksum):
+    directory = os.path.dirname(os.path.abspath(filename))
+    stat = os.stat(filename)
+    entry = _get_files_manifest(directory).get( os.path.basename(filename) )
+    if entry and entry[:3]==[checksum, stat.st_size, stat.st_mtime] and entry[3]-entry[2] >= _RACY_SECONDS:
+        return
+    with _manifests_lock:
+        _files_manifests[directory][os.path.basename(filename)] = [checksum, stat.st_size, stat.st_mtime, time.time()]
+        _modified_manifests.add(directory)
+
+
+def save_files_manifests():
+    "Write the modified manifests of save_file(); called after code generation; errors are logged only"
+    while _modified_manifests:
+        directory = _modified_manifests.pop()
+        filename = get_files_manifest_filename(directory)
+        tmp_filename = "%s.%d.tmp" % (filename, os.getpid())
+        try:
+            if not os.path.isdir( os.path.dirname(filename) ):
+                os.makedirs( os.path.dirname(filename) )
+            with open(tmp_filename, "w") as outfile:
+                json.dump({"directory":directory, "files":_files_manifests[directory]}, outfile, indent=0, sort_keys=True)
+            replace_file(tmp_filename, filename)
+            prune_cache_dir(os.path.dirname(filename), _MANIFESTS_MAX_FILES, _MANIFESTS_MAX_BYTES)
+        except EnvironmentError as inst:
+            logging.warning( _('Could not write manifest "%s": %s'), filename, inst )
+            if os.path.isfile(tmp_filename): os.remove(tmp_filename)
+
+
+def replace_file(src, dst):
+    "Rename src to dst, replacing dst; atomic, except for Python 2 on Windows"
+    if hasattr(os, "replace"):
+        os.replace(src, dst)
+        return
+    if os.name == "nt" and os.path.exists(dst): os.remove(dst)
+    os.rename(src, dst)
+
+
+# Caches in the application data directory: embedded bitmaps, snapshots and manifests.
+# The modification time of a cache file is updated when the file is used, so pruning removes the least recently used.
+# Pruning is done when a cache file is written, but not more often than every _PRUNE_INTERVAL seconds.
+_CACHE_MAX_AGE = 90*24*3600  # files not used for 90 days are removed
+_PRUNE_INTERVAL = 60.0
+_pruned = {}  # directory -> time of the last pruning
+
+
+def touch_cache_file(filename):
+    "Mark a file in a cache directory as used; see prune_cache_dir()"
+    try:
+        os.utime(filename, None)
+    except EnvironmentError:
+        pass
+
+
+def prune_cache_dir(directory, max_files, max_bytes):
+    """Remove the least recently used files from a cache directory such that at most max_files with a total size of
+    max_bytes are kept; files that have not been used for _CACHE_MAX_AGE are removed as well.
+    Errors are ignored, as another process may be pruning the same directory."""
+    now = time.time()
+    if now - _pruned.get(directory, 0) < _PRUNE_INTERVAL: return
+    _pruned[directory] = now
+    files = []
+    try:
+        for name in os.listdir(directory):
+            if name.endswith(".tmp"): continue  # being written by another process
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            files.append( (stat.st_mtime, stat.st_size, path) )
+    except EnvironmentError:
+        return
+    files.sort(reverse=True)
+    total = 0
+    for i, (mtime, size, path) in enumerate(files):
+        total += size
+        if i < max_files and total <= max_bytes and now - mtime < _CACHE_MAX_AGE: continue
+        try:
+            os.remove(path)
+        except EnvironmentError:
+            pass
+
+
+def _is_unchanged(filename, checksum, which):
+    # returns True if the file exists already with the given checksum
+    if not os.path.isfile(filename): return False
+    # for generated files, the existing file is only read if modified since it was written
+    chksum_oldcontent = _get_recorded_checksum(filename) if which=="codegen" else None
+    if chksum_oldcontent is None:
+        chksum_oldcontent = _smart_checksum( _read_file(filename) )
+    if chksum_oldcontent != checksum: return False
+    if which=="codegen": _record_checksum(filename, checksum)
+    return True
+
+
+def write_file(filename, write, do_backup=False):
+    """Write a file atomically: write(outfile) is called with a temporary file, opened in binary mode, which then
+    replaces the file. So others will never see a partially written file.
+    If filename is a symbolic link, the file it points to is replaced; the link is kept.
+    If write() returns False, the file is not replaced.
+
+    do_backup: make a backup copy of an existing file with the first save; see config.backed_up
+
+    returns False if write() returned False, True otherwise"""
+    # create the backup file only with the first save
+    need_backup = do_backup and filename not in config.backed_up and os.path.isfile(filename)
+
+    # create necessary subdirectories on demand
+    directory = os.path.dirname(filename)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    target = os.path.realpath(filename)
+    tmp_filename = "%s.%d.tmp" % (target, os.getpid())
+    try:
+        with open(tmp_filename, 'wb') as outfile:
+            if write(outfile) is False: return False  # the temporary file will be removed below
+        if os.path.isfile(target):
+            shutil.copymode(target, tmp_filename)
+            if need_backup:
+                shutil.copy2(target, filename + config.preferences.backup_suffix)
+                config.backed_up[filename] = True
+        replace_file(tmp_filename, target)
+        tmp_filename = None
+    finally:
+        if tmp_filename and os.path.isfile(tmp_filename):
+            os.remove(tmp_filename)
+    return True
+
+
 def save_file(filename, content, which='wxg'):
     """Save content to named file and, if user's preferences say so and filename exists, makes a backup copy of it.
 
@@ -347,58 +588,47 @@ def save_file(filename, content, which='wxg'):
     see: config.backed_up
 
     filename: Name of the file to create
-    content:  list of strings to store into 'filename'
-    which:    Kind of backup: 'wxg' or 'codegen'"""
+    content:  list of strings to store into 'filename';
+              for 'wxg' also an object with a write(output, tabs) method, e.g. root: the XML is streamed to the file
+    which:    Kind of backup: 'wxg' or 'codegen'
+
+    The content is written atomically; see write_file().
+    For generated code, the checksum is recorded in a manifest; see save_files_manifests().
+
+    returns False if the file exists already with the same content, True otherwise"""
+    streaming = which == 'wxg' and hasattr(content, "write")
     if which == 'wxg':
-        content = [line.encode('utf-8') for line in content] # encode from unicode to utf-8
+        if not streaming: content = [line.encode('utf-8') for line in content] # encode from unicode to utf-8
         do_backup = config.preferences.wxg_backup
     elif which == 'codegen':
         do_backup = config.preferences.codegen_backup
     else:
         raise NotImplementedError( 'Unknown value "%s" for parameter "which"!' % which )
 
-    if os.path.isfile(filename):
-        # read existing file to check content
-        chksum_oldcontent = _smart_checksum( _read_file(filename) )
-
+    if not streaming:
         # nothing changed?
         chksum_content = _smart_checksum(content)
-        if chksum_oldcontent == chksum_content:
-            return
-
-    # create the backup file only with the first save
-    need_backup = do_backup and filename not in config.backed_up and os.path.isfile(filename)
-
-    outfile = None
-    try:
-        if which=="codegen":
-            if os.path.isfile(filename):
-                with open(filename, 'rb') as infile:
-                    win_line_ending = infile.readline().endswith(b"\r\n")
-            else:
-                win_line_ending = sys.platform.startswith("win")
+        if _is_unchanged(filename, chksum_content, which): return False
 
-        if need_backup:
-            backup_name = filename + config.preferences.backup_suffix
-            if os.path.isfile(backup_name):
-                os.remove(backup_name)
-            os.rename(filename, backup_name)
-            config.backed_up[filename] = True
-
-        # create necessary subdirectories on demand
-        directory = os.path.dirname(filename)
-        if directory and not os.path.isdir(directory):
-            os.makedirs(directory)
+    if which=="codegen" and os.path.isfile(filename):
+        with open(filename, 'rb') as infile:
+            win_line_ending = infile.readline().endswith(b"\r\n")
+    else:
+        win_line_ending = which=="codegen" and sys.platform.startswith("win")
 
-        outfile = open(filename, 'wb')
+    def write(outfile):
+        if streaming:
+            output = XMLWriter(outfile, checksum=True)
+            content.write(output, 0)
+            return not _is_unchanged(filename, output.hexdigest(), which)  # e.g. only the timestamp has changed
         for line in content:
-            if which=="codegen" and win_line_ending:
+            if win_line_ending:
                 line = line.replace(b"\n", b"\r\n")
             outfile.write(line)
-        outfile.close()
-    finally:
-        if outfile:
-            outfile.close()
+
+    if not write_file(filename, write, do_backup): return False
+    if which=="codegen": _record_checksum(filename, chksum_content)
+    return True
 
 
 ########################################################################################################################
@@ -416,36 +646,90 @@ def get_name_for_autosave(filename=None):
     return ret
 
 
-class _Writer(object):
-    # file with a list compatible interface: append and extend
-    def __init__(self, filename):
-        self.outfile = codecs.open(filename, 'w', 'utf-8')
-    def append(self, line):
-        self.outfile.write(line)
-    def extend(self, lines):
-        for line in lines: self.outfile.write(line)
-    def close(self):
-        self.outfile.close()
+_autosave_lock = threading.Lock()
+_autosave_thread = None   # background thread writing the autosave file; see autosave_current()
+_autosave_changes = None  # value of root.changes at the last autosave
 
 
-def autosave_current():
-    "Save automatic backup copy for the current and un-saved design;  returns 0: error; 1: no changes to save; 2: saved"
+def _write_autosave(autosave_name, content, snapshot_duration, callback):
+    # runs in a background thread: write the snapshot to a temporary file, fsync and rename
+    global _autosave_changes
+    start = time.time()
+    tmp_filename = "%s.%d.tmp" % (autosave_name, os.getpid())
+    error = None
+    try:
+        with open(tmp_filename, "wb") as outfile:
+            outfile.write(content)
+            outfile.flush()
+            os.fsync( outfile.fileno() )
+        replace_file(tmp_filename, autosave_name)
+    except Exception as details:
+        # the next autosave will try again; the callback is called in any case
+        error = details
+        if isinstance(details, EnvironmentError):
+            logging.warning( _('Saving the autosave file "%s" failed: %s'), autosave_name, details )
+        else:
+            logging.exception( _('Saving the autosave file "%s" failed'), autosave_name )
+        with _autosave_lock:
+            _autosave_changes = None
+        try:
+            if os.path.isfile(tmp_filename): os.remove(tmp_filename)
+        except EnvironmentError:
+            pass
+    durations = (snapshot_duration, time.time()-start)
+    logging.debug( "Autosave %s: snapshot %.3fs, writing %.3fs", autosave_name, durations[0], durations[1] )
+    if callback is not None: callback(autosave_name, error, durations)
+
+
+def autosave_current(callback=None, wait=False):
+    """Save automatic backup copy for the current and un-saved design.
+
+    On the main thread, the design is only serialized into an in-memory buffer. Writing and fsync are done in a
+    background thread. If root.changes has not been incremented since the last autosave, nothing is written.
+
+    callback: called from the background thread with (autosave_name, error or None, (snapshot seconds, write seconds))
+    wait:     if True, wait for the background thread to finish
+
+    returns 0: error; 1: no changes to save or still saving; 2: saving started (finished, if wait is True)"""
+    global _autosave_thread, _autosave_changes
     if root.saved:
         return 1            # do nothing in this case...
-
+    with _autosave_lock:
+        if _autosave_thread is not None and _autosave_thread.is_alive():
+            return 1        # the previous autosave is not yet finished; try again next time
+        changes = root.changes
+        if changes == _autosave_changes:
+            return 1
+        _autosave_changes = changes
+
+    start = time.time()
     autosave_name = get_name_for_autosave()
+    content = io.BytesIO()
     try:
-        outfile = _Writer(autosave_name)
-        root.write(outfile)
-        outfile.close()
-    except EnvironmentError as details:
-        logging.warning( _('Saving the autosave file "%s" failed: %s'), autosave_name, details )
-        return 0
+        root.write( XMLWriter(content) )
+    except:
+        with _autosave_lock:
+            _autosave_changes = None
+        raise
+    args = (autosave_name, content.getvalue(), time.time()-start, callback)
+    _autosave_thread = threading.Thread(target=_write_autosave, args=args, name="autosave")
+    _autosave_thread.daemon = True
+    _autosave_thread.start()
+    if wait:
+        _autosave_thread.join()
+        if _autosave_changes is None: return 0
     return 2
 
 
+def wait_for_autosave():
+    "Wait for a running autosave to finish, e.g. before removing the autosave file"
+    thread = _autosave_thread
+    if thread is not None: thread.join()
+
+
 def remove_autosaved(filename=None):
     "Remove the automatic backup;  see: get_name_for_autosave()"
+    wait_for_autosave()
     autosave_name = get_name_for_autosave(filename)
     if os.path.exists(autosave_name):
         try:
@@ -677,6 +961,27 @@ def split_path(path):
     return components
 
 
+def get_absolute_path(path, for_preview=False):
+    "Get an absolute path relative to the current output directory (where the code is generated)."
+    if os.path.sep!="\\":
+        path = path.replace("\\", os.path.sep)
+    if os.path.isabs(path):
+        return path
+    p = root.output_path
+    if for_preview:
+        p = getattr(root, 'real_output_path', u'')
+    if os.path.sep!="\\":
+        p = p.replace("\\", os.path.sep)
+    if not os.path.isabs(p):
+        # a path relative to the application filename
+        appdir = os.path.dirname(root.filename)
+        p = os.path.abspath( os.path.join(appdir, p) )
+
+    if not os.path.isdir(p): p = os.path.dirname(p)
+
+    return os.path.abspath( os.path.join(p, path) )
+
+
 def _normalise_paths():
     "Normalise all paths stored in config module"
     for name in ['appdata_path', 'credits_file', 'docs_path', 'history_file', 'home_path', 'icons_path', 'license_file',
@@ -723,6 +1028,7 @@ def _set_file_paths(options):
         config.rc_file = os.path.join(config.appdata_path, 'wxgladerc')
     config.history_file = os.path.join(config.appdata_path, 'file_history.txt')
     config.log_file = os.path.join(config.appdata_path, 'wxglade.log')
+    config.widget_registry_file = os.path.join(config.appdata_path, 'widget_registry.json')
 
 
 def init_preferences():
@@ -795,6 +1101,9 @@ class Preferences(ConfigParser.ConfigParser):
         'allow_duplicate_names': False,
         'autosave': True,
         'autosave_delay': 120,  # in seconds
+        'codegen_jobs': 4,  # threads for reading and writing files with multiple files; 0 or 1 to disable
+        'use_snapshots': True,  # without GUI, re-open unchanged files from snapshot.py
+        'history_budget': 4096,  # in kB; memory for undo/redo, see history.History.get_memory_usage()
         'show_completion': True,
         'write_timestamp': True,
         'write_generated_from': False
@@ -897,6 +1206,31 @@ def style_attrs_to_sets(styles):
     return styles
 
 
+class XMLWriter(object):
+    """Sink for the write() methods of the tree, with the list compatible interface append() and extend().
+    The XML is passed on to outfile, without building a list of all lines.
+
+    outfile:  binary stream for the UTF-8 encoded XML; text stream if encoding is None
+    encoding: None or 'utf-8'
+    checksum: if True, the "smart" checksum is calculated while writing; see hexdigest() and save_file()"""
+    def __init__(self, outfile, encoding='utf-8', checksum=False):
+        self.outfile = outfile
+        self.encoding = encoding
+        self._checksum = _SmartChecksum() if checksum else None
+
+    def append(self, text):
+        if self.encoding: text = text.encode(self.encoding)
+        self.outfile.write(text)
+        if self._checksum is not None: self._checksum.update(text)
+
+    def extend(self, texts):
+        for text in texts:
+            self.append(text)
+
+    def hexdigest(self):
+        return self._checksum.hexdigest()
+
+
 def format_xml_tag(tag, value, indentlevel=0, **kwargs):
     r"""Generate a valid XML tag as string. The content will be proper escaped and quoted.
 
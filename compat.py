@@ -22,13 +22,20 @@ except:
     PYTHON2 = False
     PYTHON3 = True
 
-import wx
+try:
+    import wx
+except ImportError:
+    # projects can be loaded and code generated without wxPython; see edit_base
+    wx = None
 
 
 
-version = wx.VERSION_STRING[:3]  # Version string of major dot minor version number
-if version.startswith("4."): version = "3." + version[2:]
-version = (int(version[0]), int(version[2]) ) # major,minor
+if wx is not None:
+    version = wx.VERSION_STRING[:3]  # Version string of major dot minor version number
+    if version.startswith("4."): version = "3." + version[2:]
+    version = (int(version[0]), int(version[2]) ) # major,minor
+else:
+    version = (3, 0)
 
 
 GridSizer_GetRows = None
@@ -183,7 +190,7 @@ def wxWindow_IsThisEnabled(item):
 def _Destroy(widget):
     if widget: widget.Destroy()
 
-if hasattr(wx.Window, "DestroyLater"):
+if wx is not None and hasattr(wx.Window, "DestroyLater"):
     def DestroyLater(widget):
         widget.Hide()
         if hasattr(widget, "DestroyLater"):
@@ -218,7 +225,7 @@ def wxWindow_SendSizeEventToParent3(item, flags=0):
 
 
 # Set different functions depending on the active wxPython version
-if wx.VERSION[:2] >= (2, 9):
+if wx is None or wx.VERSION[:2] >= (2, 9):
     GridSizer_GetRows = GridSizer_GetRows3
     GridSizer_GetCols = GridSizer_GetCols3
     SizerItem_SetWindow = SizerItem_AssignWindow
@@ -232,9 +239,14 @@ else:
     wxWindow_SendSizeEventToParent = wxWindow_SendSizeEventToParent28
 
 
-import wx.grid
+if wx is not None:
+    import wx.grid
 
-if len(wx.VERSION)==5:
+if wx is None:
+    # no GUI available; the code generators will create code for Phoenix
+    IS_CLASSIC = False
+    IS_PHOENIX = True
+elif len(wx.VERSION)==5:
     # wxPython Classic
     IS_CLASSIC = True
     IS_PHOENIX = False
@@ -71,6 +71,7 @@ wx_version = 'not_set'               # wxPython version string
 rc_file = ''                         # Path to the rc / ini file to store user preferences in it
 history_file = ''                    # Path to the history file, if used
 log_file = ''                        # Path to wxGlade log file
+widget_registry_file = ''            # Path to the registry of widget modules; see plugins.load_registry()
 
 use_file_history =  True       # Flag to use a file history
 
@@ -261,7 +262,7 @@ All event attributes are optional. If no attributes are given, wxCommandEvent wi
 
 Use gettext ( _() ) for the attributes content of "desc" and "obsolete".
 
-The style processing is described in gui_mixins.StylesMixin.cn_f()."""
+The style processing is described in wcodegen.StylesMixin.cn_f()."""
 
 
 def read_version_file():
@@ -1,9 +1,9 @@
 
-import wx
+from compat import wx  # None without wxPython; then the widgets can be loaded and written, but not shown
 import new_properties as np
 import common, misc, compat, clipboard, config
 
-MANAGED_PROPERTIES  = ["span", "proportion", "border", "flag"]
+MANAGED_PROPERTIES  = common.MANAGED_PROPERTIES
 
 if config.debugging:
     class _UniqueList(list):
@@ -404,6 +404,7 @@ class EditBase(np.PropertyOwner):
         # bookkeeping
         if not self.IS_TOPLEVEL and self.IS_NAMED and self.name:
             self.toplevel_parent.track_contained_name( self.name )
+        common.root.untrack(self)
 
     def remove(self, focus=True, user=True):
         # entry point from GUI or script
@@ -449,17 +450,16 @@ class EditBase(np.PropertyOwner):
         if self.IS_SIZER:
             for child in self.children or []:
                 if not child.IS_SLOT:
-                    inner_xml = []
+                    # no intermediate list, as the child may be large
+                    output.append(u'%s    <object class="sizeritem">\n' % outer_tabs)
 
                     for name in MANAGED_PROPERTIES:
                         name = child.properties[name]
                         if name is not None:
-                            name.write(inner_xml, tabs+2)
+                            name.write(output, tabs+2)
 
-                    child.write(inner_xml, tabs+2)
-                    stmt = common.format_xml_tag( u'object', inner_xml, tabs+1,
-                                                  is_xml=True, **{'class': 'sizeritem'} )
-                    output.extend(stmt)
+                    child.write(output, tabs+2)
+                    output.append(u'%s    </object>\n' % outer_tabs)
                 else:
                     child.write(output, tabs+1)
         elif self.children is not None or self.ATT_CHILDREN is not None:
@@ -601,7 +601,7 @@ class Slot(EditBase):
         # the following are just set to use the same Add call as with widgets
         self.proportion = 1
         self.span = (1,1)
-        self.flag = wx.EXPAND
+        self.flag = wx.EXPAND if wx is not None else 0
         self.border = 0
 
     def update_view(self, selected):
@@ -7,7 +7,7 @@ C++ generator functions for the various wxSizerS
 """
 
 import common
-from .edit_sizers import BaseSizerBuilder, SlotGenerator
+from .sizers_codegen import BaseSizerBuilder, SlotGenerator
 
 
 class BaseCPPSizerBuilder(BaseSizerBuilder):
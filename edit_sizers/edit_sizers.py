@@ -7,15 +7,20 @@ Hierarchy of Sizers supported by wxGlade
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
-from wx.lib.buttons import GenButton
+from compat import wx  # None without wxPython; then the sizers can be loaded and written, but not shown
+if wx is not None:
+    from wx.lib.buttons import GenButton
 
 import new_properties as np
 import clipboard
 import common, compat, config, misc
 import edit_base
 
-HAVE_WRAP_SIZER = hasattr(wx, "WrapSizer")  # only for 3.0
+HAVE_WRAP_SIZER = wx is None or hasattr(wx, "WrapSizer")  # only for 3.0
+
+# the values of wx.HORIZONTAL and wx.VERTICAL, for the orientation of box sizers also without wxPython
+HORIZONTAL = 0x0004
+VERTICAL   = 0x0008
 
 def _frozen(method):
     "freeze toplevel parent during update"
@@ -96,187 +101,23 @@ class SizerSlot(edit_base.Slot):
         return "Add a widget or another sizer here."
 
 
-class SizerHandleButton(GenButton):
-    'Provides a "handle" to activate a Sizer and to access its popup menu'
-    def __init__(self, parent, id, sizer):
-        GenButton.__init__(self, parent.widget, id, '', size=(5, 5))
-        self.sizer = sizer
-        self.SetUseFocusIndicator(False)
-        self.Bind(wx.EVT_RIGHT_DOWN, self.sizer.popup_menu )
-        #self.Bind(wx.EVT_KEY_DOWN, misc.on_key_down_event)
-        color = compat.wx_SystemSettings_GetColour(wx.SYS_COLOUR_BTNFACE)
-        self.SetBackgroundColour(color)
-
-class BaseSizerBuilder(object):
-    "Language independent base class for all sizer builders / code generators"
-
-    tmpl = []                 # Statements to generate the sizer from, the stmt has to end with a newline character
-
-    language = None           # Language to generate the code for
-
-    tmpl_SetSizer = ''        # Template to call SetSizer()
-    tmpl_Fit = ''             # Template to call Fit()
-    tmpl_Realize = ''         # Template to call Realize() for StdDialogButtonSizer
-    tmpl_SetSizeHints = ''    # Template to set the size hints
-    tmpl_AddGrowableRow = ''  # Template for wxFlexGridSizer to set growable rows
-    tmpl_AddGrowableCol = ''  # Template for wxFlexGridSizer to set growable columns
-
-    def __init__(self):
-        "Initialise sizer builder"
-        self.tmpl_dict = {}                               # properties to replace in tmpl
-        self.codegen = common.code_writers[self.language] #language specific code generator (codegen.BaseLangCodeWriter)
-
-    def _get_wparent(self, topl, obj):
-        "Return the parent widget or a reference to it as string"
-        raise NotImplementedError
-
-    def _prepare_tmpl_content(self, obj):
-        """Prepare template variables"""
-        self.tmpl_dict.clear()
-        self.tmpl_dict['klass'] = self.codegen.cn(obj.WX_CLASS)
-        self.tmpl_dict['wxIDANY'] = self.codegen.cn('wxID_ANY')
-        self.tmpl_dict['parent_widget'] = self._get_wparent(obj)
-        self.tmpl_dict['sizer_name'] = self.codegen._format_classattr(obj)
-
-    def _get_code(self, obj):
-        "Generates the language specific code for sizer specified in klass"
-        if not self.tmpl:
-            return [], []  # init, final
-
-        init = []
-        layout = []
-
-        # generate init lines from tmpl filled with tmpl_dict
-        init.append(self.tmpl % self.tmpl_dict)
-
-        # generate layout lines
-        if not obj.parent.IS_SIZER:
-            layout.append(self.tmpl_SetSizer % self.tmpl_dict)
-            if not obj.parent.check_prop("size") and obj.parent.IS_TOPLEVEL:
-                layout.append(self.tmpl_Fit % self.tmpl_dict)
-            if "sizehints" in obj.window.properties and obj.window.sizehints:
-                layout.append(self.tmpl_SetSizeHints % self.tmpl_dict)
-
-        return init, layout  # init, post
-
-    def get_code(self, obj):
-        "Generates the language specific code for sizer specified in klass"
-        self._prepare_tmpl_content(obj)
-        if obj.WX_CLASS == 'wxBoxSizer':             return self.get_code_wxBoxSizer(obj)
-        if obj.WX_CLASS == 'wxWrapSizer':            return self.get_code_wxBoxSizer(obj)  # the same here
-        if obj.WX_CLASS == 'wxStaticBoxSizer':       return self.get_code_wxStaticBoxSizer(obj)
-        if obj.WX_CLASS == 'wxStdDialogButtonSizer': return self.get_code_wxStdDialogButtonSizer(obj)
-        if obj.WX_CLASS == 'wxGridSizer':            return self.get_code_wxGridSizer(obj)
-        if obj.WX_CLASS == 'wxFlexGridSizer':        return self.get_code_wxFlexGridSizer(obj)
-        if obj.WX_CLASS == 'wxGridBagSizer':         return self.get_code_wxFlexGridSizer(obj)
-        return self._get_code(obj)
-
-    def get_code_wxStaticBoxSizer(self, obj):
-        "Set sizer specific properties and generate the code"
-        self.tmpl_dict['orient'] = self.codegen.cn( obj.properties["orient"].get_string_value() )
-        self.tmpl_dict['label'] = self.codegen.quote_str( obj.label )
-        return self._get_code(obj)
-
-    def get_code_wxBoxSizer(self, obj):
-        "Set sizer specific properties and generate the code"
-        self.tmpl_dict['orient'] = self.codegen.cn( obj.properties["orient"].get_string_value() )
-        return self._get_code(obj)
-
-    def get_code_wxStdDialogButtonSizer(self, obj):
-        "Set sizer specific properties and generate the code"
-        init, layout = self._get_code(obj)
-        layout.append(self.tmpl_Realize % self.tmpl_dict)
-        return init, layout
-
-    def get_code_wxGridSizer(self, obj):
-        "Set sizer specific properties and generate the code"
-        if obj.WX_CLASS != 'wxGridBagSizer':
-            self.tmpl_dict['rows'] = obj.rows
-            self.tmpl_dict['cols'] = obj.cols
-        self.tmpl_dict['vgap'] = obj.vgap
-        self.tmpl_dict['hgap'] = obj.hgap
-        return self._get_code(obj)
-
-    def get_code_wxFlexGridSizer(self, obj):
-        "Set sizer specific properties and generate the code"
-        ret = list( self.get_code_wxGridSizer(obj) )
-
-        if obj.WX_CLASS=="wxGridBagSizer":
-            max_row, max_col = obj._get_max_row_col()
-        else:
-            max_row = max_col = None
-
-        growable = []
-        if 'growable_rows' in obj.properties:
-            for row in obj.growable_rows:
-                if max_row is None or row<=max_row:
-                    self.tmpl_dict['row'] = row
-                    growable.append(self.tmpl_AddGrowableRow % self.tmpl_dict)
-        if 'growable_cols' in obj.properties:
-            for col in obj.growable_cols:
-                if max_col is None or col<=max_col:
-                    self.tmpl_dict['col'] = col
-                    growable.append(self.tmpl_AddGrowableCol % self.tmpl_dict)
-        ret[-1] = growable + ret[-1]
-        return ret
-
-    def get_code_per_child(self, obj, child):
-        """Returns code that will be inserted after the child code; e.g. for adding element to a sizer.
-        It's placed before the final code returned from get_code()."""
-
-        if child.WX_CLASS in ("spacer","sizerslot"):  # spacer and slot are adding itself to the sizer
-            return []
-
-        # the name attribute of a spacer is already formatted "<width>, <height>".
-        # This string can simply inserted in Add() call.
-        obj_name = self.codegen._format_classattr(child)
-
-        # check if sizer has to store as a class attribute
-        sizer_name = self.codegen._format_classattr(obj)
-
-        flag = child.properties["flag"].get_string_value()  # as string, joined with "|"
-        flag = self.codegen.cn_f(flag) or '0'
-
-        if obj.WX_CLASS=="wxStdDialogButtonSizer" and child.WX_CLASS=='wxButton':
-            # XXX optionally use SetAffirmativeButton, SetCancelButton, SetNegativeButton
-            id_value = child.check_prop("id") and child.properties["id"].value.strip() or ""  # e.g. 'wxID_CANCEL'
-            if ( (child.check_prop_truth("stockitem") and child.stockitem in obj.BUTTON_STOCKITEMS) or 
-                 (id_value and id_value.startswith("wxID_") and id_value[5:] in obj.BUTTON_STOCKITEMS) ):
-                tmpl = self.codegen.tmpl_sizeritem_button
-                return [tmpl % ( sizer_name, obj_name )]
-
-        if obj.WX_CLASS!="wxGridBagSizer":
-            stmt = self.codegen.tmpl_sizeritem % ( sizer_name, obj_name, child.proportion, flag, child.border )
-        else:
-            index = obj._get_row_col(child.index)
-            stmt = self.codegen.tmpl_gridbagsizeritem % ( sizer_name, obj_name, index, child.span, flag, child.border )
-
-        return [stmt]
-
-
-class SlotGenerator(object):
-    # generic code generator; as a slot does not have flags etc. we don't need BaseWidgetBuilder etc.
-    def __init__(self, language):
-        self.language = language
-        self.codegen = common.code_writers[self.language] #language specific code generator (codegen.BaseLangCodeWriter)
-
-    def get_code(self, obj):
-        # add spacer for empty sizer slot
-        parent = obj.parent
-        if not parent.IS_SIZER or parent._IS_GRIDBAG: return [], []
-        sizer_name = self.codegen._format_classattr(parent)
-        size = self.codegen.tmpl_spacersize%(0, 0)
-        stmt = self.codegen.tmpl_sizeritem % ( sizer_name, size, 0, '0', 0 )
-        return [stmt], []
-
-    def get_event_handlers(self, obj):
-        return []
+if wx is not None:
+    class SizerHandleButton(GenButton):
+        'Provides a "handle" to activate a Sizer and to access its popup menu'
+        def __init__(self, parent, id, sizer):
+            GenButton.__init__(self, parent.widget, id, '', size=(5, 5))
+            self.sizer = sizer
+            self.SetUseFocusIndicator(False)
+            self.Bind(wx.EVT_RIGHT_DOWN, self.sizer.popup_menu )
+            #self.Bind(wx.EVT_KEY_DOWN, misc.on_key_down_event)
+            color = compat.wx_SystemSettings_GetColour(wx.SYS_COLOUR_BTNFACE)
+            self.SetBackgroundColour(color)
 
 
 class OrientProperty(np.Property):
     "orientation property for BoxSizers; hidden property to be set by the ClassOrientProperty"
-    ORIENTATION_to_STRING = {wx.HORIZONTAL: 'wxHORIZONTAL', wx.VERTICAL: 'wxVERTICAL'}
-    STRING_to_ORIENTATION = {'wxHORIZONTAL': wx.HORIZONTAL, 'wxVERTICAL': wx.VERTICAL}
+    ORIENTATION_to_STRING = {HORIZONTAL: 'wxHORIZONTAL', VERTICAL: 'wxVERTICAL'}
+    STRING_to_ORIENTATION = {'wxHORIZONTAL': HORIZONTAL, 'wxVERTICAL': VERTICAL}
 
     def __init__(self, value, default_value=None, name=None):
         assert value!=0
@@ -357,7 +198,7 @@ class SizerBase(edit_base.EditBase):
             self.span       = np.LayoutSpanProperty((1,1) )  # row,colspan for items in GridBagSizers
             self.proportion = np.LayoutProportionProperty(1)
             self.border     = np.SpinProperty(0, immediate=True)
-            self.flag       = np.ManagedFlags(wx.EXPAND)
+            self.flag       = np.ManagedFlags("wxEXPAND")
             self._has_layout = True
         else:
             self._has_layout = False
@@ -721,7 +562,7 @@ class SizerBase(edit_base.EditBase):
         #edit_base.EditBase.destroy_widget(self, level)
         self.widget = None
 
-    if wx.Platform == '__WXMSW__':
+    if wx is not None and wx.Platform == '__WXMSW__':
         def finish_set(self):  # previously called after self.set_option(...)
             for c in self.children:
                 if c.widget:
@@ -856,14 +697,14 @@ class SizerBase(edit_base.EditBase):
 
         if name in ("EditStaticBoxSizer", "EditBoxSizer"):
             # with or without label, horizontal/vertical
-            if self.orient & wx.VERTICAL:
+            if self.orient & VERTICAL:
                 name = "EditVerticalSizer"
-            elif self.orient & wx.HORIZONTAL:
+            elif self.orient & HORIZONTAL:
                 name = "EditHorizontalSizer"
             else:
                 name = "EditSpacer"
         elif name=="EditWrapSizer":
-            if self.orient & wx.VERTICAL:
+            if self.orient & VERTICAL:
                 name = "EditVerticalWrapSizer"
             else:
                 name = "EditHorizontalWrapSizer"
@@ -872,23 +713,24 @@ class SizerBase(edit_base.EditBase):
 
 
 
-class wxGladeBoxSizer(wx.BoxSizer):
-    _BTN_OFFSET = 1
-    def SetItemMinSize(self, item, w, h):
-        if w==-1 or h==-1:
-            try:
-                w2, h2 = item.GetBestSize()
-                if w == -1: w = w2
-                if h == -1: h = h2
-            except AttributeError:
-                pass
-        wx.BoxSizer.SetItemMinSize(self, item, w, h)
+if wx is not None:
+    class wxGladeBoxSizer(wx.BoxSizer):
+        _BTN_OFFSET = 1
+        def SetItemMinSize(self, item, w, h):
+            if w==-1 or h==-1:
+                try:
+                    w2, h2 = item.GetBestSize()
+                    if w == -1: w = w2
+                    if h == -1: h = h2
+                except AttributeError:
+                    pass
+            wx.BoxSizer.SetItemMinSize(self, item, w, h)
 
 
 class BoxSizerBase(SizerBase):
     "orientation handling for BoxSizer and StaticBoxSizer"
 
-    def __init__(self, name, parent, index, orient=wx.VERTICAL, elements=0):
+    def __init__(self, name, parent, index, orient=VERTICAL, elements=0):
         # elements: number of slots
         SizerBase.__init__(self, name, parent, index, orient)
 
@@ -912,7 +754,7 @@ class BoxSizerBase(SizerBase):
             if "wxALIGN_CENTER" in flags:          replace["wxALIGN_CENTER"] = None
             if "wxALIGN_CENTER_VERTICAL" in flags: replace["wxALIGN_CENTER_VERTICAL"] = None
             
-        if self.orient==wx.VERTICAL:
+        if self.orient==VERTICAL:
             excludes = {"wxALIGN_BOTTOM", "wxALIGN_CENTER_VERTICAL", "wxALIGN_CENTER"}
             if "wxALIGN_BOTTOM" in flags or "wxALIGN_CENTER_VERTICAL" in flags or "wxALIGN_CENTER" in flags:
                 msg = "Vertical alignment flags are ignored in vertical sizers"
@@ -965,17 +807,18 @@ class EditBoxSizer(BoxSizerBase):
 
 
 if HAVE_WRAP_SIZER:
-    class wxGladeWrapSizer(wx.WrapSizer):
-        _BTN_OFFSET = 1
-        def SetItemMinSize(self, item, w, h):
-            if w==-1 or h==-1:
-                try:
-                    w2, h2 = item.GetBestSize()
-                    if w == -1: w = w2
-                    if h == -1: h = h2
-                except AttributeError:
-                    pass
-            wx.BoxSizer.SetItemMinSize(self, item, w, h)
+    if wx is not None:
+        class wxGladeWrapSizer(wx.WrapSizer):
+            _BTN_OFFSET = 1
+            def SetItemMinSize(self, item, w, h):
+                if w==-1 or h==-1:
+                    try:
+                        w2, h2 = item.GetBestSize()
+                        if w == -1: w = w2
+                        if h == -1: h = h2
+                    except AttributeError:
+                        pass
+                wx.BoxSizer.SetItemMinSize(self, item, w, h)
 
 
     class EditWrapSizer(BoxSizerBase):
@@ -995,23 +838,24 @@ class EditStdDialogButtonSizer(EditBoxSizer):
     BUTTON_STOCKITEMS = ["OK", "YES", "SAVE", "APPLY", "CLOSE","NO", "CANCEL", "HELP", "CONTEXT_HELP"]
     def __init__(self, name, parent, index, elements=0):
         # elements: number of slots
-        BoxSizerBase.__init__(self, name, parent, index, wx.HORIZONTAL, elements)
+        BoxSizerBase.__init__(self, name, parent, index, HORIZONTAL, elements)
 
     def get_class_orient(self):
         return self.WX_CLASS
 
 
-class wxGladeStaticBoxSizer(wx.StaticBoxSizer):
-    _BTN_OFFSET = 1
-    def SetItemMinSize(self, item, w, h):
-        if w==-1 or h==-1:
-            try:
-                w2, h2 = item.GetBestSize()
-                if w == -1: w = w2
-                if h == -1: h = h2
-            except AttributeError:
-                pass
-        wx.StaticBoxSizer.SetItemMinSize(self, item, w, h)
+if wx is not None:
+    class wxGladeStaticBoxSizer(wx.StaticBoxSizer):
+        _BTN_OFFSET = 1
+        def SetItemMinSize(self, item, w, h):
+            if w==-1 or h==-1:
+                try:
+                    w2, h2 = item.GetBestSize()
+                    if w == -1: w = w2
+                    if h == -1: h = h2
+                except AttributeError:
+                    pass
+            wx.StaticBoxSizer.SetItemMinSize(self, item, w, h)
 
 
 class EditStaticBoxSizer(BoxSizerBase):
@@ -1022,7 +866,7 @@ class EditStaticBoxSizer(BoxSizerBase):
                   "Layout"]  # not a property, just start the next page in the editor
     EXTRA_PROPERTIES = []
 
-    def __init__(self, name, parent, index, orient=wx.VERTICAL, label='', elements=3):
+    def __init__(self, name, parent, index, orient=VERTICAL, label='', elements=3):
         BoxSizerBase.__init__(self, name, parent, index, orient, elements)
         self.label = np.TextProperty(label)
 
@@ -1041,124 +885,125 @@ class EditStaticBoxSizer(BoxSizerBase):
         SizerBase.destroy_widget(self, level)
 
 
-class CustomGridSizer(wx.BoxSizer):
-    """Custom wxSizer class used to implement a GridSizer with an additional handle button.
-    e.g. in EditGridSizer instance: self.widget = CustomGridSizer(self,rows,cols,vgap,hgap"""
-    _BTN_OFFSET = 0
-    def __init__(self, parent, rows, cols, vgap, hgap):
-        wx.BoxSizer.__init__(self, wx.VERTICAL)
-        self.parent = parent  # EditGridSizer or derived class
-        self._create(rows, cols, vgap, hgap)
-        wx.BoxSizer.Add(self, self.parent._btn, 0, wx.EXPAND)
-        wx.BoxSizer.Add(self, self._grid, 1, wx.EXPAND)
-        if wx.VERSION[:2] < (3,0):
-            self._growable_rows = set()
-            self._growable_cols = set()
+if wx is not None:
+    class CustomGridSizer(wx.BoxSizer):
+        """Custom wxSizer class used to implement a GridSizer with an additional handle button.
+        e.g. in EditGridSizer instance: self.widget = CustomGridSizer(self,rows,cols,vgap,hgap"""
+        _BTN_OFFSET = 0
+        def __init__(self, parent, rows, cols, vgap, hgap):
+            wx.BoxSizer.__init__(self, wx.VERTICAL)
+            self.parent = parent  # EditGridSizer or derived class
+            self._create(rows, cols, vgap, hgap)
+            wx.BoxSizer.Add(self, self.parent._btn, 0, wx.EXPAND)
+            wx.BoxSizer.Add(self, self._grid, 1, wx.EXPAND)
+            if wx.VERSION[:2] < (3,0):
+                self._growable_rows = set()
+                self._growable_cols = set()
 
-    def _create(self, rows, cols, vgap, hgap):
-        self._grid = wx.GridSizer(rows, cols, vgap, hgap)
+        def _create(self, rows, cols, vgap, hgap):
+            self._grid = wx.GridSizer(rows, cols, vgap, hgap)
 
-    def __getattr__(self, name):
-        return getattr(self._grid, name)
+        def __getattr__(self, name):
+            return getattr(self._grid, name)
 
-    def GetBestSize(self):
-        return self._grid.GetMinSize()
+        def GetBestSize(self):
+            return self._grid.GetMinSize()
 
-    def Add(self, *args, **kwds):
-        self._grid.Add(*args, **kwds)
+        def Add(self, *args, **kwds):
+            self._grid.Add(*args, **kwds)
 
-    def Insert(self, index, *args, **kwds):
-        self._grid.Insert(index, *args, **kwds)
+        def Insert(self, index, *args, **kwds):
+            self._grid.Insert(index, *args, **kwds)
 
-    def Remove(self, *args, **kwds):
-        try:
-            index = int(args[0])
+        def Remove(self, *args, **kwds):
+            try:
+                index = int(args[0])
+                self._grid.Remove(index)
+            except TypeError:
+                self._grid.Remove(*args, **kwds)
+
+        def RemovePos(self, index):
             self._grid.Remove(index)
-        except TypeError:
-            self._grid.Remove(*args, **kwds)
 
-    def RemovePos(self, index):
-        self._grid.Remove(index)
+        def Detach(self, pos_or_obj):
+            try:
+                index = int(pos_or_obj)
+                self._grid.Detach(index)
+            except TypeError:
+                self._grid.Detach(pos_or_obj)
 
-    def Detach(self, pos_or_obj):
-        try:
-            index = int(pos_or_obj)
-            self._grid.Detach(index)
-        except TypeError:
-            self._grid.Detach(pos_or_obj)
+        def SetItemMinSize(self, item, w, h):
+            try:
+                w2, h2 = item.GetBestSize()
+                if w == -1: w = w2
+                if h == -1: h = h2
+            except AttributeError:
+                pass
+            self._grid.SetItemMinSize(item, w, h)
 
-    def SetItemMinSize(self, item, w, h):
-        try:
-            w2, h2 = item.GetBestSize()
-            if w == -1: w = w2
-            if h == -1: h = h2
-        except AttributeError:
-            pass
-        self._grid.SetItemMinSize(item, w, h)
-
-    def GetChildren(self):
-        return self._grid.GetChildren()
-
-    def GetItem(self, widget):
-        if hasattr(self._grid, "FindItem"):
-            return self._grid.FindItem(widget)  # GridBagSizer
-        return self._grid.GetItem(widget)
-
-    def Layout(self):
-        self._grid.Layout()
-        wx.BoxSizer.Layout(self)
-
-    if wx.VERSION[:2] < (3,0):
-        # compatibility for wxPython 2.8, as IsRowGrowable was only introduced with wx 2.9.1
-        def IsRowGrowable(self, row):
-            return row in self._growable_rows
-        def IsColGrowable(self, col):
-            return col in self._growable_cols
-        def AddGrowableRow(self, row):
-            self._grid.AddGrowableRow(row)
-            self._growable_rows.add(row)
-        def RemoveGrowableRow(self, row):
-            self._grid.RemoveGrowableRow(row)
-            self._growable_rows.remove(row)
-        def AddGrowableCol(self, col):
-            self._grid.AddGrowableCol(col)
-            self._growable_cols.add(col)
-        def RemoveGrowableCol(self, col):
-            self._grid.RemoveGrowableCol(col)
-            self._growable_cols.remove(col)
-
-
-class CustomFlexGridSizer(CustomGridSizer):
-    def _create(self, rows, cols, vgap, hgap):
-        self._grid = wx.FlexGridSizer(rows, cols, vgap, hgap)
-
-
-class CustomGridBagSizer(CustomFlexGridSizer):
-    def _create(self, rows, cols, vgap, hgap):
-        self._grid = wx.GridBagSizer(vgap, hgap)
-
-    def Add(self, widget, pos, span, flag, border, destroy=False):
-        "Add to sizer, re-use existing SizerItem if there is one; pos is (row,col)"
-        if isinstance(pos, int):
-            pos = self.parent._get_row_col(pos)
-        old_sizer_item = self._grid.FindItemAtPosition(pos)
-        if old_sizer_item:
-            if destroy:
-                old_window = old_sizer_item.GetWindow()
-                if old_window:
-                    compat.DestroyLater(old_window)
-            old_sizer_item.SetSpan((1,1))
-            old_sizer_item.SetFlag(wx.EXPAND)
-            old_sizer_item.SetBorder(border)
-            if isinstance(widget, wx.Sizer):
-                old_sizer_item.AssignSizer(widget)
+        def GetChildren(self):
+            return self._grid.GetChildren()
+
+        def GetItem(self, widget):
+            if hasattr(self._grid, "FindItem"):
+                return self._grid.FindItem(widget)  # GridBagSizer
+            return self._grid.GetItem(widget)
+
+        def Layout(self):
+            self._grid.Layout()
+            wx.BoxSizer.Layout(self)
+
+        if wx.VERSION[:2] < (3,0):
+            # compatibility for wxPython 2.8, as IsRowGrowable was only introduced with wx 2.9.1
+            def IsRowGrowable(self, row):
+                return row in self._growable_rows
+            def IsColGrowable(self, col):
+                return col in self._growable_cols
+            def AddGrowableRow(self, row):
+                self._grid.AddGrowableRow(row)
+                self._growable_rows.add(row)
+            def RemoveGrowableRow(self, row):
+                self._grid.RemoveGrowableRow(row)
+                self._growable_rows.remove(row)
+            def AddGrowableCol(self, col):
+                self._grid.AddGrowableCol(col)
+                self._growable_cols.add(col)
+            def RemoveGrowableCol(self, col):
+                self._grid.RemoveGrowableCol(col)
+                self._growable_cols.remove(col)
+
+
+    class CustomFlexGridSizer(CustomGridSizer):
+        def _create(self, rows, cols, vgap, hgap):
+            self._grid = wx.FlexGridSizer(rows, cols, vgap, hgap)
+
+
+    class CustomGridBagSizer(CustomFlexGridSizer):
+        def _create(self, rows, cols, vgap, hgap):
+            self._grid = wx.GridBagSizer(vgap, hgap)
+
+        def Add(self, widget, pos, span, flag, border, destroy=False):
+            "Add to sizer, re-use existing SizerItem if there is one; pos is (row,col)"
+            if isinstance(pos, int):
+                pos = self.parent._get_row_col(pos)
+            old_sizer_item = self._grid.FindItemAtPosition(pos)
+            if old_sizer_item:
+                if destroy:
+                    old_window = old_sizer_item.GetWindow()
+                    if old_window:
+                        compat.DestroyLater(old_window)
+                old_sizer_item.SetSpan((1,1))
+                old_sizer_item.SetFlag(wx.EXPAND)
+                old_sizer_item.SetBorder(border)
+                if isinstance(widget, wx.Sizer):
+                    old_sizer_item.AssignSizer(widget)
+                else:
+                    old_sizer_item.AssignWindow(widget)
             else:
-                old_sizer_item.AssignWindow(widget)
-        else:
-            self._grid.Add( widget, pos, span, flag, border )
+                self._grid.Add( widget, pos, span, flag, border )
 
-    def Detach(self, obj):
-        self._grid.Detach(obj)
+        def Detach(self, obj):
+            self._grid.Detach(obj)
 
 
 class GridSizerBase(SizerBase):
@@ -1230,9 +1075,7 @@ class GridSizerBase(SizerBase):
     # context menu actions #############################################################################################
     def _rebuild_tree(self):
         # refresh labels of existing slots; add tree items for new
-        for c in self.children:
-            if c.IS_SLOT and c.item:
-                common.app_tree.refresh(c)
+        common.app_tree.refresh_items( [c for c in self.children if c.IS_SLOT] )
         misc.rebuild_tree(self)
 
     @_frozen
@@ -1451,40 +1294,41 @@ class EditGridSizer(GridSizerBase):
         self.widget = CustomGridSizer(self, self.rows, self.cols, self.vgap, self.hgap)
 
 
-class _GrowableDialog(wx.Dialog):
-    def __init__(self, parent, title):
-        wx.Dialog.__init__(self, parent, -1, title)
-        self.sizer = sizer = wx.BoxSizer(wx.VERTICAL)
-        self.message = wx.StaticText(self, -1, "")
-        sizer.Add(self.message, 0, wx.TOP | wx.LEFT | wx.RIGHT | wx.EXPAND, 10)
-        self.choices = wx.CheckListBox(self, -1, choices=[])
-        sizer.Add(self.choices, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 10)
-        sizer.Add(wx.StaticLine(self, -1), 0, wx.EXPAND | wx.ALL, 10)
-        sz2 = wx.BoxSizer(wx.HORIZONTAL)
-        sz2.Add(wx.Button(self, wx.ID_OK, ""), 0, wx.ALL, 10)
-        sz2.Add(wx.Button(self, wx.ID_CANCEL, ""), 0, wx.ALL, 10)
-        sizer.Add(sz2, 0, wx.ALIGN_CENTER)
-        self.SetAutoLayout(True)
-        self.SetSizer(sizer)
-        sizer.Fit(self)
-        self.CenterOnScreen()
-
-    def get_value(self):
-        ret = []
-        for c,choice in enumerate(self._choices):
-            if self.choices.IsChecked(c):
-                ret.append(str(int(choice)-1))
-        return ",".join(ret)
-
-    def set_choices(self, choices, values):
-        self.choices.Set(choices)
-        self._choices = choices
-        for i,value in enumerate(choices):
-            if value in values: self.choices.Check(i)
-
-    def set_descriptions(self, title, message):
-        self.SetTitle(title)
-        self.message.SetLabel(message)
+if wx is not None:
+    class _GrowableDialog(wx.Dialog):
+        def __init__(self, parent, title):
+            wx.Dialog.__init__(self, parent, -1, title)
+            self.sizer = sizer = wx.BoxSizer(wx.VERTICAL)
+            self.message = wx.StaticText(self, -1, "")
+            sizer.Add(self.message, 0, wx.TOP | wx.LEFT | wx.RIGHT | wx.EXPAND, 10)
+            self.choices = wx.CheckListBox(self, -1, choices=[])
+            sizer.Add(self.choices, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 10)
+            sizer.Add(wx.StaticLine(self, -1), 0, wx.EXPAND | wx.ALL, 10)
+            sz2 = wx.BoxSizer(wx.HORIZONTAL)
+            sz2.Add(wx.Button(self, wx.ID_OK, ""), 0, wx.ALL, 10)
+            sz2.Add(wx.Button(self, wx.ID_CANCEL, ""), 0, wx.ALL, 10)
+            sizer.Add(sz2, 0, wx.ALIGN_CENTER)
+            self.SetAutoLayout(True)
+            self.SetSizer(sizer)
+            sizer.Fit(self)
+            self.CenterOnScreen()
+
+        def get_value(self):
+            ret = []
+            for c,choice in enumerate(self._choices):
+                if self.choices.IsChecked(c):
+                    ret.append(str(int(choice)-1))
+            return ",".join(ret)
+
+        def set_choices(self, choices, values):
+            self.choices.Set(choices)
+            self._choices = choices
+            for i,value in enumerate(choices):
+                if value in values: self.choices.Check(i)
+
+        def set_descriptions(self, title, message):
+            self.SetTitle(title)
+            self.message.SetLabel(message)
 
 
 class _GrowablePropertyD(np.DialogPropertyD):
@@ -1927,13 +1771,13 @@ def change_sizer(old, new):
     index = old.index
     parent = old.parent
     constructors = {
-        'wxBoxSizer (wxVERTICAL)':         lambda: EditBoxSizer(old.name, parent, index, wx.VERTICAL, 0),
-        'wxBoxSizer (wxHORIZONTAL)':       lambda: EditBoxSizer(old.name, parent, index, wx.HORIZONTAL, 0),
-        'wxWrapSizer (wxVERTICAL)':        lambda: EditWrapSizer(old.name, parent, index, wx.VERTICAL, 0),
-        'wxWrapSizer (wxHORIZONTAL)':      lambda: EditWrapSizer(old.name, parent, index, wx.HORIZONTAL, 0),
-        'wxStaticBoxSizer (wxVERTICAL)':   lambda: EditStaticBoxSizer(old.name, parent, index, wx.VERTICAL,
+        'wxBoxSizer (wxVERTICAL)':         lambda: EditBoxSizer(old.name, parent, index, VERTICAL, 0),
+        'wxBoxSizer (wxHORIZONTAL)':       lambda: EditBoxSizer(old.name, parent, index, HORIZONTAL, 0),
+        'wxWrapSizer (wxVERTICAL)':        lambda: EditWrapSizer(old.name, parent, index, VERTICAL, 0),
+        'wxWrapSizer (wxHORIZONTAL)':      lambda: EditWrapSizer(old.name, parent, index, HORIZONTAL, 0),
+        'wxStaticBoxSizer (wxVERTICAL)':   lambda: EditStaticBoxSizer(old.name, parent, index, VERTICAL,
                                                                       getattr(old, 'label', old.name), 0),
-        'wxStaticBoxSizer (wxHORIZONTAL)': lambda: EditStaticBoxSizer(old.name, parent, index, wx.HORIZONTAL,
+        'wxStaticBoxSizer (wxHORIZONTAL)': lambda: EditStaticBoxSizer(old.name, parent, index, HORIZONTAL,
                                                                       getattr(old, 'label', old.name), 0),
         'wxStdDialogButtonSizer':          lambda: EditStdDialogButtonSizer(old.name, parent, index, 0),
         'wxGridSizer':     lambda: EditGridSizer(old.name, parent, index, rows=0, cols=0),
@@ -2032,7 +1876,7 @@ def change_sizer(old, new):
         misc.set_focused_widget(szr)
 
 
-def _builder(parent, index, orientation=wx.VERTICAL, slots=1, is_static=False, label="", is_wrap=False):
+def _builder(parent, index, orientation=VERTICAL, slots=1, is_static=False, label="", is_wrap=False):
     name = parent.toplevel_parent.get_next_contained_name('sizer_%d')
 
     # add slots later
@@ -2061,116 +1905,117 @@ def _builder(parent, index, orientation=wx.VERTICAL, slots=1, is_static=False, l
     return editor
 
 
-class _SizerDialog(wx.Dialog):
-    def __init__(self, parent, to_dialog, default_orient=None):
-        pos = wx.GetMousePosition()
-        wx.Dialog.__init__( self, misc.get_toplevel_parent(parent), -1, _('Select sizer type'), pos )
-        szr = wx.BoxSizer(wx.VERTICAL)
-
-        # static box sizer with radio buttons for orientation / type
-        self.orientation = 1 if default_orient==wx.VERTICAL else 0
-        self.radios = []
-        vsizer = wx.StaticBoxSizer(wx.StaticBox(self, -1, _("Orientation")), wx.VERTICAL)
-        for i, choice in enumerate( ('Horizontal', 'Vertical') ):
-            radio = wx.RadioButton(self, -1, _(choice), style=wx.RB_GROUP if i==0 else 0)
-            if i==self.orientation: radio.SetValue(True)
-            vsizer.Add(radio, 0, wx.ALL, 4)
-            radio.Bind(wx.EVT_RADIOBUTTON, self.on_choice_orientation)
-            self.radios.append(radio)
-        szr.Add(vsizer, 0, wx.ALL | wx.EXPAND, 4)
-
-        tmp = wx.BoxSizer(wx.HORIZONTAL)
-        tmp.Add( wx.StaticText(self, -1, _('Slots: ')), 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 3 )
-        self.num = wx.SpinCtrl(self, -1)
-        self.num.SetValue(1)
-        self.num.SetRange(0, 100)
-        tmp.Add(self.num, 1, wx.ALL, 3)
-        szr.Add(tmp, 0, wx.EXPAND)
-
-        self.checkbox_static = wx.CheckBox(self, -1, _('Has a Static Box:'))
-        compat.SetToolTip(self.checkbox_static, "Use wxStaticBoxSizer with box and label")
-        self.label = wx.TextCtrl(self, -1, "")
-        self.label.Enable(False)
-        self.checkbox_static.Bind(wx.EVT_CHECKBOX, self._set_active)
-        szr.Add(self.checkbox_static, 0, wx.ALL | wx.EXPAND, 4)
-
-        tmp = wx.BoxSizer(wx.HORIZONTAL)
-        tmp.Add(wx.StaticText(self, -1, _("Label: ")), 0, wx.ALIGN_CENTER)
-        tmp.Add(self.label, 1)
-        szr.Add(tmp, 0, wx.ALL | wx.EXPAND, 4)
+if wx is not None:
+    class _SizerDialog(wx.Dialog):
+        def __init__(self, parent, to_dialog, default_orient=None):
+            pos = wx.GetMousePosition()
+            wx.Dialog.__init__( self, misc.get_toplevel_parent(parent), -1, _('Select sizer type'), pos )
+            szr = wx.BoxSizer(wx.VERTICAL)
+
+            # static box sizer with radio buttons for orientation / type
+            self.orientation = 1 if default_orient==VERTICAL else 0
+            self.radios = []
+            vsizer = wx.StaticBoxSizer(wx.StaticBox(self, -1, _("Orientation")), wx.VERTICAL)
+            for i, choice in enumerate( ('Horizontal', 'Vertical') ):
+                radio = wx.RadioButton(self, -1, _(choice), style=wx.RB_GROUP if i==0 else 0)
+                if i==self.orientation: radio.SetValue(True)
+                vsizer.Add(radio, 0, wx.ALL, 4)
+                radio.Bind(wx.EVT_RADIOBUTTON, self.on_choice_orientation)
+                self.radios.append(radio)
+            szr.Add(vsizer, 0, wx.ALL | wx.EXPAND, 4)
+
+            tmp = wx.BoxSizer(wx.HORIZONTAL)
+            tmp.Add( wx.StaticText(self, -1, _('Slots: ')), 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 3 )
+            self.num = wx.SpinCtrl(self, -1)
+            self.num.SetValue(1)
+            self.num.SetRange(0, 100)
+            tmp.Add(self.num, 1, wx.ALL, 3)
+            szr.Add(tmp, 0, wx.EXPAND)
+
+            self.checkbox_static = wx.CheckBox(self, -1, _('Has a Static Box:'))
+            compat.SetToolTip(self.checkbox_static, "Use wxStaticBoxSizer with box and label")
+            self.label = wx.TextCtrl(self, -1, "")
+            self.label.Enable(False)
+            self.checkbox_static.Bind(wx.EVT_CHECKBOX, self._set_active)
+            szr.Add(self.checkbox_static, 0, wx.ALL | wx.EXPAND, 4)
+
+            tmp = wx.BoxSizer(wx.HORIZONTAL)
+            tmp.Add(wx.StaticText(self, -1, _("Label: ")), 0, wx.ALIGN_CENTER)
+            tmp.Add(self.label, 1)
+            szr.Add(tmp, 0, wx.ALL | wx.EXPAND, 4)
+
+            if HAVE_WRAP_SIZER:
+                self.checkbox_wrap = wx.CheckBox(self, -1, _('Wraps around'))
+                compat.SetToolTip(self.checkbox_wrap, "Use wxWrapSizer")
+                self.checkbox_wrap.Bind(wx.EVT_CHECKBOX, self._set_active)
+                szr.Add(self.checkbox_wrap, 0, wx.ALL | wx.EXPAND, 4)
+
+            if to_dialog:
+                # option for 'StdDialogButtonSizer'
+                self.checkbox_dlgbutton = wx.CheckBox(self, -1, "StdDialogButtonSizer")
+                compat.SetToolTip(self.checkbox_dlgbutton, "Horizontal sizer for action buttons in dialogs")
+                self.checkbox_dlgbutton.Bind(wx.EVT_CHECKBOX, self.on_checkbox_dlgbutton)
+                szr.Add(self.checkbox_dlgbutton, 0, wx.ALL | wx.EXPAND, 4)
+            else:
+                self.checkbox_dlgbutton = None
 
-        if HAVE_WRAP_SIZER:
-            self.checkbox_wrap = wx.CheckBox(self, -1, _('Wraps around'))
-            compat.SetToolTip(self.checkbox_wrap, "Use wxWrapSizer")
-            self.checkbox_wrap.Bind(wx.EVT_CHECKBOX, self._set_active)
-            szr.Add(self.checkbox_wrap, 0, wx.ALL | wx.EXPAND, 4)
-
-        if to_dialog:
-            # option for 'StdDialogButtonSizer'
-            self.checkbox_dlgbutton = wx.CheckBox(self, -1, "StdDialogButtonSizer")
-            compat.SetToolTip(self.checkbox_dlgbutton, "Horizontal sizer for action buttons in dialogs")
-            self.checkbox_dlgbutton.Bind(wx.EVT_CHECKBOX, self.on_checkbox_dlgbutton)
-            szr.Add(self.checkbox_dlgbutton, 0, wx.ALL | wx.EXPAND, 4)
-        else:
-            self.checkbox_dlgbutton = None
-
-        # horizontal sizer for action buttons
-        hsizer = wx.StdDialogButtonSizer()
-        hsizer.Add( wx.Button(self, wx.ID_CANCEL, _('Cancel')), 1, wx.ALL, 5)
-        btn = wx.Button(self, wx.ID_OK, _('OK'))
-        btn.SetDefault()
-        hsizer.Add(btn, 1, wx.ALL, 5)
-        szr.Add(hsizer, 0, wx.EXPAND )
-
-        self.SetAutoLayout(1)
-        self.SetSizer(szr)
-        szr.Fit(self)
-        self.Layout()
-
-    def on_choice_orientation(self, event):
-        self.orientation = self.radios.index(event.GetEventObject())
-        self._set_active()
-
-    def on_checkbox_dlgbutton(self, event):
-        if event.IsChecked() and self.num.Value<2: self.num.SetValue(2)
-        self._set_active()
-
-    def _set_active(self, event=None):
-        # dynamically activate and deactivate controls
-        if HAVE_WRAP_SIZER:
-            can_be_wrap = not self.checkbox_static.IsChecked()
-            if self.checkbox_dlgbutton and self.checkbox_dlgbutton.IsChecked(): can_be_wrap = False
-            self.checkbox_wrap.Enable( can_be_wrap )
+            # horizontal sizer for action buttons
+            hsizer = wx.StdDialogButtonSizer()
+            hsizer.Add( wx.Button(self, wx.ID_CANCEL, _('Cancel')), 1, wx.ALL, 5)
+            btn = wx.Button(self, wx.ID_OK, _('OK'))
+            btn.SetDefault()
+            hsizer.Add(btn, 1, wx.ALL, 5)
+            szr.Add(hsizer, 0, wx.EXPAND )
 
-        can_be_static = self.orientation<2
-        if HAVE_WRAP_SIZER and self.checkbox_wrap.IsChecked(): can_be_static = False
-        if self.checkbox_dlgbutton and self.checkbox_dlgbutton.IsChecked(): can_be_static = False
-        self.checkbox_static.Enable( can_be_static )
+            self.SetAutoLayout(1)
+            self.SetSizer(szr)
+            szr.Fit(self)
+            self.Layout()
 
-        self.label.Enable( self.checkbox_static.IsChecked() )
+        def on_choice_orientation(self, event):
+            self.orientation = self.radios.index(event.GetEventObject())
+            self._set_active()
 
-        if self.checkbox_dlgbutton:
-            can_be_dialogbutton_sizer = self.orientation==0 and not self.checkbox_static.IsChecked()
-            if HAVE_WRAP_SIZER and self.checkbox_wrap.IsChecked(): can_be_dialogbutton_sizer = False
-            self.checkbox_dlgbutton.Enable( can_be_dialogbutton_sizer )
-            
-            self.radios[1].Enable( not self.checkbox_dlgbutton.IsChecked() )
+        def on_checkbox_dlgbutton(self, event):
+            if event.IsChecked() and self.num.Value<2: self.num.SetValue(2)
+            self._set_active()
+
+        def _set_active(self, event=None):
+            # dynamically activate and deactivate controls
+            if HAVE_WRAP_SIZER:
+                can_be_wrap = not self.checkbox_static.IsChecked()
+                if self.checkbox_dlgbutton and self.checkbox_dlgbutton.IsChecked(): can_be_wrap = False
+                self.checkbox_wrap.Enable( can_be_wrap )
+
+            can_be_static = self.orientation<2
+            if HAVE_WRAP_SIZER and self.checkbox_wrap.IsChecked(): can_be_static = False
+            if self.checkbox_dlgbutton and self.checkbox_dlgbutton.IsChecked(): can_be_static = False
+            self.checkbox_static.Enable( can_be_static )
+
+            self.label.Enable( self.checkbox_static.IsChecked() )
+
+            if self.checkbox_dlgbutton:
+                can_be_dialogbutton_sizer = self.orientation==0 and not self.checkbox_static.IsChecked()
+                if HAVE_WRAP_SIZER and self.checkbox_wrap.IsChecked(): can_be_dialogbutton_sizer = False
+                self.checkbox_dlgbutton.Enable( can_be_dialogbutton_sizer )
+
+                self.radios[1].Enable( not self.checkbox_dlgbutton.IsChecked() )
 
 
 def builder(parent, index):
     "factory function for box sizers"
     default_orient = None
-    if parent.IS_SIZER and parent.check_prop("orient") and parent.orient in (wx.HORIZONTAL, wx.VERTICAL):
-        default_orient = wx.HORIZONTAL if parent.orient==wx.VERTICAL else wx.VERTICAL
+    if parent.IS_SIZER and parent.check_prop("orient") and parent.orient in (HORIZONTAL, VERTICAL):
+        default_orient = HORIZONTAL if parent.orient==VERTICAL else VERTICAL
     dialog = _SizerDialog(common.adding_window or parent, parent.toplevel_parent.WX_CLASS=="wxDialog", default_orient)
     with misc.disable_stay_on_top(common.adding_window or parent):
         res = dialog.ShowModal()
     if dialog.checkbox_dlgbutton and dialog.checkbox_dlgbutton.IsChecked():
         orientation = "StdDialogButtonSizer"
     elif dialog.orientation==0:
-        orientation = wx.HORIZONTAL
+        orientation = HORIZONTAL
     else:
-        orientation = wx.VERTICAL
+        orientation = VERTICAL
 
     num = dialog.num.GetValue()
     wrap = HAVE_WRAP_SIZER and dialog.checkbox_wrap.GetValue() or False
@@ -2187,7 +2032,7 @@ def builder(parent, index):
 
 def xml_builder(parser, base, name, parent, index):
     "factory function to build EditBoxSizer objects from a XML file"
-    orientation = wx.VERTICAL  # default value
+    orientation = VERTICAL  # default value
     if base == 'EditStaticBoxSizer':
         return EditStaticBoxSizer(name, parent, index, orientation, '', 0)
     if base == 'EditWrapSizer':
@@ -2197,51 +2042,52 @@ def xml_builder(parser, base, name, parent, index):
     return EditBoxSizer(name, parent, index, orientation, 0)
 
 
-class _GridBuilderDialog(wx.Dialog):
-    def __init__(self, parent):
-        pos = wx.GetMousePosition()
-        wx.Dialog.__init__( self, misc.get_toplevel_parent(parent), -1, _('Select sizer type and attributes'), pos )
-        # the main sizer
-        sizer = wx.BoxSizer(wx.VERTICAL)
-        # type
-        choices = ["Grid", "FlexGrid", "GridBag"]
-        self.type_ = wx.RadioBox(self, -1, _('Type'), choices=choices, majorDimension=1)
-        sizer.Add(self.type_, 1, wx.ALL|wx.EXPAND, 3)
-        # layout
-        self.rows = wx.SpinCtrl(self, -1, "3")
-        self.cols = wx.SpinCtrl(self, -1, "3")
-        self.vgap = wx.SpinCtrl(self, -1, "0")
-        self.hgap = wx.SpinCtrl(self, -1, "0")
-        # grid sizer with the controls
-        gsizer = wx.FlexGridSizer(cols=2)
-        for label, control, tooltip in [("Rows", self.rows, 'Numbers of sizer rows'),
-                                        ("Cols", self.cols, 'Numbers of sizer colums'),
-                                        ("Vgap", self.vgap, 'Vertical extra space between all children'),
-                                        ("Hgap", self.hgap, 'Horizontal extra space between all children')]:
-            gsizer.Add(wx.StaticText(self, -1, _(label)), 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
-            gsizer.Add(control, 0, wx.ALL | wx.EXPAND | wx.ALIGN_CENTER_VERTICAL, 3)
-            compat.SetToolTip( control, tooltip )
-        self.rows.SetFocus()
-        for ctrl in (self.rows, self.cols, self.hgap, self.vgap):
-            ctrl.SetSelection(-1, -1)
-        # static box sizer around the grid sizer
-        boxsizer = wx.StaticBoxSizer(wx.StaticBox(self, -1, _("Layout")), wx.VERTICAL)
-        boxsizer.Add(gsizer)
-        sizer.Add(boxsizer, 0, wx.EXPAND | wx.ALL, 3)
-
-        # horizontal sizer for action buttons
-        hsizer = wx.BoxSizer(wx.HORIZONTAL)
-        hsizer.Add( wx.Button(self, wx.ID_CANCEL, _('Cancel')), 1, wx.ALL, 5)
-        btn = wx.Button(self, wx.ID_OK, _('OK') )
-        btn.SetDefault()
-        hsizer.Add(btn, 1, wx.ALL, 5)
-        sizer.Add(hsizer, 0, wx.EXPAND )
-
-        self.SetAutoLayout(True)
-        self.SetSizer(sizer)
-
-        sizer.Fit(self)
-        self.Layout()
+if wx is not None:
+    class _GridBuilderDialog(wx.Dialog):
+        def __init__(self, parent):
+            pos = wx.GetMousePosition()
+            wx.Dialog.__init__( self, misc.get_toplevel_parent(parent), -1, _('Select sizer type and attributes'), pos )
+            # the main sizer
+            sizer = wx.BoxSizer(wx.VERTICAL)
+            # type
+            choices = ["Grid", "FlexGrid", "GridBag"]
+            self.type_ = wx.RadioBox(self, -1, _('Type'), choices=choices, majorDimension=1)
+            sizer.Add(self.type_, 1, wx.ALL|wx.EXPAND, 3)
+            # layout
+            self.rows = wx.SpinCtrl(self, -1, "3")
+            self.cols = wx.SpinCtrl(self, -1, "3")
+            self.vgap = wx.SpinCtrl(self, -1, "0")
+            self.hgap = wx.SpinCtrl(self, -1, "0")
+            # grid sizer with the controls
+            gsizer = wx.FlexGridSizer(cols=2)
+            for label, control, tooltip in [("Rows", self.rows, 'Numbers of sizer rows'),
+                                            ("Cols", self.cols, 'Numbers of sizer colums'),
+                                            ("Vgap", self.vgap, 'Vertical extra space between all children'),
+                                            ("Hgap", self.hgap, 'Horizontal extra space between all children')]:
+                gsizer.Add(wx.StaticText(self, -1, _(label)), 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
+                gsizer.Add(control, 0, wx.ALL | wx.EXPAND | wx.ALIGN_CENTER_VERTICAL, 3)
+                compat.SetToolTip( control, tooltip )
+            self.rows.SetFocus()
+            for ctrl in (self.rows, self.cols, self.hgap, self.vgap):
+                ctrl.SetSelection(-1, -1)
+            # static box sizer around the grid sizer
+            boxsizer = wx.StaticBoxSizer(wx.StaticBox(self, -1, _("Layout")), wx.VERTICAL)
+            boxsizer.Add(gsizer)
+            sizer.Add(boxsizer, 0, wx.EXPAND | wx.ALL, 3)
+
+            # horizontal sizer for action buttons
+            hsizer = wx.BoxSizer(wx.HORIZONTAL)
+            hsizer.Add( wx.Button(self, wx.ID_CANCEL, _('Cancel')), 1, wx.ALL, 5)
+            btn = wx.Button(self, wx.ID_OK, _('OK') )
+            btn.SetDefault()
+            hsizer.Add(btn, 1, wx.ALL, 5)
+            sizer.Add(hsizer, 0, wx.EXPAND )
+
+            self.SetAutoLayout(True)
+            self.SetSizer(sizer)
+
+            sizer.Fit(self)
+            self.Layout()
 
 
 def grid_builder(parent, index):
@@ -2314,25 +2160,26 @@ def init_all():
     common.widgets_from_xml['EditFlexGridSizer'] = grid_xml_builder
     common.widgets_from_xml['EditGridBagSizer'] = grid_xml_builder
 
-    import os.path
-    from tree import WidgetTree
+    if config.use_gui:
+        import os.path
+        from tree import WidgetTree
 
-    if HAVE_WRAP_SIZER:
-        WidgetTree.images['EditWrapSizer'] = os.path.join( config.icons_path, 'wrap_sizer_h.png')
-        WidgetTree.images['EditHorizontalWrapSizer'] = os.path.join( config.icons_path, 'wrap_sizer_h.png')
-        WidgetTree.images['EditVerticalWrapSizer'] = os.path.join( config.icons_path, 'wrap_sizer.png')
-    WidgetTree.images['EditStaticBoxSizer'] = os.path.join( config.icons_path, 'sizer.png')
-    WidgetTree.images['EditFlexGridSizer']  = os.path.join( config.icons_path, 'flexgrid_sizer.png' )
-    WidgetTree.images['EditGridBagSizer']  = os.path.join( config.icons_path, 'gridbag_sizer.png' )
-
-    WidgetTree.images['EditVerticalSizer']   = os.path.join( config.icons_path, 'sizer_v.png' )
-    WidgetTree.images['EditHorizontalSizer'] = os.path.join( config.icons_path, 'sizer_h.png' )
-    WidgetTree.images['EditStdDialogButtonSizer'] = os.path.join( config.icons_path, 'button_sizer.png' )
-
-    WidgetTree.images['EditVerticalSizerSlot']   = os.path.join( config.icons_path, 'sizer_slot_v.png' )
-    WidgetTree.images['EditHorizontalSizerSlot'] = os.path.join( config.icons_path, 'sizer_slot_h.png' )
-    WidgetTree.images['EditSizerSlot'] = os.path.join( config.icons_path, 'sizer_slot.png' )
-    WidgetTree.images['EditSlot'] = os.path.join( config.icons_path, 'slot.png' )
+        if HAVE_WRAP_SIZER:
+            WidgetTree.images['EditWrapSizer'] = os.path.join( config.icons_path, 'wrap_sizer_h.png')
+            WidgetTree.images['EditHorizontalWrapSizer'] = os.path.join( config.icons_path, 'wrap_sizer_h.png')
+            WidgetTree.images['EditVerticalWrapSizer'] = os.path.join( config.icons_path, 'wrap_sizer.png')
+        WidgetTree.images['EditStaticBoxSizer'] = os.path.join( config.icons_path, 'sizer.png')
+        WidgetTree.images['EditFlexGridSizer']  = os.path.join( config.icons_path, 'flexgrid_sizer.png' )
+        WidgetTree.images['EditGridBagSizer']  = os.path.join( config.icons_path, 'gridbag_sizer.png' )
+
+        WidgetTree.images['EditVerticalSizer']   = os.path.join( config.icons_path, 'sizer_v.png' )
+        WidgetTree.images['EditHorizontalSizer'] = os.path.join( config.icons_path, 'sizer_h.png' )
+        WidgetTree.images['EditStdDialogButtonSizer'] = os.path.join( config.icons_path, 'button_sizer.png' )
+
+        WidgetTree.images['EditVerticalSizerSlot']   = os.path.join( config.icons_path, 'sizer_slot_v.png' )
+        WidgetTree.images['EditHorizontalSizerSlot'] = os.path.join( config.icons_path, 'sizer_slot_h.png' )
+        WidgetTree.images['EditSizerSlot'] = os.path.join( config.icons_path, 'sizer_slot.png' )
+        WidgetTree.images['EditSlot'] = os.path.join( config.icons_path, 'slot.png' )
 
     ret = {'Sizers': [
         common.make_object_button('EditBoxSizer', 'sizer.png'),
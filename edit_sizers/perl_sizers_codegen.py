@@ -8,7 +8,7 @@ Perl generator functions for the various wxSizerS
 """
 
 import common
-from .edit_sizers import BaseSizerBuilder, SlotGenerator
+from .sizers_codegen import BaseSizerBuilder, SlotGenerator
 
 
 class BasePerlSizerBuilder(BaseSizerBuilder):
@@ -9,7 +9,7 @@ Python generator functions for the various wxSizers
 
 
 import common
-from .edit_sizers import BaseSizerBuilder, SlotGenerator
+from .sizers_codegen import BaseSizerBuilder, SlotGenerator
 
 
 class BasePythonSizerBuilder(BaseSizerBuilder):
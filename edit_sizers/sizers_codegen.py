@@ -0,0 +1,176 @@
+"""
+Language independent base classes for the sizer code generators; this module must not import wx
+
+@copyright: 2002-2007 Alberto Griggio
+@copyright: 2014-2016 Carsten Grohmann
+@copyright: 2016-2021 Dietmar Schwertberger
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+import common
+
+
+class BaseSizerBuilder(object):
+    "Language independent base class for all sizer builders / code generators"
+
+    tmpl = []                 # Statements to generate the sizer from, the stmt has to end with a newline character
+
+    language = None           # Language to generate the code for
+
+    tmpl_SetSizer = ''        # Template to call SetSizer()
+    tmpl_Fit = ''             # Template to call Fit()
+    tmpl_Realize = ''         # Template to call Realize() for StdDialogButtonSizer
+    tmpl_SetSizeHints = ''    # Template to set the size hints
+    tmpl_AddGrowableRow = ''  # Template for wxFlexGridSizer to set growable rows
+    tmpl_AddGrowableCol = ''  # Template for wxFlexGridSizer to set growable columns
+
+    def __init__(self):
+        "Initialise sizer builder"
+        self.tmpl_dict = {}                               # properties to replace in tmpl
+        self.codegen = common.code_writers[self.language] #language specific code generator (codegen.BaseLangCodeWriter)
+
+    def _get_wparent(self, topl, obj):
+        "Return the parent widget or a reference to it as string"
+        raise NotImplementedError
+
+    def _prepare_tmpl_content(self, obj):
+        """Prepare template variables"""
+        self.tmpl_dict.clear()
+        self.tmpl_dict['klass'] = self.codegen.cn(obj.WX_CLASS)
+        self.tmpl_dict['wxIDANY'] = self.codegen.cn('wxID_ANY')
+        self.tmpl_dict['parent_widget'] = self._get_wparent(obj)
+        self.tmpl_dict['sizer_name'] = self.codegen._format_classattr(obj)
+
+    def _get_code(self, obj):
+        "Generates the language specific code for sizer specified in klass"
+        if not self.tmpl:
+            return [], []  # init, final
+
+        init = []
+        layout = []
+
+        # generate init lines from tmpl filled with tmpl_dict
+        init.append(self.tmpl % self.tmpl_dict)
+
+        # generate layout lines
+        if not obj.parent.IS_SIZER:
+            layout.append(self.tmpl_SetSizer % self.tmpl_dict)
+            if not obj.parent.check_prop("size") and obj.parent.IS_TOPLEVEL:
+                layout.append(self.tmpl_Fit % self.tmpl_dict)
+            if "sizehints" in obj.window.properties and obj.window.sizehints:
+                layout.append(self.tmpl_SetSizeHints % self.tmpl_dict)
+
+        return init, layout  # init, post
+
+    def get_code(self, obj):
+        "Generates the language specific code for sizer specified in klass"
+        self._prepare_tmpl_content(obj)
+        if obj.WX_CLASS == 'wxBoxSizer':             return self.get_code_wxBoxSizer(obj)
+        if obj.WX_CLASS == 'wxWrapSizer':            return self.get_code_wxBoxSizer(obj)  # the same here
+        if obj.WX_CLASS == 'wxStaticBoxSizer':       return self.get_code_wxStaticBoxSizer(obj)
+        if obj.WX_CLASS == 'wxStdDialogButtonSizer': return self.get_code_wxStdDialogButtonSizer(obj)
+        if obj.WX_CLASS == 'wxGridSizer':            return self.get_code_wxGridSizer(obj)
+        if obj.WX_CLASS == 'wxFlexGridSizer':        return self.get_code_wxFlexGridSizer(obj)
+        if obj.WX_CLASS == 'wxGridBagSizer':         return self.get_code_wxFlexGridSizer(obj)
+        return self._get_code(obj)
+
+    def get_code_wxStaticBoxSizer(self, obj):
+        "Set sizer specific properties and generate the code"
+        self.tmpl_dict['orient'] = self.codegen.cn( obj.properties["orient"].get_string_value() )
+        self.tmpl_dict['label'] = self.codegen.quote_str( obj.label )
+        return self._get_code(obj)
+
+    def get_code_wxBoxSizer(self, obj):
+        "Set sizer specific properties and generate the code"
+        self.tmpl_dict['orient'] = self.codegen.cn( obj.properties["orient"].get_string_value() )
+        return self._get_code(obj)
+
+    def get_code_wxStdDialogButtonSizer(self, obj):
+        "Set sizer specific properties and generate the code"
+        init, layout = self._get_code(obj)
+        layout.append(self.tmpl_Realize % self.tmpl_dict)
+        return init, layout
+
+    def get_code_wxGridSizer(self, obj):
+        "Set sizer specific properties and generate the code"
+        if obj.WX_CLASS != 'wxGridBagSizer':
+            self.tmpl_dict['rows'] = obj.rows
+            self.tmpl_dict['cols'] = obj.cols
+        self.tmpl_dict['vgap'] = obj.vgap
+        self.tmpl_dict['hgap'] = obj.hgap
+        return self._get_code(obj)
+
+    def get_code_wxFlexGridSizer(self, obj):
+        "Set sizer specific properties and generate the code"
+        ret = list( self.get_code_wxGridSizer(obj) )
+
+        if obj.WX_CLASS=="wxGridBagSizer":
+            max_row, max_col = obj._get_max_row_col()
+        else:
+            max_row = max_col = None
+
+        growable = []
+        if 'growable_rows' in obj.properties:
+            for row in obj.growable_rows:
+                if max_row is None or row<=max_row:
+                    self.tmpl_dict['row'] = row
+                    growable.append(self.tmpl_AddGrowableRow % self.tmpl_dict)
+        if 'growable_cols' in obj.properties:
+            for col in obj.growable_cols:
+                if max_col is None or col<=max_col:
+                    self.tmpl_dict['col'] = col
+                    growable.append(self.tmpl_AddGrowableCol % self.tmpl_dict)
+        ret[-1] = growable + ret[-1]
+        return ret
+
+    def get_code_per_child(self, obj, child):
+        """Returns code that will be inserted after the child code; e.g. for adding element to a sizer.
+        It's placed before the final code returned from get_code()."""
+
+        if child.WX_CLASS in ("spacer","sizerslot"):  # spacer and slot are adding itself to the sizer
+            return []
+
+        # the name attribute of a spacer is already formatted "<width>, <height>".
+        # This string can simply inserted in Add() call.
+        obj_name = self.codegen._format_classattr(child)
+
+        # check if sizer has to store as a class attribute
+        sizer_name = self.codegen._format_classattr(obj)
+
+        flag = child.properties["flag"].get_string_value()  # as string, joined with "|"
+        flag = self.codegen.cn_f(flag) or '0'
+
+        if obj.WX_CLASS=="wxStdDialogButtonSizer" and child.WX_CLASS=='wxButton':
+            # XXX optionally use SetAffirmativeButton, SetCancelButton, SetNegativeButton
+            id_value = child.check_prop("id") and child.properties["id"].value.strip() or ""  # e.g. 'wxID_CANCEL'
+            if ( (child.check_prop_truth("stockitem") and child.stockitem in obj.BUTTON_STOCKITEMS) or 
+                 (id_value and id_value.startswith("wxID_") and id_value[5:] in obj.BUTTON_STOCKITEMS) ):
+                tmpl = self.codegen.tmpl_sizeritem_button
+                return [tmpl % ( sizer_name, obj_name )]
+
+        if obj.WX_CLASS!="wxGridBagSizer":
+            stmt = self.codegen.tmpl_sizeritem % ( sizer_name, obj_name, child.proportion, flag, child.border )
+        else:
+            index = obj._get_row_col(child.index)
+            stmt = self.codegen.tmpl_gridbagsizeritem % ( sizer_name, obj_name, index, child.span, flag, child.border )
+
+        return [stmt]
+
+
+class SlotGenerator(object):
+    # generic code generator; as a slot does not have flags etc. we don't need BaseWidgetBuilder etc.
+    def __init__(self, language):
+        self.language = language
+        self.codegen = common.code_writers[self.language] #language specific code generator (codegen.BaseLangCodeWriter)
+
+    def get_code(self, obj):
+        # add spacer for empty sizer slot
+        parent = obj.parent
+        if not parent.IS_SIZER or parent._IS_GRIDBAG: return [], []
+        sizer_name = self.codegen._format_classattr(parent)
+        size = self.codegen.tmpl_spacersize%(0, 0)
+        stmt = self.codegen.tmpl_sizeritem % ( sizer_name, size, 0, '0', 0 )
+        return [stmt], []
+
+    def get_event_handlers(self, obj):
+        return []
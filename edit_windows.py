@@ -8,7 +8,7 @@ Base classes for windows used by wxGlade
 """
 
 import logging
-import wx
+from compat import wx  # None without wxPython; see edit_base
 
 import new_properties as np
 import edit_base
@@ -791,7 +791,7 @@ class PreviewMixin(object):
 class DesignButtonProperty(np.ActionButtonProperty):
     def __init__(self, callback):
         np.ActionButtonProperty.__init__(self, callback)
-        self.background_color = wx.Colour(150,150,200)
+        if wx is not None: self.background_color = wx.Colour(150,150,200)
         self.set_label( _('Show Design Window') )
 
     def update_label(self):
@@ -1134,9 +1134,7 @@ class EditStylesMixin(np.PropertyOwner):
         if not self.codegen:
             EditStylesMixin.codegen = common.code_writers['preview']
 
-        try:
-            self.widget_writer = self.codegen.obj_builders[self.WX_CLASS]
-        except KeyError:
+        if not self.WX_CLASS in self.codegen.obj_builders:
             raise NotImplementedError
         if styles:
             if isinstance(styles, dict):
@@ -1148,6 +1146,11 @@ class EditStylesMixin(np.PropertyOwner):
             self.style_names = self.widget_writer.style_list
         self.style = np.WidgetStyleProperty(style)  # this will read it's default value
 
+    @property
+    def widget_writer(self):
+        # looked up on each access, so that snapshots of the tree don't include the code generators
+        return self.codegen.obj_builders[self.WX_CLASS]
+
     @decorators.memoize
     def wxname2attr(self, name):
         """Return the attribute specified by the name. Only wx attributes are supported.
@@ -7,8 +7,9 @@ Mixin class for 'events' property
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
-import wx.grid
+from compat import wx  # None without wxPython; see edit_base
+if wx is not None:
+    import wx.grid
 import re
 
 import common, config
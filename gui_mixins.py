@@ -6,199 +6,12 @@ Different Mixins
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import copy, decorators, logging
-import wx
+import logging
+from compat import wx  # None without wxPython; the mixins are then only used for loading and code generation
 
 import config, compat, misc
 
 
-class StylesMixin(object):
-    "Class mixin to handle formatting and re-combining styles"
-
-    def cn_f(self, flags):
-        """Rearrange and format flags into a string.
-
-        Steps to rearrange:
-         1. Split given string using delimiter '|' and remove duplicate flags
-         2. Process following style attributes, the styles are processed in a alphanumeric order:
-              - Rename flags using the 'rename_to' entry
-              - Add additional flags using the 'include' entry (soft requirement)
-              - Delete flags using the 'exclude' entry
-              - Remove unsupported flags using the 'supported_by' entry
-              - Add required flags using the 'require' entry (hard requirement)
-         3. Combine flags using the 'combination' entry
-         4. Format single flags with wcodegen.BaseLanguageMixin.cn() if wcodegen.BaseLanguageMixin.format_flags is True
-         5. Sort and recombine flags using wcodegen.BaseLanguageMixin.tmpl_flag_join
-
-        The style details are described in config.widget_config.
-        The access to the details is only available in widget writer instances.
-
-        Sometime the flag is a digit as a string. The function doesn't process such kind of flags.
-        It returns these flags unchanged.
-
-        Example C++::
-            >>> self.cn_f('wxLC_REPORT|wxSUNKEN_BORDER')
-            'wxLC_REPORT|wxSUNKEN_BORDER'
-
-        Example Python::
-            >>> self.cn_f('wxLC_REPORT|wxSUNKEN_BORDER')
-            'wxLC_REPORT | wxSUNKEN_BORDER'
-
-        flags: string with wxWidget styles joined by '|'
-        
-        see: cn(), format_flags, tmpl_flag_join, config.widget_config"""
-        assert isinstance(flags, compat.basestring)
-
-        if flags.isdigit(): return flags
-
-        # split flags to set first
-        oflags = flags
-        flags = set(flags.split('|'))
-
-        # check for non-supported, renamed flags and ...
-        if self.style_defs:
-            flags = self.process_styles(flags)
-            flags = self.combine_styles(flags)
-
-        if hasattr(self, 'cn') and getattr(self, 'format_flags', True):
-            flags = [self.cn(f) for f in flags if f]
-
-        tmpl_flag_join = getattr(self, 'tmpl_flag_join', '|')
-        flags = tmpl_flag_join.join(sorted(flags))
-
-        return flags
-
-    @decorators.memoize
-    def _get_widget_styles_defs(self, widget_name):
-        """Logic of _get_style_defs() but extracted for cache decorator.
-
-        note: The styles are copied using a deep-copy to prevent changing original data accidentally.
-
-        widget_name: Widget name e.g. 'wxCheckBox'
-        widget_name: Widget name e.g. 'wxCheckBox'
-
-        returns a joined copy of the generic styles and widget specific styles as dict"""
-        styles = {}
-        # Use always a deep-copy to prevent changing original data
-        try:
-            styles = copy.deepcopy(config.widget_config['generic_styles'])
-            styles.update(config.widget_config[widget_name]['style_defs'])
-        except KeyError:
-            pass
-
-        return styles
-
-    def _get_style_defs(self):
-        """Return all styles related to this widget as dict. This includes generic styles from config.widget_config.
-
-        The implementation has moved to _get_widget_styles_defs() to use a
-        simple cache decorator instead of using an own cache implementation.
-
-        see: config.widget_config, _get_widget_styles_defs()"""
-        return self._get_widget_styles_defs(getattr(self, 'klass', None))
-
-    style_defs = property(_get_style_defs)
-
-    def process_styles(self, flags):
-        """Process the style attributes 'rename_to', 'include', 'exclude', 'supported_by' and 'require'.
-        Returns processed flags as set.
-
-        flags: Flags to process as set
-
-        see: The documentation of cn_f() contains more details of the flag handling process.
-             config.widget_config"""
-        assert isinstance(flags, set)
-
-        # processing empty set()s causes later trouble with
-        # set([<filled>]) >= set()
-        if not flags:
-            return flags
-
-        for flag in flags.copy():
-            try:
-                flags.add(self.style_defs[flag]['rename_to'])
-                flags.remove(flag)
-            except (AttributeError, KeyError):
-                pass
-
-        add = set()
-        remove = set()
-        flag_list = list(flags)
-        flag_list.sort()
-
-        for required_by in flag_list:
-            if required_by in remove:
-                continue
-            try:
-                add |= self.style_defs[required_by]['include']
-            except (AttributeError, KeyError):
-                pass
-
-            try:
-                remove |= self.style_defs[required_by]['exclude']
-            except (AttributeError, KeyError):
-                pass
-
-            try:
-                supported_by = self.style_defs[required_by]['supported_by']
-                major = 'wx%d' % self.codegen.for_version[0]
-                detailed = 'wx%d%d' % self.codegen.for_version
-                if not (major in supported_by or detailed in supported_by):
-                    remove.add(required_by)
-            except (AttributeError, KeyError):
-                pass
-
-            try:
-                for required in self.style_defs[required_by]['require']:
-                    if required in remove:
-                        remove.add(required_by)
-                    else:
-                        add.add(required)
-            except (AttributeError, KeyError):
-                pass
-
-        # drop flags from add if they should be removed
-        add -= remove
-
-        flags |= add
-        flags -= remove
-
-        return flags
-
-    def combine_styles(self, flags):
-        """Combine flags (attribute 'combination') and remove flags that are parts of other flags already.
-        Returns processed flags as set.
-
-        flags: Flags to combine and reduce as set
-
-        see: config.widget_config"""
-        # processing empty set()s causes later trouble with set([<filled>]) >= set()
-        if not flags:
-            return flags
-
-        # combined flags: replace children by parent flag
-        for style in self.style_defs:
-            try:
-                if self.style_defs[style]['combination'] <= flags:
-                    flags -= self.style_defs[style]['combination']
-                    style = self.style_defs[style].get('rename_to', style)
-                    flags.add(style)
-            except KeyError:
-                pass
-
-        # combined flags: remove flags that are part of other flags already
-        for flag in flags.copy():
-            # ignore already eliminated flags
-            if flag not in flags:
-                continue
-            try:
-                flags -= self.style_defs[flag]['combination']
-            except (KeyError, TypeError):
-                pass
-
-        return flags
-
-
 class BitmapMixin(object):
     "Class mixin to create wxBitmap instances from the given statement"
     _PROPERTY_HELP = {"bitmap":         "Bitmap to be shown on the widget normally.",
@@ -311,8 +124,8 @@ class BitmapMixin(object):
         elif bitmap.startswith('art:'):
             return self.get_preview_obj_artprovider(bitmap)
         else:
-            bitmap = misc.get_absolute_path(bitmap)
-            return wx.Bitmap(bitmap, wx.BITMAP_TYPE_ANY)
+            # the decoded bitmaps are cached, as the widgets are re-created frequently
+            return misc.get_bitmap(bitmap, relative=True)
 
     def get_preview_obj_artprovider(self, bitmap):
         """Create a wxBitmap or wx.EmptyBitmap from the given statement using wxArtProvider.
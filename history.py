@@ -5,8 +5,39 @@ copyright: 2017-2021 Dietmar Schwertberger
 license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
+import hashlib, weakref, zlib
 import common, config, clipboard, misc
-import wx
+from compat import wx
+
+
+_ITEM_SIZE = 256  # rough estimate of the memory used by a history item without its data
+
+
+class _Blob(object):
+    # compressed UTF-8 XML; shared between snapshots with identical XML
+    __slots__ = ("data", "size", "__weakref__")
+    def __init__(self, data, size):
+        self.data = data
+        self.size = size  # uncompressed size
+
+
+class XMLSnapshot(object):
+    "compressed copy of the clipboard data of a widget, as returned by clipboard.dump_widget()"
+    _blobs = weakref.WeakValueDictionary()  # digest -> _Blob; a blob is released with its last snapshot
+
+    def __init__(self, clipboard_data):
+        option, span, flag, border, xml_unicode = clipboard.clipboard2widget(clipboard_data)
+        self.layout = (option, span, flag, border)
+        data = xml_unicode.encode("utf-8")
+        key = hashlib.sha1(data).digest()
+        blob = self._blobs.get(key)
+        if blob is None:
+            blob = self._blobs[key] = _Blob(zlib.compress(data), len(data))
+        self.blob = blob
+
+    def get(self):
+        "returns the clipboard data: option, span, flag, border, xml_unicode"
+        return self.layout + ( zlib.decompress(self.blob.data).decode("utf-8"), )
 
 
 def copy_value(prop):
@@ -60,6 +91,8 @@ class PropertyValue(object):
 
 
 class HistoryItem(object):
+    xml_data = None  # XMLSnapshot for structural changes; counted separately, as it may be shared
+
     def __init__(self, prop):
         self.path = prop.owner.get_path()
         self.path2 = None  # can be different if the name of the widget has been changed
@@ -68,6 +101,10 @@ class HistoryItem(object):
     def get_key(self):
         return self.name
 
+    def get_size(self):
+        "estimated memory usage in bytes, except for xml_data"
+        return _ITEM_SIZE
+
 
 class HistoryPropertyItem(HistoryItem):
     def __init__(self, prop):
@@ -117,6 +154,13 @@ class HistoryPropertyItem(HistoryItem):
         owner.properties_changed(changed)
         misc.set_focused_widget(owner)
 
+    def get_size(self):
+        size = getattr(self, "_size", None)
+        if size is None:
+            values = [self.old, self.new] + [d[2:] for d in self.dependent]
+            size = self._size = _ITEM_SIZE + len(repr(values))
+        return size
+
     def __repr__(self):
         return "%s(%s, %r, %r, %r)"%(self.__class__.__name__, self.path, self.name, self.old, self.new)
 
@@ -139,7 +183,7 @@ class HistoryRemovedItem(HistoryItem):
         self.IS_SLOT = widget.IS_SLOT
         self.index = widget.index
         self.path = widget.get_path()
-        self.xml_data = clipboard.dump_widget(widget)
+        self.xml_data = XMLSnapshot( clipboard.dump_widget(widget) )
         self.slot_path = self.slot_tab = None
 
         parent = widget.parent
@@ -163,7 +207,7 @@ class HistoryRemovedItem(HistoryItem):
             widget = common.root.find_widget_from_path(parent_path)
 
         if widget.IS_ROOT:# or widget.IS_CONTAINER:
-            widget.clipboard_paste(self.xml_data, self.index)
+            widget.clipboard_paste(self.xml_data.get(), self.index)
         elif self.IS_SLOT:
             widget.insert_item(None, self.index)  # placeholder
             if self.slot_tab is not None:
@@ -181,11 +225,10 @@ class HistoryRemovedItem(HistoryItem):
             # update structure
             misc.rebuild_tree( widget, focus=False )
             # update following slots
-            for c in widget.children[self.index+1:]:
-                if c.IS_SLOT: common.app_tree.refresh(c)
+            common.app_tree.refresh_items( [c for c in widget.children[self.index+1:] if c.IS_SLOT] )
             misc.set_focused_widget(slot)
         else:
-            widget.clipboard_paste(self.xml_data)
+            widget.clipboard_paste(self.xml_data.get())
 
     def redo(self):
         # identical to HistoryAddedItem.undo
@@ -199,7 +242,7 @@ class HistoryRemovedItem(HistoryItem):
 class HistoryAddedItem(HistoryItem):
     def __init__(self, parent, xml_data=None):
         self.slot_path = parent.IS_SLOT and parent.get_path() or None
-        self.xml_data = xml_data  # could be set on undo
+        self.xml_data = xml_data and XMLSnapshot(xml_data) or None  # could be set on undo
         self.path = self.index = None
 
     def finalize(self, item):
@@ -210,7 +253,7 @@ class HistoryAddedItem(HistoryItem):
     def undo(self):
         # identical to HistoryRemovedItem.redo
         widget = common.root.find_widget_from_path(self.path)
-        if self.xml_data is None: self.xml_data = clipboard.dump_widget(widget)
+        if self.xml_data is None: self.xml_data = XMLSnapshot( clipboard.dump_widget(widget) )
         slot = widget.remove(user=False)
         if slot is not None and not self.slot_path:
             # a slot has been left there, but should not be
@@ -221,7 +264,7 @@ class HistoryAddedItem(HistoryItem):
         path = self.slot_path or self.path.rsplit("/",1)[0]  # slot or parent
         widget = common.root.find_widget_from_path(path)
         if widget.IS_ROOT:# or widget.IS_CONTAINER:
-            widget.clipboard_paste(self.xml_data, self.index)
+            widget.clipboard_paste(self.xml_data.get(), self.index)
         elif self.IS_SLOT:
             widget.insert_item(None, self.index)  # placeholder
             #if self.slot_tab is not None:
@@ -239,11 +282,10 @@ class HistoryAddedItem(HistoryItem):
             # update structure
             misc.rebuild_tree( widget, focus=False )
             # update following slots
-            for c in widget.children[self.index+1:]:
-                if c.IS_SLOT: common.app_tree.refresh(c)
+            common.app_tree.refresh_items( [c for c in widget.children[self.index+1:] if c.IS_SLOT] )
             misc.set_focused_widget(slot)
         else:
-            widget.clipboard_paste(self.xml_data)
+            widget.clipboard_paste(self.xml_data.get())
 
 
 class HistorySizerSlots(HistoryItem):
@@ -304,10 +346,17 @@ class HistoryGridSizerRowCol(HistoryItem):
 
 
 class History(object):
-    def __init__(self, depth=20):
+    def __init__(self, depth=None, budget=None):
+        # the number of actions is limited by depth, if given, and by the memory budget in bytes;
+        # default for the budget is the preference history_budget (in kB)
         self.actions = []
         self.actions_redo = [] # on undo, the action is moved from actions to actions_redo
         self.depth = depth
+        self.budget = budget
+        # running totals for actions and actions_redo, updated by _count(); shared XML snapshots are counted once
+        self._items_size = 0  # sum of get_size()
+        self._blobs = {}      # id(blob) -> [blob, number of actions referencing it]
+        self._blobs_size = 0  # compressed size of the blobs
         self._buffer = self._structure_item = None
         self._redo_widget = None # the widget that originally was modified
         self._redo_info = []  # name of properties
@@ -317,6 +366,8 @@ class History(object):
     def reset(self):
         del self.actions[:]
         del self.actions_redo[:]
+        self._items_size = self._blobs_size = 0
+        self._blobs.clear()
         self.can_undo = False
         self.can_redo = False
         self.can_repeat = len(self._redo_info) > 1
@@ -335,7 +386,9 @@ class History(object):
         if not self.actions:
             return wx.Bell()
         action = self.actions.pop(0)
-        action.undo()
+        self._count(action, -1)
+        action.undo()  # this may set action.xml_data
+        self._count(action, 1)
         self.actions_redo.append(action)
 
     def redo(self, focused_widget):
@@ -345,7 +398,9 @@ class History(object):
             if not repeated: wx.Bell()
             return
         action = self.actions_redo.pop(-1)
+        self._count(action, -1)
         action.redo()
+        self._count(action, 1)
         self.actions.insert(0, action)
 
     def repeat(self, focused_widget, multiple=True):
@@ -389,10 +444,46 @@ class History(object):
         self._repeating = False
         return True
 
+    def get_budget(self):
+        if self.budget is not None: return self.budget
+        return config.preferences.history_budget * 1024
+
+    def get_memory_usage(self):
+        """returns a dict with the estimated memory usage in bytes and the number of actions;
+        XML snapshots that are shared between actions are counted once"""
+        return {"actions": len(self.actions), "redo_actions": len(self.actions_redo),
+                "bytes": self._items_size + self._blobs_size, "budget": self.get_budget(),
+                "xml_compressed": self._blobs_size,
+                "xml_uncompressed": sum(blob.size for blob, count in self._blobs.values())}
+
+    def _count(self, action, sign):
+        # add (sign=1) or remove (sign=-1) the action to/from the running totals of the memory usage
+        self._items_size += sign * action.get_size()
+        if action.xml_data is None: return
+        blob = action.xml_data.blob
+        entry = self._blobs.get(id(blob))
+        if entry is None:
+            entry = self._blobs[id(blob)] = [blob, 0]
+        entry[1] += sign
+        if entry[1]==0:
+            del self._blobs[id(blob)]
+            self._blobs_size -= len(blob.data)
+        elif entry[1]==1 and sign==1:
+            self._blobs_size += len(blob.data)
+
+    def _enforce_limits(self):
+        # drop the oldest actions; the latest one is always kept
+        if self.depth and len(self.actions)>self.depth:
+            for action in self.actions[self.depth:]:
+                self._count(action, -1)
+            del self.actions[self.depth:]
+        budget = self.get_budget()
+        while len(self.actions)>1 and self._items_size + self._blobs_size > budget:
+            self._count(self.actions.pop(-1), -1)
+
     def add_item(self, item):
         self.actions.insert(0, item)
-        if len(self.actions)>self.depth:
-            del self.actions[-1]
+        self._count(item, 1)
         if not self._repeating and isinstance(item, HistoryPropertyItem):
             path = item.path
             if path != self._redo_widget:
@@ -403,12 +494,17 @@ class History(object):
                 self._redo_info.append(key)
 
         if self.actions_redo:
+            for action in self.actions_redo:
+                self._count(action, -1)
             del self.actions_redo[:]
+        self._enforce_limits()
 
         if config.debugging:
             print("UndoBuffer:")
             for entry in self.actions:
                 print(entry)
+            print("Memory usage: %(bytes)d of %(budget)d bytes for %(actions)d actions; "
+                  "XML %(xml_compressed)d bytes compressed, %(xml_uncompressed)d uncompressed" % self.get_memory_usage())
 
     ####################################################################################################################
     # property changes: interface from Property instances
@@ -15,13 +15,13 @@ from xml.sax import SAXParseException
 
 # import project modules
 import application
-import common, config, compat, misc, history
+import common, config, compat, misc, history, profiling
 import new_properties as np
 import preferencesdialog, msgdialog, bugdialog, about
 import log
 import template
 from tree import WidgetTree
-from xml_parse import XmlWidgetBuilder, ProgressXmlWidgetBuilder, XmlParsingError
+from xml_parse import ExpatXmlWidgetBuilder, ProgressXmlWidgetBuilder, XmlParsingError
 
 
 
@@ -79,12 +79,17 @@ class wxGladePropertyPanel(wx.Panel):
         self.next_widget = None           # the next one, will only be edited after a small delay
 
         self.pagenames = None
+        # the property editors of a page are only created when the page is shown; see build_page()
+        self._edit_widget = None
+        self._page_properties = []  # for each page, a list of property names
+        self._built_pages = set()   # indices of pages with editors
 
         sizer = wx.BoxSizer(wx.VERTICAL)
         self.heading = wx.TextCtrl(self, style=wx.TE_READONLY)
         sizer.Add(self.heading, 0, wx.EXPAND, 0)
         self.notebook = wx.Notebook(self)
         self.notebook.Bind(wx.EVT_SIZE, self.on_notebook_size)
+        self.notebook.Bind(wx.EVT_NOTEBOOK_PAGE_CHANGED, self.on_page_changed)
 
         sizer.Add(self.notebook, 1, wx.EXPAND, 0)
 
@@ -103,7 +108,8 @@ class wxGladePropertyPanel(wx.Panel):
             if p_name[0].isupper(): continue
             prop = self.current_widget.properties.get(p_name)
             if not prop or not hasattr(prop, "on_drop_file"): continue
-            if ( hasattr(prop, "label_ctrl") and prop.label_ctrl.ScreenRect.Contains( screen_xy ) and
+            if not prop.editing: continue  # the page with the editor has not been shown
+            if ( getattr(prop, "label_ctrl", None) and prop.label_ctrl.ScreenRect.Contains( screen_xy ) and
                  prop.label_ctrl.IsShownOnScreen() ) or prop.has_control(ctrl):
                 return prop.on_drop_file(filenames[0])
         return False
@@ -144,7 +150,7 @@ class wxGladePropertyPanel(wx.Panel):
             self.heading.SetValue( _('Properties') )
 
     def create_editor(self, edit_widget):
-        # fill the frame with a notebook of property editors
+        # fill the frame with a notebook of property editors; the editors are created when a page is shown
 
         if not self.notebook: return  # already deleted
         self.current_widget_class = edit_widget.__class__
@@ -157,58 +163,64 @@ class wxGladePropertyPanel(wx.Panel):
         select_page = self.pagenames[selection]  if selection!=-1  else None
 
         # clear notebook pages
-        #self.notebook.DeleteAllPages()  # deletes also the windows on the pages
+        self._edit_widget = None
+        self._page_properties = []
+        self._built_pages.clear()
         while self.notebook.PageCount:
-            print("DELETE PAGE; new widget:", edit_widget)
             self.notebook.DeletePage(self.notebook.PageCount-1)
 
         self.pagenames = pagenames = []
-        self.sizers = []
         if not edit_widget: return
-        current_page = current_sizer = current_pagename = None
-        property_instance = None
+        current_properties = None
         for prop in edit_widget.PROPERTIES:
             if prop[0].isupper():
-                # end previous page
-                if current_page is not None:
-                    self.end_page(current_page, current_sizer, current_pagename)
-                    current_page = None
-
                 # start new page
-                current_pagename = prop
+                current_properties = None
                 if prop=="Layout" and not edit_widget._has_layout:continue
                 if prop=="Events" and edit_widget.events is None: continue
-
-                current_page = self.start_page(prop)
-                current_sizer = wx.BoxSizer(wx.VERTICAL)
-                self.sizers.append(current_sizer)
-
-                self.pagenames.append(prop)
-
+                current_properties = []
+                pagenames.append(prop)
+                self._page_properties.append(current_properties)
                 continue
 
-            if current_pagename=="Layout" and not edit_widget._has_layout: continue
-
             # a property or None
-            property_instance_ = edit_widget.properties.get(prop)
-            if property_instance_ is not None:
-                property_instance = property_instance_
-                property_instance.create_editor(current_page, current_sizer)
+            if current_properties is not None and prop in edit_widget.properties:
+                current_properties.append(prop)
 
-        if current_page is not None:
-            self.end_page(current_page, current_sizer, current_pagename)
+        # add empty pages
+        self._edit_widget = edit_widget
+        for pagename in pagenames:
+            panel = self.start_page(pagename)
+            self.notebook.AddPage(panel.GetParent(), _(pagename), select=False)
 
         if select_page and select_page in pagenames:
             index = pagenames.index(select_page)
-            self.notebook.SetSelection(index)
         else:
-            self.notebook.SetSelection(0)
+            index = 0
+        self.notebook.SetSelection(index)
+        self.build_page(index)
 
         self.notebook.Show()
 
         if wx.Platform != "__WXMSW__" and focus_before is common.app_tree:
             focus_before.SetFocus()
 
+    def build_page(self, index):
+        "create the property editors of a page, if this was not done before"
+        if self._edit_widget is None or index in self._built_pages or not 0<=index<len(self._page_properties):
+            return
+        self._built_pages.add(index)
+        scrolled = self.notebook.GetPage(index)
+        panel = self._get_page_panel(scrolled)
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        for name in self._page_properties[index]:
+            self._edit_widget.properties[name].create_editor(panel, sizer)
+        self.end_page(panel, sizer)
+
+    def on_page_changed(self, event):
+        self.build_page( event.GetSelection() )
+        event.Skip()
+
     def start_page(self, name):
         # create a ScrolledWindow and a Panel; with only ScrolledWindow, scrolling on gtk 3 does not work
         scrolled = wx.ScrolledWindow( self.notebook, name=name)
@@ -217,16 +229,16 @@ class wxGladePropertyPanel(wx.Panel):
             panel.SetBackgroundColour(scrolled.GetBackgroundColour())
         return panel
 
-    def end_page(self, panel, sizer, header, select=False):
+    def end_page(self, panel, sizer):
         sizer.AddSpacer(30)
         panel.SetAutoLayout(1)
         panel.SetSizer(sizer)
         sizer.Layout()
         sizer.Fit(panel)
+        self._set_page_size( panel.GetParent() )
 
-        scrolled = panel.GetParent()
-        self.notebook.AddPage(scrolled, _(header),select=select)
-        self._set_page_size(scrolled)
+    def _get_page_panel(self, scrolled):
+        return [w for w in scrolled.GetChildren() if isinstance(w, wx.Panel)][0]
 
     def _set_page_size(self, scrolled):
         # set ScrolledWindow and Panel to available size; enable scrolling, if required
@@ -236,7 +248,7 @@ class wxGladePropertyPanel(wx.Panel):
         hs -= self._notebook_decoration_size[1]
         w_scrollbar = wx.SystemSettings.GetMetric(wx.SYS_VSCROLL_X)  # width a of a scrollbar
 
-        panel = [w for w in scrolled.GetChildren() if isinstance(w, wx.Panel)][0]
+        panel = self._get_page_panel(scrolled)
         szr = panel.GetSizer()
         if not szr: return
         wm, hm = szr.GetMinSize()
@@ -285,7 +297,8 @@ class wxGladePalettePanel(wx.Panel):
         self.SetBackgroundColour( compat.wx_SystemSettings_GetColour(wx.SYS_COLOUR_BTNFACE) )
 
         # load the available code generators
-        all_widgets = common.init_codegen()
+        with profiling.phase("common.init_codegen"):
+            all_widgets = common.init_codegen()
         if not config.use_gui: return
         self.all_togglebuttons = []  # used by reset_togglebuttons
 
@@ -356,8 +369,8 @@ class wxGladePalettePanel(wx.Panel):
             new_row = 0
         elif key[0]==wx.WXK_PAGEDOWN:
             new_row = len(self._ids_by_row)-1
-        elif (ord("A") <= key[0] <= ord("Z")) and chr(key[0]) in misc.palette_hotkeys:
-            section = misc.palette_hotkeys[chr(key[0])]
+        elif (ord("A") <= key[0] <= ord("Z")) and chr(key[0]) in common.palette_hotkeys:
+            section = common.palette_hotkeys[chr(key[0])]
             new_row = self._section_to_row[section]
             new_col = 0
         else:
@@ -396,18 +409,23 @@ class wxGladeFrame(wx.Frame):
 
         common.main = self
         self._set_icon()
-        self.create_menu()
-        self.create_toolbar()
+        with profiling.phase("main.create_menu"):
+            self.create_menu()
+        with profiling.phase("main.create_toolbar"):
+            self.create_toolbar()
 
         style = wx.SP_3D | wx.SP_LIVE_UPDATE
         self.splitter1 = wx.SplitterWindow(self, style=style)
         self.splitter2 = wx.SplitterWindow(self.splitter1, style=style)
-        self.palette = wxGladePalettePanel(self.splitter2)
+        with profiling.phase("main.wxGladePalettePanel"):
+            self.palette = wxGladePalettePanel(self.splitter2)
 
         # create the property and the tree frame
-        common.property_panel = self.property_panel = wxGladePropertyPanel(self.splitter2)
+        with profiling.phase("main.wxGladePropertyPanel"):
+            common.property_panel = self.property_panel = wxGladePropertyPanel(self.splitter2)
         common.root = app = application.Application()
-        common.app_tree = self.tree = WidgetTree(self.splitter1, app)
+        with profiling.phase("main.WidgetTree"):
+            common.app_tree = self.tree = WidgetTree(self.splitter1, app)
 
         self.splitter1.SplitVertically(self.splitter2, self.tree)
         self.splitter2.SplitHorizontally(self.palette, self.property_panel)
@@ -765,20 +783,25 @@ class wxGladeFrame(wx.Frame):
         self.autosave_timer.Start( int(config.preferences.autosave_delay) * 1000 )
 
     def on_autosave_timer(self, event):
-        res = common.autosave_current()
-        if res == 2:
-            self.user_message(_("Auto saving... done"))
-        elif not res:
-            self.autosave_timer.Stop()
-            config.preferences.autosave = False
-            logging.info(_('Disable autosave function permanently'))
-            wx.MessageBox(
-                _('The autosave function failed. It has been disabled\n'
-                  'permanently due to this error. Use the preferences\n'
-                  'dialog to re-enable this functionality.\n'
-                  'The details have been written to the wxGlade log file\n\n'
-                  'The log file is: %s' % config.log_file ),
-                _('Autosave Failed'), wx.OK | wx.CENTRE | wx.ICON_ERROR )
+        # the file is written in a background thread; on_autosave_done will be called from the main thread afterwards
+        callback = lambda *args: wx.CallAfter(self.on_autosave_done, *args)
+        if common.autosave_current(callback) == 2:
+            self.user_message(_("Auto saving..."))
+
+    def on_autosave_done(self, autosave_name, error, durations):
+        if not error:
+            self.user_message( _("Auto saving... done in %.2f seconds") % sum(durations) )
+            return
+        if self.autosave_timer is not None: self.autosave_timer.Stop()
+        config.preferences.autosave = False
+        logging.info(_('Disable autosave function permanently'))
+        wx.MessageBox(
+            _('The autosave function failed. It has been disabled\n'
+              'permanently due to this error. Use the preferences\n'
+              'dialog to re-enable this functionality.\n'
+              'The details have been written to the wxGlade log file\n\n'
+              'The log file is: %s' % config.log_file ),
+            _('Autosave Failed'), wx.OK | wx.CENTRE | wx.ICON_ERROR )
 
     def check_autosaved(self):
         if not common.check_autosaved(None): return
@@ -844,6 +867,7 @@ class wxGladeFrame(wx.Frame):
             i = self.property_panel.pagenames.index(section)
             if self.property_panel.notebook.GetSelection() != i:
                 self.property_panel.notebook.ChangeSelection(i)
+                self.property_panel.build_page(i)  # ChangeSelection does not send an event
             else:
                 self.property_panel.notebook.SetFocus()
                 # try to set the focus if the widget has changed; this is not yet implemented for many property types
@@ -1031,34 +1055,19 @@ class wxGladeFrame(wx.Frame):
         try:
             try:
                 logging.info( _('Read wxGlade project from file "%s"'), filename )
-                input_file_version = None
 
                 if not isinstance(filename, list):
                     common.root.filename = filename
-                    # decoding will done automatically by SAX XML library
-                    if compat.PYTHON2:
-                        infile = open(filename)
-                    else:
-                        infile = open(filename, "r", encoding="UTF8")
-                    if hasattr(infile, "seek"):
-                        # try to read file version number from the first few lines
-                        import re
-                        version_re = re.compile(r"<!-- generated by wxGlade (\d+)\.(\d+)\.(\d+)(\S*)\s*")
-                        for n in range(3):
-                            match = version_re.match( infile.readline() )
-                            if match:
-                                major, minor, sub, extension = match.groups()
-                                input_file_version = (int(major), int(minor), int(sub), extension)
-                                break
-                        infile.seek(0)
-
+                    # the file is read only once: decoding is done by the XML parser and the file version is taken
+                    # from the comment at the top (see: ExpatXmlWidgetBuilder.comment())
+                    infile = open(filename, "rb")
                 else:
                     common.root.filename = None
 
                 if use_progress_dialog and config.preferences.show_progress:
-                    p = ProgressXmlWidgetBuilder(filename, input_file_version, input_file=infile)
+                    p = ProgressXmlWidgetBuilder(filename, None, input_file=infile)
                 else:
-                    p = XmlWidgetBuilder(filename, input_file_version)
+                    p = ExpatXmlWidgetBuilder(filename)
 
                 if infile is not None:
                     p.parse(infile)
@@ -1140,9 +1149,7 @@ class wxGladeFrame(wx.Frame):
 
     def _save_app(self, filename):
         try:
-            obuffer = []
-            common.root.write(obuffer)
-            common.save_file(filename, obuffer, 'wxg')
+            common.save_file(filename, common.root, 'wxg')
         except EnvironmentError as inst:
             if config.debugging: raise
             common.root.saved = False
@@ -1473,12 +1480,14 @@ class wxGlade(wx.App):
         if not config.debugging:
             self.SetAssertMode(0)
 
-        common.init_preferences()
+        with profiling.phase("common.init_preferences"):
+            common.init_preferences()
 
         self.locale = wx.Locale(wx.LANGUAGE_DEFAULT)  # avoid PyAssertionErrors
         #compat.wx_ArtProviderPush(wxGladeArtProvider())
 
-        frame = wxGladeFrame()
+        with profiling.phase("main.wxGladeFrame"):
+            frame = wxGladeFrame()
         self.SetTopWindow(frame)
         self.SetExitOnFrameDelete(True)
 
@@ -1597,4 +1606,5 @@ def main(filename=None):
     ##win.import_xrc(r"D:\Python\Sources35\wxglade\wxglade_dev\tests\casefiles\CalendarCtrl.xrc")
     #win.import_xrc(r"D:\Python\Sources35\wxglade\wxglade_dev\tests\casefiles\AllWidgets_30.xrc")
 
+    profiling.report()  # startup is finished
     app.MainLoop()
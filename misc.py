@@ -9,7 +9,8 @@ Miscellaneous stuff, used in many parts of wxGlade
 
 import common, config, compat
 import logging, os, re, time
-import wx
+from collections import OrderedDict
+from compat import wx  # None without wxPython: only the functions that don't use wx are available
 
 
 
@@ -93,61 +94,62 @@ def show_widget(widget):
         widget = parent  # go up one level
 
 
-class wxMSWRadioButton(wx.RadioButton):
-    """Custom wxRadioButton class which tries to implement a better GetBestSize than the default one for WXMSW
-    (mostly copied from wxCheckBox::DoGetBestSize in checkbox.cpp)"""
-    __radio_size = None
-
-    def GetBestSize(self):
-        if not self.__radio_size:
-            dc = wx.ScreenDC()
-            dc.SetFont(compat.wx_SystemSettings_GetFont(wx.SYS_DEFAULT_GUI_FONT))
-            self.__radio_size = (3*dc.GetCharHeight())//2
-        label = self.GetLabel()
-        if label:
-            w, h = self.GetTextExtent(label)
-            w += self.__radio_size + self.GetCharWidth()
-            if h < self.__radio_size:
-                h = self.__radio_size
-        else:
-            w = h = self.__radio_size
-        return w, h
+if wx is not None:
+    class wxMSWRadioButton(wx.RadioButton):
+        """Custom wxRadioButton class which tries to implement a better GetBestSize than the default one for WXMSW
+        (mostly copied from wxCheckBox::DoGetBestSize in checkbox.cpp)"""
+        __radio_size = None
+
+        def GetBestSize(self):
+            if not self.__radio_size:
+                dc = wx.ScreenDC()
+                dc.SetFont(compat.wx_SystemSettings_GetFont(wx.SYS_DEFAULT_GUI_FONT))
+                self.__radio_size = (3*dc.GetCharHeight())//2
+            label = self.GetLabel()
+            if label:
+                w, h = self.GetTextExtent(label)
+                w += self.__radio_size + self.GetCharWidth()
+                if h < self.__radio_size:
+                    h = self.__radio_size
+            else:
+                w = h = self.__radio_size
+            return w, h
 
 
-class wxGTKGladePopupMenu(wx.Menu):
-    "Default wxMenu seems to have probles with SetTitle on GTK"
+    class wxGTKGladePopupMenu(wx.Menu):
+        "Default wxMenu seems to have probles with SetTitle on GTK"
 
-    def __init__(self, title):
-        wx.Menu.__init__(self)
-        self.TITLE_ID = wx.NewId()
-        item = self.Append(self.TITLE_ID, title)
-        self.AppendSeparator()
-        font = item.GetFont()
-        font.SetWeight(wx.BOLD)
-        item.SetFont( wx.Font(font.GetPointSize(), font.GetFamily(), font.GetStyle(), wx.BOLD) )
+        def __init__(self, title):
+            wx.Menu.__init__(self)
+            self.TITLE_ID = wx.NewId()
+            item = self.Append(self.TITLE_ID, title)
+            self.AppendSeparator()
+            font = item.GetFont()
+            font.SetWeight(wx.BOLD)
+            item.SetFont( wx.Font(font.GetPointSize(), font.GetFamily(), font.GetStyle(), wx.BOLD) )
 
-    def SetTitle(self, title):
-        self.SetLabel(self.TITLE_ID, title)
+        def SetTitle(self, title):
+            self.SetLabel(self.TITLE_ID, title)
 
-if wx.Platform == '__WXMSW__':
-    wxGladeRadioButton = wxMSWRadioButton
-else:
-    wxGladeRadioButton = wx.RadioButton
+    if wx.Platform == '__WXMSW__':
+        wxGladeRadioButton = wxMSWRadioButton
+    else:
+        wxGladeRadioButton = wx.RadioButton
 
 
-if wx.Platform == '__WXGTK__':
-    wxGladePopupMenu = wxGTKGladePopupMenu
-else:
-    wxGladePopupMenu = wx.Menu
+    if wx.Platform == '__WXGTK__':
+        wxGladePopupMenu = wxGTKGladePopupMenu
+    else:
+        wxGladePopupMenu = wx.Menu
 
 
-class SelectionTag(wx.Window):
-    "This is one of the small blue squares that appear at the corners of the active widgets"
-    def __init__(self, parent):
-        kwds = {'size': (7, 7)}
-        wx.Window.__init__(self, parent, wx.ID_ANY, **kwds)
-        self.SetBackgroundColour(wx.BLUE)
-        self.Hide()
+    class SelectionTag(wx.Window):
+        "This is one of the small blue squares that appear at the corners of the active widgets"
+        def __init__(self, parent):
+            kwds = {'size': (7, 7)}
+            wx.Window.__init__(self, parent, wx.ID_ANY, **kwds)
+            self.SetBackgroundColour(wx.BLUE)
+            self.Hide()
 
 
 class SelectionMarker(object):
@@ -234,18 +236,7 @@ def string_to_color(color):
     raise ValueError
 
 
-def format_for_version(version):
-    "Return the version information in a string; e.g. format_for_version((2, 8)) -> '2.8'"
-    # see: wxglade.codegen.BaseLangCodeWriter.for_version
-    return '%s.%s' % version
 
-def format_supported_by(version):
-    "Return formatted version string; e.g. 'wx3' -> '3' or 'wx28' -> '2.8'"
-    # see config.widget_config, wcodegen.BaseWidgetWriter.is_widget_supported(), config.widget_config
-    assert version.startswith("wx")
-    if len(version) == 3: return '%s' % version[2]
-    if len(version) == 4: return '%s.%s' % (version[2], version[3])
-    raise ValueError(_('Unknown version format for "%s"') % repr(version))
 
 
 def get_toplevel_parent(obj):
@@ -509,73 +500,74 @@ def navigate(up):
 
 # accelerator tables to enable keyboard shortcuts for the popup menus of the various widgets (remove, cut, copy, paste)
 # only for the editing windows:
-accel_table_editors = {
-    ("",  wx.WXK_DELETE):(_remove, ()),
-    ("C", ord('C')):     (_copy,   ()),
-    ("C", ord('X')):     (_cut,    ()),
-    ("C", ord('V')):     (_paste,  ()),
-    ("C", ord('I')):     (_insert, ()),
-    ("C", ord('A')):     (_add,    ()),
+if wx is not None:
+    accel_table_editors = {
+        ("",  wx.WXK_DELETE):(_remove, ()),
+        ("C", ord('C')):     (_copy,   ()),
+        ("C", ord('X')):     (_cut,    ()),
+        ("C", ord('V')):     (_paste,  ()),
+        ("C", ord('I')):     (_insert, ()),
+        ("C", ord('A')):     (_add,    ()),
 
-    ("", wx.WXK_UP):     (navigate,  (True, )),
-    ("", wx.WXK_DOWN):   (navigate,  (False,)),
+        ("", wx.WXK_UP):     (navigate,  (True, )),
+        ("", wx.WXK_DOWN):   (navigate,  (False,)),
 
-    ("",  wx.WXK_ESCAPE):(_cancel, ()),
+        ("",  wx.WXK_ESCAPE):(_cancel, ()),
 
-    ("", wx.WXK_RETURN): (drop,    ()),
-}
+        ("", wx.WXK_RETURN): (drop,    ()),
+    }
 
-if wx.Platform == "__WXMAC__":
-    # on Windows this one would go up in the hierarchy when in the Tree control
-    accel_table_editors["", wx.WXK_BACK] = (_remove, ())
+    if wx.Platform == "__WXMAC__":
+        # on Windows this one would go up in the hierarchy when in the Tree control
+        accel_table_editors["", wx.WXK_BACK] = (_remove, ())
 
 
-# for the palette window
-accel_table_editors_palette = {
-    ("",  wx.WXK_ESCAPE):(_cancel, ())
-}
+    # for the palette window
+    accel_table_editors_palette = {
+        ("",  wx.WXK_ESCAPE):(_cancel, ())
+    }
 
-# for all windows
-accel_table = {
-    ("C", ord('Z')):     ((common, "history","undo"), "focused_widget"),
-    ("C", ord('Y')):     ((common, "history","redo"), "focused_widget"),
-    ("C", ord('R')):     ((common, "history","repeat"), "focused_widget"),
+    # for all windows
+    accel_table = {
+        ("C", ord('Z')):     ((common, "history","undo"), "focused_widget"),
+        ("C", ord('Y')):     ((common, "history","redo"), "focused_widget"),
+        ("C", ord('R')):     ((common, "history","repeat"), "focused_widget"),
 
-    ("",  wx.WXK_F2):    ((common,"main","show_tree"),            ()),
-    ("",  wx.WXK_F3):    ((common,"main","show_props_window"),    ()),
-    ("",  wx.WXK_F4):    ((common,"main","show_palette"),         ()),
-    ("",  wx.WXK_F5):    ((common,"main","preview"),              ()),
-    ("",  wx.WXK_F6):    ((common,"main","show_design_window"),   ()),
-    ("",  wx.WXK_F7):    ((common,"main","create_shell_window"),  ()),
+        ("",  wx.WXK_F2):    ((common,"main","show_tree"),            ()),
+        ("",  wx.WXK_F3):    ((common,"main","show_props_window"),    ()),
+        ("",  wx.WXK_F4):    ((common,"main","show_palette"),         ()),
+        ("",  wx.WXK_F5):    ((common,"main","preview"),              ()),
+        ("",  wx.WXK_F6):    ((common,"main","show_design_window"),   ()),
+        ("",  wx.WXK_F7):    ((common,"main","create_shell_window"),  ()),
 
-    ("",  wx.WXK_F8):    ((common,"main","show_props_window"),    ("Common",)),
-    ("C", ord('M')):     ((common,"main","show_props_window"),    ("Common",)),
+        ("",  wx.WXK_F8):    ((common,"main","show_props_window"),    ("Common",)),
+        ("C", ord('M')):     ((common,"main","show_props_window"),    ("Common",)),
 
-    ("",  wx.WXK_F9):    ((common,"main","show_props_window"),    ("Layout",)),
-    ("C", ord('L')):     ((common,"main","show_props_window"),    ("Layout",)),
+        ("",  wx.WXK_F9):    ((common,"main","show_props_window"),    ("Layout",)),
+        ("C", ord('L')):     ((common,"main","show_props_window"),    ("Layout",)),
 
-    ("",  wx.WXK_F10):   ((common,"main","show_props_window"),    ("Widget",)),
-    ("C", ord('W')):     ((common,"main","show_props_window"),    ("Widget",)),
+        ("",  wx.WXK_F10):   ((common,"main","show_props_window"),    ("Widget",)),
+        ("C", ord('W')):     ((common,"main","show_props_window"),    ("Widget",)),
 
-    ("",  wx.WXK_F11):   ((common,"main","show_props_window"),    ("Events",)),
-    ("C", ord('E')):     ((common,"main","show_props_window"),    ("Events",)),
+        ("",  wx.WXK_F11):   ((common,"main","show_props_window"),    ("Events",)),
+        ("C", ord('E')):     ((common,"main","show_props_window"),    ("Events",)),
 
-    ("",  wx.WXK_F12):   ((common,"main","show_props_window"),    ("Code",)),
-    ("C", ord('D')):     ((common,"main","show_props_window"),    ("Code",)),  # -> 'O'? and use 'D' for Design window?
+        ("",  wx.WXK_F12):   ((common,"main","show_props_window"),    ("Code",)),
+        ("C", ord('D')):     ((common,"main","show_props_window"),    ("Code",)),  # -> 'O'? and use 'D' for Design window?
 
-    ("C", ord('P')):     ((common,"main","pin_design_window"),    ()),
+        ("C", ord('P')):     ((common,"main","pin_design_window"),    ()),
 
-    ("A", ord('1')):     ((common,"main","switch_layout"),        (0,)),
-    ("A", ord('2')):     ((common,"main","switch_layout"),        (1,)),
-    ("A", ord('3')):     ((common,"main","switch_layout"),        (2,)),
+        ("A", ord('1')):     ((common,"main","switch_layout"),        (0,)),
+        ("A", ord('2')):     ((common,"main","switch_layout"),        (1,)),
+        ("A", ord('3')):     ((common,"main","switch_layout"),        (2,)),
 
-    ("C", ord('S')):     ((common,"main","save_app"),             ()),
-    ("C", ord('G')):     ((common,"root","generate_code"), ()),
+        ("C", ord('S')):     ((common,"main","save_app"),             ()),
+        ("C", ord('G')):     ((common,"root","generate_code"), ()),
 
-    ("C", ord('N')):     ((common,"main","new_app"),              ()), 
-    ("C", ord('O')):     ((common,"main","open_app"),             ()),
-    ("C", ord('Q')):     ((common,"main","Close"),                ()),
-}
+        ("C", ord('N')):     ((common,"main","new_app"),              ()), 
+        ("C", ord('O')):     ((common,"main","open_app"),             ()),
+        ("C", ord('Q')):     ((common,"main","Close"),                ()),
+    }
 
 
 def handle_key_event(event, window_type, window=None):
@@ -614,8 +606,6 @@ def handle_key_event(event, window_type, window=None):
         args = (globals()[args],)
     wx.CallAfter(function, *args)
 
-# for key handler in palette window:
-palette_hotkeys = {"S":"Sizers"}  # key to section name
 
 
 def _reverse_dict(src):
@@ -633,7 +623,7 @@ def dummy_contextmanager():
     yield
 
 
-if wx.Platform == '__WXMAC__':
+if wx is not None and wx.Platform == '__WXMAC__':
     # on Mac OS we need to disable STAY_ON_TOP when a dialog is to be shown
     @contextlib.contextmanager
     def disable_stay_on_top(widget):
@@ -655,7 +645,7 @@ else:
 
 ########################################################################################################################
 # key handlers
-if wx.Platform == '__WXMAC__':
+if wx is not None and wx.Platform == '__WXMAC__':
     # Mac has no Ctrl-Click -> use Shift-Click
     def event_modifier_copy(event):
         return event.ShiftDown()
@@ -686,7 +676,26 @@ def design_title(title):
     return _('Design - <%s>') % title
 
 
-def get_xpm_bitmap(path):
+# decoded bitmaps #####################################################################################################
+
+# LRU cache for bitmaps that were loaded from files: (absolute path, mtime, requested size) -> wx.Bitmap;
+# the most recently used entries are at the end; the total size of the cached bitmaps is limited by _bitmap_cache_limit
+_bitmap_cache = OrderedDict()
+_bitmap_cache_size = 0           # approx. memory usage in bytes, 4 bytes per pixel
+_bitmap_cache_limit = 32*1024*1024
+
+
+def _get_bitmap_mtime(path):
+    # the modification time of the file or of the zip archive containing it; None if there's no such file
+    if not os.path.exists(path) and '.zip' in path:
+        path = path.split('.zip', 1)[0] + '.zip'
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _load_bitmap(path):
     bmp = wx.NullBitmap
     if not os.path.exists(path):
         if '.zip' in path:
@@ -698,36 +707,55 @@ def get_xpm_bitmap(path):
             if zipfile.is_zipfile(archive):
                 # extract the XPM lines...
                 try:
-                    data = zipfile.ZipFile(archive).read(name)
+                    with zipfile.ZipFile(archive) as zf:
+                        data = zf.read(name)
                     data = [d[1:-1] for d in _get_xpm_bitmap_re.findall(data)]
                     bmp = wx.BitmapFromXPMData(data)  # XXX
                 except:
                     logging.exception(_('Internal Error'))
                     bmp = wx.NullBitmap
     else:
-        bmp = wx.Bitmap(path)
+        bmp = wx.Bitmap(path, wx.BITMAP_TYPE_ANY)
     return bmp
 
 
-def get_absolute_path(path, for_preview=False):
-    "Get an absolute path relative to the current output directory (where the code is generated)."
-    if os.path.sep!="\\":
-        path = path.replace("\\", os.path.sep)
-    if os.path.isabs(path):
-        return path
-    p = common.root.output_path
-    if for_preview:
-        p = getattr(common.root, 'real_output_path', u'')
-    if os.path.sep!="\\":
-        p = p.replace("\\", os.path.sep)
-    if not os.path.isabs(p):
-        # a path relative to the application filename
-        appdir = os.path.dirname(common.root.filename)
-        p = os.path.abspath( os.path.join(appdir, p) )
-
-    if not os.path.isdir(p): p = os.path.dirname(p)
-
-    return os.path.abspath( os.path.join(p, path) )
+def get_bitmap(path, size=None, relative=False):
+    """Load a bitmap from a file or from a zip archive; the decoded bitmaps are cached until the file is modified.
+
+    path: the file name; a relative path is resolved by common.get_absolute_path() if relative is True
+    size: if not None, the bitmap is scaled to this size; tuple (width, height)
+
+    returns wx.NullBitmap if the file can't be loaded"""
+    global _bitmap_cache_size
+    if relative:
+        path = common.get_absolute_path(path)
+    mtime = _get_bitmap_mtime(path)
+    if mtime is None:
+        return _load_bitmap(path)  # no such file; nothing to cache
+
+    key = (path, mtime, size and tuple(size) or None)
+    bmp = _bitmap_cache.pop(key, None)
+    if bmp is None:
+        bmp = _load_bitmap(path)
+        if not bmp.IsOk(): return bmp
+        if size and tuple(bmp.Size)!=tuple(size):
+            bmp = wx.Bitmap( bmp.ConvertToImage().Scale(size[0], size[1], wx.IMAGE_QUALITY_HIGH) )
+        _bitmap_cache_size += bmp.GetWidth() * bmp.GetHeight() * 4
+        while _bitmap_cache and _bitmap_cache_size>_bitmap_cache_limit:
+            old = _bitmap_cache.popitem(last=False)[1]
+            _bitmap_cache_size -= old.GetWidth() * old.GetHeight() * 4
+    _bitmap_cache[key] = bmp  # (re-)insert as most recently used
+    return bmp
+
+
+def clear_bitmap_cache():
+    global _bitmap_cache_size
+    _bitmap_cache.clear()
+    _bitmap_cache_size = 0
+
+
+def get_xpm_bitmap(path):
+    return get_bitmap(path)
 
 
 def get_relative_path(filename):
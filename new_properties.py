@@ -12,19 +12,24 @@ Interface to owner modified; see below for class PropertyOwner
 import common, config, compat, logging, misc
 from collections import OrderedDict
 import re, os
-import wx
+from compat import wx  # None without wxPython: the properties can be used for loading and code generation, w/o editors
 
-if wx.Platform != '__WXMSW__':
+if wx is not None and wx.Platform != '__WXMSW__':
     import wx.lib.stattext
 
 
 class _DefaultArgument(object):
+    def __reduce__(self):
+        return "_DefaultArgument"  # the singleton, also for snapshots
     def __bool__(self):
         return False
     def __nonzero__(self):
         return False
 _DefaultArgument = _DefaultArgument()
 
+_NullColour = wx.NullColour if wx is not None else None  # default value of ColorProperty
+_FD_OPEN_STYLE = (wx.FD_OPEN | wx.FD_FILE_MUST_EXIST) if wx is not None else 0  # file dialog of BitmapProperty
+
 
 # some building blocks for regular expressions:
 _leading  = r"^\s*\(?\s*"          # whitespace, optionally including an opening "("
@@ -65,6 +70,7 @@ class Property(object):
     GROW = False # if this is True, no spacer is added after the control, so it may grow down to the lower edge
     HAS_DATA = True
     min_version = None  # can be overwritten in instances; currently only used by BitmapProperty
+    IS_BITMAP = False   # True for BitmapProperty; used by the code generators, which must not import this module
     _error = _warning = None  # used by TextProperty and derived classes
 
     def __init__(self, value, default_value=_DefaultArgument, name=None):#, write_always=False):
@@ -215,7 +221,7 @@ class Property(object):
         This is the default implementation."""
         if not self.is_active():
             return
-        if self.default_value is wx.NullColour:  # workaround for wxPython Phoenix bug 404
+        if self.default_value is _NullColour:  # workaround for wxPython Phoenix bug 404
             if self.value is self.default_value:
                 return
         elif self.default_value is not _DefaultArgument and self.value==self.default_value:
@@ -1101,7 +1107,7 @@ class ManagedFlags(_CheckListProperty):
                 'wxALIGN_CENTER':           set(['wxALIGN_BOTTOM','wxALIGN_RIGHT']) }
 
     FLAG_NAMES  = sum( FLAG_DESCRIPTION.values(), [] )
-    FLAG_VALUES = [getattr(wx, name[2:]) for name in FLAG_NAMES]
+    FLAG_VALUES = [getattr(wx, name[2:]) for name in FLAG_NAMES] if wx is not None else None
 
     def __init__(self, value, default_value=_DefaultArgument, name=None):
         self.styles = self.FLAG_DESCRIPTION
@@ -1257,22 +1263,23 @@ class WidgetStyleProperty(_CheckListProperty):
             output.extend( common.format_xml_tag(self.name, value, tabs) )
 
 
-import wx.lib.expando
+if wx is not None:
+    import wx.lib.expando
 
-class ExpandoTextCtrl(wx.lib.expando.ExpandoTextCtrl):
-    def _adjustCtrl(self):
-        # avoid PyDeadObjectError
-        if not self: return
-        wx.lib.expando.ExpandoTextCtrl._adjustCtrl(self)
-    def GetNumberOfLines(self):
-        numLines = max( wx.lib.expando.ExpandoTextCtrl.GetNumberOfLines(self), 2)
-        if self.maxHeight != -1:
-            # ensure that calculated height is less than self.maxHeight
-            charHeight = self.GetCharHeight()
-            leading = getattr(self, "_leading", 0)
-            maxLines = (self.maxHeight - self.extraHeight-1) / (charHeight+leading)
-            if numLines > maxLines: numLines = maxLines
-        return numLines
+    class ExpandoTextCtrl(wx.lib.expando.ExpandoTextCtrl):
+        def _adjustCtrl(self):
+            # avoid PyDeadObjectError
+            if not self: return
+            wx.lib.expando.ExpandoTextCtrl._adjustCtrl(self)
+        def GetNumberOfLines(self):
+            numLines = max( wx.lib.expando.ExpandoTextCtrl.GetNumberOfLines(self), 2)
+            if self.maxHeight != -1:
+                # ensure that calculated height is less than self.maxHeight
+                charHeight = self.GetCharHeight()
+                leading = getattr(self, "_leading", 0)
+                maxLines = (self.maxHeight - self.extraHeight-1) / (charHeight+leading)
+                if numLines > maxLines: numLines = maxLines
+            return numLines
 
 
 class TextProperty(Property):
@@ -1631,6 +1638,20 @@ class NameProperty(TextProperty):
     #validation_re  = re.compile(r'^[a-zA-Z_]+[\w-]*(\[\w*\])*$')  # Python 3 only, including non-ASCII characters
     validation_re  = re.compile(r'^[a-zA-Z_]+[a-zA-Z0-9_-]*$')  # Python 2 also; for lisp a hyphen - is allowed
 
+    # keep the name index of the root up to date; see application.EditRoot.track_name()
+    def set_owner(self, owner, attributename=None):
+        TextProperty.set_owner(self, owner, attributename)
+        self._track()
+
+    def set(self, value, activate=None, deactivate=None, notify=False):
+        TextProperty.set(self, value, activate, deactivate)
+        self._track()
+        if notify: self._notify()
+
+    def _track(self):
+        if common.root is not None and self.owner.IS_NAMED:
+            common.root.track_name(self.owner, self.value)
+
     def _check_name_uniqueness(self, name):
         # check whether the name is unique
         if self.owner.IS_TOPLEVEL:
@@ -1680,38 +1701,30 @@ class ClassProperty(TextProperty):
     _UNIQUENESS_MSG2 = ("Name not unique; imported class may be overwritten, as\n"
                         "wxGlade is currently creating code like from '... import ...'.")
 
+    # keep the class indexes of the root up to date; see application.EditRoot.track_class()
+    def set_owner(self, owner, attributename=None):
+        TextProperty.set_owner(self, owner, attributename)
+        self._track()
+
+    def set(self, value, activate=None, deactivate=None, notify=False):
+        TextProperty.set(self, value, activate, deactivate)
+        self._track()
+        if notify: self._notify()
+
+    def _track(self):
+        if common.root is not None:
+            common.root.track_class(self.owner, self.value)
+
     def _check_class_uniqueness(self, klass):
         """Check whether the class name is unique, as otherwise the source code would be overwritten.
         Returns string message if not unique, None else."""
         if klass==self.owner.WX_CLASS: return None
+        for node in common.root.find_widgets_by_class(klass):
+            if node is not self.owner: return self._UNIQUENESS_MSG1
         if "." in klass:
-            leaf = klass.rsplit(".",1)[-1]
-        else:
-            leaf = None
-
-        # shortcut: check sibilings first
-        siblings = self.owner.parent.get_all_children()
-        for node in siblings:
-            if node is self.owner or not node.check_prop("class"): continue
-            if node.klass==klass:
-                return self._UNIQUENESS_MSG1
-            if leaf and "." in node.klass and leaf==node.klass.rsplit(".",1)[-1]:
-                return self._UNIQUENESS_MSG2
-
-        # check recursively, starting from root
-        def check(children):
-            for c in children:
-                if c is None or c.IS_SLOT: continue
-                if c.children:
-                    result = check(c.children)
-                    if result: return result
-                if c is self.owner or not c.check_prop("class"): continue
-                if c.klass==klass:
-                    return self._UNIQUENESS_MSG1
-                if leaf and "." in c.klass and leaf==c.klass.rsplit(".",1)[-1]:
-                    return self._UNIQUENESS_MSG2
-            return None
-        return check(common.root.children)
+            for node in common.root.find_widgets_by_leaf_class( klass.rsplit(".",1)[-1] ):
+                if node is not self.owner: return self._UNIQUENESS_MSG2
+        return None
 
     def _check(self, klass, ctrl=None):
         msg = self._check_class_uniqueness(klass)
@@ -1843,7 +1856,7 @@ del _leading, _ge_m1, _g_0, _ge_0, _comma, _trailing, _float, _int
 ########################################################################################################################
 
 class ComboBoxProperty(TextProperty):
-    _CB_STYLE = wx.CB_DROPDOWN
+    _CB_STYLE = wx.CB_DROPDOWN if wx is not None else None
     def __init__(self, value="", choices=[], strip=False, default_value=_DefaultArgument, name=None):
         self.choices = choices
         TextProperty.__init__(self, value, False, strip, default_value, name)
@@ -1895,7 +1908,7 @@ class ComboBoxPropertyD(ComboBoxProperty):
 
 
 class ListBoxProperty(ComboBoxProperty):
-    _CB_STYLE = wx.CB_DROPDOWN | wx.CB_READONLY
+    _CB_STYLE = wx.CB_DROPDOWN | wx.CB_READONLY if wx is not None else None
 
     def _on_text_click(self, event):
         if self.deactivated and not self.auto_activated and self.text:
@@ -2085,10 +2098,10 @@ class FileNamePropertyD(FileNameProperty):
 
 
 class BitmapProperty(FileNameProperty):
+    IS_BITMAP = True
     def __init__(self, value="", name=None, min_version=None):
         self._size = None  # will be set when a bitmap is loaded
-        style = wx.FD_OPEN | wx.FD_FILE_MUST_EXIST
-        FileNameProperty.__init__(self, value, style, "", name)
+        FileNameProperty.__init__(self, value, _FD_OPEN_STYLE, "", name)
         self.min_version = min_version
 
     def set_bitmap(self, bmp):
@@ -2123,58 +2136,60 @@ class BitmapPropertyD(BitmapProperty):
     deactivated = True
     def __init__(self, value="", name=None, min_version=None):
         self._size = self._warning = self._error = None
-        style = wx.FD_OPEN | wx.FD_FILE_MUST_EXIST
         self.min_version = min_version
-        FileNameProperty.__init__(self, value, style, '', name)
+        FileNameProperty.__init__(self, value, _FD_OPEN_STYLE, '', name)
 
 
 class ColorProperty(DialogProperty):
     STRIP = True
-    str_to_colors = {
-        'wxSYS_COLOUR_SCROLLBAR': wx.SYS_COLOUR_SCROLLBAR,
-        'wxSYS_COLOUR_BACKGROUND': wx.SYS_COLOUR_BACKGROUND,
-        'wxSYS_COLOUR_ACTIVECAPTION': wx.SYS_COLOUR_ACTIVECAPTION,
-        'wxSYS_COLOUR_INACTIVECAPTION': wx.SYS_COLOUR_INACTIVECAPTION,
-        'wxSYS_COLOUR_MENU': wx.SYS_COLOUR_MENU,
-        'wxSYS_COLOUR_WINDOW': wx.SYS_COLOUR_WINDOW,
-        'wxSYS_COLOUR_WINDOWFRAME': wx.SYS_COLOUR_WINDOWFRAME,
-        'wxSYS_COLOUR_MENUTEXT': wx.SYS_COLOUR_MENUTEXT,
-        'wxSYS_COLOUR_WINDOWTEXT': wx.SYS_COLOUR_WINDOWTEXT,
-        'wxSYS_COLOUR_CAPTIONTEXT': wx.SYS_COLOUR_CAPTIONTEXT,
-        'wxSYS_COLOUR_ACTIVEBORDER': wx.SYS_COLOUR_ACTIVEBORDER,
-        'wxSYS_COLOUR_INACTIVEBORDER': wx.SYS_COLOUR_INACTIVEBORDER,
-        'wxSYS_COLOUR_APPWORKSPACE': wx.SYS_COLOUR_APPWORKSPACE,
-        'wxSYS_COLOUR_HIGHLIGHT': wx.SYS_COLOUR_HIGHLIGHT,
-        'wxSYS_COLOUR_HIGHLIGHTTEXT': wx.SYS_COLOUR_HIGHLIGHTTEXT,
-        'wxSYS_COLOUR_BTNFACE': wx.SYS_COLOUR_BTNFACE,
-        'wxSYS_COLOUR_BTNSHADOW': wx.SYS_COLOUR_BTNSHADOW,
-        'wxSYS_COLOUR_GRAYTEXT': wx.SYS_COLOUR_GRAYTEXT,
-        'wxSYS_COLOUR_BTNTEXT': wx.SYS_COLOUR_BTNTEXT,
-        'wxSYS_COLOUR_INACTIVECAPTIONTEXT': wx.SYS_COLOUR_INACTIVECAPTIONTEXT,
-        'wxSYS_COLOUR_BTNHIGHLIGHT': wx.SYS_COLOUR_BTNHIGHLIGHT,
-        'wxSYS_COLOUR_3DDKSHADOW': wx.SYS_COLOUR_3DDKSHADOW,
-        'wxSYS_COLOUR_3DLIGHT': wx.SYS_COLOUR_3DLIGHT,
-        'wxSYS_COLOUR_INFOTEXT': wx.SYS_COLOUR_INFOTEXT,
-        'wxSYS_COLOUR_INFOBK': wx.SYS_COLOUR_INFOBK,
-        'wxSYS_COLOUR_DESKTOP': wx.SYS_COLOUR_DESKTOP,
-        'wxSYS_COLOUR_3DFACE': wx.SYS_COLOUR_3DFACE,
-        'wxSYS_COLOUR_3DSHADOW': wx.SYS_COLOUR_3DSHADOW,
-        'wxSYS_COLOUR_3DHIGHLIGHT': wx.SYS_COLOUR_3DHIGHLIGHT,
-        'wxSYS_COLOUR_3DHILIGHT': wx.SYS_COLOUR_3DHILIGHT,
-        'wxSYS_COLOUR_BTNHILIGHT': wx.SYS_COLOUR_BTNHILIGHT,
-        'wxSYS_COLOUR_LISTBOX': wx.SYS_COLOUR_LISTBOX,
-        'wxSYS_COLOUR_HOTLIGHT': wx.SYS_COLOUR_HOTLIGHT,
-        'wxSYS_COLOUR_GRADIENTACTIVECAPTION': wx.SYS_COLOUR_GRADIENTACTIVECAPTION,
-        'wxSYS_COLOUR_GRADIENTINACTIVECAPTION': wx.SYS_COLOUR_GRADIENTINACTIVECAPTION,
-        'wxSYS_COLOUR_MENUHILIGHT': wx.SYS_COLOUR_MENUHILIGHT,
-        'wxSYS_COLOUR_MENUBAR': wx.SYS_COLOUR_MENUBAR,
-        'wxSYS_COLOUR_LISTBOXTEXT': wx.SYS_COLOUR_LISTBOXTEXT,
-        # these are not supported by wxWidgets 2.8:
-        # wx.SYS_COLOUR_LISTBOXHIGHLIGHTTEXT
-        # wx.SYS_COLOUR_FRAMEBK
-        }
+    if wx is not None:
+        str_to_colors = {
+            'wxSYS_COLOUR_SCROLLBAR': wx.SYS_COLOUR_SCROLLBAR,
+            'wxSYS_COLOUR_BACKGROUND': wx.SYS_COLOUR_BACKGROUND,
+            'wxSYS_COLOUR_ACTIVECAPTION': wx.SYS_COLOUR_ACTIVECAPTION,
+            'wxSYS_COLOUR_INACTIVECAPTION': wx.SYS_COLOUR_INACTIVECAPTION,
+            'wxSYS_COLOUR_MENU': wx.SYS_COLOUR_MENU,
+            'wxSYS_COLOUR_WINDOW': wx.SYS_COLOUR_WINDOW,
+            'wxSYS_COLOUR_WINDOWFRAME': wx.SYS_COLOUR_WINDOWFRAME,
+            'wxSYS_COLOUR_MENUTEXT': wx.SYS_COLOUR_MENUTEXT,
+            'wxSYS_COLOUR_WINDOWTEXT': wx.SYS_COLOUR_WINDOWTEXT,
+            'wxSYS_COLOUR_CAPTIONTEXT': wx.SYS_COLOUR_CAPTIONTEXT,
+            'wxSYS_COLOUR_ACTIVEBORDER': wx.SYS_COLOUR_ACTIVEBORDER,
+            'wxSYS_COLOUR_INACTIVEBORDER': wx.SYS_COLOUR_INACTIVEBORDER,
+            'wxSYS_COLOUR_APPWORKSPACE': wx.SYS_COLOUR_APPWORKSPACE,
+            'wxSYS_COLOUR_HIGHLIGHT': wx.SYS_COLOUR_HIGHLIGHT,
+            'wxSYS_COLOUR_HIGHLIGHTTEXT': wx.SYS_COLOUR_HIGHLIGHTTEXT,
+            'wxSYS_COLOUR_BTNFACE': wx.SYS_COLOUR_BTNFACE,
+            'wxSYS_COLOUR_BTNSHADOW': wx.SYS_COLOUR_BTNSHADOW,
+            'wxSYS_COLOUR_GRAYTEXT': wx.SYS_COLOUR_GRAYTEXT,
+            'wxSYS_COLOUR_BTNTEXT': wx.SYS_COLOUR_BTNTEXT,
+            'wxSYS_COLOUR_INACTIVECAPTIONTEXT': wx.SYS_COLOUR_INACTIVECAPTIONTEXT,
+            'wxSYS_COLOUR_BTNHIGHLIGHT': wx.SYS_COLOUR_BTNHIGHLIGHT,
+            'wxSYS_COLOUR_3DDKSHADOW': wx.SYS_COLOUR_3DDKSHADOW,
+            'wxSYS_COLOUR_3DLIGHT': wx.SYS_COLOUR_3DLIGHT,
+            'wxSYS_COLOUR_INFOTEXT': wx.SYS_COLOUR_INFOTEXT,
+            'wxSYS_COLOUR_INFOBK': wx.SYS_COLOUR_INFOBK,
+            'wxSYS_COLOUR_DESKTOP': wx.SYS_COLOUR_DESKTOP,
+            'wxSYS_COLOUR_3DFACE': wx.SYS_COLOUR_3DFACE,
+            'wxSYS_COLOUR_3DSHADOW': wx.SYS_COLOUR_3DSHADOW,
+            'wxSYS_COLOUR_3DHIGHLIGHT': wx.SYS_COLOUR_3DHIGHLIGHT,
+            'wxSYS_COLOUR_3DHILIGHT': wx.SYS_COLOUR_3DHILIGHT,
+            'wxSYS_COLOUR_BTNHILIGHT': wx.SYS_COLOUR_BTNHILIGHT,
+            'wxSYS_COLOUR_LISTBOX': wx.SYS_COLOUR_LISTBOX,
+            'wxSYS_COLOUR_HOTLIGHT': wx.SYS_COLOUR_HOTLIGHT,
+            'wxSYS_COLOUR_GRADIENTACTIVECAPTION': wx.SYS_COLOUR_GRADIENTACTIVECAPTION,
+            'wxSYS_COLOUR_GRADIENTINACTIVECAPTION': wx.SYS_COLOUR_GRADIENTINACTIVECAPTION,
+            'wxSYS_COLOUR_MENUHILIGHT': wx.SYS_COLOUR_MENUHILIGHT,
+            'wxSYS_COLOUR_MENUBAR': wx.SYS_COLOUR_MENUBAR,
+            'wxSYS_COLOUR_LISTBOXTEXT': wx.SYS_COLOUR_LISTBOXTEXT,
+            # these are not supported by wxWidgets 2.8:
+            # wx.SYS_COLOUR_LISTBOXHIGHLIGHTTEXT
+            # wx.SYS_COLOUR_FRAMEBK
+            }
+    else:
+        str_to_colors = {}
     colors_to_str = misc._reverse_dict(str_to_colors)
-    def __init__(self, value="", multiline=False, strip=True, default_value=wx.NullColour, name=None):
+    def __init__(self, value="", multiline=False, strip=True, default_value=_NullColour, name=None):
         DialogProperty.__init__(self, value, multiline, strip, default_value, name)
 
     def _create_dialog(self):
@@ -2247,17 +2262,18 @@ class ColorPropertyD(ColorProperty):
 
 class FontProperty(DialogProperty):
     # keep this in sync with wxGladeFontDialog
-    font_families_to = {'default': wx.FONTFAMILY_DEFAULT,
-                        'decorative': wx.FONTFAMILY_DECORATIVE, 'roman': wx.FONTFAMILY_ROMAN,
-                        'swiss': wx.FONTFAMILY_SWISS, 'script': wx.FONTFAMILY_SCRIPT, 'modern': wx.FONTFAMILY_MODERN }
-    font_families_from = misc._reverse_dict(font_families_to)
-    font_styles_to = {'normal': wx.FONTSTYLE_NORMAL, 'slant': wx.FONTSTYLE_SLANT, 'italic': wx.FONTSTYLE_ITALIC }
-    font_styles_from = misc._reverse_dict(font_styles_to)
-    font_weights_to = {'normal': wx.FONTWEIGHT_NORMAL, 'light': wx.FONTWEIGHT_LIGHT, 'bold': wx.FONTWEIGHT_BOLD }
-    font_weights_from = misc._reverse_dict(font_weights_to)
-
-    font_families_to['teletype'] = wx.FONTFAMILY_TELETYPE
-    font_families_from[wx.FONTFAMILY_TELETYPE] = 'teletype'
+    if wx is not None:  # for the editor
+        font_families_to = {'default': wx.FONTFAMILY_DEFAULT,
+                            'decorative': wx.FONTFAMILY_DECORATIVE, 'roman': wx.FONTFAMILY_ROMAN,
+                            'swiss': wx.FONTFAMILY_SWISS, 'script': wx.FONTFAMILY_SCRIPT, 'modern': wx.FONTFAMILY_MODERN }
+        font_families_from = misc._reverse_dict(font_families_to)
+        font_styles_to = {'normal': wx.FONTSTYLE_NORMAL, 'slant': wx.FONTSTYLE_SLANT, 'italic': wx.FONTSTYLE_ITALIC }
+        font_styles_from = misc._reverse_dict(font_styles_to)
+        font_weights_to = {'normal': wx.FONTWEIGHT_NORMAL, 'light': wx.FONTWEIGHT_LIGHT, 'bold': wx.FONTWEIGHT_BOLD }
+        font_weights_from = misc._reverse_dict(font_weights_to)
+
+        font_families_to['teletype'] = wx.FONTFAMILY_TELETYPE
+        font_families_from[wx.FONTFAMILY_TELETYPE] = 'teletype'
 
     validation_re = re.compile(r" *\[(\d+), *'(default|teletype|decorative|roman|swiss|script|modern)', *"
                                r"'(normal|slant|italic)', *'(normal|light|bold)', *(0|1), *'([a-zA-Z _]*)'] *")
@@ -3464,7 +3480,7 @@ class PropertyOwner(object):
             self.property_names.append(attname)
         prop.set_owner(self, attname)
     def __getattr__(self, attr):
-        if attr in self.properties:
+        if attr != "properties" and attr in self.properties:  # not yet set while restoring from a snapshot
             # return the value (either the user-provided or the default value)
             return self.properties[attr].get()
         raise AttributeError("%r object has no attribute %r" %(self.__class__, attr))
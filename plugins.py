@@ -6,10 +6,10 @@ Functions to import modules
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import os, re, sys, zipfile, logging
+import os, re, sys, copy, json, zipfile, logging
 from collections import OrderedDict
 
-import common, config, misc
+import common, config, profiling
 
 # Regex tp match section headers; optionally with a hotkey character
 rec_section = re.compile(r'\[(?P<section>[^]]+)\](\:(?P<hotkey>[A-Z]))?')
@@ -17,6 +17,15 @@ rec_section = re.compile(r'\[(?P<section>[^]]+)\](\:(?P<hotkey>[A-Z]))?')
 # Regex to match modules
 rec_module = re.compile(r'^(?P<module>\w+)')
 
+# widget registry for loading the widget modules on demand; see load_registry(), load_widget()
+_registry = {}      # class name -> list of (widget_dir, module_name, submodule), in loading order
+_loaded = set()     # (widget_dir, module_name, submodule) of the modules imported by load_widget()
+_recording = None   # list of [widget_dir, module_name, submodule, class names] while all widgets are loaded
+_button_specs = {}  # button id -> arguments of common.make_object_button(), while all widgets are loaded
+_palette = None     # GUI mode: list of [section, list of arguments for make_object_button()]; see load_registry()
+palette_from_registry = False  # True if the palette buttons were created by create_palette_buttons()
+_registry_stamp = None  # cached result of _get_registry_stamp()
+
 
 def load_widgets_from_dir(widget_dir, submodule='', default_section='not_set'):
     """Load and initialise the all widgets listed in widgets.txt in the given directory.
@@ -48,41 +57,55 @@ def load_widgets_from_dir(widget_dir, submodule='', default_section='not_set'):
         buttons[section] = []
 
         for module_name in module_names:
-            if submodule:
-                fqmn = "%s.%s" % (module_name, submodule)
-            else:
-                fqmn = "%s" % module_name
-    
-            # step 1: import widget module
-            module = import_module(widget_dir, fqmn)
-            if not module: continue  # error already logged
-    
-            # step 2: use individual initialisation if available
-            if hasattr(module, 'initialize'):
-                button = module.initialize()
-                if config.use_gui and button: buttons[section].append(button)
-    
-            # step 3: import and initialise Python codegen as well as widget GUI elements
-            elif not submodule:
-                result, button = _init_codegen_gui(widget_dir, module_name)
-                if not result: continue
-                if config.use_gui and button: buttons[section].append(button)
-    
-            # step 4: do special initialisation for wconfig submodules
-            elif submodule and submodule == 'wconfig':
-                _process_widget_config(module)
-                # don't log this action
-                continue
-    
-            else:
-                logging.warning(_('Missing function "initialize()" in imported module %s. Skip initialisation.'), fqmn)
-                continue
-    
+            if _recording is not None: registered = _get_registrations()
+            with profiling.phase(_get_module_label(widget_dir, module_name, submodule), "plugin"):
+                result, button = _load_module(widget_dir, module_name, submodule)
+            if _recording is not None:
+                classes = _get_new_registrations(registered)
+                if classes: _recording.append( [widget_dir, module_name, submodule, classes] )
+            if not result or submodule=='wconfig': continue  # error already logged; don't log wconfig
+            if config.use_gui and button: buttons[section].append(button)
+
             if config.use_gui and not submodule.endswith('codegen'):
                 logging.info('\t%s', module_name)
     return buttons
 
 
+def _get_module_label(widget_dir, module_name, submodule):
+    "returns the name of a widget module for the startup profile; user widgets are marked with their directory"
+    label = "%s.%s" % (module_name, submodule) if submodule else module_name
+    if widget_dir != config.widgets_path: label = "%s (%s)" % (label, widget_dir)
+    return label
+
+
+def _load_module(widget_dir, module_name, submodule=''):
+    """Import and initialise a single widget module or one of its submodules; see load_widgets_from_dir()
+    returns (bool, wx.BitmapButton)"""
+    if submodule:
+        fqmn = "%s.%s" % (module_name, submodule)
+    else:
+        fqmn = "%s" % module_name
+
+    # step 1: import widget module
+    module = import_module(widget_dir, fqmn)
+    if not module: return False, None  # error already logged
+
+    # step 2: use individual initialisation if available
+    if hasattr(module, 'initialize'):
+        return True, module.initialize()
+
+    # step 3: import and initialise Python codegen as well as widget GUI elements
+    if not submodule:
+        return _init_codegen_gui(widget_dir, module_name)
+
+    # step 4: do special initialisation for wconfig submodules
+    if submodule == 'wconfig':
+        return _process_widget_config(module), None
+
+    logging.warning(_('Missing function "initialize()" in imported module %s. Skip initialisation.'), fqmn)
+    return False, None
+
+
 def _modulenames_from_file(filename, default_section):
     """Return OrderedDict with module sections as key and assigned list of module names read from given file.
 
@@ -116,7 +139,7 @@ def _modulenames_from_file(filename, default_section):
         if mo:
             cursect = mo.group('section')
             hotkey = mo.group('hotkey')
-            if hotkey: misc.palette_hotkeys[hotkey] = cursect
+            if hotkey: common.palette_hotkeys[hotkey] = cursect
             continue
 
         mo = rec_module.match(line)
@@ -162,7 +185,7 @@ def _process_widget_config(module):
 
 
 def _init_codegen_gui(widget_dir, widget_name):
-    """Initialise Python code generator for the widget as well as widget GUI parts.
+    """Initialise Python code generator for the widget as well as widget GUI parts (in GUI mode only).
     returns (bool, wx.BitmapButton)"""
     widget_button = None
 
@@ -188,6 +211,202 @@ def _init_codegen_gui(widget_dir, widget_name):
     return True, widget_button
 
 
+class WidgetDict(dict):
+    """Dictionary of code generators or widget configurations, which imports the widget modules on first access.
+    For copies of code writers like the preview code writer, the code generators are copied from the original one.
+    see: init_lazy_loading()"""
+    def __init__(self, items, codegen=None):
+        dict.__init__(self, items)
+        self.codegen = codegen
+
+    def __missing__(self, klass):
+        load_widget(klass)
+        if dict.__contains__(self, klass):
+            return dict.__getitem__(self, klass)
+        source = common.code_writers.get(self.codegen.language) if self.codegen else None
+        if source is None or source is self.codegen or not dict.__contains__(source.obj_builders, klass):
+            raise KeyError(klass)
+        # a copy of a code writer; the code generators refer to their code writer
+        builder = copy.deepcopy( dict.__getitem__(source.obj_builders, klass), {id(source):self.codegen} )
+        dict.__setitem__(self, klass, builder)
+        return builder
+
+    def __contains__(self, klass):
+        if dict.__contains__(self, klass): return True
+        try:
+            self[klass]
+        except KeyError:
+            return False
+        return True
+
+    def get(self, klass, default=None):
+        try:
+            return self[klass]
+        except KeyError:
+            return default
+
+
+# the dicts of the editor classes and factories, which are filled by the GUI modules of the widgets
+_GUI_DICTS = ("widget_classes", "widgets", "widgets_from_xml")
+
+
+def init_lazy_loading():
+    """Replace the code generator dicts of the code writers, config.widget_config and, for the GUI, the dicts of
+    editor classes and factories in common with WidgetDict instances"""
+    for writer in common.code_writers.values():
+        writer.obj_builders = WidgetDict(writer.obj_builders, writer)
+    config.widget_config = WidgetDict(config.widget_config)
+    for name in _GUI_DICTS:
+        setattr( common, name, WidgetDict(getattr(common, name)) )
+
+
+def load_widget(klass):
+    """Import and initialise the widget modules registering the given class, including configuration and code
+    generators for all languages.
+
+    returns True if modules were imported"""
+    modules = _registry.pop(klass, None)
+    if not modules: return False
+    # with palette_from_registry, common.make_object_button() will not create the button again
+    for module in modules:
+        if module in _loaded: continue
+        _loaded.add(module)
+        with profiling.phase(_get_module_label(*module), "plugin"):
+            _load_module(*module)
+    return True
+
+
+def record_registry():
+    "Record which modules register which classes while loading all widgets; see save_registry()"
+    global _recording
+    _recording = []
+    _button_specs.clear()
+
+
+def record_button(button, widget, icon_path, toplevel, tip):
+    "called from common.make_object_button() to record the palette buttons while all widgets are loaded"
+    if _recording is not None:
+        _button_specs[button.GetId()] = [widget, icon_path, bool(toplevel), tip]
+
+
+def save_registry(all_widgets=None):
+    """Write the recorded registrations to config.widget_registry_file; see load_registry()
+
+    all_widgets: GUI mode: OrderedDict with the palette sections and buttons of the widgets, as from load_widgets()"""
+    global _recording
+    modules, _recording = _recording, None
+    if modules is None or not config.widget_registry_file: return
+    registry = {'stamp':_get_registry_stamp(), 'modules':modules}
+    if config.use_gui and all_widgets is not None:
+        palette = [[section, [_button_specs.get(button.GetId()) for button in buttons]]
+                   for section, buttons in all_widgets.items()]
+        if all(spec is not None for section, specs in palette for spec in specs):
+            registry['palette'] = palette
+            registry['hotkeys'] = common.palette_hotkeys
+        else:
+            # a button was not created by common.make_object_button(); the GUI will always load all widgets
+            logging.debug( _("Widget registry: palette can't be recorded") )
+    _button_specs.clear()
+    try:
+        with open(config.widget_registry_file, 'w') as outfile:
+            json.dump( registry, outfile )
+    except EnvironmentError as details:
+        logging.warning( _("Can't write widget registry %s: %s"), config.widget_registry_file, details )
+
+
+def load_registry():
+    """Read config.widget_registry_file, if it's up to date.
+    In GUI mode, the registry must contain the palette as well; see create_palette_buttons().
+
+    returns True if the widget modules can be loaded on demand using load_widget()"""
+    global _palette
+    filename = config.widget_registry_file
+    if not filename or not os.path.isfile(filename): return False
+    try:
+        with open(filename) as infile:
+            registry = json.load(infile)
+    except (EnvironmentError, ValueError) as details:
+        logging.debug( _("Can't read widget registry %s: %s"), filename, details )
+        return False
+    if registry.get('stamp') != _get_registry_stamp():
+        return False
+    if config.use_gui and not registry.get('palette'):
+        return False  # recorded in batch mode
+
+    _registry.clear()
+    for widget_dir, module_name, submodule, classes in registry['modules']:
+        for klass in classes:
+            _registry.setdefault(klass, []).append( (widget_dir, module_name, submodule) )
+    if config.use_gui:
+        _palette = registry['palette']
+        common.palette_hotkeys.update( registry.get('hotkeys', {}) )
+    return True
+
+
+def create_palette_buttons():
+    """GUI mode: create the palette buttons as recorded in the registry, without importing the widget modules
+
+    returns OrderedDict with palette sections as key and lists of buttons; empty in batch mode"""
+    global palette_from_registry
+    buttons = OrderedDict()
+    if not config.use_gui or not _palette: return buttons
+    for section, specs in _palette:
+        buttons[section] = [common.make_object_button(*spec) for spec in specs]
+    palette_from_registry = True
+    return buttons
+
+
+def _get_registrations():
+    "returns a snapshot of the registered code generators and widget configurations"
+    registered = {lang:dict(writer.obj_builders) for lang, writer in common.code_writers.items()}
+    registered['wconfig'] = dict(config.widget_config)
+    for name in _GUI_DICTS:
+        registered[name] = dict( getattr(common, name) )
+    return registered
+
+
+def _get_new_registrations(registered):
+    "returns the sorted names of the classes registered since the snapshot was taken by _get_registrations()"
+    classes = set()
+    current = {lang:writer.obj_builders for lang, writer in common.code_writers.items()}
+    current['wconfig'] = config.widget_config
+    for name in _GUI_DICTS:
+        current[name] = getattr(common, name)
+    for key, items in current.items():
+        previous = registered.get(key, {})
+        classes.update( klass for klass, value in items.items() if previous.get(klass) is not value )
+    return sorted(classes)
+
+
+def clear_registry_stamp():
+    "the widget directories will be scanned again on the next call of _get_registry_stamp(); e.g. for server requests"
+    global _registry_stamp
+    _registry_stamp = None
+
+
+def _get_registry_stamp():
+    """returns version and number and modification time of code writer and widget files; see load_registry()
+    The directories are scanned only once per process or after clear_registry_stamp()."""
+    global _registry_stamp
+    if _registry_stamp is None:
+        _registry_stamp = _scan_registry_stamp()
+    return _registry_stamp
+
+
+def _scan_registry_stamp():
+    stamp = {'version':config.version, 'paths':[]}
+    for path in [os.path.join(config.wxglade_path, 'codegen'), config.widgets_path,
+                 config.preferences.local_widget_path]:
+        mtimes = []
+        if path and os.path.isdir(path):
+            for dirpath, dirnames, filenames in os.walk(path):
+                dirnames[:] = [name for name in dirnames if name!='__pycache__']
+                mtimes.extend( os.path.getmtime(os.path.join(dirpath, name)) for name in filenames
+                               if os.path.splitext(name)[1] in ('.py', '.txt', '.zip') )
+        stamp['paths'].append( [path, len(mtimes), max(mtimes) if mtimes else 0] )
+    return stamp
+
+
 def import_module(widget_dir, module_name):
     """Import a single module from a ZIP file or from the directory structure.
 
@@ -213,7 +432,9 @@ def import_module(widget_dir, module_name):
     zip_filename = os.path.join(widget_dir, '%s.zip' % basemodule)
     if os.path.exists(zip_filename):
         # check ZIP file formally
-        if not is_valid_zip(zip_filename, basemodule):
+        with profiling.phase(zip_filename, "is_valid_zip"):
+            valid = is_valid_zip(zip_filename, basemodule)
+        if not valid:
             logging.warning( _('ZIP file %s is not a valid ZIP file. Ignoring it.'), zip_filename )
             zip_filename = None
         else:
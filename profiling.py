@@ -0,0 +1,71 @@
+"""\
+Startup profiling: wall time and number of imported modules for each phase of the startup and for each widget plugin.
+
+The phases are always recorded, as this is cheap; the report is only written if enabled by the command line option
+--profile-startup or --profile-json (see: wxglade.parse_command_line()).
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+import atexit, contextlib, json, sys, time
+
+_start = time.time()
+_start_modules = len(sys.modules)
+_phases = []       # list of (category, name, start, duration, imported modules); start relative to _start
+_output = None     # None: disabled; '': print text report to stderr; else filename for JSON report
+_reported = False
+
+
+@contextlib.contextmanager
+def phase(name, category="phase"):
+    "Record wall time and number of imported modules for the enclosed code; phases may be nested"
+    start = time.time()
+    modules = len(sys.modules)
+    try:
+        yield
+    finally:
+        _phases.append( (category, name, start-_start, time.time()-start, len(sys.modules)-modules) )
+
+
+def enable(filename=None):
+    """Enable the report, which will be written by report() or at exit.
+    filename: write JSON to this file instead of printing a text report to stderr"""
+    global _output
+    _output = filename or ''
+    atexit.register(report)
+
+
+def get_profile():
+    "returns dict with total time and imported modules and a list of all recorded phases"
+    phases = [{"category":category, "name":name, "start":round(start, 6), "duration":round(duration, 6),
+               "modules":modules}
+              for category, name, start, duration, modules in _phases]
+    return {"total":round(time.time()-_start, 6), "modules":len(sys.modules)-_start_modules, "phases":phases}
+
+
+def format_report(profile):
+    "returns the profile as text, with the phases of each category sorted by decreasing duration"
+    lines = ["Startup profile: %.3fs, %d modules imported"%(profile["total"], profile["modules"])]
+    categories = []
+    for p in profile["phases"]:
+        if p["category"] not in categories: categories.append(p["category"])
+    for category in categories:
+        phases = [p for p in profile["phases"] if p["category"]==category]
+        phases.sort(key=lambda p: p["duration"], reverse=True)
+        lines.append( "%-44s %9s %9s"%(category, "seconds", "modules") )
+        for p in phases:
+            lines.append( "  %-42s %9.4f %9d"%(p["name"], p["duration"], p["modules"]) )
+    return "\n".join(lines) + "\n"
+
+
+def report():
+    "Write the report once, if enabled; called when the GUI is about to enter the main loop or at exit"
+    global _reported
+    if _output is None or _reported: return
+    _reported = True
+    profile = get_profile()
+    if _output:
+        with open(_output, "w") as outfile:
+            json.dump(profile, outfile, indent=1)
+    else:
+        sys.stderr.write( format_report(profile) )
@@ -0,0 +1,88 @@
+"""\
+Binary snapshots of loaded projects for fast re-opening without GUI
+
+After a .wxg file has been loaded, the tree of editor objects is pickled into the snapshots directory inside the
+application data directory. When the same file is opened again, the tree is restored from the snapshot, unless the
+file, wxGlade or the widgets have changed in the meantime.
+Snapshots are not used with the GUI, as the editor objects need to be created through their constructors; so
+main.wxGladeFrame._open_app() always parses the file.
+
+The key is computed once per loading and passed to save(), as it requires reading the whole file for the hash.
+
+see: wxglade._guiless_open_app(), config.preferences.use_snapshots
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+import gc, hashlib, logging, os, pickle, sys
+
+import common, config, plugins
+
+
+# at most 100 snapshots with 200 MB are kept; the least recently used are removed; see common.prune_cache_dir()
+MAX_FILES = 100
+MAX_BYTES = 200*1024*1024
+
+
+def get_filename(filename):
+    "returns the name of the snapshot file for the given project file"
+    digest = hashlib.md5( os.path.abspath(filename).encode("utf-8") ).hexdigest()
+    return os.path.join(config.appdata_path, "snapshots", "%s.pickle" % digest)
+
+
+def get_key(filename):
+    "returns the dict that a snapshot must match: file size, modification time and content hash, versions and widgets"
+    import xml_parse, new_properties, edit_base, edit_windows, edit_sizers.edit_sizers, application
+    model = (xml_parse, new_properties, edit_base, edit_windows, edit_sizers.edit_sizers, application)
+    stat = os.stat(filename)
+    with open(filename, "rb") as infile:
+        digest = hashlib.md5( infile.read() ).hexdigest()
+    return {"filename": os.path.abspath(filename), "size": stat.st_size, "mtime": stat.st_mtime, "md5": digest,
+            "version": config.version, "python": list(sys.version_info[:2]),
+            "model": [os.path.getmtime(module.__file__) for module in model],
+            "languages": sorted(common.code_writers), "widgets": plugins._get_registry_stamp()}
+
+
+def load(filename, key=None):
+    """returns the root of the tree, as restored from the snapshot, or None if there's no up to date snapshot
+
+    key: the result of get_key(filename), if available already"""
+    snapshot_filename = get_filename(filename)
+    if not os.path.isfile(snapshot_filename): return None
+    gc_enabled = gc.isenabled()
+    gc.disable()  # for speed; see xml_parse.ExpatXmlWidgetBuilder
+    try:
+        with open(snapshot_filename, "rb") as infile:
+            if pickle.load(infile) != (key or get_key(filename)):
+                return None
+            root = pickle.load(infile)
+    except Exception as inst:
+        logging.debug( _("Can't read snapshot %s: %s"), snapshot_filename, inst )
+        return None
+    finally:
+        if gc_enabled: gc.enable()
+    common.touch_cache_file(snapshot_filename)
+    return root
+
+
+def save(filename, root, key=None):
+    """Write a snapshot of the loaded tree; errors are logged, but otherwise ignored
+
+    key: the result of get_key(filename) from before loading the file; it's not computed again"""
+    snapshot_filename = get_filename(filename)
+    tmp_filename = "%s.%d.tmp" % (snapshot_filename, os.getpid())
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        if not os.path.isdir( os.path.dirname(snapshot_filename) ):
+            os.makedirs( os.path.dirname(snapshot_filename) )
+        with open(tmp_filename, "wb") as outfile:
+            pickle.dump( key or get_key(filename), outfile, pickle.HIGHEST_PROTOCOL )
+            pickle.dump( root, outfile, pickle.HIGHEST_PROTOCOL )
+        common.replace_file(tmp_filename, snapshot_filename)
+        common.prune_cache_dir(os.path.dirname(snapshot_filename), MAX_FILES, MAX_BYTES)
+    except Exception as inst:
+        logging.debug( _("Can't write snapshot %s: %s"), snapshot_filename, inst )
+        if os.path.isfile(tmp_filename): os.remove(tmp_filename)
+    finally:
+        if gc_enabled: gc.enable()
@@ -0,0 +1,113 @@
+"""\
+Benchmark for merging generated code into a large existing source file: replacement of the placeholder tags
+with and without the index of tag positions (codegen._TagIndex).
+
+Usage: python bench_replace_tag.py [lines] [classes]
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+import os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import gettext
+gettext.install("wxglade")
+
+import common
+import wxglade
+import codegen
+
+
+def _replace_tag_unindexed(lst, tag, content):
+    # the implementation without index, for comparison
+    ret = False
+    add_line = False
+    if not tag in lst and not tag.endswith("\n"):
+        tag = tag + "\n"
+        add_line = True
+    while True:
+        try:
+            idx = lst.index(tag)
+        except ValueError:
+            return ret
+        if isinstance(content, list):
+            lst[idx:idx+1] = content + ["\n"] if add_line else content
+        else:
+            lst[idx] = content + "\n" if add_line else content
+        ret = True
+
+
+def create_source(filename, lines, classes):
+    "write a Python file with the given number of classes with wxGlade blocks and filler lines of user code"
+    filler = max(0, lines // classes - 16)
+    out = ["#!/usr/bin/env python\n", "# -*- coding: UTF-8 -*-\n", "#\n", "# generated by wxGlade\n", "#\n\n",
+           "# begin wxGlade: dependencies\n", "import wx\n", "# end wxGlade\n\n",
+           "# begin wxGlade: extracode\n", "# end wxGlade\n\n"]
+    for n in range(classes):
+        klass = "Frame%d" % n
+        out.append("\nclass %s(wx.Frame):\n" % klass)
+        out.append("    def __init__(self, *args, **kwds):\n")
+        out.append("        # begin wxGlade: %s.__init__\n" % klass)
+        out.append("        wx.Frame.__init__(self, *args, **kwds)\n")
+        out.append("        self.button = wx.Button(self, wx.ID_ANY, \"button\")\n")
+        out.append("        # end wxGlade\n\n")
+        out.append("    def user_code(self):\n")
+        out.extend(["        value = %d  # user code\n" % i for i in range(filler)])
+        out.append("        return value\n\n")
+        out.append("    def on_button(self, event):  # wxGlade: %s.<event_handler>\n" % klass)
+        out.append("        print(\"Event handler 'on_button' not implemented!\")\n")
+        out.append("        event.Skip()\n\n")
+        out.append("# end of class %s\n" % klass)
+    with open(filename, "w") as outfile:
+        outfile.writelines(out)
+    return sum(line.count("\n") for line in out)
+
+
+def merge(source, classes, replace):
+    "replace the tags as BaseLangCodeWriter.finalize_class() and finalize() do; returns the duration"
+    nonce = source.nonce
+    start = time.time()
+    for n in range(classes):
+        klass = "Frame%d" % n
+        ctor = ["        wx.Frame.__init__(self, *args, **kwds)\n",
+                "        self.button = wx.Button(self, wx.ID_ANY, \"button %d\")\n" % n,
+                "        self.Bind(wx.EVT_BUTTON, self.on_button, self.button)\n",
+                "        # end wxGlade\n"]
+        replace(source.content, '<%swxGlade replace %s __init__>' % (nonce, klass), ctor)
+        replace(source.content, '<%swxGlade event_handlers %s>' % (nonce, klass), [])
+        replace(source.content, '<%swxGlade insert new_classes>' % nonce, "")
+        replace(source.content, '<%swxGlade replace dependencies>' % nonce, "# begin wxGlade: dependencies\n")
+    replace(source.content, '<%swxGlade replace extracode>' % nonce, "# begin wxGlade: extracode\n")
+    return time.time() - start
+
+
+def main(lines=50000, classes=300):
+    wxglade.init_stage1(None)
+    wxglade.init_stage2(False)
+    writer = common.code_writers["python"]
+    writer.out_dir = tempfile.gettempdir()
+    writer.multiple_files = False
+
+    fd, filename = tempfile.mkstemp(".py")
+    os.close(fd)
+    try:
+        total = create_source(filename, lines, classes)
+        start = time.time()
+        unindexed = writer.SourceFileContent(filename, writer)
+        parsed = time.time() - start
+        indexed = writer.SourceFileContent(filename, writer)
+    finally:
+        os.remove(filename)
+
+    index = codegen._TagIndex()
+    t_unindexed = merge(unindexed, classes, _replace_tag_unindexed)
+    t_indexed = merge(indexed, classes, lambda lst, tag, content: codegen._replace_tag(lst, tag, content, index))
+    assert unindexed.content == indexed.content, "results differ"
+
+    print("%d lines, %d classes; parsing: %.3fs" % (total, classes, parsed))
+    print("merge without index: %.3fs" % t_unindexed)
+    print("merge with index:    %.3fs" % t_indexed)
+
+
+if __name__ == "__main__":
+    main( *[int(arg) for arg in sys.argv[1:3]] )
@@ -0,0 +1,362 @@
+"""\
+Scalability benchmark: synthetic projects of configurable size are loaded, saved and code is generated and merged
+for all languages. The results are written as JSON, so that runs for different commits can be compared.
+
+The project generator can be parameterised by number of toplevel windows, nesting depth and width, sizer types,
+notebooks, menus and toolbars.
+With the option --gui, the project is loaded into the editor with wxPython, i.e. including the creation of widgets.
+
+Usage: python bench_scaling.py [options]
+e.g.:  python bench_scaling.py --toplevels=50 --depth=4 --output=before.json
+       python bench_scaling.py --toplevels=50 --depth=4 --output=after.json --compare=before.json
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+import json, optparse, os, platform, shutil, subprocess, sys, tempfile, time
+
+ROOT = os.path.normpath( os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..") )
+sys.path.insert(0, ROOT)
+import gettext
+gettext.install("wxglade")
+
+import common, compat, config
+import wxglade
+
+
+SIZER_TYPES = ["wxBoxSizer", "wxStaticBoxSizer", "wxGridSizer", "wxFlexGridSizer", "wxGridBagSizer", "wxWrapSizer"]
+LEAF_WIDGETS = [  # class, base, properties
+    ("wxButton",     "EditButton",     "<label>Button %(n)d</label>\n"
+                                       "<events>\n    <handler event=\"EVT_BUTTON\">on_button_%(n)d</handler>\n</events>\n"),
+    ("wxTextCtrl",   "EditTextCtrl",   "<value>text %(n)d</value>\n<tooltip>Enter text %(n)d</tooltip>\n"),
+    ("wxStaticText", "EditStaticText", "<label>Label %(n)d</label>\n"),
+    ("wxCheckBox",   "EditCheckBox",   "<label>Check %(n)d</label>\n"),
+    ("wxChoice",     "EditChoice",     "<selection>0</selection>\n"
+                                       "<choices>\n    <choice>first</choice>\n    <choice>second</choice>\n</choices>\n"),
+]
+
+
+class ProjectGenerator(object):
+    """Generates a synthetic .wxg file.
+    Each toplevel frame has a sizer with 'width' items. Up to the given 'depth', each item is a panel with a nested
+    sizer; at the last level, the items are simple controls.
+    Sizer types are used round robin. With 'notebooks', the first item of each frame is a notebook with 'width' pages.
+    Frames get a menu bar, tool bar and status bar, if enabled."""
+
+    def __init__(self, toplevels=10, depth=3, width=4, sizers=SIZER_TYPES, notebooks=True, menus=True,
+                 toolbars=True):
+        self.toplevels = toplevels
+        self.depth = depth
+        self.width = width
+        self.sizers = sizers
+        self.notebooks = notebooks
+        self.menus = menus
+        self.toolbars = toolbars
+
+    def get_parameters(self):
+        return {"toplevels":self.toplevels, "depth":self.depth, "width":self.width, "sizers":list(self.sizers),
+                "notebooks":self.notebooks, "menus":self.menus, "toolbars":self.toolbars}
+
+    def create(self, filename):
+        "write the project to filename; returns the number of objects, including menu, tool and status bars"
+        self._lines = []
+        self._objects = 0
+        self._counter = 0
+        self._sizer_index = 0
+        self._write('<?xml version="1.0"?>\n<!-- generated by wxGlade 1.0.0 on Thu Jan  1 00:00:00 2021 -->\n\n')
+        self._write('<application class="BenchmarkApp" encoding="UTF-8" for_version="3.0" header_extension=".h" '
+                    'indent_amount="4" indent_symbol="space" is_template="0" language="python" name="app" '
+                    'option="0" overwrite="0" path="benchmark.py" source_extension=".cpp" top_window="frame_0" '
+                    'use_gettext="1" use_new_namespace="1">\n')
+        for n in range(self.toplevels):
+            self._write_frame(n, 1)
+        self._write('</application>\n')
+        with open(filename, "w") as outfile:
+            outfile.writelines(self._lines)
+        del self._lines
+        return self._objects
+
+    def _write(self, text, tabs=0):
+        indent = "    " * tabs
+        self._lines.extend( indent + line + "\n" for line in text.splitlines() if line )
+
+    def _next(self):
+        self._counter += 1
+        return self._counter
+
+    def _begin_object(self, klass, name, base, tabs):
+        self._objects += 1
+        self._write('<object class="%s" name="%s" base="%s">\n' % (klass, name, base), tabs)
+
+    def _write_frame(self, n, tabs):
+        name = "frame_%d" % n
+        self._begin_object("Frame%d" % n, name, "EditFrame", tabs)
+        self._write("<size>600, 400</size>\n<title>Frame %d</title>\n<style>wxDEFAULT_FRAME_STYLE</style>\n" % n,
+                    tabs+1)
+        if self.menus:
+            self._write("<menubar>1</menubar>\n", tabs+1)
+        if self.toolbars:
+            self._write("<toolbar>1</toolbar>\n", tabs+1)
+        self._write("<statusbar>1</statusbar>\n", tabs+1)
+        if self.menus:
+            self._write_menubar(name, tabs+1)
+        self._begin_object("wxStatusBar", "%s_statusbar" % name, "EditStatusBar", tabs+1)
+        self._write("<fields>\n    <field width=\"-1\">%s_statusbar</field>\n</fields>\n" % name, tabs+2)
+        self._write("</object>\n", tabs+1)
+        if self.toolbars:
+            self._write_toolbar(name, tabs+1)
+        items = [self._write_notebook] if self.notebooks else []
+        self._write_sizer(items, 1, tabs+1)
+        self._write("</object>\n", tabs)
+
+    def _write_menubar(self, name, tabs):
+        self._begin_object("wxMenuBar", "%s_menubar" % name, "EditMenuBar", tabs)
+        self._write("<menus>\n", tabs+1)
+        for m in range(3):
+            self._write('<menu label="Menu %d" name="">\n' % m, tabs+2)
+            for i in range(self.width):
+                n = self._next()
+                self._write("<item>\n    <label>Item %d</label>\n    <id>ID_ITEM_%d</id>\n"
+                            "    <handler>on_menu_%d</handler>\n</item>\n" % (n, n, n), tabs+3)
+            self._write("</menu>\n", tabs+2)
+        self._write("</menus>\n", tabs+1)
+        self._write("</object>\n", tabs)
+
+    def _write_toolbar(self, name, tabs):
+        self._begin_object("wxToolBar", "%s_toolbar" % name, "EditToolBar", tabs)
+        self._write("<tools>\n", tabs+1)
+        for i in range(self.width):
+            n = self._next()
+            self._write("<tool>\n    <id>ID_TOOL_%d</id>\n    <label>Tool %d</label>\n    <type>0</type>\n"
+                        "    <short_help>Tool %d</short_help>\n    <bitmap1>art:wxART_GO_UP,wxART_OTHER,32,32</bitmap1>\n"
+                        "    <handler>on_tool_%d</handler>\n</tool>\n" % (n, n, n, n), tabs+2)
+        self._write("</tools>\n", tabs+1)
+        self._write("</object>\n", tabs)
+
+    def _write_sizer(self, items, level, tabs):
+        "write a sizer with self.width items; the first items are written by the callables in items"
+        klass = self.sizers[self._sizer_index % len(self.sizers)]
+        self._sizer_index += 1
+        n = self._next()
+        self._begin_object(klass, "sizer_%d" % n, "Edit%s" % klass[2:], tabs)
+        if klass in ("wxBoxSizer", "wxStaticBoxSizer", "wxWrapSizer"):
+            self._write("<orient>%s</orient>\n" % ("wxVERTICAL" if level % 2 else "wxHORIZONTAL"), tabs+1)
+            if klass == "wxStaticBoxSizer":
+                self._write("<label>sizer_%d</label>\n" % n, tabs+1)
+        else:
+            self._write("<rows>1</rows>\n<cols>%d</cols>\n<vgap>0</vgap>\n<hgap>0</hgap>\n" % self.width, tabs+1)
+            if klass in ("wxFlexGridSizer", "wxGridBagSizer"):
+                self._write("<growable_cols>0</growable_cols>\n", tabs+1)
+        for i in range(self.width):
+            self._write('<object class="sizeritem">\n    <option>1</option>\n    <border>0</border>\n'
+                        '    <flag>wxEXPAND</flag>\n', tabs+1)
+            if i < len(items):
+                items[i](level+1, tabs+2)
+            elif level < self.depth:
+                self._write_panel(level+1, tabs+2)
+            else:
+                self._write_leaf(tabs+2)
+            self._write("</object>\n", tabs+1)
+        self._write("</object>\n", tabs)
+
+    def _write_panel(self, level, tabs):
+        n = self._next()
+        self._begin_object("wxPanel", "panel_%d" % n, "EditPanel", tabs)
+        self._write("<style>wxTAB_TRAVERSAL</style>\n", tabs+1)
+        self._write_sizer([], level, tabs+1)
+        self._write("</object>\n", tabs)
+
+    def _write_leaf(self, tabs):
+        n = self._next()
+        klass, base, properties = LEAF_WIDGETS[n % len(LEAF_WIDGETS)]
+        self._begin_object(klass, "%s_%d" % (klass[2:].lower(), n), base, tabs)
+        self._write(properties % {"n":n}, tabs+1)
+        self._write("</object>\n", tabs)
+
+    def _write_notebook(self, level, tabs):
+        n = self._next()
+        name = "notebook_%d" % n
+        pages = ["%s_pane_%d" % (name, i) for i in range(self.width)]
+        self._begin_object("wxNotebook", name, "EditNotebook", tabs)
+        self._write("<style>wxNB_TOP</style>\n<tabs>\n", tabs+1)
+        for i, page in enumerate(pages):
+            self._write('    <tab window="%s">Page %d</tab>\n' % (page, i), tabs+1)
+        self._write("</tabs>\n", tabs+1)
+        for page in pages:
+            self._begin_object("wxPanel", page, "EditPanel", tabs+1)
+            if level < self.depth:
+                self._write_sizer([], level, tabs+2)
+            self._write("</object>\n", tabs+1)
+        self._write("</object>\n", tabs)
+
+
+class Benchmark(object):
+    "runs the timings for one project; keeps the best of the repetitions"
+
+    def __init__(self, filename, languages, repetitions, use_gui):
+        self.filename = filename
+        self.languages = languages
+        self.repetitions = repetitions
+        self.use_gui = use_gui
+        self.out_dir = tempfile.mkdtemp()
+
+    def _best(self, function, *args):
+        durations = []
+        for n in range(self.repetitions):
+            start = time.time()
+            function(*args)
+            durations.append(time.time() - start)
+        return min(durations)
+
+    def load(self):
+        if self.use_gui:
+            common.main._open_app(self.filename, use_progress_dialog=False, add_to_history=False)
+        else:
+            import application
+            common.root = application.Application()
+            if not wxglade._guiless_open_app(self.filename):
+                raise ValueError("project could not be loaded")
+
+    def write(self):
+        output = []
+        common.root.write(output)
+        common.save_file(os.path.join(self.out_dir, "benchmark.wxg"), output, "wxg")
+
+    def generate(self, language, remove):
+        app = common.root
+        out_path = os.path.join(self.out_dir, "benchmark_%s" % language.replace("+", "p"))
+        if remove and os.path.exists(out_path): shutil.rmtree(out_path)
+        if not os.path.exists(out_path): os.mkdir(out_path)
+        app.properties["language"].set(language)
+        app.properties_changed(["language"])
+        app.properties["multiple_files"].set(0)
+        out_file = os.path.join(out_path, "benchmark." + common.code_writers[language].default_extensions[0])
+        if app.generate_code(out_path=out_file) is None:
+            raise ValueError("code generation failed for %s" % language)
+
+    def run(self):
+        results = {"load":self._best(self.load)}
+        results["write"] = self._best(self.write)
+        results["codegen"] = {}
+        results["merge"] = {}
+        results["errors"] = {}
+        for language in self.languages:
+            try:
+                # code generation into a new file
+                results["codegen"][language] = self._best(self.generate, language, True)
+                # merging into the existing sources, as overwrite is disabled
+                results["merge"][language] = self._best(self.generate, language, False)
+            except Exception as inst:
+                # e.g. the Lisp code writer does not support all sizer types
+                results["errors"][language] = "%s: %s" % (inst.__class__.__name__, inst)
+        shutil.rmtree(self.out_dir, ignore_errors=True)
+        return results
+
+
+def _get_commit():
+    try:
+        output = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.STDOUT)
+    except (EnvironmentError, subprocess.CalledProcessError):
+        return None
+    return output.decode("ascii").strip()
+
+
+def _init(use_gui):
+    wxglade.init_stage1(None)
+    if use_gui:
+        import wx
+        app = wx.App()
+        wxglade.init_stage2(True)
+        import main
+        compat.wx_ArtProviderPush(main.wxGladeArtProvider())
+        import history
+        common.history = history.History()
+        common.main = main.wxGladeFrame()
+        common.main._benchmark_app = app  # keep a reference
+    else:
+        wxglade.init_stage2(False)
+    config.testing = True  # no timestamps
+    config.preferences.autosave = False
+    config.preferences.show_progress = False
+    config.preferences.show_completion = False
+    config.preferences.write_timestamp = False
+    config.preferences.use_snapshots = False
+
+
+def compare(results, previous):
+    "returns text with the timings of both runs and the relative change"
+    lines = ["%-24s %10s %10s %8s" % ("", previous.get("commit") or "previous", results.get("commit") or "current",
+                                      "change")]
+
+    def add(label, old, new):
+        if old is None or new is None: return
+        change = "%+.1f%%" % (100.0*(new-old)/old) if old else ""
+        lines.append( "%-24s %10.4f %10.4f %8s" % (label, old, new, change) )
+
+    old_timings, new_timings = previous["timings"], results["timings"]
+    for key in ("load", "write"):
+        add(key, old_timings.get(key), new_timings.get(key))
+    for key in ("codegen", "merge"):
+        for language in sorted(new_timings[key]):
+            add("%s %s" % (key, language), old_timings.get(key, {}).get(language), new_timings[key][language])
+    if previous["parameters"] != results["parameters"]:
+        lines.append("Warning: the project parameters differ")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = optparse.OptionParser( usage="python bench_scaling.py [options]" )
+    parser.add_option("--toplevels", type="int", default=10, help="number of toplevel frames; default: 10")
+    parser.add_option("--depth", type="int", default=3, help="nesting depth of panels and sizers; default: 3")
+    parser.add_option("--width", type="int", default=4, help="number of items per sizer, menu and notebook; "
+                                                            "default: 4")
+    parser.add_option("--sizers", default=",".join(SIZER_TYPES), help="sizer types, separated by commas")
+    parser.add_option("--no-notebooks", action="store_false", dest="notebooks", default=True)
+    parser.add_option("--no-menus", action="store_false", dest="menus", default=True)
+    parser.add_option("--no-toolbars", action="store_false", dest="toolbars", default=True)
+    parser.add_option("--languages", help="code writers, separated by commas; default: all")
+    parser.add_option("--repetitions", type="int", default=3, help="take the best of N runs; default: 3")
+    parser.add_option("--gui", action="store_true", default=False,
+                      help="load into the editor; required for timing of 'write'")
+    parser.add_option("--keep", metavar="FILE", help="keep the generated project as FILE")
+    parser.add_option("--output", metavar="FILE", help="write results as JSON to FILE instead of stdout")
+    parser.add_option("--compare", metavar="FILE", help="compare with the results of a previous run")
+    options, args = parser.parse_args()
+
+    _init(options.gui)
+    generator = ProjectGenerator( options.toplevels, options.depth, options.width, options.sizers.split(","),
+                                  options.notebooks, options.menus, options.toolbars )
+    if options.languages:
+        languages = options.languages.split(",")
+    else:
+        languages = sorted(language for language in common.code_writers if language != "preview")
+
+    if options.keep:
+        filename = options.keep
+    else:
+        fd, filename = tempfile.mkstemp(".wxg")
+        os.close(fd)
+    try:
+        objects = generator.create(filename)
+        size = os.path.getsize(filename)
+        timings = Benchmark(filename, languages, options.repetitions, options.gui).run()
+    finally:
+        if not options.keep: os.remove(filename)
+
+    results = {"commit":_get_commit(), "version":config.version, "python":platform.python_version(),
+               "date":time.strftime("%Y-%m-%dT%H:%M:%S"), "gui":options.gui, "repetitions":options.repetitions,
+               "parameters":generator.get_parameters(), "objects":objects, "bytes":size, "timings":timings}
+
+    if options.output:
+        with open(options.output, "w") as outfile:
+            json.dump(results, outfile, indent=1, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=1, sort_keys=True)
+        sys.stdout.write("\n")
+    if options.compare:
+        with open(options.compare) as infile:
+            sys.stdout.write( compare(results, json.load(infile)) )
+
+
+if __name__ == "__main__":
+    main()
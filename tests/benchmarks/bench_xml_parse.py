@@ -0,0 +1,155 @@
+"""\
+Benchmark for loading a large project: the SAX based loader (xml_parse.XmlWidgetBuilder) compared to the pyexpat
+based one (xml_parse.ExpatXmlWidgetBuilder), both building the tree of editor objects without widgets.
+
+Usage: python bench_xml_parse.py [objects] [repetitions]
+
+@license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
+"""
+
+import os, sys, tempfile, time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+import gettext
+gettext.install("wxglade")
+
+import common, config
+import wxglade
+import xml_parse
+
+
+HEADER = """<?xml version="1.0"?>
+<!-- generated by wxGlade 1.0.0 on Thu Jan  1 00:00:00 2021 -->
+
+<application class="MyApp" encoding="UTF-8" for_version="3.0" header_extension=".h" indent_amount="4" indent_symbol="space" is_template="0" language="python" mark_blocks="1" name="app" option="0" overwrite="0" path="large.py" source_extension=".cpp" top_window="frame" use_gettext="0" use_new_namespace="1">
+    <object class="MyFrame" name="frame" base="EditFrame">
+        <size>400, 300</size>
+        <title>frame</title>
+        <style>wxDEFAULT_FRAME_STYLE</style>
+        <object class="wxBoxSizer" name="sizer" base="EditBoxSizer">
+            <orient>wxVERTICAL</orient>
+"""
+
+PANEL = """            <object class="sizeritem">
+                <option>1</option>
+                <border>0</border>
+                <flag>wxEXPAND</flag>
+                <object class="wxPanel" name="panel_%(n)d" base="EditPanel">
+                    <object class="wxBoxSizer" name="sizer_%(n)d" base="EditBoxSizer">
+                        <orient>wxHORIZONTAL</orient>
+                        <object class="sizeritem">
+                            <option>0</option>
+                            <border>4</border>
+                            <flag>wxALL</flag>
+                            <object class="wxStaticText" name="label_%(n)d" base="EditStaticText">
+                                <label>Label %(n)d</label>
+                                <font>
+                                    <size>10</size>
+                                    <family>default</family>
+                                    <style>normal</style>
+                                    <weight>bold</weight>
+                                    <underlined>0</underlined>
+                                    <face></face>
+                                </font>
+                            </object>
+                        </object>
+                        <object class="sizeritem">
+                            <option>1</option>
+                            <border>4</border>
+                            <flag>wxALL|wxEXPAND</flag>
+                            <object class="wxTextCtrl" name="text_%(n)d" base="EditTextCtrl">
+                                <value>text %(n)d</value>
+                                <tooltip>Enter text %(n)d</tooltip>
+                            </object>
+                        </object>
+                        <object class="sizeritem">
+                            <option>0</option>
+                            <border>4</border>
+                            <flag>wxALL</flag>
+                            <object class="wxChoice" name="choice_%(n)d" base="EditChoice">
+                                <selection>0</selection>
+                                <choices>
+                                    <choice>first</choice>
+                                    <choice>second</choice>
+                                    <choice>third</choice>
+                                </choices>
+                            </object>
+                        </object>
+                        <object class="sizeritem">
+                            <option>0</option>
+                            <border>4</border>
+                            <flag>wxALL</flag>
+                            <object class="wxButton" name="button_%(n)d" base="EditButton">
+                                <label>Button %(n)d</label>
+                                <events>
+                                    <handler event="EVT_BUTTON">on_button_%(n)d</handler>
+                                </events>
+                            </object>
+                        </object>
+                    </object>
+                </object>
+            </object>
+"""
+
+FOOTER = """        </object>
+    </object>
+</application>
+"""
+
+OBJECTS_PER_PANEL = 10  # panel, sizer, four widgets and four sizeritems; the sizeritems are not part of the tree
+
+
+def create_project(filename, objects):
+    panels = max(1, objects // OBJECTS_PER_PANEL)
+    with open(filename, "w") as outfile:
+        outfile.write(HEADER)
+        for n in range(panels):
+            outfile.write(PANEL % {"n":n})
+        outfile.write(FOOTER)
+    return panels * OBJECTS_PER_PANEL
+
+
+def _count(obj):
+    return 1 + sum(_count(child) for child in (obj.children or []) if child is not None)
+
+
+def load(builder_class, filename):
+    "load the project without GUI; returns duration and number of objects"
+    import application
+    common.root = app = application.Application()
+    app.clear()
+    app.init()
+    start = time.time()
+    parser = builder_class(filename, (1, 0, 0, ""))
+    with open(filename, "r", encoding="UTF8") as infile:
+        parser.parse(infile)
+    return time.time() - start, _count(app)
+
+
+def main(objects=20000, repetitions=3):
+    wxglade.init_stage1(None)
+    wxglade.init_stage2(False)
+    config.testing = True
+
+    fd, filename = tempfile.mkstemp(".wxg")
+    os.close(fd)
+    try:
+        create_project(filename, objects)
+        size = os.path.getsize(filename)
+        results = {xml_parse.XmlWidgetBuilder:[], xml_parse.ExpatXmlWidgetBuilder:[]}
+        for n in range(repetitions):
+            for builder_class, durations in results.items():
+                durations.append( load(builder_class, filename) )
+    finally:
+        os.remove(filename)
+    t_sax, count_sax = min(results[xml_parse.XmlWidgetBuilder])
+    t_expat, count_expat = min(results[xml_parse.ExpatXmlWidgetBuilder])
+    assert count_sax == count_expat, "results differ"
+
+    print("%d objects in tree, %d bytes; best of %d" % (count_sax, size, repetitions))
+    print("SAX:     %.3fs" % t_sax)
+    print("pyexpat: %.3fs" % t_expat)
+
+
+if __name__ == "__main__":
+    main( *[int(arg) for arg in sys.argv[1:3]] )
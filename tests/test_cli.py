@@ -7,8 +7,19 @@
 
 from testsupport_new import WXGladeCLITest
 
-import common, wxglade
-import unittest, os
+import common, config, wxglade
+import unittest, os, sys, time
+
+
+def _dump_tree(obj, excluded=()):
+    "returns class names and property values of obj and its children, for comparison of trees"
+    # flags are compared by name, as their numeric values are taken from wxPython; buttons have no value
+    import new_properties as np
+    props = [(name, sorted(prop.value_set) if hasattr(prop, "value_set") else repr(prop.get()))
+             for name, prop in sorted(obj.properties.items())
+             if name not in excluded and not isinstance(prop, np.ActionButtonProperty)]
+    children = [_dump_tree(child, excluded) for child in obj.children or [] if child is not None]
+    return (obj.__class__.__name__, props, children)
 
 
 class TestCodegen(WXGladeCLITest):
@@ -23,5 +34,487 @@ class TestCodegen(WXGladeCLITest):
     def test_Issue502_codegen(self):
         self.generate('Issue502_codegen_fail', included=["perl"])
 
+    def test_batch_model(self):
+        "code generation from the command line uses the editor classes, without creating any widgets"
+        import application
+        self.generate('AllWidgets_30', included=["XRC"])
+        self.assertIsInstance(common.root, application.Application)
+        frame = common.root.children[0]
+        self.assertIsInstance(frame, common.widget_classes["EditFrame"])
+        self.assertIsNone(frame.widget)
+        self.assertEqual(common.root.top_window, frame.name)
+
+    def test_without_wx(self):
+        "code generation from the command line works without wxPython"
+        import subprocess
+        infilename = self._get_inputfile_path('AllWidgets_30.wxg')
+        generated_filename = os.path.join(self.outDirectory, 'AllWidgets_30_without_wx.xrc')
+        if os.path.isfile(generated_filename): os.remove(generated_filename)
+        # with sys.modules['wx'] set to None, 'import wx' raises an ImportError
+        script = ( "import sys, runpy; sys.modules['wx'] = None; sys.argv = ['wxglade', '-g', 'XRC', '-o', %r, %r]; "
+                   "runpy.run_path(%r, run_name='__main__')" ) % (generated_filename, infilename, wxglade.__file__)
+        subprocess.check_output( [sys.executable, "-c", script], stderr=subprocess.STDOUT )
+        with open(self._get_casefile_path('AllWidgets_30.xrc'), "rb") as infile:
+            expected = infile.read()
+        with open(generated_filename, "rb") as infile:
+            generated = infile.read()
+        # the second line may contain a timestamp
+        self.assertEqual( generated.split(b"\n", 2)[2], expected.split(b"\n", 2)[2] )
+
+    def test_batch(self):
+        "batch mode: generate code for multiple files, including a missing one"
+        out_dir = os.path.join(self.outDirectory, "batch")
+        if not os.path.isdir(out_dir): os.mkdir(out_dir)
+        basenames = ['AllWidgets_28', 'AllWidgets_30', 'missing_file']
+        filenames = [os.path.join(self.caseDirectory, '%s.wxg'%basename) for basename in basenames]
+        results = wxglade.command_line_batch_generation(filenames, "XRC", out_dir, jobs=1)
+
+        self.assertEqual( [result[0] for result in results], filenames )
+        self.assertEqual( [result[1] for result in results], [True, True, False] )
+        self.assertTrue(results[2][3])  # error message
+        for basename in basenames[:2]:
+            self._compare_files( self._get_casefile_path('%s.xrc'%basename), os.path.join(out_dir, '%s.xrc'%basename) )
+
+    def test_batch_sub_directories(self):
+        "batch mode with output directory: projects with the same output file name in different directories"
+        import shutil
+        in_dir = os.path.join(self.outDirectory, "batch_input")
+        out_dir = os.path.join(self.outDirectory, "batch_output")
+        for directory in (in_dir, out_dir):
+            if os.path.isdir(directory): shutil.rmtree(directory)
+        filenames = []
+        for sub_directory in ("a", "b"):
+            os.makedirs( os.path.join(in_dir, sub_directory) )
+            filenames.append( os.path.join(in_dir, sub_directory, 'AllWidgets_30.wxg') )
+            shutil.copy( self._get_inputfile_path('AllWidgets_30.wxg'), filenames[-1] )
+        self.assertEqual( wxglade._get_batch_out_dirs(filenames, out_dir),
+                          [os.path.join(out_dir, "a"), os.path.join(out_dir, "b")] )
+        self.assertEqual( wxglade._get_batch_out_dirs(filenames[:1], out_dir), [out_dir] )
+
+        results = wxglade.command_line_batch_generation(filenames, "XRC", out_dir, jobs=1)
+        self.assertEqual( [result[1] for result in results], [True, True] )
+        for sub_directory in ("a", "b"):
+            self._compare_files( self._get_casefile_path('AllWidgets_30.xrc'),
+                                 os.path.join(out_dir, sub_directory, 'AllWidgets_30.xrc') )
+
+    def test_server(self):
+        "code generation server: requests and replies are JSON objects, one per line"
+        import io, json
+        infilename = self._get_inputfile_path('AllWidgets_30.wxg')
+        generated_filename = os.path.join(self.outDirectory, 'AllWidgets_30_server.xrc')
+        requests = [{"id":1, "command":"ping"},
+                    {"id":2, "filename":infilename, "output":generated_filename},
+                    {"id":3, "filename":"missing_file.wxg"},
+                    {"id":4, "command":"quit"}]
+        instream = io.StringIO( u"".join(json.dumps(request)+"\n" for request in requests) + u"not processed\n" )
+        outstream = io.StringIO()
+        common.init_preferences()
+        self.assertFalse( wxglade._serve_stream(instream, outstream, "XRC") )
+
+        replies = [json.loads(line) for line in outstream.getvalue().splitlines()]
+        self.assertEqual( [reply["id"] for reply in replies], [1, 2, 3, 4] )
+        self.assertEqual( [reply["success"] for reply in replies], [True, True, False, True] )
+        self.assertEqual( replies[1]["files"], [os.path.abspath(generated_filename)] )
+        self.assertTrue( replies[3]["quit"] )
+        self._compare_files( self._get_casefile_path('AllWidgets_30.xrc'), generated_filename )
+
+    def test_widget_registry(self):
+        "batch mode: the widget registry maps class names to the widget modules to be imported on demand"
+        import config, plugins
+        self.assertTrue( os.path.isfile(config.widget_registry_file) )
+        self.assertTrue( plugins.load_registry() )
+        modules = [(module_name, submodule) for widget_dir, module_name, submodule in plugins._registry['wxButton']]
+        self.assertEqual( modules[:2], [('button', 'wconfig'), ('button', '')] )
+        # the widget directories are scanned only once
+        self.assertIs( plugins._get_registry_stamp(), plugins._get_registry_stamp() )
+        plugins.clear_registry_stamp()
+        self.assertEqual( plugins._get_registry_stamp(), plugins._scan_registry_stamp() )
+
+        # copies of code writers like the preview code writer get their own code generators
+        python_codegen = common.code_writers['python']
+        new_codegen = python_codegen.copy()
+        self.assertTrue( 'wxButton' in new_codegen.obj_builders )
+        self.assertTrue( new_codegen.obj_builders['wxButton'].codegen is new_codegen )
+        self.assertTrue( python_codegen.obj_builders['wxButton'].codegen is python_codegen )
+        self.assertFalse( 'NoSuchClass' in new_codegen.obj_builders )
+
+    def test_startup_profile(self):
+        "startup profiling: phases are recorded with wall time and number of imported modules"
+        import profiling, json
+        with profiling.phase("test phase", "test"):
+            pass
+        profile = profiling.get_profile()
+        phase = profile["phases"][-1]
+        self.assertEqual( (phase["category"], phase["name"], phase["modules"]), ("test", "test phase", 0) )
+        self.assertTrue( any(p["name"]=="load_sizers" for p in profile["phases"]) )
+        self.assertEqual( json.loads(json.dumps(profile)), profile )
+        self.assertIn( "  test phase ", profiling.format_report(profile) )
+
+    def test_expat_loader(self):
+        "the pyexpat based loader builds the same tree as the SAX based one"
+        import application, xml_parse
+
+        def load(builder_class):
+            common.root = app = application.Application()
+            app.clear()
+            app.init()
+            with open(self._get_inputfile_path('AllWidgets_30.wxg'), "r", encoding="UTF8") as infile:
+                builder_class(None, (1, 0, 0, "")).parse(infile)
+            return app
+
+        common.init_preferences()
+        excluded = ("menus", "tools")
+        self.assertEqual( _dump_tree(load(xml_parse.XmlWidgetBuilder), excluded),
+                          _dump_tree(load(xml_parse.ExpatXmlWidgetBuilder), excluded) )
+
+    def test_file_version(self):
+        "the file is read once, in binary mode; the file version is taken from the comment at the top"
+        import application, xml_parse
+        common.init_preferences()
+        common.root = app = application.Application()
+        app.clear()
+        app.init()
+        builder = xml_parse.ExpatXmlWidgetBuilder(None)
+        with open(self._get_inputfile_path('AllWidgets_30.wxg'), "rb") as infile:
+            builder.parse(infile)
+        self.assertEqual( builder.input_file_version, (0, 8, 0, "") )
+        self.assertEqual( app.children[0].name, "All_Widgets" )
+
+    def test_snapshot(self):
+        "without GUI, unchanged projects are re-opened from a binary snapshot of the tree"
+        import application, snapshot
+        infilename = self._get_inputfile_path('AllWidgets_30.wxg')
+        snapshot_filename = snapshot.get_filename(infilename)
+        if os.path.isfile(snapshot_filename): os.remove(snapshot_filename)
+        common.init_preferences()
+        common.root = application.Application()
+        # the key requires hashing the file; it's computed only once for loading and saving
+        get_key = snapshot.get_key
+        keys = []
+        snapshot.get_key = lambda filename: keys.append(filename) or get_key(filename)
+        try:
+            self.assertTrue( wxglade._guiless_open_app(infilename) )
+        finally:
+            snapshot.get_key = get_key
+        self.assertEqual( len(keys), 1 )
+        self.assertTrue( os.path.isfile(snapshot_filename) )
+        loaded = common.root
+
+        restored = snapshot.load(infilename)
+        self.assertIsNot( restored, loaded )
+        self.assertEqual( _dump_tree(restored), _dump_tree(loaded) )
+        # the code generators are not part of the snapshot
+        def find(obj, name):
+            if obj.name == name: return obj
+            for child in obj.children or []:
+                found = child is not None and find(child, name)
+                if found: return found
+
+        button = find(restored, "button_1")
+        self.assertEqual( button.WX_CLASS, "wxButton" )
+        self.assertIs( button.widget_writer, common.code_writers['preview'].obj_builders['wxButton'] )
+
+    def test_preview_code(self):
+        "the code for preview is kept in memory and can be compiled from there"
+        import application
+        infilename = self._get_inputfile_path('AllWidgets_30.wxg')
+        common.init_preferences()
+        common.root = application.Application()
+        self.assertTrue( wxglade._guiless_open_app(infilename) )
+        app = common.root
+        frame = app.children[0]
+        writer = common.code_writers["preview"]
+        self.assertIsNone( writer.new_project(app, "<preview>", True) )
+        try:
+            writer.generate_code(app, frame)
+            writer.finalize()
+        finally:
+            writer.clean_up(frame)
+        self.assertFalse( os.path.exists("<preview>") )
+        self.assertEqual( writer.saved_files, [] )
+        code = compile(writer.preview_code, "<preview>", "exec")
+        self.assertIn( frame.klass, code.co_names )
+
+    def test_xrc2wxg_batch(self):
+        "XRC files are converted with a pool of worker processes; results are the same as for single conversions"
+        import shutil, xrc2wxg
+        out_dir = os.path.join(self.outDirectory, "xrc2wxg_batch")
+        basenames = ['AllWidgets_30', 'ComplexExample', 'app_wo_attrs_gui']
+        filenames = [self._get_inputfile_path('%s.xrc'%basename) for basename in basenames]
+        results = xrc2wxg.convert_files(filenames, out_dir, jobs=2)
+        self.assertEqual( [result[0] for result in results], filenames )
+        self.assertEqual( [result[3] for result in results], [None, None, None] )
+        for filename, basename in zip(filenames, basenames):
+            expected = []
+            xrc2wxg.convert(filename, expected)
+            with open(os.path.join(out_dir, '%s.wxg'%basename), "rb") as infile:
+                # the second line may contain a timestamp
+                self.assertEqual( infile.read().split(b"\n", 2)[2], b"".join(expected[2:]) )
+        # spacer size goes into the spacer, not into the sizeritem
+        with open(os.path.join(out_dir, 'AllWidgets_30.wxg'), "rb") as infile:
+            content = infile.read()
+        self.assertIn( b'base="EditSpacer">\n                                    <width>60</width>', content )
+
+        # files with the same name in different directories: the second one would overwrite the output of the first
+        copy_dir = os.path.join(self.outDirectory, "xrc2wxg_copy")
+        if not os.path.isdir(copy_dir): os.mkdir(copy_dir)
+        shutil.copy(filenames[0], copy_dir)
+        results = xrc2wxg.convert_files([filenames[0], os.path.join(copy_dir, 'AllWidgets_30.xrc')], out_dir, jobs=1)
+        self.assertIsNone( results[0][3] )
+        self.assertIn( "same output file", results[1][3] )
+
+    def test_xrs_archive(self):
+        "XRC output to an .xrs file: zip archive with the XRC code and the bitmaps, each bitmap stored once"
+        import shutil, zipfile
+        out_dir = os.path.join(self.outDirectory, "xrs")
+        if not os.path.isdir(out_dir): os.mkdir(out_dir)
+        # relative bitmap paths are relative to the output file
+        shutil.copy( self._get_inputfile_path('icon.png'), out_dir )
+        generated_filename = os.path.join(out_dir, 'AllWidgets_28.xrs')
+        if os.path.isfile(generated_filename): os.remove(generated_filename)
+        infilename = self._get_inputfile_path('AllWidgets_28.wxg')
+        wxglade.command_line_code_generation(infilename, "XRC", generated_filename)
+
+        with zipfile.ZipFile(generated_filename) as archive:
+            names = archive.namelist()
+            xrc = archive.read('AllWidgets_28.xrc')
+            bitmap = archive.read(names[-1])
+        # icon.png is used three times, non-existing.bmp is kept as reference
+        self.assertEqual( len(names), 2 )
+        with open(self._get_inputfile_path('icon.png'), "rb") as infile:
+            self.assertEqual( bitmap, infile.read() )
+        with open(self._get_casefile_path('AllWidgets_28.xrc'), "rb") as infile:
+            expected = infile.read().replace( b"<bitmap>icon.png<", b"<bitmap>" + names[-1].encode() + b"<" )
+        self.assertEqual( xrc.split(b"\n", 2)[2], expected.split(b"\n", 2)[2] )
+
+        # not written again if unchanged
+        wxglade.command_line_code_generation(infilename, "XRC", generated_filename)
+        self.assertEqual( common.code_writers["XRC"].saved_files, [(generated_filename, False)] )
+        # the checksum is recorded like for other generated files
+        self.assertIn( 'AllWidgets_28.xrs', common._get_files_manifest(os.path.abspath(out_dir)) )
+
+        if hasattr(os, "symlink") and not sys.platform.startswith("win"):
+            # written through a symbolic link
+            link = os.path.join(out_dir, 'link.xrs')
+            if os.path.lexists(link): os.remove(link)
+            os.symlink('AllWidgets_28.xrs', link)
+            os.remove(generated_filename)
+            with open(generated_filename, "wb") as outfile:
+                outfile.write(b"")
+            wxglade.command_line_code_generation(infilename, "XRC", link)
+            self.assertTrue( os.path.islink(link) )
+            self.assertTrue( zipfile.is_zipfile(generated_filename) )
+
+    def test_embedded_bitmaps(self):
+        "Python and C++ code with the option embed_bitmaps: bitmap files are embedded; one definition per content"
+        import application, ast, base64, codegen, hashlib, re, shutil
+        out_dir = os.path.join(self.outDirectory, "embedded_bitmaps")
+        if not os.path.isdir(out_dir): os.mkdir(out_dir)
+        # relative bitmap paths are relative to the output file
+        shutil.copy( self._get_inputfile_path('icon.png'), out_dir )
+        with open(self._get_inputfile_path('icon.png'), "rb") as infile:
+            content = infile.read()
+        digest = hashlib.sha1(content).hexdigest()
+        name = "embedded_bitmap_icon_%s" % digest[:8]
+        common.init_preferences()
+
+        for language, extension in (("python", ".py"), ("C++", ".cpp")):
+            common.root = application.Application()
+            self.assertTrue( wxglade._guiless_open_app(self._get_inputfile_path('AllWidgets_28.wxg')) )
+            common.root.properties["embed_bitmaps"].set(True)
+            common.root.properties["language"].set(language)
+            generated_filename = os.path.join(out_dir, "AllWidgets_28%s" % extension)
+            self.assertTrue( common.root.generate_code(out_path=generated_filename) )
+            with open(generated_filename, "r") as infile:
+                code = infile.read()
+            # icon.png is used three times; non-existing.bmp is still loaded from file
+            self.assertEqual( code.count(name), 4 )
+            self.assertNotIn( '"icon.png"', code )
+            self.assertIn( '"non-existing.bmp"', code )
+            if language == "python":
+                data = re.search( r"%s = PyEmbeddedImage\((.*?)\)\n" % name, code, re.S ).group(1)
+                self.assertEqual( base64.b64decode(ast.literal_eval("(%s)" % data)), content )
+            else:
+                data = re.search( r"data\[\] = \{(.*?)\}", code, re.S ).group(1)
+                self.assertEqual( bytearray(int(byte, 16) for byte in data.replace(",", " ").split()), content )
+            # the encoded data is cached
+            self.assertIn( (language, digest), codegen._encoded_bitmaps )
+
+    def test_incremental_codegen(self):
+        "Test that with multiple files only the files of modified toplevel windows are written again"
+        import codegen
+        out_dir = os.path.join(self.outDirectory, "incremental")
+        if not os.path.isdir(out_dir): os.mkdir(out_dir)
+        manifest = codegen.get_manifest_filename(out_dir)
+        if os.path.isfile(manifest): os.remove(manifest)
+        writer = common.code_writers["python"]
+        get_saved = lambda: [os.path.basename(filename) for filename, written in writer.saved_files]
+
+        infilename = self._get_inputfile_path('PyOgg2.wxg')
+        wxglade.command_line_code_generation(infilename, "python", out_dir)
+        self.assertEqual( get_saved(), ['PyOgg2_MyDialog.py', 'PyOgg2_MyFrame.py', 'PyOgg2_app.py'] )
+        self.assertTrue( os.path.isfile(manifest) )
+        # the manifest is stored in the application data directory, not in the output directory
+        self.assertEqual( [name for name in os.listdir(out_dir) if name.endswith(".json")], [] )
+
+        # nothing changed
+        wxglade.command_line_code_generation(infilename, "python", out_dir)
+        self.assertEqual( get_saved(), ['PyOgg2_app.py'] )
+
+        # one toplevel window modified
+        frame = [child for child in common.root.children if child.klass=="PyOgg2_MyFrame"][0]
+        frame.properties["title"].set("modified")
+        common.root.generate_code(out_path=out_dir)
+        self.assertEqual( get_saved(), ['PyOgg2_MyFrame.py', 'PyOgg2_app.py'] )
+
+        # generated file removed
+        os.remove( os.path.join(out_dir, 'PyOgg2_MyDialog.py') )
+        common.root.generate_code(out_path=out_dir)
+        self.assertEqual( get_saved(), ['PyOgg2_MyDialog.py', 'PyOgg2_app.py'] )
+
+    def test_replace_tag(self):
+        "Test replacing tags in a list of lines, with index of the tag positions"
+        import codegen
+        lines = ["a\n", "<1wxGlade x>\n", "b\n", "<1wxGlade y>\n", "<1wxGlade x>\n", "c\n"]
+        index = codegen._TagIndex()
+        self.assertTrue( codegen._replace_tag(lines, "<1wxGlade x>", ["x1\n", "<1wxGlade z>\n"], index) )
+        self.assertEqual( lines, ["a\n", "x1\n", "<1wxGlade z>\n", "\n", "b\n", "<1wxGlade y>\n",
+                                  "x1\n", "<1wxGlade z>\n", "\n", "c\n"] )
+        self.assertTrue( codegen._replace_tag(lines, "<1wxGlade y>\n", [], index) )
+        self.assertFalse( codegen._replace_tag(lines, "<1wxGlade y>", "y", index) )
+        # modification without _replace_tag
+        lines.insert(0, "<1wxGlade y>\n")
+        lines[2] = "<1wxGlade x>\n"
+        self.assertTrue( codegen._replace_tag(lines, "<1wxGlade y>\n", "y\n", index) )
+        self.assertTrue( codegen._replace_tag(lines, "<1wxGlade z>", "z", index) )
+        self.assertTrue( codegen._replace_tag(lines, "<1wxGlade x>", "x2", index) )
+        self.assertEqual( lines, ["y\n", "a\n", "x2\n", "z\n", "\n", "b\n", "x1\n", "z\n", "\n", "c\n"] )
+
+    def test_save_file_manifest(self):
+        "Test that generated files are not read again if unmodified since written and that no temporary files remain"
+        out_dir = os.path.join(self.outDirectory, "save_file_manifest")
+        if not os.path.isdir(out_dir): os.mkdir(out_dir)
+        filename = os.path.join(out_dir, "generated.py")
+        if os.path.isfile(filename): os.remove(filename)
+        content = [b"# generated by wxGlade 1.0.0\n", b"import wx\n"]
+        self.assertTrue( common.save_file(filename, content, "codegen") )
+        common.save_files_manifests()
+        # the manifest is stored in the application data directory, not in the output directory
+        self.assertTrue( os.path.isfile(common.get_files_manifest_filename(os.path.abspath(out_dir))) )
+        self.assertEqual( [name for name in os.listdir(out_dir) if name.endswith(".json")], [] )
+
+        read_file = common._read_file
+        racy_seconds = common._RACY_SECONDS
+        common._RACY_SECONDS = 0  # trust the entry, although the file has just been written
+        try:
+            common._read_file = None  # must not be called
+            self.assertFalse( common.save_file(filename, content, "codegen") )
+            common._read_file = read_file
+
+            # modified by the user: read again and compare
+            with open(filename, "ab") as outfile:
+                outfile.write(b"# user code\n")
+            self.assertTrue( common.save_file(filename, content, "codegen") )
+            common._read_file = None
+            self.assertFalse( common.save_file(filename, content, "codegen") )
+        finally:
+            common._read_file = read_file
+            common._RACY_SECONDS = racy_seconds
+        self.assertEqual( [name for name in os.listdir(out_dir) if name.endswith(".tmp")], [] )
+
+    def test_prune_cache_dir(self):
+        "Test that the least recently used and the old files are removed from a cache directory"
+        cache_dir = os.path.join(self.outDirectory, "prune_cache_dir")
+        if not os.path.isdir(cache_dir): os.mkdir(cache_dir)
+        for name in os.listdir(cache_dir): os.remove( os.path.join(cache_dir, name) )
+        now = time.time()
+        for i, name in enumerate(["a", "b", "c", "d", "e", "old"]):
+            filename = os.path.join(cache_dir, name)
+            with open(filename, "wb") as outfile:
+                outfile.write(b"x"*10)
+            age = common._CACHE_MAX_AGE + 10 if name=="old" else i*10
+            os.utime(filename, (now-age, now-age))
+        common.touch_cache_file( os.path.join(cache_dir, "e") )  # most recently used
+
+        common._pruned.pop(cache_dir, None)
+        common.prune_cache_dir(cache_dir, 4, 1000)
+        self.assertEqual( sorted(os.listdir(cache_dir)), ["a", "b", "c", "e"] )
+        common.prune_cache_dir(cache_dir, 1, 10)  # not again within _PRUNE_INTERVAL
+        self.assertEqual( len(os.listdir(cache_dir)), 4 )
+        common._pruned.pop(cache_dir, None)
+        common.prune_cache_dir(cache_dir, 4, 25)  # the size limit
+        self.assertEqual( sorted(os.listdir(cache_dir)), ["a", "e"] )
+
+    @unittest.skipUnless(hasattr(os, "symlink") and not sys.platform.startswith("win"), "symbolic links required")
+    def test_save_file_symlink(self):
+        "Test that a file is written through a symbolic link and the link is kept"
+        out_dir = os.path.join(self.outDirectory, "save_file_symlink")
+        if not os.path.isdir(out_dir): os.mkdir(out_dir)
+        target = os.path.join(out_dir, "target.py")
+        link = os.path.join(out_dir, "link.py")
+        for filename in (target, link):
+            if os.path.lexists(filename): os.remove(filename)
+        with open(target, "wb") as outfile:
+            outfile.write(b"# old\n")
+        os.symlink("target.py", link)
+
+        self.assertTrue( common.save_file(link, [b"# generated by wxGlade\n", b"import wx\n"], "codegen") )
+        self.assertTrue( os.path.islink(link) )
+        with open(target, "rb") as infile:
+            self.assertEqual( infile.read().splitlines(), [b"# generated by wxGlade", b"import wx"] )
+        self.assertEqual( [name for name in os.listdir(out_dir) if name.endswith(".tmp")], [] )
+
+    def test_parallel_file_jobs(self):
+        "Test that with multiple files, merging and writing in the thread pool gives the same files in the same order"
+        import codegen, filecmp
+        infilename = self._get_inputfile_path('CPPOgg2.wxg')
+        results = []
+        codegen_jobs = config.preferences.codegen_jobs
+        try:
+            for jobs in (1, 4):
+                config.preferences.codegen_jobs = jobs
+                out_dir = os.path.join(self.outDirectory, "jobs_%d" % jobs)
+                if not os.path.isdir(out_dir): os.mkdir(out_dir)
+                for filename in os.listdir(out_dir):
+                    os.remove( os.path.join(out_dir, filename) )
+                wxglade.command_line_code_generation(infilename, "C++", out_dir)
+                os.remove( codegen.get_manifest_filename(out_dir) )  # not incremental: merge all classes
+                wxglade.command_line_code_generation(infilename, "C++", out_dir)
+                saved = [os.path.basename(filename) for filename, written in common.code_writers["C++"].saved_files]
+                results.append( (out_dir, saved) )
+        finally:
+            config.preferences.codegen_jobs = codegen_jobs
+        (dir_1, saved_1), (dir_4, saved_4) = results
+        self.assertEqual(saved_1, saved_4)
+        match, mismatch, errors = filecmp.cmpfiles(dir_1, dir_4, saved_1, shallow=False)
+        self.assertEqual( (mismatch, errors), ([], []) )
+
+    def test_save_file_streaming(self):
+        "Test that a project is streamed to the file and only replaced if the content has changed"
+        out_dir = os.path.join(self.outDirectory, "save_file_streaming")
+        if not os.path.isdir(out_dir): os.mkdir(out_dir)
+        filename = os.path.join(out_dir, "streamed.wxg")
+        if os.path.isfile(filename): os.remove(filename)
+
+        class Project(object):
+            def __init__(self, timestamp, chunks):
+                self.timestamp = timestamp
+                self.chunks = chunks
+            def write(self, output, tabs=0):
+                output.append( u'<?xml version="1.0"?>\n<!-- generated by wxGlade on %s -->\n\n' % self.timestamp )
+                output.extend(self.chunks)
+
+        self.assertTrue( common.save_file(filename, Project("1", [u"<application>\n", u"    <\xe4/>\n</application>\n"])) )
+        with open(filename, "rb") as infile:
+            content = infile.read()
+        self.assertEqual( content.decode("utf-8").splitlines()[3:], [u"<application>", u"    <\xe4/>", u"</application>"] )
+        self.assertEqual( common._smart_checksum([content]), common._smart_checksum(common._read_file(filename)) )
+
+        # different timestamp and differently split content: not written again
+        self.assertFalse( common.save_file(filename, Project("2", [u"<application>\n    <\xe4/>\n", u"</application>\n"])) )
+        self.assertIn( b"generated by wxGlade on 1", open(filename, "rb").read() )
+        self.assertTrue( common.save_file(filename, Project("3", [u"<application>\n</application>\n"])) )
+        self.assertEqual( [name for name in os.listdir(out_dir) if name.endswith(".tmp")], [] )
+
 if __name__ == '__main__':
     unittest.main(exit=False)
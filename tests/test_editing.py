@@ -8,7 +8,7 @@
 from testsupport_new import WXGladeGUITest
 
 import common, clipboard
-import unittest, wx, time
+import os, unittest, wx, time
 
 
 class TestEditing(WXGladeGUITest):
@@ -145,6 +145,191 @@ class TestEditing(WXGladeGUITest):
         widget = app.find_widget_from_path("app/frame/notebook_1/window_1/window_1_pane_1/grid_sizer_1/button_3")
         widget.properties["span"].set((2,2), notify=True)
 
+    def test_name_class_index(self):
+        "the root keeps indexes of names and classes for path lookups and class uniqueness checks"
+        basename = 'Test_Editing'
+        infilename = self._get_casefile_path( '%s.wxg'%basename )
+        common.main._open_app(infilename, use_progress_dialog=False, add_to_history=False)
+        app = common.root  # shortcut
+
+        def check_paths(editor):
+            for child in editor.get_all_children():
+                if child is None: continue
+                self.assertIs( app.find_widget_from_path(child.get_path()), child )
+                check_paths(child)
+        check_paths(app)
+        self.assertIsNone( app.find_widget_from_path("app/frame/no_such_widget") )
+
+        # rename
+        path = "app/frame/notebook_1/window_1/window_1_pane_1/grid_sizer_1/button_3"
+        button = app.find_widget_from_path(path)
+        button.properties["name"].set("button_renamed", notify=True)
+        self.assertIsNone( app.find_widget_from_path(path) )
+        self.assertIs( app.find_widget_from_path(path.replace("button_3", "button_renamed")), button )
+
+        # class uniqueness
+        frame = app.children[0]
+        class_p = frame.properties["class"]
+        self.assertEqual( app.find_widgets_by_class("MyFrame"), [frame] )
+        panel = app.find_widget_from_path("app/frame/notebook_1/panel_1")
+        panel.properties["class"].set("MyFrame", activate=True)
+        self.assertEqual( class_p._check_class_uniqueness("MyFrame"), class_p._UNIQUENESS_MSG1 )
+        panel.properties["class"].set("module.MyPanel")
+        self.assertIsNone( class_p._check_class_uniqueness("MyFrame") )
+        self.assertEqual( class_p._check_class_uniqueness("other.MyPanel"), class_p._UNIQUENESS_MSG2 )
+        panel.properties["class"].set_active(False)
+        self.assertIsNone( class_p._check_class_uniqueness("other.MyPanel") )
+
+        # removal
+        panel.properties["class"].set_active(True)
+        panel.remove(user=False)
+        self.assertEqual( app.find_widgets_by_leaf_class("MyPanel"), [] )
+        self.assertIsNone( app.find_widget_from_path("app/frame/notebook_1/panel_1") )
+
+    def test_lazy_tree(self):
+        "tree items are created when a branch is expanded or when a widget is selected"
+        basename = 'Test_Editing'
+        infilename = self._get_casefile_path( '%s.wxg'%basename )
+        common.main._open_app(infilename, use_progress_dialog=False, add_to_history=False)
+        app = common.root  # shortcut
+        tree = common.app_tree
+        frame = app.children[0]
+        self.assertTrue( frame.item.IsOk() )
+        self.assertTrue( tree.ItemHasChildren(frame.item) )
+        self.assertEqual( tree.GetChildrenCount(frame.item, False), 0 )
+
+        button = app.find_widget_from_path("app/frame/notebook_1/window_1/window_1_pane_1/grid_sizer_1/button_3")
+        self.assertIsNone( button.item )
+        tree.select_item(button)
+        self.assertIs( tree._GetItemData(button.item), button )
+
+        def check_items(editor):
+            for child in editor.get_all_children():
+                if child is None: continue
+                self.assertIs( tree._GetItemData(child.item), child )
+                check_items(child)
+        tree.ExpandAllChildren(frame.item)
+        check_items(frame)
+
+    def test_history_memory(self):
+        "the history stores compressed XML; identical XML is shared; the memory budget limits the number of actions"
+        basename = 'Test_Editing'
+        infilename = self._get_casefile_path( '%s.wxg'%basename )
+        common.main._open_app(infilename, use_progress_dialog=False, add_to_history=False)
+        app = common.root  # shortcut
+        history = common.history
+        path = "app/frame/notebook_1/panel_1/sizer_2/sizer_1"
+
+        app.find_widget_from_path(path).remove()
+        history.undo(None)
+        app.find_widget_from_path(path).remove()
+        usage = history.get_memory_usage()
+        self.assertEqual( usage["actions"], 1 )
+        self.assertEqual( usage["redo_actions"], 0 )
+        self.assertTrue( usage["xml_compressed"] < usage["xml_uncompressed"] )
+        history.undo(None)
+        self.assertEqual( history.get_memory_usage()["redo_actions"], 1 )
+        self.assertIsNotNone( app.find_widget_from_path(path) )
+
+        # with a small budget, only the latest action is kept
+        history.budget = 1
+        for n in range(3):
+            app.find_widget_from_path(path).remove()
+            history.undo(None)
+            self.assertIsNotNone( app.find_widget_from_path(path) )
+        app.find_widget_from_path(path).remove()
+        self.assertEqual( len(history.actions), 1 )
+
+        # the memory usage is a running total; it must match the sum over all actions
+        actions = history.actions + history.actions_redo
+        blobs = dict( (id(a.xml_data.blob), a.xml_data.blob) for a in actions if a.xml_data is not None )
+        expected = sum(a.get_size() for a in actions) + sum(len(blob.data) for blob in blobs.values())
+        self.assertEqual( history.get_memory_usage()["bytes"], expected )
+
+    def test_autosave(self):
+        "the autosave file is written in background and only if there are new changes"
+        basename = 'Test_Editing'
+        infilename = self._get_casefile_path( '%s.wxg'%basename )
+        common.main._open_app(infilename, use_progress_dialog=False, add_to_history=False)
+        app = common.root  # shortcut
+        app.filename = os.path.join(self.outDirectory, 'Test_Editing_autosave.wxg')
+        autosave_name = common.get_name_for_autosave()
+        if os.path.exists(autosave_name): os.remove(autosave_name)
+        results = []
+        callback = lambda *args: results.append(args)
+
+        self.assertEqual( common.autosave_current(callback, wait=True), 1 )  # nothing changed
+        app.saved = False
+        self.assertEqual( common.autosave_current(callback, wait=True), 2 )
+        self.assertEqual( len(results), 1 )
+        self.assertEqual( results[0][:2], (autosave_name, None) )
+        self.assertTrue( common.check_autosaved(None) )
+        self.assertEqual( common.autosave_current(callback, wait=True), 1 )  # no changes since the last autosave
+        app.saved = False
+        self.assertEqual( common.autosave_current(callback, wait=True), 2 )
+        self.assertEqual( len(results), 2 )
+
+        # any error is reported to the callback and the next autosave tries again
+        def replace_file(src, dst):
+            raise ValueError("replace_file failed")
+        common.replace_file, replace_file = replace_file, common.replace_file
+        try:
+            app.saved = False
+            self.assertEqual( common.autosave_current(callback, wait=True), 0 )
+        finally:
+            common.replace_file = replace_file
+        self.assertEqual( len(results), 3 )
+        self.assertIsInstance( results[2][1], ValueError )
+        self.assertEqual( common.autosave_current(callback, wait=True), 2 )
+        self.assertEqual( results[3][:2], (autosave_name, None) )
+        common.remove_autosaved()
+        self.assertFalse( os.path.exists(autosave_name) )
+
+    def test_preview_cache(self):
+        "the compiled preview code is re-used until the toplevel or one of its children is modified"
+        basename = 'Test_Editing'
+        infilename = self._get_casefile_path( '%s.wxg'%basename )
+        common.main._open_app(infilename, use_progress_dialog=False, add_to_history=False)
+        app = common.root  # shortcut
+        frame = app.children[0]
+
+        def preview():
+            frame.on_preview()  # show
+            self._process_wx_events()
+            self.assertIsNotNone( frame.preview_widget )
+            frame.on_preview()  # close
+            self._process_wx_events()
+            return app._preview_cache[frame.name][1]
+
+        code = preview()
+        self.assertIs( preview(), code )
+        button = app.find_widget_from_path("app/frame/notebook_1/window_1/window_1_pane_1/grid_sizer_1/button_3")
+        button.properties["label"].set("modified", notify=True)
+        self.assertIsNot( preview(), code )
+
+    def test_property_pages(self):
+        "the property editors of a notebook page are created when the page is shown"
+        basename = 'Test_Editing'
+        infilename = self._get_casefile_path( '%s.wxg'%basename )
+        common.main._open_app(infilename, use_progress_dialog=False, add_to_history=False)
+        panel = common.property_panel
+        button = common.root.find_widget_from_path("app/frame/notebook_1/window_1/window_1_pane_1/grid_sizer_1/button_3")
+        panel.set_widget(button)
+        panel.edit_properties(button)
+        self.assertTrue( len(panel.pagenames)>1 )
+
+        def check_editing():
+            for index, names in enumerate(panel._page_properties):
+                for name in names:
+                    self.assertEqual( button.properties[name].editing, index in panel._built_pages )
+        selection = panel.notebook.GetSelection()
+        self.assertEqual( panel._built_pages, set([selection]) )
+        check_editing()
+        other = (selection+1) % len(panel.pagenames)
+        panel.build_page(other)
+        self.assertEqual( panel._built_pages, set([selection, other]) )
+        check_editing()
+
 
 if __name__ == '__main__':
     unittest.main(exit=False)
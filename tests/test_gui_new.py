@@ -545,6 +545,44 @@ class TestGui(WXGladeGUITest):
         common.main._save_app(generated_filename)
         self._compare_files(compare_filename, generated_filename)
 
+    def test_widget_registry_palette(self):
+        "in GUI mode, the widget registry stores the palette, so the widget modules can be imported on demand"
+        import config, json, plugins
+        with open(config.widget_registry_file) as infile:
+            registry = json.load(infile)
+        specs = [spec for section, specs in registry["palette"] for spec in specs]
+        self.assertIn( ["EditButton", "button.png", False, None], specs )
+        self.assertIn( "EditFrame", [spec[0] for spec in specs if spec[2]] )  # toplevel
+        # the GUI module registers the editor class
+        modules = [module_name for widget_dir, module_name, submodule, classes in registry["modules"]
+                   if "EditButton" in classes]
+        self.assertEqual( modules, ["button"] )
+        self.assertEqual( common.widget_classes["EditButton"].__name__, "EditButton" )
+
+    def test_bitmap_cache(self):
+        "Test the cache for decoded bitmaps"
+        import config, misc
+        path = os.path.join(config.icons_path, "frame.png")
+        misc.clear_bitmap_cache()
+        bmp = misc.get_bitmap(path)
+        self.assertTrue( bmp.IsOk() )
+        self.assertTrue( misc.get_bitmap(path) is bmp )
+        scaled = misc.get_bitmap(path, (32,32))
+        self.assertEqual( tuple(scaled.Size), (32,32) )
+        self.assertTrue( misc.get_bitmap(path, (32,32)) is scaled )
+        self.assertEqual( len(misc._bitmap_cache), 2 )
+
+        # the least recently used bitmaps are removed when the limit is exceeded
+        limit = misc._bitmap_cache_limit
+        misc._bitmap_cache_limit = 32*32*4
+        try:
+            small = misc.get_bitmap(path, (16,16))
+        finally:
+            misc._bitmap_cache_limit = limit
+        self.assertEqual( list(misc._bitmap_cache.values()), [small] )
+        self.assertEqual( misc._bitmap_cache_size, 16*16*4 )
+        misc.clear_bitmap_cache()
+
     def stop(self):
         print("XXX")  # nothing to do
 
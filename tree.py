@@ -40,6 +40,8 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
         self.SetDropTarget(self.drop_target)
         self._drag_ongoing = False
         self.auto_expand = True  # this control the automatic expansion of  nodes: it is set to False during xml loading
+        # editors with collapsed items for which the children items were not yet created; see on_expanding()
+        self._unbuilt = set()
         self.Bind(wx.EVT_TREE_SEL_CHANGED, self.on_change_selection)
         self.Bind(wx.EVT_RIGHT_DOWN, self.popup_menu)
         self.Bind(wx.EVT_LEFT_DCLICK, self.on_left_dclick)
@@ -56,6 +58,7 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
         self.Bind(wx.EVT_KEY_DOWN, self.on_key_down_event)
         #self.Bind(wx.EVT_CHAR_HOOK, self.on_char)  # on wx 2.8 the event will not be delivered to the child
         self.Bind(wx.EVT_TREE_DELETE_ITEM, self.on_delete_item)
+        self.Bind(wx.EVT_TREE_ITEM_EXPANDING, self.on_expanding)
 
         if self.GetSelection().IsOk():
             # on some platforms, an item is pre-selected -> trigger an update
@@ -358,6 +361,7 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
 
     def remove(self, editor):
         # just remove the mutual references between editor and tree item
+        self._unbuilt.discard(editor)
         if editor.item is None: return  # could be during common.root.clear() when there is an error on loading
         self._SetItemData(editor.item, None)
         editor.item = None
@@ -371,6 +375,43 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
             print("on_delete_item", utilities.hx(item), editor, editor and editor.item or None)
         if editor is not None and editor.item is item:
             editor.item = None
+            self._unbuilt.discard(editor)
+
+    # lazy creation of items: the children items are only created when an item is expanded for the first time
+    def on_expanding(self, event):
+        item = event.GetItem()
+        editor = self._GetItemData(item)
+        if editor is not None and editor in self._unbuilt:
+            self._unbuilt.discard(editor)
+            auto_expand, self.auto_expand = self.auto_expand, False  # the item is being expanded already
+            try:
+                self._build_children(editor, item)
+            finally:
+                self.auto_expand = auto_expand
+        event.Skip()
+
+    def _defer_children(self, editor, item):
+        "don't create children items for a collapsed item that has none yet; returns True if deferred"
+        if self.IsExpanded(item) or self.GetChildrenCount(item, False):
+            # expanded or with children items, e.g. when re-used for another editor: children items need an update
+            self._unbuilt.discard(editor)
+            return False
+        if editor.children and editor.get_all_children():
+            self._unbuilt.add(editor)
+            self.SetItemHasChildren(item, True)
+        elif editor in self._unbuilt:
+            self._unbuilt.discard(editor)
+            self.SetItemHasChildren(item, False)
+        return True
+
+    def ensure_item(self, editor):
+        "create the items for editor and its parents, if these were not yet created; returns editor.item"
+        if editor.item is not None or editor.IS_ROOT: return editor.item
+        parent_item = self.ensure_item(editor.parent)
+        if parent_item is not None and editor.parent in self._unbuilt:
+            self._unbuilt.discard(editor.parent)
+            self._build_children(editor.parent, parent_item)
+        return editor.item
 
     def _get_children_items(self, item):
         items = []
@@ -438,11 +479,11 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
         
         if not recursive:
             # update labels and images, called e.g. when notebook pages change
-            for child in children:
-                self.refresh(child)
+            self.refresh_items(children)
             return
         for child, item in zip(children, items):
-            self._build_children(child, item)
+            if not self._defer_children(child, item):
+                self._build_children(child, item)
 
     def build(self, editor=None, recursive=True, freeze=False):
         if DEBUG:
@@ -470,7 +511,8 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
                 while item is None:
                     editor = editor.parent
                     item = editor.item
-            self._build_children(editor, item, recursive)
+            if editor.IS_ROOT or not self._defer_children(editor, item):
+                self._build_children(editor, item, recursive)
         finally:
             if freeze: self.Thaw()
         #if config.debugging or DEBUG:
@@ -493,12 +535,35 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
         # refresh label and/or image
         if editor.item is None: return
         if refresh_label:
-            self.SetItemText(editor.item, editor._get_tree_label())
+            label = editor._get_tree_label()
+            if label!=self.GetItemText(editor.item):
+                self.SetItemText(editor.item, label)
         if refresh_image:
             image = self.images.get( editor._get_tree_image(), -1)
-            self.SetItemImage(editor.item, image)
+            if image!=self.GetItemImage(editor.item):
+                self.SetItemImage(editor.item, image)
+
+    def refresh_items(self, editors):
+        "refresh labels and images of multiple editors; only the modified items are updated, within one Freeze/Thaw"
+        updates = []
+        for editor in editors:
+            if editor is None or editor.item is None: continue
+            label = editor._get_tree_label()
+            image = self.images.get( editor._get_tree_image(), -1)
+            if label!=self.GetItemText(editor.item) or image!=self.GetItemImage(editor.item):
+                updates.append( (editor.item, label, image) )
+        if not updates: return
+        freeze = len(updates)>1  # Freeze/Thaw makes the tree scroll around, so avoid it for a single item
+        if freeze: self.Freeze()
+        try:
+            for item, label, image in updates:
+                self.SetItemText(item, label)
+                self.SetItemImage(item, image)
+        finally:
+            if freeze: self.Thaw()
 
     def select_item(self, editor):
+        self.ensure_item(editor)
         self.skip_select = True
         self.SelectItem(editor.item)
         self.skip_select = False
@@ -526,7 +591,7 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
 
     def set_current_widget(self, editor):
         # interface from common.set_focused_widget
-        if editor is None or editor is self.cur_widget or editor.item is None: return
+        if editor is None or editor is self.cur_widget or self.ensure_item(editor) is None: return
         self.skip_select = True
         self.SelectItem(editor.item)
         if not self.IsExpanded(editor.item) and (not hasattr(self, "HasFocus") or not self.HasFocus()):
@@ -676,4 +741,7 @@ class WidgetTree(wx.TreeCtrl):#, Tree):
         self._SetItemData(old.item, new)
         new.item = old.item
         old.item = None
+        if old in self._unbuilt:
+            self._unbuilt.discard(old)
+            self._unbuilt.add(new)
         self.refresh(new)
@@ -7,7 +7,7 @@ wxButton objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import common, compat
 from edit_windows import ManagedBase, EditStylesMixin
 import new_properties as np
@@ -50,9 +50,9 @@ class EditButton(BitmapMixin, ManagedBase, EditStylesMixin):
         self.current_bitmap  = np.BitmapPropertyD(min_version=(3,0))
         self.focus_bitmap    = np.BitmapPropertyD(min_version=(3,0))
 
-        values = [wx.LEFT, wx.RIGHT, wx.TOP, wx.BOTTOM]
+        values = [0x0010, 0x0020, 0x0040, 0x0080]  # wx.LEFT, wx.RIGHT, wx.TOP, wx.BOTTOM
         aliases = ["wxLEFT", "wxRIGHT", "wxTOP", "wxBOTTOM"]
-        p = self.bitmap_dir = np.RadioProperty(wx.LEFT, values, columns=4, aliases=aliases, default_value=wx.LEFT)
+        p = self.bitmap_dir = np.RadioProperty(values[0], values, columns=4, aliases=aliases, default_value=values[0])
         p.min_version = (3,0)
         p.blocked = True
 
@@ -7,13 +7,15 @@ wxCalendarCtrl objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 from edit_windows import ManagedBase, EditStylesMixin
 import common, compat, config
 import new_properties as np
 import decorators
 
-if compat.IS_PHOENIX:
+if wx is None:
+    pass  # code generation only
+elif compat.IS_PHOENIX:
     import wx.adv
     from wx.adv import CalendarCtrl
 else:
@@ -7,7 +7,7 @@ wxCheckBox objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import common, config
 from edit_windows import ManagedBase, EditStylesMixin
 import new_properties as np
@@ -22,7 +22,8 @@ class EditCheckBox(ManagedBase, EditStylesMixin):
     _PROPERTY_LABELS = {"checked":"wxCheckBox state"}
 
     # Convert the position of "checked" RadioProperty to wxCheckBoxState
-    index2state = { 0: wx.CHK_UNCHECKED, 1: wx.CHK_CHECKED, 2: wx.CHK_UNDETERMINED }
+    if wx is not None:
+        index2state = { 0: wx.CHK_UNCHECKED, 1: wx.CHK_CHECKED, 2: wx.CHK_UNDETERMINED }
 
     def __init__(self, name, parent, index, label=""):
         "Class to handle wxCheckBox objects"
@@ -7,7 +7,7 @@ wxChoice objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import common, config
 from edit_windows import ManagedBase
 import new_properties as np
@@ -7,7 +7,7 @@ Custom wxWindow objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import common, misc, compat, config
 from wcodegen.taghandler import BaseXmlBuilderTagHandler
 import new_properties as np
@@ -180,43 +180,44 @@ class CustomWidget(ManagedBase):
         ManagedBase._properties_changed(self, modified, actions)
 
 
-class Dialog(wx.Dialog):
-    import re
-    validation_re  = re.compile(r'^[a-zA-Z_\.\:]+[\w-]*(\[\w*\])*$')  # does not avoid ".."
-    def __init__(self):
-        title = _('Enter widget class')
-        wx.Dialog.__init__(self, None, -1, title, wx.GetMousePosition())
-        klass = 'CustomWidget'
-
-        self.classname = wx.TextCtrl(self, -1, klass, size=(200,-1))
-        sizer = wx.BoxSizer(wx.VERTICAL)
-        hsizer = wx.BoxSizer(wx.HORIZONTAL)
-        hsizer.Add(wx.StaticText(self, -1, _('Instance class')), 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
-        hsizer.Add(self.classname, 1, wx.ALIGN_CENTER_VERTICAL|wx.TOP|wx.BOTTOM|wx.RIGHT, 3)
-        sizer.Add(hsizer, 0, wx.EXPAND)
-
-        # horizontal sizer for action buttons
-        hsizer = wx.BoxSizer(wx.HORIZONTAL)
-        hsizer.Add( wx.Button(self, wx.ID_CANCEL, _('Cancel')), 1, wx.ALL, 5)
-        self.OK_button = btn = wx.Button(self, wx.ID_OK, _('OK') )
-        btn.SetDefault()
-        hsizer.Add(btn, 1, wx.ALL, 5)
-        sizer.Add(hsizer, 0, wx.EXPAND)
-
-        self.SetAutoLayout(True)
-        self.SetSizer(sizer)
-        sizer.Fit(self)
-        w = self.GetTextExtent(title)[0] *2
-        if self.GetSize()[0] < w:
-            self.SetSize((w, -1))
-        self.classname.Bind(wx.EVT_TEXT, self.validate)
-
-    def validate(self, event):
-        class_name = self.classname.GetValue()
-        OK = bool( self.validation_re.match(class_name) )
-        if ".." in class_name or class_name.endswith("."): OK = False
-        if class_name.startswith(":") or (":" in class_name and not "::" in class_name): OK = False
-        self.OK_button.Enable( OK )
+if wx is not None:
+    class Dialog(wx.Dialog):
+        import re
+        validation_re  = re.compile(r'^[a-zA-Z_\.\:]+[\w-]*(\[\w*\])*$')  # does not avoid ".."
+        def __init__(self):
+            title = _('Enter widget class')
+            wx.Dialog.__init__(self, None, -1, title, wx.GetMousePosition())
+            klass = 'CustomWidget'
+
+            self.classname = wx.TextCtrl(self, -1, klass, size=(200,-1))
+            sizer = wx.BoxSizer(wx.VERTICAL)
+            hsizer = wx.BoxSizer(wx.HORIZONTAL)
+            hsizer.Add(wx.StaticText(self, -1, _('Instance class')), 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
+            hsizer.Add(self.classname, 1, wx.ALIGN_CENTER_VERTICAL|wx.TOP|wx.BOTTOM|wx.RIGHT, 3)
+            sizer.Add(hsizer, 0, wx.EXPAND)
+
+            # horizontal sizer for action buttons
+            hsizer = wx.BoxSizer(wx.HORIZONTAL)
+            hsizer.Add( wx.Button(self, wx.ID_CANCEL, _('Cancel')), 1, wx.ALL, 5)
+            self.OK_button = btn = wx.Button(self, wx.ID_OK, _('OK') )
+            btn.SetDefault()
+            hsizer.Add(btn, 1, wx.ALL, 5)
+            sizer.Add(hsizer, 0, wx.EXPAND)
+
+            self.SetAutoLayout(True)
+            self.SetSizer(sizer)
+            sizer.Fit(self)
+            w = self.GetTextExtent(title)[0] *2
+            if self.GetSize()[0] < w:
+                self.SetSize((w, -1))
+            self.classname.Bind(wx.EVT_TEXT, self.validate)
+
+        def validate(self, event):
+            class_name = self.classname.GetValue()
+            OK = bool( self.validation_re.match(class_name) )
+            if ".." in class_name or class_name.endswith("."): OK = False
+            if class_name.startswith(":") or (":" in class_name and not "::" in class_name): OK = False
+            self.OK_button.Enable( OK )
 
 
 def builder(parent, index):
@@ -7,13 +7,15 @@ wxDatePickerCtrl objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 from edit_windows import ManagedBase, EditStylesMixin
 import common, compat, config
 import decorators
 
 
-if compat.IS_PHOENIX:
+if wx is None:
+    pass  # code generation only
+elif compat.IS_PHOENIX:
     #import wx.adv
     from wx.adv import DatePickerCtrl
 else:
@@ -8,7 +8,7 @@ wxDialog objects (incl. wxMenuBar, wxToolBar and wxStatusBar)
 """
 
 import os
-import wx
+from compat import wx
 
 import common, compat, config, misc
 import new_properties as np
@@ -67,7 +67,7 @@ class EditDialog(BitmapMixin, TopLevelBase, EditStylesMixin):
                                "Select a different button to be used instead.\n"
                                "See SetAffirmativeId and SetEscapeId in the wx documentation."}
 
-    def __init__(self, name, parent, index, klass, title, style=wx.DEFAULT_DIALOG_STYLE):
+    def __init__(self, name, parent, index, klass, title, style="wxDEFAULT_DIALOG_STYLE"):
         TopLevelBase.__init__(self, name, parent, index, klass, title)
         EditStylesMixin.__init__(self)
         self.properties["style"].set(style)
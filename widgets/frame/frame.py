@@ -7,7 +7,7 @@ wxFrame objects (incl. wxMenuBar, wxToolBar and wxStatusBar)
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import os
 import common, config, misc, compat
 import new_properties as np
@@ -61,7 +61,7 @@ class EditFrame(BitmapMixin, TopLevelBase, EditStylesMixin):
                          "statusbar":'Has StatusBar' }
     ATT_CHILDREN = ["_menubar", "_statusbar", "_toolbar"]
 
-    def __init__(self, name, parent, index, klass, title, style=wx.DEFAULT_FRAME_STYLE):
+    def __init__(self, name, parent, index, klass, title, style="wxDEFAULT_FRAME_STYLE"):
         TopLevelBase.__init__(self, name, parent, index, klass, title)
         EditStylesMixin.__init__(self)
         self.properties["style"].set(style)
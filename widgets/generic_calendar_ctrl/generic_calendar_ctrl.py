@@ -8,13 +8,15 @@ wxGenericCalendarCtrl objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 from edit_windows import ManagedBase, EditStylesMixin
 import common, compat, config
 import new_properties as np
 import decorators
 
-if compat.IS_PHOENIX:
+if wx is None:
+    pass  # code generation only
+elif compat.IS_PHOENIX:
     from wx.adv import GenericCalendarCtrl
 else:
     from wx.calendar import GenericCalendarCtrl
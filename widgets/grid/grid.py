@@ -7,7 +7,9 @@ wxGrid objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-from wx.grid import *
+from compat import wx
+if wx is not None:
+    from wx.grid import *
 import common, misc, compat, config
 from edit_windows import ManagedBase
 import new_properties as np
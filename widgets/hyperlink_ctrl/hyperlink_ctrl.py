@@ -7,13 +7,15 @@ wxHyperlinkCtrl objects
 """
 
 
-import wx
+from compat import wx
 import common, compat, config
 from edit_windows import ManagedBase, EditStylesMixin
 import new_properties as np
 import decorators
 
-if compat.IS_PHOENIX:
+if wx is None:
+    pass  # code generation only
+elif compat.IS_PHOENIX:
     import wx.adv
     from wx.adv import HyperlinkCtrl, HL_DEFAULT_STYLE, HL_ALIGN_LEFT, HL_ALIGN_CENTRE, HL_ALIGN_RIGHT
 else:
@@ -31,7 +33,7 @@ class EditHyperlinkCtrl(ManagedBase, EditStylesMixin):
                        "attribute":'Store instance as attribute of window class; e.g. self.bitmap_1 = wx.wxStaticBitmap'
                                    '(...)\nWithout this, you can not access the bitmap from your program.'}
 
-    def __init__(self, name, parent, index, label, style=HL_DEFAULT_STYLE):
+    def __init__(self, name, parent, index, label, style="wxHL_DEFAULT_STYLE"):
         # Initialise parent classes
         ManagedBase.__init__(self, name, parent, index)
         EditStylesMixin.__init__(self, style)
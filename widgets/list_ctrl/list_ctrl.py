@@ -7,7 +7,7 @@ wxListCtrl objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 from edit_windows import ManagedBase, EditStylesMixin
 from widgets.grid.grid import GridColsProperty, ColsHandler
 import new_properties as np
@@ -24,7 +24,7 @@ class EditListCtrl(ManagedBase, EditStylesMixin):
                       "columns":"Only for style LC_REPORT."}
     recreate_on_style_change = True
 
-    def __init__(self, name, parent, index, style=wx.LC_REPORT | wx.BORDER_SUNKEN):
+    def __init__(self, name, parent, index, style="wxLC_REPORT|wxBORDER_SUNKEN"):
         ManagedBase.__init__(self, name, parent, index)
         EditStylesMixin.__init__(self, style)
         self.columns = GridColsProperty([])
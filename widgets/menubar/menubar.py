@@ -7,7 +7,7 @@ wxMenuBar objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import re
 
 import common, compat, config, misc, clipboard
@@ -16,7 +16,9 @@ from MenuTree import MenuTree
 import new_properties as np
 from edit_windows import EditBase, PreviewMixin
 
-if compat.IS_CLASSIC:
+if wx is None:
+    _MenuItemDialog = object  # code generation only
+elif compat.IS_CLASSIC:
     from .MenuItemDialog28 import MenuItemDialog as _MenuItemDialog
 else:
     from .MenuItemDialog import MenuItemDialog as _MenuItemDialog
@@ -547,8 +549,7 @@ class MenuHandler(BaseXmlBuilderTagHandler):
             cm = self.curr_menu[-1]
             cm[0].children.append(node)
             node.parent = cm[0]
-            menu = wx.Menu()
-            self.curr_menu.append( (node, menu) )
+            self.curr_menu.append( (node,) )
         elif name == 'item':
             self.curr_item = MenuTree.Node()
         else:
@@ -7,7 +7,7 @@ wxNotebook objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import common, compat, misc, config
 import new_properties as np
 from edit_windows import ManagedBase, EditStylesMixin
@@ -342,7 +342,7 @@ class EditNotebook(ManagedBase, EditStylesMixin):
             p = self.properties["style"]
             new = self._get_direction(p.value_set)
             old = self._get_direction(p.previous_value)
-            if wx.Platform=="__WXMSW__" and ((old=="T" and new=="B") or (old=="B" and new=="T")):
+            if self.widget and wx.Platform=="__WXMSW__" and ((old=="T" and new=="B") or (old=="B" and new=="T")):
                 actions.add("layout")
             elif old!=new:
                 actions.add("recreate2")
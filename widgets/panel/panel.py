@@ -8,7 +8,7 @@ wxPanel objects
 """
 
 import logging
-import wx
+from compat import wx
 import common, config, misc, clipboard, compat
 import new_properties as np
 from edit_windows import ManagedBase, TopLevelBase, EditStylesMixin
@@ -8,8 +8,9 @@ wxPropertyGridManager objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
-from wx.propgrid import *
+from compat import wx
+if wx is not None:
+    from wx.propgrid import *
 import common, compat
 from edit_windows import ManagedBase, EditStylesMixin
 
@@ -7,11 +7,10 @@ wxRadioBox objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
-import common, compat
+from compat import wx
+import common, compat, misc
 from edit_windows import ManagedBase
 import new_properties as np
-from misc import wxGladeRadioButton
 
 from ChoicesProperty import *
 
@@ -32,8 +31,8 @@ class EditRadioBox(ManagedBase):
         self.dimension = np.SpinProperty(major_dim)
         self.selection = np.SpinProperty(0, val_range=(0,len(choices)-1), immediate=True )
         self.choices   = ChoicesProperty( choices, [(_('Label'), np.GridProperty.STRING)] )
-        style = style or wx.RA_SPECIFY_COLS
-        styles = [wx.RA_SPECIFY_ROWS, wx.RA_SPECIFY_COLS]
+        styles = [0x0008, 0x0004]  # wx.RA_SPECIFY_ROWS, wx.RA_SPECIFY_COLS
+        style = style or styles[1]
         aliases = ["wxRA_SPECIFY_ROWS","wxRA_SPECIFY_COLS"]  # labels and aliases
         self.style = np.RadioProperty(style, styles, aliases, aliases=aliases, columns=2)
 
@@ -50,7 +49,7 @@ class EditRadioBox(ManagedBase):
         self._set_selection()
 
     def _create_button(self, label):
-        r = wxGladeRadioButton(self.widget, -1, label)
+        r = misc.wxGladeRadioButton(self.widget, -1, label)
         r.Bind(wx.EVT_LEFT_DOWN, self.on_set_focus)
         r.Bind(wx.EVT_RIGHT_DOWN, self.popup_menu)
         return r
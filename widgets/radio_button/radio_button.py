@@ -7,11 +7,10 @@ wxRadioButton objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
-import common, config
+from compat import wx
+import common, config, misc
 from edit_windows import ManagedBase, EditStylesMixin
 import new_properties as np
-from misc import wxGladeRadioButton
 
 
 class EditRadioButton(ManagedBase, EditStylesMixin):
@@ -31,7 +30,7 @@ class EditRadioButton(ManagedBase, EditStylesMixin):
         self.clicked = np.CheckBoxProperty(False, default_value=False)
 
     def create_widget(self):
-        self.widget = wxGladeRadioButton(self.parent_window.widget, wx.ID_ANY, self.label)
+        self.widget = misc.wxGladeRadioButton(self.parent_window.widget, wx.ID_ANY, self.label)
         self.widget.SetValue(self.clicked)
         self.widget.Bind(wx.EVT_CHECKBOX, lambda e: self.widget.SetValue(self.value))
 
@@ -7,7 +7,7 @@ wxSearchCtrl objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 
 import common, config, misc
 from edit_windows import ManagedBase, EditStylesMixin
@@ -7,7 +7,7 @@ wxSlider objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import common
 from edit_windows import ManagedBase, EditStylesMixin
 import new_properties as np
@@ -46,8 +46,8 @@ def xrc_code_generator(obj):
                 output.append( tabs1 + '<size>%s, %s</size>\n' % (obj.width, obj.height) )
                 if obj.proportion:
                     output.append(tabs1 + '<option>%s</option>\n' % obj.proportion)
-                if obj.flag:
-                    flag = obj.properties["flag"].get_string_value()
+                flag = obj.properties["flag"].get_string_value()
+                if flag:
                     output.append(tabs1 + '<flag>%s</flag>\n' % self.cn_f(flag))
                 if obj.border:
                     output.append(tabs1 + '<border>%s</border>\n' % obj.border)
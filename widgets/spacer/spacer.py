@@ -7,7 +7,7 @@ Spacers to use in sizers
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import common, misc
 import new_properties as np
 from edit_windows import ManagedBase
@@ -60,34 +60,35 @@ class EditSpacer(ManagedBase):
         ManagedBase._properties_changed(self, modified, actions)
 
 
-class _Dialog(wx.Dialog):
-    def __init__(self):
-        wx.Dialog.__init__(self, common.main, -1, _("Enter size"), wx.GetMousePosition())
-        # the controls
-        self.width  = wx.SpinCtrl(self, -1, "20")
-        self.height = wx.SpinCtrl(self, -1, "20")
-        self.width.SetFocus()
-        self.width.SetSelection(-1, -1)
-        self.height.SetSelection(-1, -1)
-        # the main sizer
-        sizer = wx.BoxSizer(wx.VERTICAL)
-        # grid sizer with the controls
-        gsizer = wx.FlexGridSizer(cols=2)
-        for label, control in [("Width", self.width), ("Height", self.height)]:
-            gsizer.Add(wx.StaticText(self, -1, _(label)), 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
-            gsizer.Add(control, 0, wx.ALL | wx.EXPAND | wx.ALIGN_CENTER_VERTICAL, 3)
-        sizer.Add(gsizer)
-        # horizontal sizer for action buttons
-        hsizer = wx.BoxSizer(wx.HORIZONTAL)
-        hsizer.Add( wx.Button(self, wx.ID_CANCEL, _('Cancel')), 1, wx.ALL, 5)
-        btn = wx.Button(self, wx.ID_OK, _('OK') )
-        btn.SetDefault()
-        hsizer.Add(btn, 1, wx.ALL, 5)
-        sizer.Add(hsizer, 0, wx.EXPAND)
-
-        self.SetAutoLayout(True)
-        self.SetSizer(sizer)
-        sizer.Fit(self)
+if wx is not None:
+    class _Dialog(wx.Dialog):
+        def __init__(self):
+            wx.Dialog.__init__(self, common.main, -1, _("Enter size"), wx.GetMousePosition())
+            # the controls
+            self.width  = wx.SpinCtrl(self, -1, "20")
+            self.height = wx.SpinCtrl(self, -1, "20")
+            self.width.SetFocus()
+            self.width.SetSelection(-1, -1)
+            self.height.SetSelection(-1, -1)
+            # the main sizer
+            sizer = wx.BoxSizer(wx.VERTICAL)
+            # grid sizer with the controls
+            gsizer = wx.FlexGridSizer(cols=2)
+            for label, control in [("Width", self.width), ("Height", self.height)]:
+                gsizer.Add(wx.StaticText(self, -1, _(label)), 0, wx.ALL | wx.ALIGN_CENTER_VERTICAL, 5)
+                gsizer.Add(control, 0, wx.ALL | wx.EXPAND | wx.ALIGN_CENTER_VERTICAL, 3)
+            sizer.Add(gsizer)
+            # horizontal sizer for action buttons
+            hsizer = wx.BoxSizer(wx.HORIZONTAL)
+            hsizer.Add( wx.Button(self, wx.ID_CANCEL, _('Cancel')), 1, wx.ALL, 5)
+            btn = wx.Button(self, wx.ID_OK, _('OK') )
+            btn.SetDefault()
+            hsizer.Add(btn, 1, wx.ALL, 5)
+            sizer.Add(hsizer, 0, wx.EXPAND)
+
+            self.SetAutoLayout(True)
+            self.SetSizer(sizer)
+            sizer.Fit(self)
 
 def builder(parent, index):
     "factory function for EditSpacer objects"
@@ -9,7 +9,7 @@ based on wxGlade/widgets/spin_ctrl/
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 from edit_windows import ManagedBase, EditStylesMixin
 import common, config
 import new_properties as np
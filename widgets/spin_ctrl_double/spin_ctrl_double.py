@@ -7,7 +7,7 @@ wxSpinCtrlDouble objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 from edit_windows import ManagedBase, EditStylesMixin
 import time
 import common, misc
@@ -113,7 +113,7 @@ def xml_builder(parser, base, name, parent, index):
 
 def initialize():
     "initialization function for the module: returns a wxBitmapButton to be added to the main palette"
-    if not hasattr(wx, "SpinCtrlDouble"): return None
+    if wx is not None and not hasattr(wx, "SpinCtrlDouble"): return None
     common.widget_classes['EditSpinCtrlDouble'] = EditSpinCtrlDouble
     common.widgets['EditSpinCtrlDouble'] = builder
     common.widgets_from_xml['EditSpinCtrlDouble'] = xml_builder
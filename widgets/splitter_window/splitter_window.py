@@ -7,7 +7,7 @@ wxSplitterWindow objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 
 import common, compat, config, misc
 import new_properties as np
@@ -55,7 +55,7 @@ class EditSplitterWindow(ManagedBase, EditStylesMixin):
         # initialise instance properties
         self.no_custom_class = np.CheckBoxProperty(False, default_value=False)
         self.sash_pos = np.SpinPropertyD(0, default_value="")
-        if hasattr(wx, "SpinCtrlDouble"):
+        if wx is None or hasattr(wx, "SpinCtrlDouble"):
             self.sash_gravity = np.SpinDoublePropertyD(0.5, (0.0,1.0), default_value=0.0, immediate=True)
         else:
             self.sash_gravity = np.FloatPropertyD(0.5, (0.0,1.0), default_value=0.0)
@@ -260,13 +260,14 @@ def initialize():
     common.widgets['EditSplitterWindow'] = builder
     common.widgets_from_xml['EditSplitterWindow'] = xml_builder
 
-    import os.path
-    from tree import WidgetTree
-    WidgetTree.images['EditSplitterSlot-Left']   = os.path.join( config.icons_path, 'splitter_slot-left.png' )
-    WidgetTree.images['EditSplitterSlot-Right']  = os.path.join( config.icons_path, 'splitter_slot-right.png' )
-    WidgetTree.images['EditSplitterSlot-Top']    = os.path.join( config.icons_path, 'splitter_slot-top.png' )
-    WidgetTree.images['EditSplitterSlot-Bottom'] = os.path.join( config.icons_path, 'splitter_slot-bottom.png' )
-    WidgetTree.images['EditSplitterWindow']      = os.path.join( config.icons_path, 'splitter_window.png' )
-    WidgetTree.images['EditSplitterWindow-h']    = os.path.join( config.icons_path, 'splitter_window-h.png' )
+    if config.use_gui:
+        import os.path
+        from tree import WidgetTree
+        WidgetTree.images['EditSplitterSlot-Left']   = os.path.join( config.icons_path, 'splitter_slot-left.png' )
+        WidgetTree.images['EditSplitterSlot-Right']  = os.path.join( config.icons_path, 'splitter_slot-right.png' )
+        WidgetTree.images['EditSplitterSlot-Top']    = os.path.join( config.icons_path, 'splitter_slot-top.png' )
+        WidgetTree.images['EditSplitterSlot-Bottom'] = os.path.join( config.icons_path, 'splitter_slot-bottom.png' )
+        WidgetTree.images['EditSplitterWindow']      = os.path.join( config.icons_path, 'splitter_window.png' )
+        WidgetTree.images['EditSplitterWindow-h']    = os.path.join( config.icons_path, 'splitter_window-h.png' )
 
     return common.make_object_button('EditSplitterWindow', 'splitter_window.png')
@@ -6,7 +6,7 @@ wxStaticBitmap objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 
 import common, misc
 from edit_windows import ManagedBase, EditStylesMixin
@@ -7,7 +7,7 @@ wxStaticText objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 #import wx.lib.stattext
 import common
 from edit_windows import ManagedBase, EditStylesMixin
@@ -54,7 +54,7 @@ class EditStaticText(ManagedBase, EditStylesMixin):
             actions.add("recreate2")  # calling .Wrap(self.wrap) would only work once and not set the size correctly
             return
 
-        if modified and wx.Platform!="__WXMSW__":
+        if modified and self.widget and wx.Platform!="__WXMSW__":
             if "style" in modified or "font" in modified or "foreground" in modified:
                 actions.add("recreate2")
                 return
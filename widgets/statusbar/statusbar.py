@@ -7,7 +7,7 @@ wxFrame and wxStatusBar objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 import common, misc
 from wcodegen.taghandler import BaseXmlBuilderTagHandler
 import new_properties as np
@@ -128,30 +128,31 @@ class EditStatusBar(EditBase, EditStylesMixin):
 
 _NUMBER = 0
 
-class Dialog(wx.Dialog):
-    def __init__(self):
-        global _NUMBER
-        wx.Dialog.__init__(self, None, -1, _('Select statusbar class'))
-        
-        if common.root.language.lower() == 'xrc':
-            klass = 'wxStatusBar'
-        else:
-            klass = 'MyStatusBar%s' % (_NUMBER or "")
-            _NUMBER += 1
-
-        # class
-        self.klass = wx.TextCtrl(self, -1, klass)
-        self.klass.Bind(wx.EVT_TEXT, self.on_text)
-        # layout
-        szr = wx.BoxSizer(wx.VERTICAL)
-        szr.Add(klass_prop.panel, 0, wx.EXPAND)
-        sz2 = wx.BoxSizer(wx.HORIZONTAL)
-        sz2.Add(wx.Button(self, wx.ID_OK, _('OK')), 0, wx.ALL, 3)
-        sz2.Add(wx.Button(self, wx.ID_CANCEL, _('Cancel')), 0, wx.ALL, 3)
-        szr.Add(sz2, 0, wx.ALL|wx.ALIGN_CENTER, 3)
-        self.SetAutoLayout(True)
-        self.SetSizer(szr)
-        szr.Fit(self)
+if wx is not None:
+    class Dialog(wx.Dialog):
+        def __init__(self):
+            global _NUMBER
+            wx.Dialog.__init__(self, None, -1, _('Select statusbar class'))
+
+            if common.root.language.lower() == 'xrc':
+                klass = 'wxStatusBar'
+            else:
+                klass = 'MyStatusBar%s' % (_NUMBER or "")
+                _NUMBER += 1
+
+            # class
+            self.klass = wx.TextCtrl(self, -1, klass)
+            self.klass.Bind(wx.EVT_TEXT, self.on_text)
+            # layout
+            szr = wx.BoxSizer(wx.VERTICAL)
+            szr.Add(klass_prop.panel, 0, wx.EXPAND)
+            sz2 = wx.BoxSizer(wx.HORIZONTAL)
+            sz2.Add(wx.Button(self, wx.ID_OK, _('OK')), 0, wx.ALL, 3)
+            sz2.Add(wx.Button(self, wx.ID_CANCEL, _('Cancel')), 0, wx.ALL, 3)
+            szr.Add(sz2, 0, wx.ALL|wx.ALIGN_CENTER, 3)
+            self.SetAutoLayout(True)
+            self.SetSizer(szr)
+            szr.Fit(self)
 
 
 
@@ -174,6 +175,7 @@ def initialize():
     common.widgets['EditStatusBar'] = builder   # only used from Frame.menubar property
     common.widgets_from_xml['EditStatusBar'] = xml_builder
     import config, os
-    from tree import WidgetTree
-    WidgetTree.images['EditStatusBar'] = os.path.join(config.icons_path, 'statusbar.png')
+    if config.use_gui:
+        from tree import WidgetTree
+        WidgetTree.images['EditStatusBar'] = os.path.join(config.icons_path, 'statusbar.png')
     return []
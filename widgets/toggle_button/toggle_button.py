@@ -7,7 +7,7 @@ wxToggleButton objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 
 import common, config
 from edit_windows import ManagedBase, EditStylesMixin
@@ -9,7 +9,7 @@ wxToolBar objects
 
 from __future__ import absolute_import
 
-import wx
+from compat import wx
 
 import common, compat, config, misc, clipboard
 import os, re
@@ -19,7 +19,9 @@ from edit_windows import EditBase, PreviewMixin, EditStylesMixin
 from gui_mixins import BitmapMixin
 from wcodegen.taghandler import BaseXmlBuilderTagHandler
 
-if compat.IS_CLASSIC:
+if wx is None:
+    _ToolsDialog = object  # code generation only
+elif compat.IS_CLASSIC:
     from .ToolsDialog28 import ToolsDialog as _ToolsDialog
 else:
     from .ToolsDialog import ToolsDialog as _ToolsDialog
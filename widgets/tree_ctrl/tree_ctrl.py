@@ -7,7 +7,7 @@ wxTreeCtrl objects
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import wx
+from compat import wx
 from edit_windows import ManagedBase, EditStylesMixin
 import common, config
 
@@ -21,7 +21,7 @@ class EditTreeCtrl(ManagedBase, EditStylesMixin):
     _PROPERTIES = ["Widget", "style"]
     PROPERTIES = ManagedBase.PROPERTIES + _PROPERTIES + ManagedBase.EXTRA_PROPERTIES
 
-    def __init__(self, name, parent, index, style=wx.TR_HAS_BUTTONS|wx.BORDER_SUNKEN):
+    def __init__(self, name, parent, index, style="wxTR_HAS_BUTTONS|wxBORDER_SUNKEN"):
         ManagedBase.__init__(self, name, parent, index)
         EditStylesMixin.__init__(self, style)
         self._item_with_name = None  # a Tree item for visualization
@@ -12,6 +12,8 @@ import atexit
 import codecs
 import logging, os, sys, gettext, optparse
 
+import profiling  # first, to record the imports as well
+
 # Use a NullWriter with Unicode support (encoding attribute) to catch and
 # drop all output in PyInstaller environment (standalone Edition)
 #
@@ -44,7 +46,8 @@ def my_displayhook(value):
 sys.displayhook = my_displayhook
 
 
-import common, config, compat, log
+with profiling.phase("import modules"):
+    import common, config, compat, log
 
 
 def parse_command_line():
@@ -55,14 +58,18 @@ def parse_command_line():
     # inject
     optparse.OptionParser.format_description = lambda self, formatter: self.description
 
+    with profiling.phase("config.get_version"):
+        version = config.get_version()
     version = _("wxGlade version %s\n"
                 "Copyright (C) 2007-2012 Alberto Griggio\n"
                 "Copyright (C) 2011-2016 Carsten Grohmann\n"
                 "Copyright (C) 2016-2021 Dietmar Schwertberger\n"
                 "License MIT: The MIT License\n"
-                "             <http://www.opensource.org/licenses/mit-license.php>") % config.get_version()
+                "             <http://www.opensource.org/licenses/mit-license.php>") % version
     usage = _("Usage: wxglade <WXG File>             start the wxGlade GUI\n"
               " or:   wxglade <Options> <WXG File>   generate code from command line\n"
+              " or:   wxglade <Options> <WXG Files>  generate code for multiple files (batch mode)\n"
+              " or:   wxglade -d [-s <Socket>]       run as code generation server\n"
               " or:   wxglade --version              show programs version number and exit\n"
               " or:   wxglade -h|--help              show this help message and exit")
     parser = optparse.OptionParser( add_help_option=False, version=version, usage=usage )
@@ -72,13 +79,36 @@ def parse_command_line():
                             help=_("(required) output language, valid languages are: %s") % ", ".join(languages) )
     
     parser.add_option("-o", "--output", metavar="PATH", dest="output",
-                            help=_("(optional) output file in single-file mode or output directory in multi-file mode"))
+                            help=_("(optional) output file in single-file mode or output directory in multi-file mode;\n"
+                                   "output directory when generating code for multiple wxg files, keeping their "
+                                   "sub-directories"))
+
+    parser.add_option("-m", "--manifest", metavar="FILE", dest="manifest",
+                            help=_("(optional) file with the names of wxg files to generate code for, one per line"))
+
+    parser.add_option("-j", "--jobs", type="int", metavar="N", dest="jobs",
+                            help=_("(optional) number of worker processes for multiple wxg files; default: number of CPUs"))
+
+    parser.add_option("-d", "--daemon", action="store_true", dest="daemon",
+                            help=_("run as code generation server; requests are read from stdin or --socket as JSON lines"))
+
+    parser.add_option("-s", "--socket", metavar="PATH", dest="socket",
+                            help=_("(optional) Unix domain socket for the code generation server"))
 
     parser.add_option("-c", "--use-config", dest="rc_file",
                             help=_("use specified wxgladerc config file instead of the default one") )
 
+    parser.add_option("--profile-startup", action="store_true", dest="profile_startup",
+                            help=_("print wall time and imported modules for each startup phase and plugin to stderr"))
+
+    parser.add_option("--profile-json", metavar="FILE", dest="profile_json",
+                            help=_("write the startup profile as JSON to FILE instead"))
+
     options, args = parser.parse_args()
 
+    if options.profile_startup or options.profile_json:
+        profiling.enable(options.profile_json and _normalise_filename(options.profile_json))
+
     # print epilog because OptionParser.epilog isn't available to Python 2.3
     if options.help:
         parser.print_help()
@@ -92,37 +122,33 @@ def parse_command_line():
     # Make an absolute version of path.
     # According to the invoking dir of wxGlade (which can be different
     # from '.' if it is invoked from a shell script).
-    if len(args) == 1:
-        filename = args[0]
-        if filename.startswith("file://"): filename = filename[7:]
-        if not os.path.isabs(filename):
-            filename = os.path.join(os.getcwd(), filename)
-        filename = os.path.normpath(os.path.expanduser(filename))
-        options.filename = filename
-    else:
-        options.filename = None
+    options.filenames = [_normalise_filename(filename) for filename in args]
+    if options.manifest:
+        options.filenames += _read_manifest(_normalise_filename(options.manifest))
+    options.filename = options.filenames[0] if len(options.filenames) == 1 else None
+    options.batch = bool(options.manifest) or len(options.filenames) > 1
 
     # check parameters
     #  - language
     #     - one file            -> cmdline code generation
-    #     - no / > one files    -> usage
+    #     - > one files         -> cmdline code generation in batch mode
+    #     - no files            -> usage
     #  - no language            -> start gui
-    if options.language:
-        if len(args) == 1:
-            options.start_gui = False
-        elif len(args) == 0:
+    if options.daemon:
+        options.start_gui = False
+    elif options.language:
+        options.start_gui = False
+        if not options.filenames and not options.manifest:
             msg = _("No wxg file given.\n")
             logging.error(msg)
             parser.print_help()
             sys.exit(msg)
-        else:
-            msg = _("Too many wxg files given.\n")
-            logging.error(msg)
-            parser.print_help()
-            sys.exit(msg)
     else:
         options.start_gui = True
 
+    if options.socket:
+        options.socket = _normalise_filename(options.socket)
+
     # check output path
     if options.output:
         options.output = os.path.normpath(os.path.expanduser(options.output))
@@ -130,74 +156,78 @@ def parse_command_line():
     return options
 
 
-def command_line_code_generation(filename, language, out_path=None):
-    """Starts a code generator without starting the GUI.
+def _normalise_filename(filename):
+    if filename.startswith("file://"): filename = filename[7:]
+    if not os.path.isabs(filename):
+        filename = os.path.join(os.getcwd(), filename)
+    return os.path.normpath(os.path.expanduser(filename))
 
-    filename: Name of wxg file to generate code from
-    language: Code generator language
-    out_path: output file / output directory"""
-    from xml_parse import CodeWriter
 
+def _read_manifest(filename):
+    """Read a batch mode manifest: one wxg file per line, relative to the manifest's directory;
+    empty lines and lines starting with '#' are ignored"""
+    dirname = os.path.dirname(filename)
+    ret = []
     try:
-        if language not in common.code_writers:
-            raise ValueError('Code writer for "%s" is not available.'%language)
+        with open(filename) as manifest:
+            for line in manifest:
+                line = line.strip()
+                if not line or line.startswith("#"): continue
+                ret.append( os.path.normpath( os.path.join(dirname, os.path.expanduser(line)) ) )
+    except EnvironmentError as inst:
+        msg = _('Can\'t read manifest file "%s": %s\n') % (filename, inst.strerror)
+        logging.error(msg)
+        sys.exit(msg)
+    return ret
 
-        writer = common.code_writers[language]
-        CodeWriter( writer=writer, input=filename, out_path=out_path )
-    except errors.WxgBaseException as inst:
-        logging.error(inst)
-        sys.exit(inst)
-    except Exception:
-        logging.error( _("An exception occurred while generating the code for the application.\n"
-                         "If you think this is a wxGlade bug, please report it.") )
-        logging.exception(_('Internal Error'))
-        sys.exit(1)
-    sys.exit(0)
 
 def _guiless_open_app(filename):
     """Load a new wxGlade project
 
     GUI-less version of main.wxGladeFrame._open_app().
+    Without GUI, common.root may be replaced by a tree restored from a snapshot; see snapshot.py.
     Returns True if successful."""
     import time
     from xml.sax import SAXParseException
-    from xml_parse import XmlWidgetBuilder, XmlParsingError
+    from xml_parse import ExpatXmlWidgetBuilder, XmlParsingError
     error_msg = None
     infile = None
 
     start = time.time()
 
+    use_snapshot = not config.use_gui and not isinstance(filename, list) and config.preferences.use_snapshots
+    if use_snapshot:
+        import snapshot
+        try:
+            snapshot_key = snapshot.get_key(filename)  # computed once, for loading and saving
+        except EnvironmentError:
+            use_snapshot = False  # the error will be reported when parsing
+    if use_snapshot:
+        root = snapshot.load(filename, snapshot_key)
+        if root is not None:
+            common.root = root
+            common.root.filename = filename
+            common.root.saved = True
+            logging.debug( _("Loaded %s from snapshot in %.2f seconds"), os.path.basename(filename),
+                           time.time() - start )
+            return True
+
     common.root.clear()
     common.root.init()
 
     try:
         try:
             logging.info( _('Read wxGlade project from file "%s"'), filename )
-            input_file_version = None
 
             if not isinstance(filename, list):
                 common.root.filename = filename
-                # decoding will done automatically by SAX XML library
-                if compat.PYTHON2:
-                    infile = open(filename)
-                else:
-                    infile = open(filename, "r", encoding="UTF8")
-                if hasattr(infile, "seek"):
-                    # try to read file version number from the first few lines
-                    import re
-                    version_re = re.compile(r"<!-- generated by wxGlade (\d+)\.(\d+)\.(\d+)(\S*)\s*")
-                    for n in range(3):
-                        match = version_re.match( infile.readline() )
-                        if match:
-                            major, minor, sub, extension = match.groups()
-                            input_file_version = (int(major), int(minor), int(major), extension)
-                            break
-                    infile.seek(0)
-
+                # the file is read only once: decoding is done by the XML parser and the file version is taken
+                # from the comment at the top (see: xml_parse.ExpatXmlWidgetBuilder.comment())
+                infile = open(filename, "rb")
             else:
                 common.root.filename = None
 
-            p = XmlWidgetBuilder(filename, input_file_version)
+            p = ExpatXmlWidgetBuilder(filename)
 
             if infile is not None:
                 p.parse(infile)
@@ -235,6 +265,8 @@ def _guiless_open_app(filename):
         logging.info(_("Template loaded"))
         common.root.template_data = template.Template(filename)
         common.root.filename = None
+    elif use_snapshot:
+        snapshot.save(filename, common.root, snapshot_key)
 
     end = time.time()
     logging.debug(_('Loading time: %.5f'), end - start)
@@ -252,53 +284,252 @@ def _guiless_open_app(filename):
 
     
 
-def command_line_code_generation(filename, language, out_path=None):
-    """Starts a code generator without starting the GUI.
+def _generate_code(filename, language, out_path=None, out_dir=None):
+    """Load a wxg file and generate code without GUI; returns the code writer if successful.
+    Preferences and code writers need to be initialised already.
 
-    filename: Name of wxg file to generate code from
-    language: Code generator language
-    out_path: output file / output directory"""
-    import application, tree
-    # Instead of instantiating a main.wxGlade() object, that is
-    # derived from wx.App, we must do the equivalent work.  The
-    # following lines are taken from main.wxGlade().OnInit() and
-    # main.wxGladeFrame.__init__()
-    common.init_preferences()
-    common.root = app = application.Application()
+    out_dir: for batch mode: output directory; the output path of the project will be taken relative to it"""
+    import application
+    common.root = application.Application()
 
     # Now we can load the file
     if filename is not None:
-        b = _guiless_open_app(filename)
-        if not b:
-            sys.exit(1)
+        if not _guiless_open_app(filename):
+            return None
+    app = common.root  # may have been replaced by a snapshot
     try:
         if language not in common.code_writers:
             raise ValueError('Code writer for "%s" is not available.'%language)
-        common.root.properties["language"].set(language)
-        common.root.generate_code(out_path=out_path)
-    #except errors.WxgBaseException as inst:
-        #if config.debugging: raise
-        #logging.error(inst)
-        #sys.exit(inst)
+        app.properties["language"].set(language)
+        if out_dir is not None:
+            app.properties_changed(["language"])  # adjust the extension of the output path
+            if app.multiple_files:
+                out_path = out_dir
+            else:
+                out_path = os.path.join( out_dir, os.path.basename(app.output_path) )
+        return app.generate_code(out_path=out_path)
     except Exception:
         if config.debugging: raise
         logging.error( _("An exception occurred while generating the code for the application.\n"
                          "If you think this is a wxGlade bug, please report it.") )
         logging.exception(_('Internal Error'))
+        return None
+
+
+def command_line_code_generation(filename, language, out_path=None):
+    """Starts a code generator without starting the GUI.
+
+    filename: Name of wxg file to generate code from
+    language: Code generator language
+    out_path: output file / output directory"""
+    # Instead of instantiating a main.wxGlade() object, that is
+    # derived from wx.App, we must do the equivalent work.  The
+    # following lines are taken from main.wxGlade().OnInit() and
+    # main.wxGladeFrame.__init__()
+    common.init_preferences()
+    if not _generate_code(filename, language, out_path):
         sys.exit(1)
     if not config.testing:
         sys.exit(0)
 
 
+def _batch_init(rc_file):
+    "Initialise a worker process for batch mode; with fork(), everything is inherited from the parent process already"
+    if common.code_writers: return
+    options = optparse.Values( {"rc_file":rc_file} )
+    init_stage1(options)
+    init_stage2(False)
+
+
+def _batch_generate(task):
+    "Generate code for a single file in batch mode; returns filename, success, duration and warning/error messages"
+    import time
+    filename, language, out_dir = task
+    log.flush()
+    start = time.time()
+    success = bool( _generate_code(filename, language, out_dir=out_dir) )
+    return filename, success, time.time() - start, log.getBufferAsList()
+
+
+def _get_batch_out_dirs(filenames, out_path):
+    """returns the output directory for each file in batch mode or None to use the output path of the project.
+    Below out_path, the directories of the files relative to their common parent directory are kept, so projects
+    in different directories don't overwrite each other's files."""
+    if out_path is None: return [None] * len(filenames)
+    directories = [os.path.dirname( os.path.abspath(filename) ) for filename in filenames]
+    parent = os.path.commonprefix( [directory + os.sep for directory in directories] )
+    parent = parent[:parent.rfind(os.sep)+1]  # commonprefix() works character by character
+    ret = []
+    for directory in directories:
+        if parent:
+            relative = os.path.relpath(directory, parent)
+        else:
+            relative = os.path.splitdrive(directory)[1].lstrip(os.sep)  # different drives on Windows
+        ret.append( os.path.normpath( os.path.join(out_path, relative) ) )
+    return ret
+
+
+def command_line_batch_generation(filenames, language, out_path=None, jobs=None):
+    """Generate code for multiple wxg files without starting the GUI.
+
+    The code writers are initialised only once; with more than one job, the files are distributed over a pool of
+    worker processes. A line with result and duration is printed for each file.
+    The exit status is 1 if code generation failed for any of the files.
+
+    filenames: Names of wxg files to generate code from
+    language:  Code generator language
+    out_path:  output directory or None to use the output paths of the projects;
+               the directory structure of the input files is kept below it; see _get_batch_out_dirs()
+    jobs:      number of worker processes; default is the number of CPUs
+    returns the list of (filename, success, duration, messages) if config.testing is set"""
+    import multiprocessing, time
+    if out_path is not None and os.path.isfile(out_path):
+        msg = _('Output path "%s" must be a directory when generating code for multiple files.\n') % out_path
+        logging.error(msg)
+        sys.exit(msg)
+    if not jobs:
+        jobs = multiprocessing.cpu_count()
+    jobs = max( 1, min(jobs, len(filenames)) )
+
+    common.init_preferences()
+    out_dirs = _get_batch_out_dirs(filenames, out_path)
+    for filename, out_dir in zip(filenames, out_dirs):
+        # created here, as the worker processes would compete
+        if out_dir is not None and os.path.isfile(filename) and not os.path.isdir(out_dir):
+            os.makedirs(out_dir)
+    tasks = [(filename, language, out_dir) for filename, out_dir in zip(filenames, out_dirs)]
+    start = time.time()
+    results = []
+    pool = None
+    try:
+        if jobs == 1:
+            iterator = (_batch_generate(task) for task in tasks)
+        else:
+            pool = multiprocessing.Pool( jobs, _batch_init, (config.rc_file,) )
+            iterator = pool.imap(_batch_generate, tasks)
+        for result in iterator:
+            filename, success, duration, messages = result
+            print( "%-7s %7.3fs  %s" % ("OK" if success else "FAILED", duration, filename) )
+            for message in messages:
+                print( "                  %s" % message.replace("\n", "\n                  ") )
+            results.append(result)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    failed = len( [result for result in results if not result[1]] )
+    print( _("%d files, %d failed; %.2f seconds with %d job(s)") % (len(results), failed, time.time()-start, jobs) )
+    if not config.testing:
+        sys.exit(1 if failed else 0)
+    return results
+
+
+def _handle_request(line, language=None):
+    """Handle a single request of the code generation server; returns the reply as dictionary.
+
+    line:     request in JSON format, e.g.
+              {"id": 1, "filename": "/path/app.wxg", "language": "python", "output": "/path/app.py"}
+              "command" may be "generate" (default), "ping" or "quit"
+    language: default language if not specified in request"""
+    import json, time
+    try:
+        request = json.loads(line)
+        if not isinstance(request, dict):
+            raise ValueError("JSON object expected")
+    except ValueError as inst:
+        return {"id": None, "success": False, "messages": ["Invalid request: %s"%inst]}
+
+    reply = {"id": request.get("id")}
+    command = request.get("command", "generate")
+    if command in ("ping", "quit"):
+        reply["success"] = True
+        if command == "quit": reply["quit"] = True
+        return reply
+    filename = request.get("filename")
+    language = request.get("language", language)
+    out_path = request.get("output")
+    if command != "generate" or not filename or not language:
+        reply.update( success=False, messages=["Invalid request: unknown command or no filename or language"] )
+        return reply
+
+    log.flush()
+    start = time.time()
+    writer = _generate_code( _normalise_filename(filename), language, out_path and _normalise_filename(out_path) )
+    saved_files = writer.saved_files if writer else []
+    reply["success"] = bool(writer)
+    reply["files"] = [filename for filename, written in saved_files]
+    reply["written"] = [filename for filename, written in saved_files if written]
+    reply["messages"] = log.getBufferAsList()
+    reply["duration"] = round(time.time() - start, 4)
+    return reply
+
+
+def _serve_stream(instream, outstream, language=None):
+    "Handle requests, one per line, until end of input; returns False if the server is to be shut down"
+    import json, plugins
+    while True:
+        line = instream.readline()
+        if not line: return True
+        binary = isinstance(line, bytes)
+        if binary: line = line.decode("utf-8")
+        if not line.strip(): continue
+        plugins.clear_registry_stamp()  # widget files may have been modified since the last request
+        reply = _handle_request(line, language)
+        answer = json.dumps(reply) + "\n"
+        outstream.write( answer.encode("utf-8") if binary and compat.PYTHON3 else answer )
+        outstream.flush()
+        if reply.get("quit"): return False
+
+
+def command_line_server(language=None, socket_path=None):
+    """Run a code generation server without GUI; code writers and widgets are loaded only once.
+
+    Requests and replies are JSON objects, one per line; see _handle_request().
+    The reply lists the generated files and the warning and error messages.
+
+    language:    default language for requests that don't specify one
+    socket_path: path of a Unix domain socket to listen on; if None, requests are read from stdin"""
+    common.init_preferences()
+    if socket_path is None:
+        _serve_stream(sys.stdin, sys.stdout, language)
+        return
+    try:
+        import socketserver
+    except ImportError:
+        import SocketServer as socketserver
+
+    class RequestHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            if not _serve_stream(self.rfile, self.wfile, language):
+                self.server.shutdown_requested = True
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)  # stale socket from a previous run
+    server = socketserver.UnixStreamServer(socket_path, RequestHandler)
+    server.shutdown_requested = False
+    logging.info( _('Code generation server listening on "%s"'), socket_path )
+    try:
+        # requests are handled one after the other, as they share common.root
+        while not server.shutdown_requested:
+            server.handle_request()
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+
+
 def init_stage1(options):
     """Initialise paths for wxGlade (first stage)
     Initialisation is split because the test suite doesn't work with proper initialised paths."""
-    config.version = config.get_version()
-    common.init_paths(options)
+    with profiling.phase("config.get_version"):
+        config.version = config.get_version()
+    with profiling.phase("common.init_paths"):
+        common.init_paths(options)
 
     # initialise own logging extensions
-    log.init(filename=config.log_file, encoding='utf-8',
-             level='DEBUG' if config.debugging else 'INFO')
+    with profiling.phase("log.init"):
+        log.init(filename=config.log_file, encoding='utf-8',
+                 level='DEBUG' if config.debugging else 'INFO')
     atexit.register(log.deinit)
 
     # print versions
@@ -342,7 +573,8 @@ def init_stage2(use_gui):
                     sys.exit(msg)
 
         try:
-            import wx
+            with profiling.phase("import wx"):
+                import wx
         except ImportError:
             msg = _('Please install missing Python module "wxPython".')
             logging.error(msg)
@@ -365,8 +597,10 @@ def init_stage2(use_gui):
         # codewrites, widgets and sizers are loaded in class main.wxGladeFrame
     else:
         # use_gui has to be set before importing config
-        common.init_preferences()
-        common.init_codegen()
+        with profiling.phase("common.init_preferences"):
+            common.init_preferences()
+        with profiling.phase("common.init_codegen"):
+            common.init_codegen()
 
 
 def run_main():
@@ -380,10 +614,18 @@ def run_main():
 
     if options.start_gui:
         # late import of main (imported wx) for using wxversion  in init_stage2()
-        import main
+        with profiling.phase("import main"):
+            import main
         main.main(options.filename)
+    elif options.daemon:
+        profiling.report()
+        command_line_server( options.language, options.socket )
+    elif options.batch:
+        with profiling.phase("code generation"):
+            command_line_batch_generation( options.filenames, options.language, options.output, options.jobs )
     else:
-        command_line_code_generation( filename=options.filename, language=options.language, out_path=options.output )
+        with profiling.phase("code generation"):
+            command_line_code_generation( filename=options.filename, language=options.language, out_path=options.output )
 
 if __name__ == "__main__":
     run_main()
@@ -9,9 +9,10 @@ See wcodegen.taghandler for custom tag handler base classes.
 @license: MIT (see LICENSE.txt) - THIS PROGRAM COMES WITH NO WARRANTY
 """
 
-import logging
-from xml.sax import SAXException, make_parser
+import gc, logging, os, re
+from xml.sax import SAXException, SAXParseException, make_parser
 from xml.sax.handler import ContentHandler
+from xml.parsers import expat
 
 import time
 
@@ -37,11 +38,15 @@ class XmlParser(ContentHandler):
         self._curr_prop_val = []     # Value of the current property; strings, to be joined
         self._appl_started = False
         self.top = self._objects.top
-        self.parser = make_parser()
-        self.parser.setContentHandler(self)
         self.locator = None # Document locator
+        self.parser = self._create_parser()
         self.index = None     # only used with ClipboardXmlWidgetBuilder
 
+    def _create_parser(self):
+        parser = make_parser()
+        parser.setContentHandler(self)
+        return parser
+
     def parse(self, source):
         ## Permanent workaround for Python bug "Sax parser crashes if given
         ## unicode file name" (http://bugs.python.org/issue11159).
@@ -133,6 +138,12 @@ class XmlParser(ContentHandler):
             mark_blocks = True
         res['mark_blocks'] = bool(mark_blocks)
 
+        try:
+            embed_bitmaps = int(attrs['embed_bitmaps'])
+        except (KeyError, ValueError):
+            embed_bitmaps = False
+        res['embed_bitmaps'] = bool(embed_bitmaps)
+
 
         res['path'] = attrs.get('path')
 
@@ -201,12 +212,13 @@ class XmlWidgetBuilder(XmlParser):
             p["is_template"].set( attrs['is_template'] )
             p["overwrite"].set( attrs['overwrite'] )
             p["mark_blocks"].set( attrs['mark_blocks'] )
+            p["embed_bitmaps"].set( attrs['embed_bitmaps'] )
             p["indent_mode"].set( attrs['indent_symbol'] )
             p["indent_amount"].set( attrs['indent_amount'] )
             p["for_version"].set( attrs['for_version'] )
 
             modified = ["encoding", "output_path", "class", "name", "multiple_files", "language", "top_window",
-                        "use_gettext", "is_template", "overwrite", "mark_blocks",
+                        "use_gettext", "is_template", "overwrite", "mark_blocks", "embed_bitmaps",
                         "indent_mode", "indent_amount", "for_version"]
 
             source_extension = attrs['source_extension']
@@ -307,23 +319,154 @@ class XmlWidgetBuilder(XmlParser):
         self._curr_prop_val.append(data)
 
 
-class ProgressXmlWidgetBuilder(XmlWidgetBuilder):
-    "Adds support for a progress dialog to the widget builder parser"
+class _ExpatLocator(object):
+    "Document locator for ExpatXmlWidgetBuilder; see xml.sax.xmlreader.Locator"
+    def __init__(self, parser, system_id=None):
+        self._parser = parser
+        self._system_id = system_id
+
+    def getColumnNumber(self):
+        return self._parser.ErrorColumnNumber
+
+    def getLineNumber(self):
+        return self._parser.ErrorLineNumber
+
+    def getPublicId(self):
+        return None
+
+    def getSystemId(self):
+        return self._system_id
+
+
+class ExpatXmlWidgetBuilder(XmlWidgetBuilder):
+    """Parser used to build the tree of widgets from a given XML file; faster version of XmlWidgetBuilder.
+
+    pyexpat is used directly instead of the SAX framework. Element names are dispatched using tables and the common
+    paths don't use exceptions for control flow. The garbage collector is disabled while parsing.
+    The resulting tree is the same.
+    See tests/benchmarks/bench_xml_parse.py"""
+
+    BLOCKSIZE = 1 << 16
+    _VERSION_RE = re.compile(r"\s*generated by wxGlade (\d+)\.(\d+)\.(\d+)(\S*)")
+    _SPECIAL_ELEMENTS = frozenset( ("application", "object") )            # handled by XmlWidgetBuilder
+    _IGNORED_PROPERTIES = frozenset( ("menubar", "toolbar", "statusbar") )
+
+    def __init__(self, filename=None, input_file_version=None):
+        self._property_handler_getters = {}  # object class -> get_property_handler function or None
+        XmlWidgetBuilder.__init__(self, filename, input_file_version)
+
+    def _create_parser(self):
+        # character data is not buffered, to get the same chunks as XmlWidgetBuilder.characters() with SAX
+        parser = expat.ParserCreate()
+        parser.StartElementHandler = self.startElement
+        parser.EndElementHandler = self.endElement
+        parser.CharacterDataHandler = self.characters
+        parser.CommentHandler = self.comment
+        self.setDocumentLocator( _ExpatLocator(parser, None if isinstance(self.filename, list) else self.filename) )
+        return parser
+
+    def _parse(self, chunks):
+        # the cyclic garbage collector would scan the growing tree again and again, without finding anything
+        XmlParsingError.locator = self.locator
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for data in chunks:
+                self.parser.Parse(data, False)
+            self.parser.Parse(b"", True)
+        except expat.ExpatError as inst:
+            raise SAXParseException( expat.ErrorString(inst.code), inst, self.locator )
+        finally:
+            if gc_enabled: gc.enable()
+
+    def comment(self, data):
+        "if not passed to __init__, the file version is taken from the comment before the application element"
+        if self._appl_started or self.input_file_version: return
+        match = self._VERSION_RE.match(data)
+        if match:
+            major, minor, sub, extension = match.groups()
+            self.input_file_version = (int(major), int(minor), int(sub), extension)
+
+    def _read_blocks(self, source):
+        while True:
+            data = source.read(self.BLOCKSIZE)
+            if not data: return
+            yield data
+
+    def parse(self, source):
+        # source is an open file; text or binary
+        self._parse( self._read_blocks(source) )
+
+    def parse_string(self, source):
+        self._parse( source if isinstance(source, list) else [source] )
+
+    def startElement(self, name, attrs):
+        if name in self._SPECIAL_ELEMENTS or not self._appl_started:
+            XmlWidgetBuilder.startElement(self, name, attrs)
+            return
+        # start of a property: look for a custom handler to push on the stack and use the top one if there's one
+        obj = self._objects[-1] if self._objects else None
+        if obj is not None and obj.obj is not None:
+            klass = obj.obj.__class__
+            getter = self._property_handler_getters.get(klass, False)
+            if getter is False:
+                getter = self._property_handler_getters[klass] = getattr(klass, "get_property_handler", None)
+            if getter is not None:
+                handler = getter(obj.obj, name)
+                if handler: obj.prop_handlers.append(handler)
+                handler = obj.prop_handlers[-1] if obj.prop_handlers else None
+                if handler: handler.start_elem(name, attrs)
+        self._curr_prop = name
+
+    def endElement(self, name):
+        if name in self._SPECIAL_ELEMENTS:
+            XmlWidgetBuilder.endElement(self, name)
+            return
+        # end of a property
+        prop = self._curr_prop
+        data = "".join(self._curr_prop_val)
+        self._curr_prop = None
+        self._curr_prop_val = []
+        if prop in self._IGNORED_PROPERTIES or not self._objects:
+            return
+        obj = self._objects[-1]
+        handler = obj.prop_handlers[-1] if obj.prop_handlers else None
+
+        # case 1: set _curr_prop value; if char_data returned False, we don't have to call add_property
+        if data and (not handler or handler.char_data(data)) and obj.obj is not None:
+            obj.add_property(prop, data)
+
+        # case 2: if there is a custom handler installed for this property, call its end_elem function:
+        #  if this returns True, remove the handler from Stack
+        if handler and handler.end_elem(name):
+            obj.prop_handlers.pop()
+            obj._properties_added.append(name)
+
+
+class ProgressXmlWidgetBuilder(ExpatXmlWidgetBuilder):
+    """Adds support for a progress dialog to the widget builder parser.
+    The file is read only once; the progress is the number of bytes parsed, relative to the file size."""
+    UPDATE_ELEMENTS = 100  # check the progress every N elements
 
     def __init__(self, filename, input_file_version, input_file):
         self.input_file = input_file
         if self.input_file:
-            self.size = len(self.input_file.readlines())
-            self.input_file.seek(0)
+            self.size = self._get_size(input_file)
             import wx
             self.progress = wx.ProgressDialog( _("Loading..."), _("Please wait while loading the app"), 20, common.main )
-            self.step = 4
-            self.i = 1
+            self._elements = 0
             self._last_progress_update = time.time()
         else:
             self.size = 0
             self.progress = None
-        XmlWidgetBuilder.__init__(self, filename, input_file_version)
+        ExpatXmlWidgetBuilder.__init__(self, filename, input_file_version)
+
+    def _get_size(self, input_file):
+        "returns the file size in bytes or 0 if not available, e.g. for a file-like object"
+        try:
+            return os.fstat( input_file.fileno() ).st_size
+        except (AttributeError, EnvironmentError, ValueError):
+            return 0
 
     def endElement(self, name):
         if self.progress:
@@ -331,21 +474,20 @@ class ProgressXmlWidgetBuilder(XmlWidgetBuilder):
                 self.progress.Destroy()
                 self.progress = None
             else:
-                if self.locator:
-                    where = self.locator.getLineNumber()
-                    value = int(round(where * 20.0 / self.size))
-                else:
-                    # we don't have any information, so we update the progress bar "randomly"
-                    value = (self.step * self.i) % 20
-                    self.i += 1
-                if time.time()-self._last_progress_update > 0.25:
+                self._elements += 1
+                if not self._elements % self.UPDATE_ELEMENTS and time.time()-self._last_progress_update > 0.25:
+                    if self.size:
+                        value = min( 20, self.parser.CurrentByteIndex * 20 // self.size )
+                    else:
+                        # we don't have any information, so we update the progress bar "randomly"
+                        value = (self._elements // self.UPDATE_ELEMENTS) % 20
                     self.progress.Update(value)
                     self._last_progress_update = time.time()
-        XmlWidgetBuilder.endElement(self, name)
+        ExpatXmlWidgetBuilder.endElement(self, name)
 
     def parse(self, *args):
         try:
-            XmlWidgetBuilder.parse(self, *args)
+            ExpatXmlWidgetBuilder.parse(self, *args)
         finally:
             if self.progress:
                 self.progress.Destroy()
@@ -353,7 +495,7 @@ class ProgressXmlWidgetBuilder(XmlWidgetBuilder):
 
     def parse_string(self, *args):
         try:
-            XmlWidgetBuilder.parse_string(self, *args)
+            ExpatXmlWidgetBuilder.parse_string(self, *args)
         finally:
             if self.progress:
                 self.progress.Destroy()
@@ -387,7 +529,7 @@ class ClipboardXmlWidgetBuilder(XmlWidgetBuilder):
 
         class XmlClipboardObject(object):
             def __init__(self, **kwds):
-                self.IS_SIZER = self.IS_WINDOW = False
+                self.IS_SIZER = self.IS_WINDOW = self.IS_SIZERITEM = False
                 self.__dict__.update(kwds)
             def notify_owner(self):
                 pass
@@ -414,6 +556,7 @@ class ClipboardXmlWidgetBuilder(XmlWidgetBuilder):
             sizeritem.index = index
             # fake sizer item
             fake_sizeritem = XmlClipboardObject(obj=sizeritem, parent=parent)
+            fake_sizeritem.IS_SIZERITEM = True
 
             self._objects.push(fake_sizer)
             self._objects.push(fake_sizeritem)
@@ -557,7 +700,7 @@ class XmlWidgetObject(object):
         stack = parser._objects[:]
         top = stack.pop(-1) if stack else None
 
-        if top and isinstance(top.obj, Sizeritem):
+        if top and top.IS_SIZERITEM:
             sizeritem = top.obj
             top = stack.pop(-1)
 
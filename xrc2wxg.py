@@ -3,6 +3,12 @@
 Converts an XRC resource file (in a format wxGlade likes, i.e. all windows
 inside sizers, no widget unknown to wxGlade, ...) into a WXG file.
 
+The file is converted while it is being parsed: each toplevel element is
+fixed and written out as soon as its end tag has been read and is then
+discarded. So the memory use depends on the largest toplevel window, not on
+the size of the file. A second pass over the file is only required if the
+XML declaration does not specify the encoding.
+
 @copyright: 2002-2007 Alberto Griggio
 @copyright: 2014-2016 Carsten Grohmann
 @copyright: 2017-2021 Dietmar Schwertberger
@@ -10,13 +16,14 @@ inside sizers, no widget unknown to wxGlade, ...) into a WXG file.
 """
 
 import logging
-import xml.dom.minidom
 import getopt
 import os.path
+import re
 import sys
 import time
+import xml.parsers.expat
 
-__version__ = '0.0.6'
+__version__ = '0.0.7'
 _name = 'xrc2wxg'  # Application name
 
 
@@ -62,7 +69,7 @@ _widgets = [
     'wxRadioButton', 'wxScrolledWindow', 'wxSlider', 'wxSpinButton',
     'wxSpinCtrl', 'wxSplitterWindow', 'wxStaticBitmap', 'wxStaticBoxSizer',
     'wxStaticLine', 'wxStaticText', 'wxStatusBar', 'wxTextCtrl',
-    'wxToggleButton', 'wxToolBar', 'wxTreeCtrl', 'wxWrapSizer', 
+    'wxToggleButton', 'wxToolBar', 'wxTreeCtrl', 'wxWrapSizer',
 ]
 
 # Widget names with special meaning
@@ -72,18 +79,327 @@ _special_class_names = ['notebookpage', 'separator', 'sizeritem', 'spacer', 'too
 _write_timestamp = True
 
 
-def get_child_elems(node):
-    def ok(n):
-        return n.nodeType == n.ELEMENT_NODE
+########################################################################################################################
+# a lightweight document tree; the parts of the xml.dom.minidom interface that are used for the conversion
+
+class Element(object):
+    "Element with attributes and child nodes: Element, Comment, CDATASection or text as string"
+    __slots__ = ("tagName", "attributes", "childNodes", "parentNode")
+
+    def __init__(self, tagName, attributes=None):
+        self.tagName = tagName
+        self.attributes = attributes or {}
+        self.childNodes = []
+        self.parentNode = None
+
+    def getAttribute(self, name):
+        return self.attributes.get(name, u'')
+
+    def setAttribute(self, name, value):
+        self.attributes[name] = value
+
+    def hasAttribute(self, name):
+        return name in self.attributes
+
+    def removeAttribute(self, name):
+        del self.attributes[name]
+
+    @property
+    def firstChild(self):
+        return self.childNodes[0] if self.childNodes else None
+
+    def _index(self, child):
+        # index of the child; text is compared by identity as well
+        for i, node in enumerate(self.childNodes):
+            if node is child: return i
+        raise ValueError("%r is not a child of <%s>" % (child, self.tagName))
+
+    def appendChild(self, child):
+        if isinstance(child, Node) and child.parentNode is not None:
+            child.parentNode.removeChild(child)
+        self.childNodes.append(child)
+        if isinstance(child, Node): child.parentNode = self
+        return child
+
+    def insertBefore(self, child, ref):
+        if ref is None: return self.appendChild(child)
+        if isinstance(child, Node) and child.parentNode is not None:
+            child.parentNode.removeChild(child)
+        self.childNodes.insert(self._index(ref), child)
+        if isinstance(child, Node): child.parentNode = self
+        return child
+
+    def removeChild(self, child):
+        del self.childNodes[self._index(child)]
+        if isinstance(child, Node): child.parentNode = None
+        return child
+
+    def replaceChild(self, child, old):
+        if child is old: return old
+        if isinstance(child, Node) and child.parentNode is not None:
+            child.parentNode.removeChild(child)
+        self.childNodes[self._index(old)] = child
+        if isinstance(child, Node): child.parentNode = self
+        if isinstance(old, Node): old.parentNode = None
+        return old
+
+    def getElementsByTagName(self, name):
+        "all descendant elements with the given tag name or all for '*', in document order"
+        ret = []
+        stack = [iter(self.childNodes)]
+        while stack:
+            for node in stack[-1]:
+                if isinstance(node, Element):
+                    if name == '*' or node.tagName == name: ret.append(node)
+                    stack.append( iter(node.childNodes) )
+                    break
+            else:
+                stack.pop()
+        return ret
+
+
+class Comment(object):
+    __slots__ = ("data", "parentNode")
+    def __init__(self, data):
+        self.data = data
+        self.parentNode = None
+
 
-    return filter(ok, node.childNodes)
+class CDATASection(Comment):
+    __slots__ = ()
+
+
+Node = (Element, Comment)  # node types with a parentNode; text is stored as plain string
+
+
+def get_child_elems(node):
+    return [n for n in node.childNodes if isinstance(n, Element)]
 
 
 def get_text_elems(node):
-    def ok(n):
-        return n.nodeType == n.TEXT_NODE
+    return [n for n in node.childNodes if not isinstance(n, Node)]
+
 
-    return filter(ok, node.childNodes)
+def _get_text(node):
+    "returns the data of the first child, if it's text or CDATA; None otherwise"
+    child = node.firstChild
+    if child is None or isinstance(child, Element) or type(child) is Comment: return None
+    return child.data if isinstance(child, CDATASection) else child
+
+
+def _set_text(node, data):
+    "replace the data of the first child, which is text or CDATA"
+    if isinstance(node.childNodes[0], CDATASection):
+        node.childNodes[0].data = data
+    else:
+        node.childNodes[0] = data
+
+
+def _text_element(tag, text):
+    element = Element(tag)
+    element.childNodes.append(text)
+    return element
+
+
+def _escape(data):
+    return data.replace("&", "&amp;").replace("<", "&lt;").replace("\"", "&quot;").replace(">", "&gt;")
+
+
+def _format_node(node, indent, out):
+    # append the node as pretty-printed XML to the list out, formatted like xml.dom.minidom's toprettyxml();
+    # lines with whitespace only will be removed when writing
+    if isinstance(node, Element):
+        out.append(u"%s<%s" % (indent, node.tagName))
+        for name, value in node.attributes.items():
+            out.append(u' %s="%s"' % (name, _escape(value)))
+        children = node.childNodes
+        if not children:
+            out.append(u"/>\n")
+            return
+        out.append(u">")
+        if len(children) == 1 and (not isinstance(children[0], Node) or isinstance(children[0], CDATASection)):
+            _format_node(children[0], u"", out)
+            if not isinstance(children[0], CDATASection): out[-1] = out[-1][:-1]  # no newline after the text
+        else:
+            out.append(u"\n")
+            for child in children:
+                _format_node(child, indent + u"    ", out)
+            out.append(indent)
+        out.append(u"</%s>\n" % node.tagName)
+    elif isinstance(node, CDATASection):
+        if u"]]>" in node.data:
+            raise ValueError("']]>' not allowed in a CDATA section")
+        out.append(u"<![CDATA[%s]]>" % node.data)
+    elif isinstance(node, Comment):
+        out.append(u"%s<!--%s-->\n" % (indent, node.data))
+    else:
+        out.append( _escape(u"%s%s\n" % (indent, node)) )
+
+
+########################################################################################################################
+# conversion
+
+class _Converter(object):
+    """Builds the tree of each toplevel element while parsing, converts it and writes it to the output.
+
+    The root element, the XRC <resource>, becomes the <application>; the start tag can only be written once the
+    encoding is known and it's known whether the root contains more than a single text node."""
+
+    def __init__(self, output, encoding):
+        self.output = output
+        self.encoding = encoding
+        self.remove_encoding = encoding is None  # remove <encoding> elements, see _get_encoding_element()
+        self.depth = 0
+        self.root = None           # root element, without children
+        self.root_written = False  # start tag written?
+        self.pending = []          # text and comments below the root, not yet written
+        self.current = None        # current element of the toplevel tree being built
+        self.objects = []          # <object> elements of the toplevel tree, in document order
+
+    def parse(self, infile):
+        parser = xml.parsers.expat.ParserCreate()
+        parser.buffer_text = True
+        parser.ordered_attributes = True
+        parser.StartElementHandler = self.start_element
+        parser.EndElementHandler = self.end_element
+        parser.CharacterDataHandler = self.character_data
+        parser.CommentHandler = self.comment
+        parser.StartCdataSectionHandler = self.start_cdata
+        parser.EndCdataSectionHandler = self.end_cdata
+        self._cdata = self._cdata_continue = False
+        parser.ParseFile(infile)
+
+    def write(self, text):
+        # split into lines and write them, except for lines with whitespace only
+        for line in text.encode("UTF-8", "xmlcharrefreplace").splitlines():
+            if not line.strip():
+                continue
+            if hasattr(self.output, "write"):
+                self.output.write(line)
+                self.output.write(b'\n')
+            else:
+                self.output.append(line+b'\n')
+
+    # parser callbacks #################################################################################################
+    def start_element(self, name, attributes):
+        attributes = dict( zip(attributes[::2], attributes[1::2]) )
+        self.depth += 1
+        if self.depth == 1:
+            self.root = Element(name, attributes)
+            return
+        element = Element(name, attributes)
+        if name == 'object':
+            self.objects.append(element)
+        if self.current is not None:
+            self.current.appendChild(element)
+        self.current = element
+
+    def end_element(self, name):
+        self.depth -= 1
+        if self.depth == 0:
+            self.end_root()
+            return
+        element = self.current
+        self.current = element.parentNode
+        if self.current is None:
+            self.toplevel(element)
+
+    def _add_node(self, node):
+        if self.current is not None:
+            self.current.appendChild(node)
+        elif self.depth == 1:
+            self.pending.append(node)
+
+    def character_data(self, data):
+        if self._cdata:
+            if self._cdata_continue:
+                self._last_node().data += data
+                return
+            self._cdata_continue = True
+            self._add_node( CDATASection(data) )
+            return
+        nodes = self._get_nodes()
+        if nodes and not isinstance(nodes[-1], Node):
+            nodes[-1] += data  # concatenate text
+        elif nodes is not None:
+            nodes.append(data)
+
+    def _get_nodes(self):
+        # returns the list to add text to
+        if self.current is not None: return self.current.childNodes
+        if self.depth == 1: return self.pending
+        return None
+
+    def _last_node(self):
+        nodes = self._get_nodes()
+        return nodes[-1] if nodes else None
+
+    def comment(self, data):
+        if self.depth: self._add_node( Comment(data) )
+
+    def start_cdata(self):
+        self._cdata = True
+        self._cdata_continue = False
+
+    def end_cdata(self):
+        self._cdata = self._cdata_continue = False
+
+    # output of the root and its children ##############################################################################
+    def _fix_root(self):
+        root = self.root
+        root.tagName = 'application'
+        for attribute in ['version', 'xmlns']:
+            if root.hasAttribute(attribute):
+                root.removeAttribute(attribute)
+        if self.encoding:
+            root.setAttribute('encoding', self.encoding)
+
+    def _get_root_start(self):
+        self._fix_root()
+        out = [u"<application"]
+        for name, value in self.root.attributes.items():
+            out.append(u' %s="%s"' % (name, _escape(value)))
+        return out
+
+    def write_nodes(self, nodes):
+        "write nodes below the root; the start tag of the root is written first, if required"
+        if not self.root_written:
+            out = self._get_root_start()
+            out.append(u">\n")
+            self.root_written = True
+        else:
+            out = []
+        for node in self.pending + nodes:
+            _format_node(node, u"    ", out)
+        self.pending = []
+        self.write( u"".join(out) )
+
+    def toplevel(self, element):
+        "convert the tree of a toplevel element and write it"
+        objects = self.objects
+        self.objects = []
+        if self.remove_encoding and element.tagName == 'encoding':
+            return
+        tree = Element('application')  # stand-in for the root element while converting
+        tree.appendChild(element)
+        convert_tree(tree, objects)
+        self.write_nodes(tree.childNodes)
+
+    def end_root(self):
+        if not self.root_written and len(self.pending) == 1 and not isinstance(self.pending[0], Node):
+            # the root contains a single text node
+            self._fix_root()
+            self.root.childNodes = self.pending
+            out = []
+            _format_node(self.root, u"", out)
+            self.write( u"".join(out) )
+        elif not self.root_written and not self.pending:
+            out = self._get_root_start()
+            out.append(u"/>\n")
+            self.write( u"".join(out) )
+        else:
+            self.write_nodes([])
+            self.write(u"</application>\n")
 
 
 def convert(filename, output_file):
@@ -92,145 +408,192 @@ def convert(filename, output_file):
     global _counter_name
     _counter_name = 1
 
-    document = xml.dom.minidom.parse(filename)
-    fix_fake_panels(document)
-    set_base_classes(document)
-    fix_default_properties(document)
-    fix_class_properties(document)
-    fix_widgets(document)
-    fix_encoding(filename, document)
     if not hasattr(output_file, 'write') and not isinstance(output_file, list):
-        output_file = open(output_file, 'wb')
-        write_output(document, output_file)
-        output_file.close()
+        try:
+            with open(output_file, 'wb') as outfile:
+                _convert(filename, outfile)
+        except:
+            # don't leave a partially written file
+            if os.path.isfile(output_file): os.remove(output_file)
+            raise
     else:
-        write_output(document, output_file)
+        _convert(filename, output_file)
 
 
-def write_output(document, output):
-    "Writes an UTF-8 encoded pretty-printed XML copy of the given document to the output object."
-    dom_copy = xml.dom.minidom.Document()
+def _convert(filename, output):
+    encoding = get_encoding(filename)
+    converter = _Converter(output, encoding)
+    if encoding is None:
+        # not from the XML declaration, but maybe from an <encoding> element; requires a first pass
+        converter.encoding = _get_encoding_element(filename)
 
     if _write_timestamp:
         msg = ' generated by %s %s on %s '%( _name, __version__, time.asctime() )
     else:
         msg = ' generated by xrc2wxg '
+    converter.write( u'<?xml version="1.0" encoding="UTF-8"?>\n<!--%s-->\n' % msg )
+    with open(filename, 'rb') as infile:
+        converter.parse(infile)
 
-    comment = dom_copy.createComment(msg)
-    dom_copy.appendChild(comment)
-    dom_copy.appendChild(document.documentElement)
 
-    pretty_xml = dom_copy.toprettyxml(indent='    ', encoding='UTF-8')
-    for line in pretty_xml.splitlines():
-        # ignore empty lines
-        if not line.strip():
-            continue
-        if hasattr(output, "write"):
-            output.write(line)
-            output.write(b'\n')
-        else:
-            output.append(line+b'\n')
-
-    dom_copy.unlink()
-
-
-def set_base_classes(document):
-    for elem in document.getElementsByTagName('object'):
-        klass = elem.getAttribute('class')
-        if klass.startswith('wx'):
-            elem.setAttribute('base', 'Edit' + klass[2:])
-            name = elem.getAttribute('name')
-            if not name:
-                global _counter_name
-                elem.setAttribute('name', 'object_%s' % _counter_name)
-                _counter_name += 1
-
-
-def fix_default_properties(document):
-    "Rename generic properties; see: _default_props"
-    # special case...
-    for elem in document.getElementsByTagName('disabled'):
-        elem.tagName = 'disabled_bitmap'
-
-    # replace property names
-    for prop in _default_props:
-        for elem in document.getElementsByTagName(prop):
-            elem.tagName = _default_props[prop]
+def get_encoding(filename):
+    "returns the encoding from the XML declaration or None"
+    enc = re.compile(r'^\s*<\?xml\s+.*(encoding\s*=\s*"(.*?)").*\?>')
+    tag = re.compile(r'<.+?>')
+    with open(filename, 'rb') as infile:
+        for line in infile:
+            line = line.decode("latin-1")
+            match = re.match(enc, line)
+            if match:
+                return match.group(2)
+            elif re.match(tag, line):
+                break
+    return None
+
+
+def _get_encoding_element(filename):
+    # if it's not specified, try to find a child of the root called
+    # 'encoding': I don't know why, but XRCed does this
+    state = {"depth":0, "text":None, "encoding":None}
+
+    def start_element(name, attributes):
+        state["depth"] += 1
+        if state["depth"] == 2 and name == 'encoding':
+            state["text"] = []
+    def end_element(name):
+        if state["depth"] == 2 and state["text"] is not None:
+            if state["text"]: state["encoding"] = u"".join(state["text"])
+            state["text"] = None
+        state["depth"] -= 1
+    def character_data(data):
+        if state["depth"] == 2 and state["text"] is not None: state["text"].append(data)
+
+    parser = xml.parsers.expat.ParserCreate()
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.CharacterDataHandler = character_data
+    with open(filename, 'rb') as infile:
+        parser.ParseFile(infile)
+    return state["encoding"]
+
+
+class _Objects(object):
+    "The <object> elements of a tree in document order, as collected by the parser; to be looked up by class"
+    def __init__(self, tree, objects):
+        self.tree = tree
+        self.objects = objects
+        self.by_class = {}  # original class name -> [(index, element), ...]
+        for index, node in enumerate(objects):
+            self.by_class.setdefault(node.getAttribute('class'), []).append( (index, node) )
+
+    def _is_attached(self, node):
+        # elements that have been removed from the tree are ignored
+        while node is not None:
+            if node is self.tree: return True
+            node = node.parentNode
+        return False
+
+    def get(self, classnames=None):
+        "returns the objects with the given class names, or all objects, that are still part of the tree"
+        if classnames is None:
+            return [node for node in self.objects if self._is_attached(node)]
+        if isinstance(classnames, str):
+            classnames = (classnames,)
+        candidates = []
+        for classname in classnames:
+            candidates += self.by_class.get(classname, [])
+        candidates.sort(key=lambda item: item[0])
+        # the class name may have been changed in the meantime
+        return [node for index, node in candidates
+                if node.getAttribute('class') in classnames and self._is_attached(node)]
+
+
+def convert_tree(tree, objects):
+    """Convert a toplevel element from XRC to WXG, in place.
+
+    tree:    stand-in for the root element, with the toplevel element as child
+    objects: all <object> elements of the toplevel element, in document order"""
+    objects = _Objects(tree, objects)
+    fix_fake_panels(tree, objects)
+    flags = fix_elements(tree)
+    fix_widgets(tree, objects, flags)
+
+
+def fix_elements(tree):
+    """Set base classes and names, rename generic and class specific properties; returns the <flag> elements.
+
+    This is done in a single pass over the tree; see: _default_props, _class_props"""
+    global _counter_name
+    flags = []
+    for elem in tree.getElementsByTagName('*'):
+        tag = elem.tagName
+        if tag == 'object':
+            klass = elem.getAttribute('class')
+            if klass.startswith('wx'):
+                elem.setAttribute('base', 'Edit' + klass[2:])
+                name = elem.getAttribute('name')
+                if not name:
+                    elem.setAttribute('name', 'object_%s' % _counter_name)
+                    _counter_name += 1
+            if klass in _class_props:
+                for child in get_child_elems(elem):
+                    if child.tagName in _class_props[klass]:
+                        child.tagName = _class_props[klass][child.tagName]
+        elif tag == 'disabled':
+            # special case...
+            elem.tagName = 'disabled_bitmap'
+        elif tag in _default_props:
+            elem.tagName = _default_props[tag]
 
             # invert property value after renaming from enabled to disabled
-            if prop == "enabled":
-                if elem.firstChild.data == u'0':
-                    elem.firstChild.data = u'1'
-                else:
-                    elem.firstChild.data = u'0'
-
-    document.documentElement.tagName = 'application'
-    for attribute in ['version', 'xmlns']:
-        if document.documentElement.hasAttribute(attribute):
-            document.documentElement.removeAttribute(attribute)
-
-
-def fix_class_properties(document):
-    "Rename class specific properties; see: _class_props"
-    for element in document.getElementsByTagName('object'):
-        klass = element.getAttribute('class')
-        if not klass or klass not in _class_props:
-            continue
-        for child in get_child_elems(element):
-            old_tagname = child.tagName
-            if old_tagname in _class_props[klass]:
-                child.tagName = _class_props[klass][old_tagname]
-
-
-def fix_widgets(document):
-    fix_menubars(document)
-    fix_toolbars(document)
-    fix_custom_widgets(document)
-    fix_sizeritems(document)
-    fix_notebooks(document)
-    fix_splitters(document)
-    fix_spacers(document)
-    fix_sliders(document)
-    fix_scrolled_windows(document)
-    fix_toplevel_names(document)
-    fix_statusbar(document)
-    fix_gridbag_sizers(document)
-
-
-def fix_custom_widgets(document):
-    for elem in document.getElementsByTagName('object'):
+            if tag == "enabled" and _get_text(elem) is not None:
+                _set_text(elem, u'1' if _get_text(elem) == u'0' else u'0')
+        elif tag == 'flag':
+            flags.append(elem)
+    return flags
+
+
+def fix_widgets(tree, objects, flags):
+    fix_menubars(tree, objects)
+    fix_toolbars(tree, objects)
+    fix_custom_widgets(tree, objects)
+    fix_sizeritems(tree, objects, flags)
+    fix_notebooks(tree, objects)
+    fix_splitters(tree, objects)
+    fix_spacers(tree, objects)
+    fix_sliders(tree, objects)
+    fix_scrolled_windows(tree, objects)
+    fix_toplevel_names(tree)
+    fix_statusbar(tree, objects)
+    fix_gridbag_sizers(tree, objects)
+
+
+def fix_custom_widgets(tree, objects):
+    for elem in objects.get():
         klass = elem.getAttribute('class')
         if klass not in _widgets and klass not in _special_class_names:
             logging.warning('Unknown widget "%s" - fallback to generic widget "CustomWidget"' % klass)
             elem.setAttribute('base', 'CustomWidget')
-            args = document.createElement('arguments')
+            args = Element('arguments')
             for child in get_child_elems(elem):
                 # if child is a 'simple' attribute, i.e <child>value</child>, convert it to an 'argument'
-                if len(child.childNodes) == 1 and child.firstChild.nodeType == child.TEXT_NODE:
-                    arg = document.createElement('argument')
-                    arg.appendChild(document.createTextNode(
-                        child.tagName + ': ' + child.firstChild.data))
-                    args.appendChild(arg)
+                if len(child.childNodes) == 1 and not isinstance(child.firstChild, Node):
+                    args.appendChild( _text_element('argument', child.tagName + ': ' + child.firstChild) )
                     # and remove it
                     elem.removeChild(child)
                     # otherwise, leave it where it is (it shouldn't hurt)
             elem.appendChild(args)
 
 
-def fix_sizeritems(document):
-    def issizeritem(node):
-        return node.getAttribute('class') == 'sizeritem'
+def fix_sizeritems(tree, objects, flags):
+    for sitem in objects.get('sizeritem'):
+        for child in get_child_elems(sitem):
+            if child.tagName == 'object':
+                sitem.appendChild(child)
+    fix_flag_property(flags)
 
-    def isobject(node):
-        return node.tagName == 'object'
 
-    for sitem in filter(issizeritem, document.getElementsByTagName('object')):
-        for child in filter(isobject, get_child_elems(sitem)):
-            sitem.appendChild(sitem.removeChild(child))
-    fix_flag_property(document)
-
-
-def fix_gridbag_sizers(document):
+def fix_gridbag_sizers(tree, objects):
     # sizers:
     #     wxg needs
     #         <rows>1</rows>
@@ -242,10 +605,7 @@ def fix_gridbag_sizers(document):
     #     wxg needs empty sizer slots and these spans, if different from 1,1:
     #         <span>1, 2</span>
 
-    def isgbsizer(node):
-        return node.getAttribute('class') == 'wxGridBagSizer'
-
-    for szr in filter(isgbsizer, document.getElementsByTagName('object')):
+    for szr in objects.get('wxGridBagSizer'):
         # collect informations
         cells = {}  # (row,col)  0-based
         rows = 0
@@ -254,15 +614,15 @@ def fix_gridbag_sizers(document):
             if child.tagName!="object": continue
             cellpos = child.getElementsByTagName("cellpos")
             if cellpos:
-                child.removeChild(cellpos[0])
-                cellpos = cellpos[0].firstChild.nodeValue.split(",")
+                cellpos[0].parentNode.removeChild(cellpos[0])
+                cellpos = _get_text(cellpos[0]).split(",")
                 row = int(cellpos[0])
                 col = int(cellpos[1])
             else:  # if required, that could be changed, but then the number of cols needs to be specified
                 raise ValueError("cellpos is required")
             cellspan = child.getElementsByTagName("span")  # renamed already from cellspan
             if cellspan:
-                cellspan = cellspan[0].firstChild.nodeValue.split(",")
+                cellspan = _get_text(cellspan[0]).split(",")
                 cellspan_rows = int(cellspan[0])
                 cellspan_cols = int(cellspan[1])
             else:
@@ -274,13 +634,8 @@ def fix_gridbag_sizers(document):
             szr.removeChild(child)
 
         # sizer: set number of rows and cols
-        cols_ = document.createElement('cols')
-        cols_.appendChild( document.createTextNode(str(cols)) )
-        szr.insertBefore(cols_, szr.firstChild)
-
-        rows_ = document.createElement('rows')
-        rows_.appendChild( document.createTextNode(str(rows)) )
-        szr.insertBefore(rows_, szr.firstChild)
+        szr.insertBefore( _text_element('cols', str(cols)), szr.firstChild )
+        szr.insertBefore( _text_element('rows', str(rows)), szr.firstChild )
 
         # insert empty sizer slots
         for row in range(rows):
@@ -289,35 +644,27 @@ def fix_gridbag_sizers(document):
                     szr.appendChild( cells[row,col] )
                 else:
                     # append an empty sizer slot
-                    slot = document.createElement("object")
-                    slot.setAttribute("class", "sizerslot")
-                    szr.appendChild( slot )
-
+                    szr.appendChild( Element("object", {"class": "sizerslot"}) )
 
-def fix_flag_property(document):
-    for elem in document.getElementsByTagName('flag'):
-        tmp = elem.firstChild.data.replace('CENTRE', 'CENTER')
-        elem.firstChild.data = tmp.replace('GROW', 'EXPAND')
-        if elem.firstChild.data.find('wxALIGN_CENTER_HORIZONTAL') < 0 and \
-           elem.firstChild.data.find('wxALIGN_CENTER_VERTICAL') < 0:
-            elem.firstChild.data = elem.firstChild.data.replace( 'wxALIGN_CENTER', 'wxALIGN_CENTER_HORIZONTAL|'
-                                                                 'wxALIGN_CENTER_VERTICAL' )
 
+def fix_flag_property(flags):
+    for elem in flags:
+        flag = _get_text(elem)
+        if flag is None: continue
+        flag = flag.replace('CENTRE', 'CENTER').replace('GROW', 'EXPAND')
+        if flag.find('wxALIGN_CENTER_HORIZONTAL') < 0 and flag.find('wxALIGN_CENTER_VERTICAL') < 0:
+            flag = flag.replace( 'wxALIGN_CENTER', 'wxALIGN_CENTER_HORIZONTAL|wxALIGN_CENTER_VERTICAL' )
+        _set_text(elem, flag)
 
-def fix_menubars(document):
-    def ismenubar(elem):
-        return elem.getAttribute('class') == 'wxMenuBar'
 
-    menubars = filter(ismenubar, document.getElementsByTagName('object'))
-    for mb in menubars:
-        fix_menus(document, mb)
-        if mb.parentNode is not document.documentElement:
-            mb_prop = document.createElement('menubar')
-            mb_prop.appendChild(document.createTextNode('1'))
-            mb.parentNode.insertBefore(mb_prop, mb)
+def fix_menubars(tree, objects):
+    for mb in objects.get('wxMenuBar'):
+        fix_menus(mb)
+        if mb.parentNode is not tree:
+            mb.parentNode.insertBefore(_text_element('menubar', '1'), mb)
 
 
-def fix_menus(document, menubar):
+def fix_menus(menubar):
     """Rearrange the wxMenu elements
 
     All menus of a wxMenuBar have to span by <menus> and </menus>::
@@ -330,117 +677,81 @@ def fix_menus(document, menubar):
             </menu>
         </menus>"""
 
-    def ismenu(elem):
-        return elem.getAttribute('class') == 'wxMenu'
-
-    wxg_menus = document.createElement('menus')
+    wxg_menus = Element('menus')
 
-    xrc_menus = filter(ismenu, get_child_elems(menubar))
-    for menu in xrc_menus:
-        try:
-            label = [c for c in get_child_elems(menu) if c.tagName == 'label'][0]
-            label = label.firstChild.data
-        except IndexError:
-            label = ''
-        new_menu = document.createElement('menu')
-        new_menu.setAttribute('name', menu.getAttribute('name'))
-        new_menu.setAttribute('label', label)
-        fix_sub_menus(document, menu, new_menu)
+    for menu in get_child_elems(menubar):
+        if menu.getAttribute('class') != 'wxMenu': continue
+        labels = [c for c in get_child_elems(menu) if c.tagName == 'label']
+        label = labels and _get_text(labels[0]) or ''
+        new_menu = Element('menu', {'name': menu.getAttribute('name'), 'label': label})
+        fix_sub_menus(menu, new_menu)
         wxg_menus.appendChild(new_menu)
-        menubar.removeChild(menu).unlink()
+        menubar.removeChild(menu)
 
     menubar.appendChild(wxg_menus)
 
 
-def fix_sub_menus(document, menu, new_menu):
+def fix_sub_menus(menu, new_menu):
     for child in get_child_elems(menu):
         klass = child.getAttribute('class')
-        elem = document.createElement('')
         if klass == 'wxMenuItem':
-            elem.tagName = 'item'
-            name = document.createElement('name')
-            name.appendChild(document.createTextNode(
-                child.getAttribute('name')))
-            elem.appendChild(name)
+            elem = Element('item')
+            elem.appendChild( _text_element('name', child.getAttribute('name')) )
             for c in get_child_elems(child):
                 elem.appendChild(c)
         elif klass == 'separator':
-            elem.tagName = 'item'
+            elem = Element('item')
             for name in 'label', 'id', 'name':
-                e = document.createElement(name)
-                e.appendChild(document.createTextNode('---'))
-                elem.appendChild(e)
+                elem.appendChild( _text_element(name, '---') )
         elif klass == 'wxMenu':
-            elem.tagName = 'menu'
-            elem.setAttribute('name', child.getAttribute('name'))
-            try:
-                label = [c for c in get_child_elems(child) if c.tagName == 'label'][0]
-                label = label.firstChild.data
-            except IndexError:
-                label = ''
-            elem.setAttribute('label', label)
-            fix_sub_menus(document, child, elem)
-        if elem.tagName:
-            new_menu.appendChild(elem)
-
-
-def _get_elements_by_class(document, classnames):
-    if isinstance(classnames, str):
-        classnames = (classnames,)
-    return [node for node in document.getElementsByTagName('object') if node.getAttribute('class') in classnames]
+            labels = [c for c in get_child_elems(child) if c.tagName == 'label']
+            label = labels and _get_text(labels[0]) or ''
+            elem = Element('menu', {'name': child.getAttribute('name'), 'label': label})
+            fix_sub_menus(child, elem)
+        else:
+            continue
+        new_menu.appendChild(elem)
 
 
-def fix_toolbars(document):
-    for tb in _get_elements_by_class(document, 'wxToolBar'):
-        fix_tools(document, tb)
-        if tb.parentNode is not document.documentElement:
-            tb_prop = document.createElement('toolbar')
-            tb_prop.appendChild(document.createTextNode('1'))
-            tb.parentNode.insertBefore(tb_prop, tb)
+def fix_toolbars(tree, objects):
+    for tb in objects.get('wxToolBar'):
+        fix_tools(tb)
+        if tb.parentNode is not tree:
+            tb.parentNode.insertBefore(_text_element('toolbar', '1'), tb)
 
 
-def fix_tools(document, toolbar):
-    tools = document.createElement('tools')
+def fix_tools(toolbar):
+    tools = Element('tools')
     for tool in [c for c in get_child_elems(toolbar) if c.tagName == 'object']:
         if tool.getAttribute('class') == 'tool':
-            new_tool = document.createElement('tool')
-            tool_id = document.createElement('id')
-            tool_id.appendChild(document.createTextNode(
-                tool.getAttribute('name')))
-            new_tool.appendChild(tool_id)
+            new_tool = Element('tool')
+            new_tool.appendChild( _text_element('id', tool.getAttribute('name')) )
             for c in get_child_elems(tool):
                 new_tool.appendChild(c)
             tools.appendChild(new_tool)
-            toolbar.removeChild(tool).unlink()
         elif tool.getAttribute('class') == 'separator':
-            new_tool = document.createElement('tool')
-            tool_id = document.createElement('id')
-            tool_id.appendChild(document.createTextNode('---'))
-            new_tool.appendChild(tool_id)
+            new_tool = Element('tool')
+            new_tool.appendChild( _text_element('id', '---') )
             tools.appendChild(new_tool)
-            toolbar.removeChild(tool).unlink()
-        else:
-            # some kind of control, unsupported at the moment, just remove it
-            toolbar.removeChild(tool).unlink()
+        # else: some kind of control, unsupported at the moment, just remove it
+        toolbar.removeChild(tool)
     toolbar.appendChild(tools)
 
 
-def fix_notebooks(document):
-
-    for nb in _get_elements_by_class(document, 'wxNotebook'):
+def fix_notebooks(tree, objects):
+    for nb in objects.get('wxNotebook'):
         pages = [node for node in get_child_elems(nb) if node.getAttribute('class')=='notebookpage']
-        tabs = document.createElement('tabs')
-        try:
-            us = [node for node in get_child_elems(nb) if node.tagName=='usenotebooksizer'][0]
-            nb.removeChild(us).unlink()
-        except IndexError:
-            pass
+        tabs = Element('tabs')
+        for node in get_child_elems(nb):
+            if node.tagName=='usenotebooksizer':
+                nb.removeChild(node)
+                break
         for page in pages:
-            tab = document.createElement('tab')
+            tab = Element('tab')
             obj = None
             for c in get_child_elems(page):
                 if c.tagName == 'label':
-                    tab.appendChild(c.firstChild)
+                    if c.childNodes: tab.appendChild(c.removeChild(c.firstChild))
                 elif c.tagName == 'object':
                     tab.setAttribute('window', c.getAttribute('name'))
                     c.setAttribute('base', 'NotebookPane')
@@ -450,23 +761,22 @@ def fix_notebooks(document):
         nb.insertBefore(tabs, nb.firstChild)
 
 
-def fix_splitters(document):
-    for sp in _get_elements_by_class(document, 'wxSplitterWindow'):
+def fix_splitters(tree, objects):
+    for sp in objects.get('wxSplitterWindow'):
         panes = [node for node in get_child_elems(sp) if node.tagName=='object']
         assert len(panes) <= 2, "Splitter window with more than 2 panes!"
         for i, pane in enumerate(panes):
-            e = document.createElement('window_%s' % (i + 1))
-            e.appendChild(document.createTextNode(pane.getAttribute('name')))
-            sp.insertBefore(e, sp.firstChild)
-        for orient in filter( lambda n: n.tagName == 'orientation', get_child_elems(sp) ):
-            if orient.firstChild.data == 'vertical':
-                orient.firstChild.data = 'wxVERTICAL'
-            elif orient.firstChild.data == 'horizontal':
-                orient.firstChild.data = 'wxHORIZONTAL'
-
-
-def fix_fake_panels(document):
-    for frame in _get_elements_by_class(document, 'wxFrame'):
+            sp.insertBefore( _text_element('window_%s' % (i + 1), pane.getAttribute('name')), sp.firstChild )
+        for orient in get_child_elems(sp):
+            if orient.tagName != 'orientation': continue
+            if _get_text(orient) == 'vertical':
+                _set_text(orient, 'wxVERTICAL')
+            elif _get_text(orient) == 'horizontal':
+                _set_text(orient, 'wxHORIZONTAL')
+
+
+def fix_fake_panels(tree, objects):
+    for frame in objects.get('wxFrame'):
         for c in get_child_elems(frame):
             if c.tagName == 'object' and c.getAttribute('class') == 'wxPanel' and c.getAttribute('name') == '':
                 elems = get_child_elems(c)
@@ -474,38 +784,31 @@ def fix_fake_panels(document):
                     frame.replaceChild(elems[0], c)
 
 
-def fix_spacers(document):
-    for spacer in _get_elements_by_class(document, 'spacer'):
+def fix_spacers(tree, objects):
+    for spacer in objects.get('spacer'):
         spacer.setAttribute('name', 'spacer')
         spacer.setAttribute('base', 'EditSpacer')
-        sizeritem = document.createElement('object')
-        sizeritem.setAttribute('class', 'sizeritem')
+        sizeritem = Element('object', {'class': 'sizeritem'})
         for child in get_child_elems(spacer):
             if child.tagName == 'size':
-                w, h = [s.strip() for s in child.firstChild.data.split(',')]
-                width = document.createElement('width')
-                width.appendChild(document.createTextNode(w))
-                height = document.createElement('height')
-                height.appendChild(document.createTextNode(h))
-                spacer.removeChild(child).unlink()
-                spacer.appendChild(width)
-                spacer.appendChild(height)
+                w, h = [s.strip() for s in _get_text(child).split(',')]
+                spacer.removeChild(child)
+                spacer.appendChild( _text_element('width', w) )
+                spacer.appendChild( _text_element('height', h) )
             else:
-                sizeritem.appendChild(spacer.removeChild(child))
+                sizeritem.appendChild(child)
         spacer.parentNode.replaceChild(sizeritem, spacer)
         sizeritem.appendChild(spacer)
 
 
-def fix_scrolled_windows(document):
-    for sw in _get_elements_by_class(document, 'wxScrolledWindow'):
-        e = document.createElement('scrollable')
-        e.appendChild(document.createTextNode('1'))
-        sw.insertBefore(e, sw.firstChild)
+def fix_scrolled_windows(tree, objects):
+    for sw in objects.get('wxScrolledWindow'):
+        sw.insertBefore( _text_element('scrollable', '1'), sw.firstChild )
 
 
-def fix_toplevel_names(document):
+def fix_toplevel_names(tree):
     names = {}
-    for widget in get_child_elems(document.documentElement):
+    for widget in get_child_elems(tree):
         klass = widget.getAttribute('class')
         if not klass:
             continue  # don't add a new 'class' attribute if it doesn't exist
@@ -520,22 +823,20 @@ def fix_toplevel_names(document):
         widget.setAttribute('class', klass_name)
 
 
-def fix_sliders(document):
-    for slider in _get_elements_by_class(document, ('wxSlider', 'wxSpinCtrl')): 
+def fix_sliders(tree, objects):
+    for slider in objects.get(('wxSlider', 'wxSpinCtrl')):
         v1, v2 = 0, 100
         for child in get_child_elems(slider):
             if child.tagName == 'min':
-                v1 = child.firstChild.data.strip()
-                slider.removeChild(child).unlink()
+                v1 = _get_text(child).strip()
+                slider.removeChild(child)
             elif child.tagName == 'max':
-                v2 = child.firstChild.data.strip()
-                slider.removeChild(child).unlink()
-        rng = document.createElement('range')
-        rng.appendChild(document.createTextNode('%s, %s' % (v1, v2)))
-        slider.appendChild(rng)
+                v2 = _get_text(child).strip()
+                slider.removeChild(child)
+        slider.appendChild( _text_element('range', '%s, %s' % (v1, v2)) )
 
 
-def fix_statusbar(document):
+def fix_statusbar(tree, objects):
     """Rearrange the wxStatusBar elements
 
     XRC format::
@@ -558,22 +859,19 @@ def fix_statusbar(document):
             <style>wxST_SIZEGRIP</style>
         </object>
     """
-    for statusbar in document.getElementsByTagName('object'):
-        if statusbar.getAttribute('class') != 'wxStatusBar':
-            continue
-
+    for statusbar in objects.get('wxStatusBar'):
         fields = statusbar.getElementsByTagName('fields')
         widths = statusbar.getElementsByTagName('widths')
 
-        new_fields = document.createElement('fields')
+        new_fields = Element('fields')
 
         if fields:
-            fields_count = int(fields[0].firstChild.data)
+            fields_count = int(_get_text(fields[0]))
         else:
             fields_count = 1
 
         if widths:
-            widths_data = widths[0].firstChild.data
+            widths_data = _get_text(widths[0])
             widths_data = widths_data.split(',')
         else:
             widths_data = []
@@ -583,60 +881,109 @@ def fix_statusbar(document):
             widths_data += ["-1"] * delta
 
         for pos in range(fields_count):
-            field = document.createElement('field')
-            field.appendChild(document.createTextNode(''))
-            field.setAttribute('width', widths_data[pos])
-            new_fields.appendChild(field)
+            new_fields.appendChild( Element('field', {'width': widths_data[pos]}) ).childNodes.append(u'')
 
         # delete rearranged fields
         for field in fields:
-            statusbar.removeChild(field).unlink()
+            statusbar.removeChild(field)
         for width in widths:
-            statusbar.removeChild(width).unlink()
+            statusbar.removeChild(width)
 
         # add new created elements
         statusbar.appendChild(new_fields)
 
         # marker <statusbar>1</statusbar> to enable the statusbar within
         # wxGlade
-        if statusbar.parentNode is not document.documentElement:
-            statusbar_prop = document.createElement('statusbar')
-            statusbar_prop.appendChild(document.createTextNode('1'))
-            statusbar.parentNode.insertBefore(statusbar_prop, statusbar)
-
+        if statusbar.parentNode is not tree:
+            statusbar.parentNode.insertBefore(_text_element('statusbar', '1'), statusbar)
 
-def fix_encoding(filename, document):
-    # first try to find the encoding of the xml doc
-    import re
 
-    enc = re.compile(r'^\s*<\?xml\s+.*(encoding\s*=\s*"(.*?)").*\?>')
-    tag = re.compile(r'<.+?>')
-    for line in open(filename):
-        match = re.match(enc, line)
-        if match:
-            document.documentElement.setAttribute('encoding', match.group(2))
-            return
-        elif re.match(tag, line):
-            break
+########################################################################################################################
+# command line
 
-    # if it's not specified, try to find a child of the root called
-    # 'encoding': I don't know why, but XRCed does this
-    for child in document.documentElement.childNodes:
-        if child.nodeType == child.ELEMENT_NODE and child.tagName == 'encoding':
-            if child.firstChild is not None and child.firstChild.nodeType == child.TEXT_NODE:
-                document.documentElement.setAttribute( 'encoding', child.firstChild.data )
-            document.documentElement.removeChild(child)
+def _convert_job(task):
+    # convert a single file; executed in a worker process; returns (infilename, outfilename, duration, error)
+    infilename, out_filename = task
+    start = time.time()
+    try:
+        convert(infilename, out_filename)
+    except Exception as inst:
+        return (infilename, out_filename, time.time()-start, "%s: %s" % (inst.__class__.__name__, inst))
+    return (infilename, out_filename, time.time()-start, None)
+
+
+def convert_files(filenames, out_dir=None, jobs=None):
+    """Convert multiple XRC files; directories are searched for .xrc files.
+    With more than one job, the files are distributed over a pool of worker processes.
+
+    out_dir: output directory or None to write each .wxg file next to the .xrc file;
+             files with the same name as a previous one are not converted, but reported as failed
+    jobs:    number of worker processes; default is the number of CPUs
+    returns the list of (input file, output file, duration, error message or None)"""
+    import multiprocessing
+    infilenames = []
+    for filename in filenames:
+        if os.path.isdir(filename):
+            infilenames += sorted( os.path.join(filename, name) for name in os.listdir(filename)
+                                   if name.lower().endswith('.xrc') )
+        else:
+            infilenames.append(filename)
+    if out_dir and not os.path.isdir(out_dir):
+        os.makedirs(out_dir)
+    tasks = []
+    duplicates = {}     # index in tasks -> error message, for files that would overwrite the output of another one
+    out_filenames = {}  # normalised output file name -> input file name
+    for infilename in infilenames:
+        out_filename = os.path.splitext(infilename)[0] + '.wxg'
+        if out_dir: out_filename = os.path.join(out_dir, os.path.basename(out_filename))
+        key = os.path.normcase( os.path.abspath(out_filename) )
+        if key in out_filenames:
+            duplicates[len(tasks)] = 'same output file "%s" as for "%s"' % (out_filename, out_filenames[key])
+        else:
+            out_filenames[key] = infilename
+        tasks.append( (infilename, out_filename) )
+    to_convert = [task for i, task in enumerate(tasks) if i not in duplicates]
+
+    if not jobs:
+        jobs = multiprocessing.cpu_count()
+    jobs = max( 1, min(jobs, len(to_convert)) )
+    results = []
+    pool = None
+    try:
+        if jobs == 1:
+            iterator = (_convert_job(task) for task in to_convert)
+        else:
+            pool = multiprocessing.Pool(jobs)
+            iterator = pool.imap(_convert_job, to_convert)
+        for i, task in enumerate(tasks):
+            result = task + (0.0, duplicates[i])  if i in duplicates else  next(iterator)
+            infilename, out_filename, duration, error = result
+            if error:
+                logging.error('Converting "%s" failed: %s', infilename, error)
+            else:
+                logging.info('Converted "%s" to "%s" in %.3fs', infilename, out_filename, duration)
+            results.append(result)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    return results
 
 
 def usage():
     msg = """\
 usage: python %s OPTIONS <INPUT_FILE.xrc> [WXG_FILE]
+       python %s OPTIONS [-o OUTPUT_DIR] <INPUT_FILE.xrc|DIRECTORY>...
 
 OPTIONS:
   -d, --debug: debug mode, i.e. you can see the whole traceback of each error
+  -j, --jobs N: number of worker processes for converting multiple files;
+                default is the number of CPUs
+  -o, --output OUTPUT_DIR: directory for the WXG files of multiple files
 
 If WXG_FILE is not given, it defaults to INPUT_FILE.wxg
-    """ % _name
+For directories, all .xrc files inside are converted.
+    """ % (_name, _name)
     print( msg)
     sys.exit(1)
 
@@ -660,24 +1007,45 @@ cases).
 
 def main():
     try:
-        options, args = getopt.getopt(sys.argv[1:], "d", ['debug'])
+        options, args = getopt.getopt(sys.argv[1:], "dj:o:", ['debug', 'jobs=', 'output='])
     except getopt.GetoptError:
         usage()
     if not args:
         usage()
+    options = dict(options)
+    debug = '-d' in options or '--debug' in options
+    jobs = options.get('-j', options.get('--jobs'))
+    out_dir = options.get('-o', options.get('--output'))
+    if jobs is not None:
+        try:
+            jobs = int(jobs)
+        except ValueError:
+            usage()
+
     infilename = args[0]
-    try:
-        out_filename = args[1]
-    except IndexError:
-        out_filename = os.path.splitext(infilename)[0] + '.wxg'
-    if not options:
+    if ( jobs is None and out_dir is None and len(args) <= 2 and not os.path.isdir(infilename) and
+         not (len(args) == 2 and (os.path.isdir(args[1]) or args[1].lower().endswith('.xrc'))) ):
+        # a single file
         try:
+            out_filename = args[1]
+        except IndexError:
+            out_filename = os.path.splitext(infilename)[0] + '.wxg'
+        if not debug:
+            try:
+                convert(infilename, out_filename)
+            except:
+                # catch the exception and print a nice message
+                print_exception()
+        else:  # if in debug mode, let the traceback be printed
             convert(infilename, out_filename)
-        except:
-            # catch the exception and print a nice message
-            print_exception()
-    else:  # if in debug mode, let the traceback be printed
-        convert(infilename, out_filename)
+        return
+
+    # multiple files and/or directories
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    results = convert_files(args, out_dir, jobs)
+    failed = [result for result in results if result[3]]
+    logging.info( '%d files converted, %d failed', len(results)-len(failed), len(failed) )
+    if failed: sys.exit(1)
 
 
 if __name__ == '__main__':